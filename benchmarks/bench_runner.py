@@ -0,0 +1,94 @@
+"""Benchmark subprocess vs in-process Alembic runners.
+
+Runs the command sequence of a normal upgrade deploy (``current``,
+``upgrade``, ``current``) against a throwaway SQLite copy of the test app.
+
+Usage:
+    python -m benchmarks.bench_runner [--iterations N]
+"""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+# Project/Local
+from src.alembic_ops import RunnerType, create_runner
+from src.constants import RUNNER_IN_PROCESS, RUNNER_SUBPROCESS
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+TEST_APP = Path(__file__).resolve().parent.parent / "tests" / "test_app"
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _deploy(runner: RunnerType) -> None:
+    """Replay the runner calls made by a regular upgrade run."""
+    runner.current()
+    runner.upgrade("head")
+    runner.current()
+
+
+def _time_mode(mode: str, iterations: int) -> list[float]:
+    """Time ``iterations`` deploys with the given runner mode."""
+    timings: list[float] = []
+    for _ in range(iterations):
+        with tempfile.TemporaryDirectory() as tmp:
+            app = Path(tmp) / "app"
+            shutil.copytree(TEST_APP, app)
+            os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{app / 'bench.db'}"
+            cwd = os.getcwd()
+            os.chdir(app)
+            try:
+                runner = create_runner(mode, "alembic.ini")
+                start = time.perf_counter()
+                _deploy(runner)
+                timings.append(time.perf_counter() - start)
+            finally:
+                os.chdir(cwd)
+    return timings
+
+
+def _report(name: str, timings: list[float]) -> float:
+    """Print a summary line and return the median."""
+    median = statistics.median(timings)
+    print(
+        f"{name:<12} median={median * 1000:8.1f} ms  "
+        f"min={min(timings) * 1000:8.1f} ms  max={max(timings) * 1000:8.1f} ms"
+    )
+    return median
+
+
+# =============================================================================
+# MAIN EXECUTION
+# =============================================================================
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    modes: dict[str, Callable[[], list[float]]] = {
+        RUNNER_SUBPROCESS: lambda: _time_mode(RUNNER_SUBPROCESS, args.iterations),
+        RUNNER_IN_PROCESS: lambda: _time_mode(RUNNER_IN_PROCESS, args.iterations),
+    }
+    medians = {name: _report(name, run()) for name, run in modes.items()}
+    speedup = medians[RUNNER_SUBPROCESS] / medians[RUNNER_IN_PROCESS]
+    print(f"in-process speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark the single-pass SafetyAnalyzer against the legacy regex passes.
+
+Generates a multi-megabyte offline-mode SQL script shaped like Alembic
+``upgrade --sql`` output and times both analyzers on it. The legacy
+implementation is reproduced here so the comparison survives its removal.
+
+Usage:
+    python -m benchmarks.bench_safety [--revisions N] [--iterations N]
+"""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import argparse
+import re
+import statistics
+import time
+from collections.abc import Callable
+
+# Project/Local
+from src.safety import SafetyAnalyzer
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+LEGACY_PATTERNS = (
+    r"DROP\s+TABLE",
+    r"DROP\s+COLUMN",
+    r"ALTER\s+.*COLUMN.*TYPE",
+    r"TRUNCATE",
+    r"DROP\s+INDEX",
+)
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _generate_sql(revisions: int) -> str:
+    """Build an Alembic-style offline script with ``revisions`` upgrades."""
+    parts = []
+    for i in range(revisions):
+        parts.append(
+            f"-- Running upgrade {i} -> {i + 1}\n\n"
+            f"CREATE TABLE table_{i} (\n    id INTEGER NOT NULL, \n"
+            "    name VARCHAR(50) NOT NULL, \n    created_at DATETIME, \n"
+            "    PRIMARY KEY (id)\n);\n\n"
+            f"/* backfill lookup_{i} */\n"
+            f"INSERT INTO lookup_{i} (id, label) "
+            "VALUES (1, 'first value'), (2, 'second value');\n\n"
+            f"ALTER TABLE table_{i} ADD COLUMN note TEXT;\n\n"
+            f"ALTER TABLE table_{i} ALTER COLUMN name TYPE VARCHAR(100);\n\n"
+            f"UPDATE alembic_version SET version_num='{i + 1}' "
+            f"WHERE alembic_version.version_num = '{i}';\n\n"
+        )
+    return "".join(parts)
+
+
+def _legacy_analyze(sql: str) -> list[bool]:
+    """Comment stripping plus one regex pass per rule, as before."""
+    sql = re.sub(r"/\*.*?\*/", "", sql, flags=re.DOTALL)
+    sql = re.sub(r"--.*$", "", sql, flags=re.MULTILINE)
+    return [bool(re.search(p, sql, re.IGNORECASE)) for p in LEGACY_PATTERNS]
+
+
+def _time(func: Callable[[str], object], sql: str, iterations: int) -> list[float]:
+    """Time ``iterations`` calls of ``func`` on ``sql``."""
+    timings: list[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func(sql)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _report(name: str, timings: list[float]) -> float:
+    """Print a summary line and return the median."""
+    median = statistics.median(timings)
+    print(
+        f"{name:<12} median={median * 1000:8.1f} ms  "
+        f"min={min(timings) * 1000:8.1f} ms  max={max(timings) * 1000:8.1f} ms"
+    )
+    return median
+
+
+# =============================================================================
+# MAIN EXECUTION
+# =============================================================================
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--revisions", type=int, default=20000)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    sql = _generate_sql(args.revisions)
+    print(f"input: {len(sql) / 1024 / 1024:.1f} MiB, {args.revisions} revisions")
+    analyzer = SafetyAnalyzer()
+    legacy = _report("legacy", _time(_legacy_analyze, sql, args.iterations))
+    scanner = _report("scanner", _time(analyzer.analyze, sql, args.iterations))
+    print(f"scanner speedup: {legacy / scanner:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,40 @@ from __future__ import annotations
 # IMPORTS
 # =============================================================================
 # Standard Library
+import asyncio
+import codecs
+import logging
+import os
 import subprocess
+import threading
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+# Third Party
+from alembic import command
+from alembic.config import Config
 
 # Project/Local
-from src.constants import CMD_CURRENT, CMD_DOWNGRADE, CMD_HISTORY, CMD_SHOW, CMD_UPGRADE
+from src.constants import (
+    ATTR_CONNECTION,
+    CMD_CURRENT,
+    CMD_DOWNGRADE,
+    CMD_HISTORY,
+    CMD_SHOW,
+    CMD_UPGRADE,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_STDERR_TAIL_LINES,
+    RUNNER_IN_PROCESS,
+    RUNNER_SUBPROCESS,
+)
 from src.logger import setup_logger
+from src.spool import CommandOutput, SpooledOutput
+from src.tracing import invocation
+
+if TYPE_CHECKING:
+    from src.session import DatabaseSession
 
 # =============================================================================
 # TYPES & CONSTANTS
@@ -36,12 +65,18 @@ class AlembicRunner:
         """
         self.config_path = config_path
 
-    def upgrade(self, revision: str = "head", sql: bool = False) -> str:
+    def upgrade(
+        self,
+        revision: str = "head",
+        sql: bool = False,
+        on_chunk: Callable[[str], None] | None = None,
+    ) -> CommandOutput:
         """Run alembic upgrade.
 
         Args:
             revision: Target revision.
             sql: If True, return generated SQL instead of executing.
+            on_chunk: Callback receiving output while it is produced.
 
         Returns:
             Output from alembic command (logs or SQL).
@@ -49,14 +84,20 @@ class AlembicRunner:
         cmd = ["alembic", "-c", self.config_path, CMD_UPGRADE, revision]
         if sql:
             cmd.append("--sql")
-        return self._run_command(cmd)
+        return self._run_command(cmd, on_chunk)
 
-    def downgrade(self, revision: str, sql: bool = False) -> str:
+    def downgrade(
+        self,
+        revision: str,
+        sql: bool = False,
+        on_chunk: Callable[[str], None] | None = None,
+    ) -> CommandOutput:
         """Run alembic downgrade.
 
         Args:
             revision: Target revision.
             sql: If True, return generated SQL.
+            on_chunk: Callback receiving output while it is produced.
 
         Returns:
             Output from command.
@@ -64,7 +105,7 @@ class AlembicRunner:
         cmd = ["alembic", "-c", self.config_path, CMD_DOWNGRADE, revision]
         if sql:
             cmd.append("--sql")
-        return self._run_command(cmd)
+        return self._run_command(cmd, on_chunk)
 
     def current(self) -> str:
         """Get current revision.
@@ -72,7 +113,9 @@ class AlembicRunner:
         Returns:
             Output from current command.
         """
-        return self._run_command(["alembic", "-c", self.config_path, CMD_CURRENT])
+        return self._run_command(
+            ["alembic", "-c", self.config_path, CMD_CURRENT]
+        ).text()
 
     def history(self) -> str:
         """Show migration history.
@@ -80,7 +123,9 @@ class AlembicRunner:
         Returns:
             Output from history command.
         """
-        return self._run_command(["alembic", "-c", self.config_path, CMD_HISTORY])
+        return self._run_command(
+            ["alembic", "-c", self.config_path, CMD_HISTORY]
+        ).text()
 
     def show(self, revision: str) -> str:
         """Show details of a revision.
@@ -90,24 +135,439 @@ class AlembicRunner:
         """
         return self._run_command(
             ["alembic", "-c", self.config_path, CMD_SHOW, revision]
-        )
+        ).text()
+
+    def _run_command(
+        self, cmd: list[str], on_chunk: Callable[[str], None] | None = None
+    ) -> CommandOutput:
+        """Execute subprocess command, streaming its output.
+
+        Stdout is read line by line into a bounded buffer that spills to a
+        temporary file, so large offline SQL never sits in memory as one
+        string. Stderr is drained on a thread (keeping only its tail) to avoid
+        blocking the child on a full pipe.
+
+        Args:
+            cmd: Command list to execute.
+            on_chunk: Callback receiving stdout while it is produced.
+
+        Returns:
+            Handle over the captured standard output.
+
+        Raises:
+            subprocess.CalledProcessError: If command fails.
+        """
+        logger.info(f"Running command: {' '.join(cmd)}")
+        spool = SpooledOutput(on_chunk=on_chunk)
+        stderr_tail: deque[str] = deque(maxlen=DEFAULT_STDERR_TAIL_LINES)
+
+        with invocation(" ".join(cmd[3:])) as span:
+            with subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            ) as process:
+                assert process.stdout is not None and process.stderr is not None
+                drain = threading.Thread(
+                    target=stderr_tail.extend, args=(process.stderr,), daemon=True
+                )
+                drain.start()
+                for line in process.stdout:
+                    spool.write(line)
+                returncode = process.wait()
+                drain.join()
+
+            output = spool.finish()
+            if span is not None:
+                span.attributes["process.exit_code"] = returncode
+            if returncode != 0:
+                stderr = "".join(stderr_tail)
+                logger.error(f"Command failed: {stderr}")
+                output.close()
+                raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
+        return output
+
+
+class AsyncAlembicRunner:
+    """Runs the ``alembic`` CLI from an event loop.
+
+    Each call starts ``alembic`` with ``asyncio.create_subprocess_exec`` and
+    reads stdout and stderr as they are produced, without a thread per
+    call. ``env`` overrides the child's environment (such as its database
+    URL), and a call running past its timeout kills the child. This is
+    library API for callers with their own event loop; the action itself
+    does not use it.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        env: dict[str, str] | None = None,
+        timeout: float = 0,
+    ):
+        """Initialize Runner.
+
+        Args:
+            config_path: Path to alembic.ini
+            env: Variables set in the environment of every call.
+            timeout: Default seconds before a call is killed (0 for no limit).
+        """
+        self.config_path = config_path
+        self.env: dict[str, str] = env if env is not None else {}
+        self.timeout = timeout
+
+    async def upgrade(
+        self,
+        revision: str = "head",
+        sql: bool = False,
+        on_chunk: Callable[[str], None] | None = None,
+        timeout: float | None = None,
+    ) -> CommandOutput:
+        """Run alembic upgrade.
+
+        Args:
+            revision: Target revision.
+            sql: If True, return generated SQL instead of executing.
+            on_chunk: Callback receiving output while it is produced.
+            timeout: Seconds before the call is killed (None for the default).
+
+        Returns:
+            Output from alembic command (logs or SQL).
+        """
+        cmd = ["alembic", "-c", self.config_path, CMD_UPGRADE, revision]
+        if sql:
+            cmd.append("--sql")
+        return await self._run_command(cmd, on_chunk, timeout)
 
-    def _run_command(self, cmd: list[str]) -> str:
-        """Execute subprocess command.
+    async def downgrade(
+        self,
+        revision: str,
+        sql: bool = False,
+        on_chunk: Callable[[str], None] | None = None,
+        timeout: float | None = None,
+    ) -> CommandOutput:
+        """Run alembic downgrade.
+
+        Args:
+            revision: Target revision.
+            sql: If True, return generated SQL.
+            on_chunk: Callback receiving output while it is produced.
+            timeout: Seconds before the call is killed (None for the default).
+
+        Returns:
+            Output from command.
+        """
+        cmd = ["alembic", "-c", self.config_path, CMD_DOWNGRADE, revision]
+        if sql:
+            cmd.append("--sql")
+        return await self._run_command(cmd, on_chunk, timeout)
+
+    async def current(self, timeout: float | None = None) -> str:
+        """Get current revision.
+
+        Returns:
+            Output from current command.
+        """
+        cmd = ["alembic", "-c", self.config_path, CMD_CURRENT]
+        return (await self._run_command(cmd, timeout=timeout)).text()
+
+    async def history(self, timeout: float | None = None) -> str:
+        """Show migration history.
+
+        Returns:
+            Output from history command.
+        """
+        cmd = ["alembic", "-c", self.config_path, CMD_HISTORY]
+        return (await self._run_command(cmd, timeout=timeout)).text()
+
+    async def show(self, revision: str, timeout: float | None = None) -> str:
+        """Show details of a revision.
+
+        Returns:
+            Output from show command.
+        """
+        cmd = ["alembic", "-c", self.config_path, CMD_SHOW, revision]
+        return (await self._run_command(cmd, timeout=timeout)).text()
+
+    async def _run_command(
+        self,
+        cmd: list[str],
+        on_chunk: Callable[[str], None] | None = None,
+        timeout: float | None = None,
+    ) -> CommandOutput:
+        """Execute subprocess command, streaming its output.
+
+        Stdout is spooled as in :class:`AlembicRunner`; only the tail of
+        stderr is kept. Both pipes are read concurrently so the child never
+        blocks on a full one.
 
         Args:
             cmd: Command list to execute.
+            on_chunk: Callback receiving stdout while it is produced.
+            timeout: Seconds before the child is killed (None for the default).
 
         Returns:
-            Standard output/error combined.
+            Handle over the captured standard output.
 
         Raises:
             subprocess.CalledProcessError: If command fails.
+            subprocess.TimeoutExpired: If the command exceeds the timeout.
         """
         logger.info(f"Running command: {' '.join(cmd)}")
+        limit = self.timeout if timeout is None else timeout
+        spool = SpooledOutput(on_chunk=on_chunk)
+        stderr_tail: deque[str] = deque(maxlen=DEFAULT_STDERR_TAIL_LINES)
+
+        with invocation(" ".join(cmd[3:])) as span:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env={**os.environ, **self.env},
+            )
+            assert process.stdout is not None and process.stderr is not None
+            finished = False
+            try:
+                async with asyncio.timeout(limit or None):
+                    await asyncio.gather(
+                        _read_text(process.stdout, spool.write),
+                        _read_text(
+                            process.stderr,
+                            lambda text: stderr_tail.extend(
+                                text.splitlines(keepends=True)
+                            ),
+                        ),
+                    )
+                    returncode = await process.wait()
+                finished = True
+            except TimeoutError:
+                logger.error(f"Command timed out after {limit:g}s")
+                raise subprocess.TimeoutExpired(cmd, limit) from None
+            finally:
+                if not finished:
+                    # Timed out, cancelled or failed reading: do not leave the
+                    # child running or its spooled output on disk
+                    if process.returncode is None:
+                        process.kill()
+                        await process.wait()
+                    spool.discard()
+
+            output = spool.finish()
+            if span is not None:
+                span.attributes["process.exit_code"] = returncode
+            if returncode != 0:
+                stderr = "".join(stderr_tail)
+                logger.error(f"Command failed: {stderr}")
+                output.close()
+                raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
+        return output
+
+
+class InProcessAlembicRunner:
+    """Executes Alembic commands through ``alembic.command`` in this process.
+
+    Avoids forking a new interpreter (and re-importing SQLAlchemy) for every
+    call. ``env.py`` is still executed per command, exactly as the CLI does.
+
+    When a shared session is open, its connection is handed to ``env.py`` as
+    ``config.attributes["connection"]`` and committed after each command.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        attributes: dict[str, Any] | None = None,
+        session: DatabaseSession | None = None,
+    ):
+        """Initialize Runner.
+
+        Args:
+            config_path: Path to alembic.ini
+            attributes: Values placed in ``Config.attributes`` for ``env.py``.
+            session: Optional shared database session.
+        """
+        self.config_path = config_path
+        self.attributes: dict[str, Any] = attributes if attributes is not None else {}
+        self.session = session
+
+    def upgrade(
+        self,
+        revision: str = "head",
+        sql: bool = False,
+        on_chunk: Callable[[str], None] | None = None,
+    ) -> CommandOutput:
+        """Run alembic upgrade.
+
+        Args:
+            revision: Target revision.
+            sql: If True, return generated SQL instead of executing.
+            on_chunk: Callback receiving output while it is produced.
+
+        Returns:
+            Output from alembic command (SQL in offline mode).
+        """
+        return self._run_command(
+            f"{CMD_UPGRADE} {revision}",
+            lambda cfg: command.upgrade(cfg, revision, sql=sql),
+            on_chunk,
+        )
+
+    def downgrade(
+        self,
+        revision: str,
+        sql: bool = False,
+        on_chunk: Callable[[str], None] | None = None,
+    ) -> CommandOutput:
+        """Run alembic downgrade.
+
+        Args:
+            revision: Target revision.
+            sql: If True, return generated SQL.
+            on_chunk: Callback receiving output while it is produced.
+
+        Returns:
+            Output from command.
+        """
+        return self._run_command(
+            f"{CMD_DOWNGRADE} {revision}",
+            lambda cfg: command.downgrade(cfg, revision, sql=sql),
+            on_chunk,
+        )
+
+    def current(self) -> str:
+        """Get current revision.
+
+        Returns:
+            Output from current command.
+        """
+        return self._run_command(CMD_CURRENT, command.current).text()
+
+    def history(self) -> str:
+        """Show migration history.
+
+        Returns:
+            Output from history command.
+        """
+        return self._run_command(CMD_HISTORY, command.history).text()
+
+    def show(self, revision: str) -> str:
+        """Show details of a revision.
+
+        Returns:
+            Output from show command.
+        """
+        return self._run_command(
+            f"{CMD_SHOW} {revision}", lambda cfg: command.show(cfg, revision)
+        ).text()
+
+    def _make_config(self, buffer: SpooledOutput) -> Config:
+        """Build a fresh Alembic config writing all output to ``buffer``."""
+        cfg = Config(
+            self.config_path,
+            stdout=buffer,  # type: ignore[arg-type]
+            output_buffer=buffer,  # type: ignore[arg-type]
+        )
+        cfg.attributes.update(self.attributes)
+        if self.session is not None and self.session.is_open:
+            cfg.attributes[ATTR_CONNECTION] = self.session.connection
+        return cfg
+
+    def _run_command(
+        self,
+        description: str,
+        func: Callable[[Config], Any],
+        on_chunk: Callable[[str], None] | None = None,
+    ) -> CommandOutput:
+        """Execute an ``alembic.command`` function and capture its output.
+
+        Args:
+            description: Human readable command for logging.
+            func: Callable receiving the Alembic config.
+            on_chunk: Callback receiving output while it is produced.
+
+        Returns:
+            Handle over the text written to stdout / the SQL output buffer.
+        """
+        logger.info(f"Running in-process: alembic -c {self.config_path} {description}")
+        buffer = SpooledOutput(on_chunk=on_chunk)
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return result.stdout
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Command failed: {e.stderr}")
+            with invocation(description), _preserve_logging():
+                func(self._make_config(buffer))
+            if self.session is not None:
+                self.session.commit()
+        except Exception as e:
+            logger.error(f"Command failed: {e}")
+            if self.session is not None:
+                self.session.rollback()
             raise
+        return buffer.finish()
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+RunnerType = AlembicRunner | InProcessAlembicRunner
+
+
+def create_runner(
+    mode: str, config_path: str, session: DatabaseSession | None = None
+) -> RunnerType:
+    """Create the Alembic runner for the requested execution mode.
+
+    Args:
+        mode: ``subprocess`` or ``in-process``.
+        config_path: Path to alembic.ini
+        session: Shared database session (in-process only).
+
+    Returns:
+        Runner instance.
+
+    Raises:
+        ValueError: If the mode is unknown or cannot use the session.
+    """
+    if mode == RUNNER_SUBPROCESS:
+        if session is not None:
+            raise ValueError("A shared connection requires the in-process runner")
+        return AlembicRunner(config_path)
+    if mode == RUNNER_IN_PROCESS:
+        return InProcessAlembicRunner(config_path, session=session)
+    raise ValueError(f"Unknown runner: {mode}")
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+async def _read_text(stream: asyncio.StreamReader, write: Callable[[str], Any]) -> None:
+    """Decode a child's output pipe chunk by chunk until it closes."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while chunk := await stream.read(DEFAULT_CHUNK_SIZE):
+        text = decoder.decode(chunk)
+        if text:
+            write(text)
+    text = decoder.decode(b"", final=True)
+    if text:
+        write(text)
+
+
+@contextmanager
+def _preserve_logging() -> Iterator[None]:
+    """Undo logging reconfiguration performed by ``env.py``.
+
+    The stock ``env.py`` calls ``logging.config.fileConfig``, which replaces
+    root handlers and disables every logger that already exists, including
+    ours. That is harmless in a child process but not in-process.
+    """
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    level = root.level
+    disabled = {
+        name: existing.disabled
+        for name, existing in logging.Logger.manager.loggerDict.items()
+        if isinstance(existing, logging.Logger)
+    }
+    try:
+        yield
+    finally:
+        root.handlers[:] = handlers
+        root.setLevel(level)
+        for name, was_disabled in disabled.items():
+            logging.getLogger(name).disabled = was_disabled
@@ -0,0 +1,274 @@
+"""Revision-by-revision upgrades with a resumable checkpoint."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import json
+import os
+import re
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+# Third Party
+from sqlalchemy.exc import DBAPIError
+
+# Project/Local
+from src.constants import DEFAULT_CHECKPOINT_PATH, REGEX_SQL_STATEMENT
+from src.durations import environment_name
+from src.logger import setup_logger
+
+if TYPE_CHECKING:
+    from src.alembic_ops import RunnerType
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+CHECKPOINT_FORMAT_VERSION = 1
+
+# Longest failing statement / error message kept in the checkpoint
+MAX_DETAIL_LENGTH = 2000
+
+SQL_STATEMENT_PATTERN = re.compile(REGEX_SQL_STATEMENT, re.DOTALL)
+
+
+@dataclass
+class CompletedRevision:
+    """A revision committed by a checkpointed upgrade.
+
+    Attributes:
+        revision: Revision ID.
+        seconds: Wall time of its upgrade.
+    """
+
+    revision: str
+    seconds: float
+
+
+@dataclass
+class Checkpoint:
+    """Progress of an upgrade towards one target on one database.
+
+    Attributes:
+        database: Database the upgrade runs on (without credentials).
+        target: Revision argument of the upgrade.
+        completed: Revisions committed so far, in order.
+        failed_revision: Revision whose upgrade failed last, if any.
+        failed_statement: SQL statement that failed, when known.
+        error: Error of the failed upgrade.
+        finished: Whether the target was reached.
+        updated_at: When the checkpoint was last written (UTC, ISO 8601).
+    """
+
+    database: str
+    target: str
+    completed: list[CompletedRevision] = field(default_factory=list)
+    failed_revision: str | None = None
+    failed_statement: str | None = None
+    error: str | None = None
+    finished: bool = False
+    updated_at: str = ""
+
+    @property
+    def last_revision(self) -> str | None:
+        """Revision committed last."""
+        return self.completed[-1].revision if self.completed else None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to JSON-compatible data."""
+        return {"format": CHECKPOINT_FORMAT_VERSION, **asdict(self)}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Checkpoint:
+        """Deserialize data written by :meth:`to_dict`."""
+        fields = {key: value for key, value in data.items() if key != "format"}
+        fields["completed"] = [
+            CompletedRevision(**entry) for entry in fields.get("completed", [])
+        ]
+        return cls(**fields)
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class RevisionCheckpointer:
+    """Upgrades one revision per Alembic command and records each commit.
+
+    Every pending revision is upgraded on its own, so it is committed
+    before the next one starts, whatever ``env.py`` does. After each one the
+    checkpoint file is rewritten with the completed revisions and their
+    durations, or with the revision and statement that failed. A rerun
+    towards the same target resumes after the last completed revision once
+    the database is confirmed to be at it, instead of trusting whatever
+    state a failed multi-revision transaction left.
+    """
+
+    def __init__(self, database_url: str, path: str | Path = DEFAULT_CHECKPOINT_PATH):
+        """Initialize checkpointer.
+
+        Args:
+            database_url: URL of the database being upgraded.
+            path: Checkpoint file (created on first save).
+        """
+        self.database = environment_name(database_url)
+        self.path = Path(path)
+        self.checkpoint: Checkpoint | None = None
+        self.resumed = 0
+
+    def resume(self, current: tuple[str, ...], target: str) -> Checkpoint:
+        """Load the checkpoint of an unfinished upgrade, or start a new one.
+
+        The saved checkpoint is resumed only when it is for the same
+        database and target and the database is at its last completed
+        revision.
+
+        Args:
+            current: Revisions in the database's version table.
+            target: Revision argument of the upgrade.
+
+        Returns:
+            The checkpoint progress is recorded in.
+        """
+        saved = self._load()
+        self.checkpoint = Checkpoint(self.database, target)
+        self.resumed = 0
+        if (
+            saved is None
+            or saved.finished
+            or not saved.completed
+            or (saved.database, saved.target) != (self.database, target)
+        ):
+            return self.checkpoint
+        if saved.last_revision not in current:
+            logger.warning(
+                f"Checkpoint {self.path} ends at {saved.last_revision} but the "
+                f"database is at {', '.join(current) or 'base'}; starting over"
+            )
+            return self.checkpoint
+
+        self.checkpoint.completed = saved.completed
+        self.resumed = len(saved.completed)
+        message = f"Resuming after {self.resumed} revision(s) completed earlier"
+        if saved.failed_revision:
+            message += f"; {saved.failed_revision} failed: {saved.error}"
+        logger.info(message)
+        return self.checkpoint
+
+    def upgrade(
+        self,
+        runner: RunnerType,
+        current: tuple[str, ...],
+        target: str,
+        pending: list[str],
+    ) -> None:
+        """Upgrade to ``target`` one pending revision at a time.
+
+        Args:
+            runner: Runner executing each upgrade.
+            current: Revisions in the database's version table.
+            target: Revision argument of the upgrade.
+            pending: Revisions between ``current`` and ``target``, in order.
+
+        Raises:
+            Exception: The error of the revision that failed, after it was
+                recorded.
+        """
+        checkpoint = self.checkpoint
+        if checkpoint is None or checkpoint.target != target:
+            checkpoint = self.resume(current, target)
+        done = {entry.revision for entry in checkpoint.completed}
+
+        for revision in pending:
+            if revision in done:
+                continue
+            start = time.perf_counter()
+            try:
+                runner.upgrade(revision)
+            except Exception as e:
+                checkpoint.failed_revision = revision
+                checkpoint.failed_statement, checkpoint.error = failure_details(e)
+                self._save()
+                logger.error(
+                    f"Revision {revision} failed after "
+                    f"{len(checkpoint.completed)} completed; checkpoint saved "
+                    f"to {self.path}"
+                )
+                raise
+            seconds = time.perf_counter() - start
+            checkpoint.completed.append(CompletedRevision(revision, round(seconds, 3)))
+            checkpoint.failed_revision = None
+            checkpoint.failed_statement = checkpoint.error = None
+            self._save()
+            logger.info(f"Revision {revision} committed in {seconds:.1f}s")
+
+        checkpoint.finished = True
+        self._save()
+
+    def _load(self) -> Checkpoint | None:
+        """Read the checkpoint file; missing or unreadable files are ignored."""
+        try:
+            data = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return None
+        if data.get("format") != CHECKPOINT_FORMAT_VERSION:
+            return None
+        try:
+            return Checkpoint.from_dict(data)
+        except TypeError as e:
+            logger.warning(f"Ignoring malformed checkpoint {self.path}: {e}")
+            return None
+
+    def _save(self) -> None:
+        """Write the checkpoint atomically."""
+        if self.checkpoint is None:
+            return
+        self.checkpoint.updated_at = datetime.now(UTC).isoformat(timespec="seconds")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.checkpoint.to_dict(), indent=2))
+        os.replace(tmp, self.path)
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def failure_details(error: BaseException) -> tuple[str | None, str]:
+    """Failing SQL statement (when known) and message of an upgrade error.
+
+    Args:
+        error: Exception raised by a runner's ``upgrade``.
+
+    Returns:
+        Statement and message, each truncated for storage.
+    """
+    if isinstance(error, subprocess.CalledProcessError):
+        text = error.stderr or ""
+    else:
+        text = str(error)
+    match = SQL_STATEMENT_PATTERN.search(text)
+
+    # The error is the last line before the statement (or of the output)
+    head = text[: match.start()] if match else text
+    lines = [line for line in head.splitlines() if line.strip()]
+    message = lines[-1] if lines else str(error) or type(error).__name__
+
+    statement = error.statement if isinstance(error, DBAPIError) else None
+    if statement is None and match:
+        statement = match.group("statement")
+    if statement is not None:
+        statement = statement.strip()[:MAX_DETAIL_LENGTH]
+    return statement, message.strip()[:MAX_DETAIL_LENGTH]
@@ -6,7 +6,11 @@ from __future__ import annotations
 # IMPORTS
 # =============================================================================
 # Standard Library
+import json
+import sys
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
 from typing import TYPE_CHECKING, Protocol, runtime_checkable
 
 # Project/Local
@@ -16,19 +20,41 @@ from src.constants import (
     CMD_HISTORY,
     CMD_SHOW,
     CMD_UPGRADE,
+    OUTPUT_CONNECT_LATENCY_MS,
+    OUTPUT_CONTENTION_REPORT,
     OUTPUT_CURRENT_REVISION,
+    OUTPUT_DEPLOY_LOCK_WAIT_SECONDS,
+    OUTPUT_ESTIMATED_DURATION,
     OUTPUT_IS_SAFE,
+    OUTPUT_LOCK_FINDINGS,
+    OUTPUT_LOCK_TIMEOUT_RETRIES,
+    OUTPUT_LOCK_WAIT_SECONDS,
     OUTPUT_MIGRATION_STATUS,
+    OUTPUT_PENDING_REVISIONS,
+    OUTPUT_RENDER_CACHE_HITS,
+    OUTPUT_RENDER_CACHE_MISSES,
+    OUTPUT_RESUMED_REVISIONS,
     OUTPUT_SQL_PREVIEW,
     OUTPUT_TARGET_REVISION,
+    OUTPUT_UNESTIMATED_REVISIONS,
+    OUTPUT_UNSAFE_REVISIONS,
     OUTPUT_WARNINGS,
+    REVISION_NONE,
     STATUS_DRY_RUN,
+    STATUS_SKIPPED,
     STATUS_SUCCESS,
 )
+from src.durations import DurationEstimator
+from src.locks import BlockingImpact, rank_findings
 from src.logger import setup_logger
+from src.probe import RevisionProbe
+from src.revision_index import RevisionIndex
 from src.safety import DangerLevel, SafetyReport
+from src.session import DatabaseSession
+from src.spool import SQLText, iter_text
 
 if TYPE_CHECKING:
+    from src.render_cache import RenderCache
     from src.states import ActionContext
 
 
@@ -55,16 +81,30 @@ class RunnerProtocol(Protocol):
     """Protocol for Alembic runner."""
 
     def current(self) -> str: ...
-    def upgrade(self, revision: str, sql: bool = False) -> str: ...
-    def downgrade(self, revision: str) -> str: ...
+    def upgrade(
+        self,
+        revision: str,
+        sql: bool = False,
+        on_chunk: Callable[[str], None] | None = None,
+    ) -> SQLText: ...
+    def downgrade(self, revision: str) -> SQLText: ...
     def history(self) -> str: ...
     def show(self, revision: str) -> str: ...
 
 
+class SafetyStreamProtocol(Protocol):
+    """Protocol for incremental safety analysis."""
+
+    def feed(self, chunk: str) -> None: ...
+    def finish(self) -> SafetyReport: ...
+
+
 class AnalyzerProtocol(Protocol):
     """Protocol for safety analyzer."""
 
     def analyze(self, sql: str) -> SafetyReport: ...
+    def analyze_stream(self, chunks: Iterable[str]) -> SafetyReport: ...
+    def stream(self) -> SafetyStreamProtocol: ...
 
 
 @runtime_checkable
@@ -74,9 +114,9 @@ class ActionContextProtocol(Protocol):
     config: ConfigProtocol
     runner: RunnerProtocol
     analyzer: AnalyzerProtocol
-    sql_preview: str
+    sql_preview: SQLText
 
-    def set_output(self, key: str, value: str) -> None: ...
+    def set_output(self, key: str, value: SQLText) -> None: ...
 
 
 # =============================================================================
@@ -95,17 +135,89 @@ class Command(ABC):
         pass
 
 
+class ConnectCommand(Command):
+    """Open the database session shared by every migration step."""
+
+    def execute(self, context: ActionContext) -> None:
+        """Open the shared connection and report its latency."""
+        session = getattr(context, "session", None)
+        if session is None:
+            return
+
+        logger.info("Opening shared database connection...")
+        try:
+            session.open()
+        except Exception as e:
+            logger.error(f"Failed to connect to database: {e}")
+            raise
+
+        context.set_output(
+            OUTPUT_CONNECT_LATENCY_MS, f"{session.connect_latency_ms:.1f}"
+        )
+
+
+class DeployLockCommand(Command):
+    """Wait for the deploy lock so concurrent runs migrate one at a time.
+
+    An upgrade that waited may find its target reached by the run it
+    waited for. Only ``InitCommand`` reading the revision through a probe
+    marks the context ``up_to_date`` (and so skips), so this command sets
+    up a probe when the run has none.
+    """
+
+    def execute(self, context: ActionContext) -> None:
+        """Acquire the deploy lock and report how long it took."""
+        lock = getattr(context, "deploy_lock", None)
+        if lock is None:
+            return
+
+        logger.info(f"Acquiring deploy lock '{lock.name}'...")
+        try:
+            lock.acquire()
+        finally:
+            context.set_output(OUTPUT_DEPLOY_LOCK_WAIT_SECONDS, f"{lock.waited:.1f}")
+
+        if getattr(context, "probe", None) is None:
+            config = context.config
+            session = getattr(context, "session", None)
+            if session is None:
+                # Closed with the run's session; opened by the first probe
+                session = DatabaseSession(config.database_url)
+                context.session = session
+            context.probe = RevisionProbe(
+                session,
+                config.alembic_config_path,
+                config.version_table,
+                index=getattr(context, "revision_index", None),
+            )
+
+
 class InitCommand(Command):
     """Initialize and get current database revision."""
 
     def execute(self, context: ActionContext) -> None:
         """Get current revision and set outputs."""
         logger.info("Checking current database revision...")
+        probe = getattr(context, "probe", None)
+        revisions: tuple[str, ...] = ()
         try:
-            current_rev = context.runner.current()
-            current_rev_clean = (
-                current_rev.strip().split(" ")[0] if current_rev else "none"
-            )
+            if probe is not None:
+                revisions = probe.current_revisions()
+                context.current_revisions = revisions
+                current_rev_clean = ",".join(revisions) or REVISION_NONE
+            else:
+                current_rev = context.runner.current()
+                revisions = tuple(
+                    sorted(
+                        line.split(" ")[0]
+                        for line in current_rev.splitlines()
+                        if line.strip()
+                    )
+                )
+                context.current_revisions = revisions
+                current_rev_clean = (
+                    current_rev.strip().split(" ")[0] if current_rev else REVISION_NONE
+                )
         except Exception as e:
             logger.error(f"Failed to get current revision: {e}")
             raise
@@ -116,31 +228,159 @@ class InitCommand(Command):
         logger.info(f"Current revision: {current_rev_clean}")
         logger.info(f"Target revision: {context.config.revision}")
 
+        index = getattr(context, "revision_index", None)
+        if index is not None:
+            pending = index.upgrade_path(revisions, context.config.revision)
+            context.pending_revisions = pending
+            if pending is not None:
+                logger.info(f"Pending revisions: {len(pending)}")
+                context.set_output(OUTPUT_PENDING_REVISIONS, str(len(pending)))
+
+        if (
+            probe is not None
+            and context.config.command == CMD_UPGRADE
+            and probe.is_at_target(revisions, context.config.revision)
+        ):
+            logger.info("Database already at target revision.")
+            context.up_to_date = True
+
+
+class SkipCommand(Command):
+    """Report that there is nothing to migrate."""
+
+    def execute(self, context: ActionContext) -> None:
+        """Set skipped status without invoking Alembic."""
+        logger.info("Skipping migration: nothing to upgrade.")
+        context.set_output(OUTPUT_MIGRATION_STATUS, STATUS_SKIPPED)
+
 
 class DryRunCommand(Command):
     """Generate SQL preview without executing."""
 
     def execute(self, context: ActionContext) -> None:
-        """Generate SQL and store in context."""
+        """Generate SQL and store in context.
+
+        When safety analysis is enabled, the SQL is analyzed as Alembic
+        writes it instead of in a second pass afterwards. With a render
+        cache, unchanged ranges are loaded instead of rendered.
+
+        The preview always covers ``base:target``, with or without
+        ``render-workers``, so both report on the same statements. The SQL
+        text itself can differ: on transactional-DDL backends each parallel
+        slice is wrapped in its own ``BEGIN``/``COMMIT``, where a serial
+        render wraps the whole range in one transaction by default.
+        """
         logger.info("Running in DRY-RUN mode")
 
+        renderer = getattr(context, "renderer", None)
+        cache = getattr(context, "render_cache", None)
+        slices = None
+        if renderer is not None:
+            # Same range as the serial render: offline upgrade starts at base
+            slices = renderer.plan((), context.config.revision)
+            if slices is None:
+                logger.info("Revision range is not linear; rendering serially.")
+
         try:
-            sql_output = context.runner.upgrade(context.config.revision, sql=True)
+            if renderer is not None and slices is not None:
+                logger.info(
+                    f"Rendering {len(slices)} slice(s) on "
+                    f"{renderer.workers} worker(s)..."
+                )
+                sql_output, context.safety_report = renderer.render(slices, cache)
+            else:
+                sql_output = self._render(context, cache)
         except Exception as e:
             logger.error(f"Failed to generate SQL: {e}")
             raise
 
         logger.info("Migration Preview:")
         print("==========================================")
-        print(sql_output)
+        for chunk in iter_text(sql_output):
+            sys.stdout.write(chunk)
+        print()
         print("==========================================")
 
         context.set_output(OUTPUT_SQL_PREVIEW, sql_output)
         context.set_output(OUTPUT_MIGRATION_STATUS, STATUS_DRY_RUN)
+        if cache is not None:
+            logger.info(f"Render cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+            context.set_output(OUTPUT_RENDER_CACHE_HITS, str(cache.hits))
+            context.set_output(OUTPUT_RENDER_CACHE_MISSES, str(cache.misses))
 
         # Store for safety check
         context.sql_preview = sql_output
 
+    def _render(self, context: ActionContext, cache: RenderCache | None) -> SQLText:
+        """Render the whole range with one ``upgrade --sql`` call."""
+        key = None
+        if cache is not None:
+            key = cache.range_key(None, context.config.revision)
+            entry = cache.load(key)
+            if entry is not None:
+                logger.info("Loaded SQL preview and safety report from cache.")
+                context.safety_report = entry.report
+                return entry.sql
+
+        stream = None
+        if context.config.analyze_safety or cache is not None:
+            stream = context.analyzer.stream()
+        sql_output = context.runner.upgrade(
+            context.config.revision,
+            sql=True,
+            on_chunk=stream.feed if stream is not None else None,
+        )
+        if stream is not None:
+            context.safety_report = stream.finish()
+            if cache is not None and key is not None:
+                cache.store(key, sql_output, context.safety_report)
+        return sql_output
+
+
+class EstimateCommand(Command):
+    """Predict how long the pending upgrade will take from past runs."""
+
+    def execute(self, context: ActionContext) -> None:
+        """Estimate the pending range and enforce ``max-estimated-duration``."""
+        ledger = getattr(context, "duration_ledger", None)
+        if ledger is None:
+            return
+
+        pending = _pending_revisions(context, context.config.revision)
+        if pending is None:
+            logger.warning("Skipping duration estimate: pending range is unknown.")
+            return
+
+        estimate = DurationEstimator(ledger).estimate(pending)
+        for revision in estimate.revisions:
+            if revision.seconds is None:
+                logger.info(f"  {revision.revision}: no recorded duration")
+            else:
+                logger.info(
+                    f"  {revision.revision}: ~{revision.seconds:.1f}s "
+                    f"(median of {revision.samples}, {revision.basis})"
+                )
+        logger.info(
+            f"Estimated duration of {len(pending)} pending revision(s) on "
+            f"'{ledger.environment}': {estimate.total:.1f}s"
+        )
+        if estimate.unknown:
+            logger.warning(
+                f"{len(estimate.unknown)} revision(s) have no recorded duration "
+                "and are not included in the estimate."
+            )
+
+        context.set_output(OUTPUT_ESTIMATED_DURATION, f"{estimate.total:.1f}")
+        context.set_output(OUTPUT_UNESTIMATED_REVISIONS, ",".join(estimate.unknown))
+
+        limit = context.config.max_estimated_duration
+        if limit > 0 and estimate.total > limit:
+            logger.error(
+                f"Estimated duration {estimate.total:.1f}s exceeds "
+                f"max-estimated-duration ({limit}s)."
+            )
+            raise RuntimeError("Estimated duration exceeds the maintenance window.")
+
 
 class SafetyCheckCommand(Command):
     """Analyze SQL for dangerous operations."""
@@ -154,14 +394,46 @@ class SafetyCheckCommand(Command):
             logger.warning("No SQL content to analyze")
             return
 
-        report = context.analyzer.analyze(sql_content)
+        report = getattr(context, "safety_report", None)
+        if report is None:
+            report = context.analyzer.analyze_stream(iter_text(sql_content))
+
+        scorer = getattr(context, "risk_scorer", None)
+        if scorer is not None and report.warnings:
+            logger.info("Scoring warnings by table size...")
+            report = scorer.score(report, iter_text(sql_content))
 
         if report.warnings:
             logger.warning("SAFETY WARNINGS DETECTED:")
             for warning in report.warnings:
-                logger.warning(f"  - {warning}")
+                revisions = report.attribution.get(warning)
+                suffix = f" (revisions: {', '.join(revisions)})" if revisions else ""
+                logger.warning(f"  - {warning}{suffix}")
             context.set_output(OUTPUT_WARNINGS, ";".join(report.warnings))
 
+        if report.attribution:
+            unsafe = dict.fromkeys(
+                revision
+                for revisions in report.attribution.values()
+                for revision in revisions
+            )
+            context.set_output(OUTPUT_UNSAFE_REVISIONS, ",".join(unsafe))
+
+        if report.locks:
+            findings = rank_findings(report.locks)
+            logger.info("Table locks, most blocking first:")
+            for finding in findings:
+                log = (
+                    logger.warning
+                    if finding.impact >= BlockingImpact.BLOCKS_WRITES
+                    else logger.info
+                )
+                suffix = f" (revision {finding.revision})" if finding.revision else ""
+                log(f"  - [{finding.impact.name}] {finding.describe()}{suffix}")
+            context.set_output(
+                OUTPUT_LOCK_FINDINGS, json.dumps([f.to_dict() for f in findings])
+            )
+
         context.set_output(OUTPUT_IS_SAFE, str(report.is_safe).lower())
 
         if context.config.fail_on_danger and report.danger_level == DangerLevel.HIGH:
@@ -181,17 +453,27 @@ class ExecutionCommand(Command):
         rev = context.config.revision
 
         logger.info(f"Executing migration: {cmd} {rev}")
+        index = getattr(context, "revision_index", None)
 
         if cmd == CMD_UPGRADE:
-            context.runner.upgrade(rev)
+            with (
+                self._timed(context),
+                self._ledgered(context),
+                self._monitored(context),
+            ):
+                self._guarded(context, lambda: self._upgrade(context, rev))
         elif cmd == CMD_DOWNGRADE:
-            context.runner.downgrade(rev)
+            with self._timed(context), self._monitored(context):
+                self._guarded(context, lambda: context.runner.downgrade(rev))
         elif cmd == CMD_CURRENT:
             print(context.runner.current())
         elif cmd == CMD_HISTORY:
-            print(context.runner.history())
+            if index is not None:
+                print(index.format_history())
+            else:
+                print(context.runner.history())
         elif cmd == CMD_SHOW:
-            print(context.runner.show(rev))
+            print(self._show(context, rev))
         else:
             raise ValueError(f"Unknown command: {cmd}")
 
@@ -199,9 +481,136 @@ class ExecutionCommand(Command):
         context.set_output(OUTPUT_MIGRATION_STATUS, STATUS_SUCCESS)
 
         # Update revision output
+        probe = getattr(context, "probe", None)
         try:
-            current = context.runner.current()
-            new_rev = current.strip().split(" ")[0] if current else "none"
+            if probe is not None:
+                new_rev = ",".join(probe.current_revisions()) or REVISION_NONE
+            else:
+                current = context.runner.current()
+                new_rev = current.strip().split(" ")[0] if current else REVISION_NONE
             logger.info(f"New revision: {new_rev}")
         except Exception as e:
             logger.warning(f"Could not fetch new revision: {e}")
+
+    @staticmethod
+    @contextmanager
+    def _timed(context: ActionContext) -> Iterator[None]:
+        """Time the statements of the block, if a statement recorder is set."""
+        recorder = getattr(context, "statement_recorder", None)
+        if recorder is None:
+            yield
+            return
+        try:
+            with recorder.recording():
+                yield
+        finally:
+            recorder.publish(context, context.config.statement_timings_path)
+
+    @staticmethod
+    @contextmanager
+    def _monitored(context: ActionContext) -> Iterator[None]:
+        """Cancel the block's migration if it blocks too much traffic."""
+        monitor = getattr(context, "contention_monitor", None)
+        if monitor is None:
+            yield
+            return
+        failure: Exception | None = None
+        try:
+            with monitor.watching():
+                yield
+        except Exception as e:
+            if monitor.report is None:
+                raise
+            failure = e
+        if monitor.report is None:
+            return
+        context.set_output(
+            OUTPUT_CONTENTION_REPORT, json.dumps(monitor.report.to_dict())
+        )
+        if failure is None:
+            logger.warning("Contention limit crossed as the migration completed")
+            return
+        raise RuntimeError(
+            f"Migration cancelled for blocking traffic: {monitor.report.reason}"
+        ) from failure
+
+    @staticmethod
+    def _upgrade(context: ActionContext, revision: str) -> None:
+        """Upgrade, one revision per transaction if a checkpointer is set."""
+        checkpointer = getattr(context, "checkpointer", None)
+        if checkpointer is None:
+            context.runner.upgrade(revision)
+            return
+        pending = _pending_revisions(context, revision)
+        if pending is None:
+            logger.warning("Upgrading without checkpoints: pending range unknown")
+            context.runner.upgrade(revision)
+            return
+        try:
+            checkpointer.upgrade(
+                context.runner, context.current_revisions, revision, pending
+            )
+        finally:
+            context.set_output(OUTPUT_RESUMED_REVISIONS, str(checkpointer.resumed))
+
+    @staticmethod
+    def _guarded(context: ActionContext, operation: Callable[[], object]) -> None:
+        """Run a migration, retrying lock timeouts if a lock guard is set."""
+        guard = getattr(context, "lock_guard", None)
+        if guard is None:
+            operation()
+            return
+        try:
+            guard.run(operation)
+        finally:
+            context.set_output(OUTPUT_LOCK_TIMEOUT_RETRIES, str(guard.retries))
+            context.set_output(OUTPUT_LOCK_WAIT_SECONDS, f"{guard.waited:.1f}")
+
+    @staticmethod
+    @contextmanager
+    def _ledgered(context: ActionContext) -> Iterator[None]:
+        """Record per-revision durations of a successful upgrade, if enabled."""
+        ledger = getattr(context, "duration_ledger", None)
+        timer = getattr(context, "step_timer", None)
+        if ledger is None or timer is None:
+            yield
+            return
+        with timer.recording():
+            yield
+        ledger.record(timer.durations)
+
+    @staticmethod
+    def _show(context: ActionContext, revision: str) -> str:
+        """Show a revision from the index, or through Alembic if it cannot."""
+        index = getattr(context, "revision_index", None)
+        if index is not None:
+            try:
+                return index.format_show(revision)
+            except KeyError as e:
+                logger.debug(f"Revision index cannot show {revision}: {e}")
+        return context.runner.show(revision)
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _pending_revisions(context: ActionContext, target: str) -> list[str] | None:
+    """Revisions an upgrade to ``target`` applies, in order.
+
+    Uses the range ``InitCommand`` resolved when it is for the configured
+    target, else the run's revision index, else a transient one.
+
+    Returns:
+        Ordered revision IDs, or None if the range cannot be resolved.
+    """
+    pending = getattr(context, "pending_revisions", None)
+    if pending is not None and target == context.config.revision:
+        return pending
+    index = getattr(context, "revision_index", None)
+    if index is None:
+        try:
+            index = RevisionIndex.from_config(context.config.alembic_config_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot index revisions: {e}")
+            return None
+    return index.upgrade_path(context.current_revisions, target)
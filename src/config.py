@@ -11,19 +11,109 @@ from dataclasses import dataclass
 # Project/Local
 from src.constants import (
     DEFAULT_ALEMBIC_CONFIG,
+    DEFAULT_CHECKPOINT_PATH,
     DEFAULT_COMMAND,
+    DEFAULT_CONTENTION_POLL_INTERVAL,
+    DEFAULT_DEPLOY_LOCK,
+    DEFAULT_DEPLOY_LOCK_NAME,
+    DEFAULT_DEPLOY_LOCK_TIMEOUT,
     DEFAULT_DRY_RUN,
+    DEFAULT_DURATION_LEDGER,
+    DEFAULT_ENVIRONMENT,
     DEFAULT_FAIL_ON_DANGER,
+    DEFAULT_FANOUT_WORKERS,
+    DEFAULT_FAST_REVISION_PROBE,
+    DEFAULT_LARGE_TABLE_ROWS,
+    DEFAULT_LOCK_RETRIES,
+    DEFAULT_LOCK_RETRY_BUDGET,
+    DEFAULT_LOCK_TIMEOUT,
+    DEFAULT_MAX_BLOCKED_SESSIONS,
+    DEFAULT_MAX_BLOCKED_WAIT,
+    DEFAULT_MAX_ESTIMATED_DURATION,
+    DEFAULT_ON_TARGET_ERROR,
+    DEFAULT_PROFILE,
+    DEFAULT_PROFILE_PATH,
+    DEFAULT_RENDER_CACHE,
+    DEFAULT_RENDER_CACHE_DIR,
+    DEFAULT_RENDER_CHUNK_SIZE,
+    DEFAULT_RENDER_WORKERS,
+    DEFAULT_RESUME,
     DEFAULT_REVISION,
+    DEFAULT_REVISION_INDEX,
+    DEFAULT_REVISION_INDEX_CACHE,
+    DEFAULT_RUNNER,
+    DEFAULT_SCHEMA_WORKERS,
+    DEFAULT_SCHEMAS,
+    DEFAULT_SHARED_CONNECTION,
+    DEFAULT_SMALL_TABLE_ROWS,
+    DEFAULT_STATE_SNAPSHOT_DIR,
+    DEFAULT_STATE_SNAPSHOTS,
+    DEFAULT_STATEMENT_TIMEOUT,
+    DEFAULT_STATEMENT_TIMINGS,
+    DEFAULT_STATEMENT_TIMINGS_PATH,
+    DEFAULT_STATEMENT_TIMINGS_TOP,
+    DEFAULT_STATS_SNAPSHOT,
+    DEFAULT_TABLE_STATS,
+    DEFAULT_TARGET_TIMEOUT,
+    DEFAULT_TARGETS,
+    DEFAULT_TARGETS_FILE,
+    DEFAULT_TRACE_PATH,
+    DEFAULT_TRANSACTION_PER_REVISION,
+    DEFAULT_VERSION_TABLE,
     DEFAULT_WORKING_DIR,
     ENV_DATABASE_URL,
     INPUT_ALEMBIC_CONFIG,
     INPUT_ANALYZE_SAFETY,
+    INPUT_CHECKPOINT_PATH,
     INPUT_COMMAND,
+    INPUT_CONTENTION_POLL_INTERVAL,
     INPUT_DATABASE_URL,
+    INPUT_DEPLOY_LOCK,
+    INPUT_DEPLOY_LOCK_NAME,
+    INPUT_DEPLOY_LOCK_TIMEOUT,
     INPUT_DRY_RUN,
+    INPUT_DURATION_LEDGER,
+    INPUT_ENVIRONMENT,
     INPUT_FAIL_ON_DANGER,
+    INPUT_FANOUT_WORKERS,
+    INPUT_FAST_REVISION_PROBE,
+    INPUT_LARGE_TABLE_ROWS,
+    INPUT_LOCK_RETRIES,
+    INPUT_LOCK_RETRY_BUDGET,
+    INPUT_LOCK_TIMEOUT,
+    INPUT_MAX_BLOCKED_SESSIONS,
+    INPUT_MAX_BLOCKED_WAIT,
+    INPUT_MAX_ESTIMATED_DURATION,
+    INPUT_ON_TARGET_ERROR,
+    INPUT_PROFILE,
+    INPUT_PROFILE_PATH,
+    INPUT_RENDER_CACHE,
+    INPUT_RENDER_CACHE_DIR,
+    INPUT_RENDER_CHUNK_SIZE,
+    INPUT_RENDER_WORKERS,
+    INPUT_RESUME,
     INPUT_REVISION,
+    INPUT_REVISION_INDEX,
+    INPUT_REVISION_INDEX_CACHE,
+    INPUT_RUNNER,
+    INPUT_SCHEMA_WORKERS,
+    INPUT_SCHEMAS,
+    INPUT_SHARED_CONNECTION,
+    INPUT_SMALL_TABLE_ROWS,
+    INPUT_STATE_SNAPSHOT_DIR,
+    INPUT_STATE_SNAPSHOTS,
+    INPUT_STATEMENT_TIMEOUT,
+    INPUT_STATEMENT_TIMINGS,
+    INPUT_STATEMENT_TIMINGS_PATH,
+    INPUT_STATEMENT_TIMINGS_TOP,
+    INPUT_STATS_SNAPSHOT,
+    INPUT_TABLE_STATS,
+    INPUT_TARGET_TIMEOUT,
+    INPUT_TARGETS,
+    INPUT_TARGETS_FILE,
+    INPUT_TRACE_PATH,
+    INPUT_TRANSACTION_PER_REVISION,
+    INPUT_VERSION_TABLE,
     INPUT_WORKING_DIRECTORY,
 )
 from src.env import EnvHandler
@@ -45,6 +135,74 @@ class ActionConfig:
         working_directory: Directory where alembic commands will run.
         analyze_safety: Whether to perform SQL safety analysis.
         fail_on_danger: Whether to fail the action if dangerous ops are found.
+        runner: How Alembic is invoked (``subprocess`` or ``in-process``).
+        shared_connection: Whether all states share one database connection.
+        fast_revision_probe: Whether to read the version table directly
+            instead of running ``alembic current``.
+        version_table: Name of the Alembic version table.
+        revision_index: Whether to answer revision-graph queries from the
+            static revision index instead of importing migrations.
+        revision_index_cache: On-disk cache file of the revision index.
+        render_workers: Worker processes rendering dry-run SQL per revision
+            (0 renders the whole range serially).
+        render_chunk_size: Revisions rendered per worker task.
+        render_cache: Whether to reuse rendered dry-run SQL and safety reports
+            from a content-addressed cache.
+        render_cache_dir: Directory of the render cache.
+        targets: Newline-separated ``<name> <url>`` targets to fan out to.
+        targets_file: File with more targets, in the same format.
+        fanout_workers: Targets deployed concurrently.
+        target_timeout: Seconds before a target is killed (0 for no limit).
+        on_target_error: ``continue`` or ``fail-fast`` when a target fails.
+        schemas: Newline- or comma-separated tenant schemas to upgrade.
+        schema_workers: Connections migrating schemas concurrently.
+        profile: Whether to record time and memory used by each state.
+        profile_path: JSON file the state profile is written to.
+        trace_path: OTLP-JSON file spans are appended to (empty disables
+            tracing).
+        statement_timings: Whether to time every statement of an in-process
+            upgrade or downgrade.
+        statement_timings_path: JSON file receiving every statement timing.
+        statement_timings_top: Statements in the slowest-statements report.
+        duration_ledger: JSON ledger of per-revision durations (empty
+            disables recording and estimates).
+        environment: Ledger name of the target environment (derived from
+            the database URL when empty).
+        max_estimated_duration: Seconds the estimated upgrade may take
+            before the dry run fails (0 for no limit).
+        table_stats: Whether to rescale safety warnings by the size of the
+            tables they touch, read from the database catalog.
+        small_table_rows: Row count up to which a table is small.
+        large_table_rows: Row count from which a table is large.
+        stats_snapshot: Table statistics snapshot, written by the
+            ``stats-snapshot`` command and otherwise used instead of the
+            live catalog to scale safety warnings.
+        lock_timeout: Milliseconds a migration statement may wait for a
+            lock before failing and being retried (0 disables the guard).
+        statement_timeout: Milliseconds a migration statement may run
+            (0 for no limit; PostgreSQL only).
+        lock_retries: Retries after a lock timeout.
+        lock_retry_budget: Seconds all lock timeout retries, including
+            their backoff, may take.
+        max_blocked_sessions: Sessions the running migration may block
+            before it is cancelled (0 for no limit).
+        max_blocked_wait: Milliseconds a session may be blocked by the
+            running migration before it is cancelled (0 for no limit).
+        contention_poll_interval: Milliseconds between lock-wait polls.
+        deploy_lock: Serialize concurrent runs against the same database
+            with a database lock.
+        deploy_lock_name: Name of the deploy lock; runs sharing it wait for
+            each other.
+        deploy_lock_timeout: Seconds to wait for the deploy lock (0 for no
+            limit).
+        transaction_per_revision: Upgrade and commit one revision at a
+            time, checkpointing progress.
+        checkpoint_path: Checkpoint file resumed by the next run after a
+            failed revision.
+        state_snapshots: Save the context after every state.
+        state_snapshot_dir: Directory of the state snapshot.
+        resume: Continue an interrupted run at its last incomplete state
+            (implies ``state_snapshots``).
     """
 
     database_url: str
@@ -55,6 +213,61 @@ class ActionConfig:
     working_directory: str
     analyze_safety: bool
     fail_on_danger: bool
+    runner: str = DEFAULT_RUNNER
+    shared_connection: bool = False
+    fast_revision_probe: bool = False
+    version_table: str = DEFAULT_VERSION_TABLE
+    revision_index: bool = False
+    revision_index_cache: str = DEFAULT_REVISION_INDEX_CACHE
+    render_workers: int = DEFAULT_RENDER_WORKERS
+    render_chunk_size: int = DEFAULT_RENDER_CHUNK_SIZE
+    render_cache: bool = False
+    render_cache_dir: str = DEFAULT_RENDER_CACHE_DIR
+    targets: str = DEFAULT_TARGETS
+    targets_file: str = DEFAULT_TARGETS_FILE
+    fanout_workers: int = DEFAULT_FANOUT_WORKERS
+    target_timeout: int = DEFAULT_TARGET_TIMEOUT
+    on_target_error: str = DEFAULT_ON_TARGET_ERROR
+    schemas: str = DEFAULT_SCHEMAS
+    schema_workers: int = DEFAULT_SCHEMA_WORKERS
+    profile: bool = False
+    profile_path: str = DEFAULT_PROFILE_PATH
+    trace_path: str = DEFAULT_TRACE_PATH
+    statement_timings: bool = False
+    statement_timings_path: str = DEFAULT_STATEMENT_TIMINGS_PATH
+    statement_timings_top: int = DEFAULT_STATEMENT_TIMINGS_TOP
+    duration_ledger: str = DEFAULT_DURATION_LEDGER
+    environment: str = DEFAULT_ENVIRONMENT
+    max_estimated_duration: int = DEFAULT_MAX_ESTIMATED_DURATION
+    table_stats: bool = False
+    small_table_rows: int = DEFAULT_SMALL_TABLE_ROWS
+    large_table_rows: int = DEFAULT_LARGE_TABLE_ROWS
+    stats_snapshot: str = DEFAULT_STATS_SNAPSHOT
+    lock_timeout: int = DEFAULT_LOCK_TIMEOUT
+    statement_timeout: int = DEFAULT_STATEMENT_TIMEOUT
+    lock_retries: int = DEFAULT_LOCK_RETRIES
+    lock_retry_budget: int = DEFAULT_LOCK_RETRY_BUDGET
+    max_blocked_sessions: int = DEFAULT_MAX_BLOCKED_SESSIONS
+    max_blocked_wait: int = DEFAULT_MAX_BLOCKED_WAIT
+    contention_poll_interval: int = DEFAULT_CONTENTION_POLL_INTERVAL
+    deploy_lock: bool = False
+    deploy_lock_name: str = DEFAULT_DEPLOY_LOCK_NAME
+    deploy_lock_timeout: int = DEFAULT_DEPLOY_LOCK_TIMEOUT
+    transaction_per_revision: bool = False
+    checkpoint_path: str = DEFAULT_CHECKPOINT_PATH
+    state_snapshots: bool = False
+    state_snapshot_dir: str = DEFAULT_STATE_SNAPSHOT_DIR
+    resume: bool = False
+
+    @property
+    def contention_limits(self) -> bool:
+        """Whether the running migration is watched for blocked traffic."""
+        return self.max_blocked_sessions > 0 or self.max_blocked_wait > 0
+
+    @property
+    def fan_out(self) -> bool:
+        """Whether the run deploys to a list of targets."""
+        return bool(self.targets.strip() or self.targets_file)
 
     @classmethod
     def from_env(cls) -> ActionConfig:
@@ -66,11 +279,18 @@ class ActionConfig:
         Raises:
             ValueError: If required environment variables are missing.
         """
-        # DATABASE_URL can come from inputs or direct env
+        targets = EnvHandler.get_str(INPUT_TARGETS, default=DEFAULT_TARGETS)
+        targets_file = EnvHandler.get_str(
+            INPUT_TARGETS_FILE, default=DEFAULT_TARGETS_FILE
+        )
+
+        # DATABASE_URL can come from inputs or direct env; fan-out runs take
+        # their URLs from the target list instead
         try:
             database_url = EnvHandler.get_str(INPUT_DATABASE_URL)
         except ValueError:
-            database_url = EnvHandler.get_str(ENV_DATABASE_URL)
+            fan_out_default = "" if targets.strip() or targets_file else None
+            database_url = EnvHandler.get_str(ENV_DATABASE_URL, fan_out_default)
 
         return cls(
             database_url=database_url,
@@ -87,4 +307,127 @@ class ActionConfig:
             fail_on_danger=EnvHandler.get_bool(
                 INPUT_FAIL_ON_DANGER, default=DEFAULT_FAIL_ON_DANGER
             ),
+            runner=EnvHandler.get_str(INPUT_RUNNER, default=DEFAULT_RUNNER),
+            shared_connection=EnvHandler.get_bool(
+                INPUT_SHARED_CONNECTION, default=DEFAULT_SHARED_CONNECTION
+            ),
+            fast_revision_probe=EnvHandler.get_bool(
+                INPUT_FAST_REVISION_PROBE, default=DEFAULT_FAST_REVISION_PROBE
+            ),
+            version_table=EnvHandler.get_str(
+                INPUT_VERSION_TABLE, default=DEFAULT_VERSION_TABLE
+            ),
+            revision_index=EnvHandler.get_bool(
+                INPUT_REVISION_INDEX, default=DEFAULT_REVISION_INDEX
+            ),
+            revision_index_cache=EnvHandler.get_str(
+                INPUT_REVISION_INDEX_CACHE, default=DEFAULT_REVISION_INDEX_CACHE
+            ),
+            render_workers=EnvHandler.get_int(
+                INPUT_RENDER_WORKERS, default=DEFAULT_RENDER_WORKERS
+            ),
+            render_chunk_size=EnvHandler.get_int(
+                INPUT_RENDER_CHUNK_SIZE, default=DEFAULT_RENDER_CHUNK_SIZE
+            ),
+            render_cache=EnvHandler.get_bool(
+                INPUT_RENDER_CACHE, default=DEFAULT_RENDER_CACHE
+            ),
+            render_cache_dir=EnvHandler.get_str(
+                INPUT_RENDER_CACHE_DIR, default=DEFAULT_RENDER_CACHE_DIR
+            ),
+            targets=targets,
+            targets_file=targets_file,
+            fanout_workers=EnvHandler.get_int(
+                INPUT_FANOUT_WORKERS, default=DEFAULT_FANOUT_WORKERS
+            ),
+            target_timeout=EnvHandler.get_int(
+                INPUT_TARGET_TIMEOUT, default=DEFAULT_TARGET_TIMEOUT
+            ),
+            on_target_error=EnvHandler.get_str(
+                INPUT_ON_TARGET_ERROR, default=DEFAULT_ON_TARGET_ERROR
+            ),
+            schemas=EnvHandler.get_str(INPUT_SCHEMAS, default=DEFAULT_SCHEMAS),
+            schema_workers=EnvHandler.get_int(
+                INPUT_SCHEMA_WORKERS, default=DEFAULT_SCHEMA_WORKERS
+            ),
+            profile=EnvHandler.get_bool(INPUT_PROFILE, default=DEFAULT_PROFILE),
+            profile_path=EnvHandler.get_str(
+                INPUT_PROFILE_PATH, default=DEFAULT_PROFILE_PATH
+            ),
+            trace_path=EnvHandler.get_str(INPUT_TRACE_PATH, default=DEFAULT_TRACE_PATH),
+            statement_timings=EnvHandler.get_bool(
+                INPUT_STATEMENT_TIMINGS, default=DEFAULT_STATEMENT_TIMINGS
+            ),
+            statement_timings_path=EnvHandler.get_str(
+                INPUT_STATEMENT_TIMINGS_PATH, default=DEFAULT_STATEMENT_TIMINGS_PATH
+            ),
+            statement_timings_top=EnvHandler.get_int(
+                INPUT_STATEMENT_TIMINGS_TOP, default=DEFAULT_STATEMENT_TIMINGS_TOP
+            ),
+            duration_ledger=EnvHandler.get_str(
+                INPUT_DURATION_LEDGER, default=DEFAULT_DURATION_LEDGER
+            ),
+            environment=EnvHandler.get_str(
+                INPUT_ENVIRONMENT, default=DEFAULT_ENVIRONMENT
+            ),
+            max_estimated_duration=EnvHandler.get_int(
+                INPUT_MAX_ESTIMATED_DURATION, default=DEFAULT_MAX_ESTIMATED_DURATION
+            ),
+            table_stats=EnvHandler.get_bool(
+                INPUT_TABLE_STATS, default=DEFAULT_TABLE_STATS
+            ),
+            small_table_rows=EnvHandler.get_int(
+                INPUT_SMALL_TABLE_ROWS, default=DEFAULT_SMALL_TABLE_ROWS
+            ),
+            large_table_rows=EnvHandler.get_int(
+                INPUT_LARGE_TABLE_ROWS, default=DEFAULT_LARGE_TABLE_ROWS
+            ),
+            stats_snapshot=EnvHandler.get_str(
+                INPUT_STATS_SNAPSHOT, default=DEFAULT_STATS_SNAPSHOT
+            ),
+            lock_timeout=EnvHandler.get_int(
+                INPUT_LOCK_TIMEOUT, default=DEFAULT_LOCK_TIMEOUT
+            ),
+            statement_timeout=EnvHandler.get_int(
+                INPUT_STATEMENT_TIMEOUT, default=DEFAULT_STATEMENT_TIMEOUT
+            ),
+            lock_retries=EnvHandler.get_int(
+                INPUT_LOCK_RETRIES, default=DEFAULT_LOCK_RETRIES
+            ),
+            lock_retry_budget=EnvHandler.get_int(
+                INPUT_LOCK_RETRY_BUDGET, default=DEFAULT_LOCK_RETRY_BUDGET
+            ),
+            max_blocked_sessions=EnvHandler.get_int(
+                INPUT_MAX_BLOCKED_SESSIONS, default=DEFAULT_MAX_BLOCKED_SESSIONS
+            ),
+            max_blocked_wait=EnvHandler.get_int(
+                INPUT_MAX_BLOCKED_WAIT, default=DEFAULT_MAX_BLOCKED_WAIT
+            ),
+            contention_poll_interval=EnvHandler.get_int(
+                INPUT_CONTENTION_POLL_INTERVAL,
+                default=DEFAULT_CONTENTION_POLL_INTERVAL,
+            ),
+            deploy_lock=EnvHandler.get_bool(
+                INPUT_DEPLOY_LOCK, default=DEFAULT_DEPLOY_LOCK
+            ),
+            deploy_lock_name=EnvHandler.get_str(
+                INPUT_DEPLOY_LOCK_NAME, default=DEFAULT_DEPLOY_LOCK_NAME
+            ),
+            deploy_lock_timeout=EnvHandler.get_int(
+                INPUT_DEPLOY_LOCK_TIMEOUT, default=DEFAULT_DEPLOY_LOCK_TIMEOUT
+            ),
+            transaction_per_revision=EnvHandler.get_bool(
+                INPUT_TRANSACTION_PER_REVISION,
+                default=DEFAULT_TRANSACTION_PER_REVISION,
+            ),
+            checkpoint_path=EnvHandler.get_str(
+                INPUT_CHECKPOINT_PATH, default=DEFAULT_CHECKPOINT_PATH
+            ),
+            state_snapshots=EnvHandler.get_bool(
+                INPUT_STATE_SNAPSHOTS, default=DEFAULT_STATE_SNAPSHOTS
+            ),
+            state_snapshot_dir=EnvHandler.get_str(
+                INPUT_STATE_SNAPSHOT_DIR, default=DEFAULT_STATE_SNAPSHOT_DIR
+            ),
+            resume=EnvHandler.get_bool(INPUT_RESUME, default=DEFAULT_RESUME),
         )
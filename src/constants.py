@@ -18,6 +18,60 @@ DEFAULT_COMMAND = "upgrade"
 DEFAULT_DRY_RUN = "false"
 DEFAULT_ANALYZE_SAFETY = "true"
 DEFAULT_FAIL_ON_DANGER = "false"
+DEFAULT_RUNNER = "subprocess"
+DEFAULT_SHARED_CONNECTION = "false"
+DEFAULT_FAST_REVISION_PROBE = "false"
+DEFAULT_VERSION_TABLE = "alembic_version"
+DEFAULT_REVISION_INDEX = "false"
+DEFAULT_REVISION_INDEX_CACHE = ".alembic-deploy/revision-index.json"
+DEFAULT_SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_STDERR_TAIL_LINES = 200
+DEFAULT_RENDER_WORKERS = 0
+DEFAULT_RENDER_CHUNK_SIZE = 1
+DEFAULT_RENDER_CACHE = "false"
+DEFAULT_RENDER_CACHE_DIR = ".alembic-deploy/render-cache"
+DEFAULT_TARGETS = ""
+DEFAULT_TARGETS_FILE = ""
+DEFAULT_FANOUT_WORKERS = 4
+DEFAULT_TARGET_TIMEOUT = 0
+DEFAULT_ON_TARGET_ERROR = "continue"
+DEFAULT_SCHEMAS = ""
+DEFAULT_SCHEMA_WORKERS = 1
+DEFAULT_PROFILE = "false"
+DEFAULT_PROFILE_PATH = ".alembic-deploy/profile.json"
+DEFAULT_TRACE_PATH = ""
+DEFAULT_STATEMENT_TIMINGS = "false"
+DEFAULT_STATEMENT_TIMINGS_PATH = ".alembic-deploy/statement-timings.json"
+DEFAULT_STATEMENT_TIMINGS_TOP = 10
+DEFAULT_DURATION_LEDGER = ""
+DEFAULT_ENVIRONMENT = ""
+DEFAULT_MAX_ESTIMATED_DURATION = 0
+DEFAULT_LEDGER_HISTORY = 20
+DEFAULT_TABLE_STATS = "false"
+DEFAULT_SMALL_TABLE_ROWS = 10_000
+DEFAULT_LARGE_TABLE_ROWS = 1_000_000
+DEFAULT_LARGE_TABLE_BYTES = 1024**3
+DEFAULT_STATS_SNAPSHOT = ""
+DEFAULT_LOCK_TIMEOUT = 0
+DEFAULT_STATEMENT_TIMEOUT = 0
+DEFAULT_LOCK_RETRIES = 5
+DEFAULT_LOCK_RETRY_BUDGET = 300
+DEFAULT_LOCK_RETRY_DELAY = 1.0
+DEFAULT_LOCK_RETRY_MAX_DELAY = 60.0
+DEFAULT_MAX_BLOCKED_SESSIONS = 0
+DEFAULT_MAX_BLOCKED_WAIT = 0
+DEFAULT_CONTENTION_POLL_INTERVAL = 500
+DEFAULT_DEPLOY_LOCK = "false"
+DEFAULT_DEPLOY_LOCK_NAME = "alembic-deploy"
+DEFAULT_DEPLOY_LOCK_TIMEOUT = 600
+DEFAULT_DEPLOY_LOCK_TABLE = "alembic_deploy_lock"
+DEFAULT_DEPLOY_LOCK_POLL_INTERVAL = 1.0
+DEFAULT_TRANSACTION_PER_REVISION = "false"
+DEFAULT_CHECKPOINT_PATH = ".alembic-deploy/checkpoint.json"
+DEFAULT_STATE_SNAPSHOTS = "false"
+DEFAULT_STATE_SNAPSHOT_DIR = ".alembic-deploy/state"
+DEFAULT_RESUME = "false"
 
 # =============================================================================
 # ENV VARIABLES
@@ -33,8 +87,56 @@ INPUT_ALEMBIC_CONFIG = "INPUT_ALEMBIC_CONFIG"
 INPUT_WORKING_DIRECTORY = "INPUT_WORKING_DIRECTORY"
 INPUT_ANALYZE_SAFETY = "INPUT_ANALYZE_SAFETY"
 INPUT_FAIL_ON_DANGER = "INPUT_FAIL_ON_DANGER"
+INPUT_RUNNER = "INPUT_RUNNER"
+INPUT_SHARED_CONNECTION = "INPUT_SHARED_CONNECTION"
+INPUT_FAST_REVISION_PROBE = "INPUT_FAST_REVISION_PROBE"
+INPUT_VERSION_TABLE = "INPUT_VERSION_TABLE"
+INPUT_REVISION_INDEX = "INPUT_REVISION_INDEX"
+INPUT_REVISION_INDEX_CACHE = "INPUT_REVISION_INDEX_CACHE"
+INPUT_RENDER_WORKERS = "INPUT_RENDER_WORKERS"
+INPUT_RENDER_CHUNK_SIZE = "INPUT_RENDER_CHUNK_SIZE"
+INPUT_RENDER_CACHE = "INPUT_RENDER_CACHE"
+INPUT_RENDER_CACHE_DIR = "INPUT_RENDER_CACHE_DIR"
+INPUT_TARGETS = "INPUT_TARGETS"
+INPUT_TARGETS_FILE = "INPUT_TARGETS_FILE"
+INPUT_FANOUT_WORKERS = "INPUT_FANOUT_WORKERS"
+INPUT_TARGET_TIMEOUT = "INPUT_TARGET_TIMEOUT"
+INPUT_ON_TARGET_ERROR = "INPUT_ON_TARGET_ERROR"
+INPUT_SCHEMAS = "INPUT_SCHEMAS"
+INPUT_SCHEMA_WORKERS = "INPUT_SCHEMA_WORKERS"
+INPUT_PROFILE = "INPUT_PROFILE"
+INPUT_PROFILE_PATH = "INPUT_PROFILE_PATH"
+INPUT_TRACE_PATH = "INPUT_TRACE_PATH"
+INPUT_STATEMENT_TIMINGS = "INPUT_STATEMENT_TIMINGS"
+INPUT_STATEMENT_TIMINGS_PATH = "INPUT_STATEMENT_TIMINGS_PATH"
+INPUT_STATEMENT_TIMINGS_TOP = "INPUT_STATEMENT_TIMINGS_TOP"
+INPUT_DURATION_LEDGER = "INPUT_DURATION_LEDGER"
+INPUT_ENVIRONMENT = "INPUT_ENVIRONMENT"
+INPUT_MAX_ESTIMATED_DURATION = "INPUT_MAX_ESTIMATED_DURATION"
+INPUT_TABLE_STATS = "INPUT_TABLE_STATS"
+INPUT_SMALL_TABLE_ROWS = "INPUT_SMALL_TABLE_ROWS"
+INPUT_LARGE_TABLE_ROWS = "INPUT_LARGE_TABLE_ROWS"
+INPUT_STATS_SNAPSHOT = "INPUT_STATS_SNAPSHOT"
+INPUT_LOCK_TIMEOUT = "INPUT_LOCK_TIMEOUT"
+INPUT_STATEMENT_TIMEOUT = "INPUT_STATEMENT_TIMEOUT"
+INPUT_LOCK_RETRIES = "INPUT_LOCK_RETRIES"
+INPUT_LOCK_RETRY_BUDGET = "INPUT_LOCK_RETRY_BUDGET"
+INPUT_MAX_BLOCKED_SESSIONS = "INPUT_MAX_BLOCKED_SESSIONS"
+INPUT_MAX_BLOCKED_WAIT = "INPUT_MAX_BLOCKED_WAIT"
+INPUT_CONTENTION_POLL_INTERVAL = "INPUT_CONTENTION_POLL_INTERVAL"
+INPUT_DEPLOY_LOCK = "INPUT_DEPLOY_LOCK"
+INPUT_DEPLOY_LOCK_NAME = "INPUT_DEPLOY_LOCK_NAME"
+INPUT_DEPLOY_LOCK_TIMEOUT = "INPUT_DEPLOY_LOCK_TIMEOUT"
+INPUT_TRANSACTION_PER_REVISION = "INPUT_TRANSACTION_PER_REVISION"
+INPUT_CHECKPOINT_PATH = "INPUT_CHECKPOINT_PATH"
+INPUT_STATE_SNAPSHOTS = "INPUT_STATE_SNAPSHOTS"
+INPUT_STATE_SNAPSHOT_DIR = "INPUT_STATE_SNAPSHOT_DIR"
+INPUT_RESUME = "INPUT_RESUME"
+ENV_TRACEPARENT = "TRACEPARENT"
+ENV_PGOPTIONS = "PGOPTIONS"
 
 GITHUB_OUTPUT = "GITHUB_OUTPUT"
+GITHUB_STEP_SUMMARY = "GITHUB_STEP_SUMMARY"
 
 # =============================================================================
 # OUTPUT KEYS
@@ -45,6 +147,35 @@ OUTPUT_TARGET_REVISION = "target-revision"
 OUTPUT_SQL_PREVIEW = "sql-preview"
 OUTPUT_WARNINGS = "warnings"
 OUTPUT_IS_SAFE = "is-safe"
+OUTPUT_CONNECT_LATENCY_MS = "connect-latency-ms"
+OUTPUT_PENDING_REVISIONS = "pending-revisions"
+OUTPUT_UNSAFE_REVISIONS = "unsafe-revisions"
+OUTPUT_LOCK_FINDINGS = "lock-findings"
+OUTPUT_RENDER_CACHE_HITS = "render-cache-hits"
+OUTPUT_RENDER_CACHE_MISSES = "render-cache-misses"
+OUTPUT_TARGET_RESULTS = "target-results"
+OUTPUT_FAILED_TARGETS = "failed-targets"
+OUTPUT_SCHEMA_RESULTS = "schema-results"
+OUTPUT_FAILED_SCHEMAS = "failed-schemas"
+OUTPUT_STATE_TIMINGS = "state-timings"
+OUTPUT_PROFILE_PATH = "profile-path"
+OUTPUT_TRACE_ID = "trace-id"
+OUTPUT_STATEMENT_TIMINGS_PATH = "statement-timings-path"
+OUTPUT_SLOWEST_STATEMENTS = "slowest-statements"
+OUTPUT_ESTIMATED_DURATION = "estimated-duration"
+OUTPUT_UNESTIMATED_REVISIONS = "unestimated-revisions"
+OUTPUT_SNAPSHOT_TABLES = "snapshot-tables"
+OUTPUT_LOCK_TIMEOUT_RETRIES = "lock-timeout-retries"
+OUTPUT_LOCK_WAIT_SECONDS = "lock-wait-seconds"
+OUTPUT_CONTENTION_REPORT = "contention-report"
+OUTPUT_DEPLOY_LOCK_WAIT_SECONDS = "deploy-lock-wait-seconds"
+OUTPUT_RESUMED_REVISIONS = "resumed-revisions"
+OUTPUT_RESUMED_STATE = "resumed-state"
+
+# =============================================================================
+# TRACING
+# =============================================================================
+SERVICE_NAME = "alembic-deploy-action"
 
 # =============================================================================
 # COMMANDS
@@ -54,6 +185,33 @@ CMD_DOWNGRADE = "downgrade"
 CMD_CURRENT = "current"
 CMD_HISTORY = "history"
 CMD_SHOW = "show"
+CMD_STATS_SNAPSHOT = "stats-snapshot"
+
+# =============================================================================
+# ALEMBIC CONFIG ATTRIBUTES (read by env.py)
+# =============================================================================
+ATTR_CONNECTION = "connection"
+ATTR_TENANT_SCHEMA = "tenant_schema"
+
+# =============================================================================
+# REVISIONS
+# =============================================================================
+REVISION_HEAD = "head"
+REVISION_BASE = "base"
+REVISION_NONE = "none"
+
+# =============================================================================
+# RUNNERS
+# =============================================================================
+RUNNER_SUBPROCESS = "subprocess"
+RUNNER_IN_PROCESS = "in-process"
+
+# =============================================================================
+# CONNECTION INFO KEYS
+# =============================================================================
+# Marks the action's own connections (contention monitor, deploy lock) in
+# ``Connection.info``; statement listeners skip them
+INTERNAL_CONNECTION_KEY = "alembic_deploy_internal"
 
 # =============================================================================
 # STATUS VALUES
@@ -61,14 +219,161 @@ CMD_SHOW = "show"
 STATUS_SUCCESS = "success"
 STATUS_FAILED = "failed"
 STATUS_DRY_RUN = "dry-run"
+STATUS_SKIPPED = "skipped"
+STATUS_TIMEOUT = "timeout"
+STATUS_CANCELLED = "cancelled"
+
+# =============================================================================
+# FAN-OUT POLICIES
+# =============================================================================
+POLICY_CONTINUE = "continue"
+POLICY_FAIL_FAST = "fail-fast"
 
 # =============================================================================
 # REGEX PATTERNS
 # =============================================================================
-REGEX_DROP_TABLE = r"DROP\s+TABLE"
-REGEX_DROP_COLUMN = r"DROP\s+COLUMN"
-REGEX_ALTER_COLUMN = r"ALTER\s+.*COLUMN.*TYPE"
-REGEX_TRUNCATE = r"TRUNCATE"
-REGEX_DROP_INDEX = r"DROP\s+INDEX"
-REGEX_BLOCK_COMMENT = r"/\*.*?\*/"
-REGEX_LINE_COMMENT = r"--.*$"
+# W3C trace context: version-traceid-parentid-flags
+REGEX_TRACEPARENT = r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$"
+
+# Lock timeouts in driver errors or CLI stderr: PostgreSQL lock_timeout
+# (SQLSTATE 55P03), MySQL lock_wait_timeout (error 1205), SQLite busy_timeout
+REGEX_LOCK_TIMEOUT_ERROR = (
+    r"due to lock timeout|lock_not_available|lock wait timeout exceeded|"
+    r"database is locked|database table is locked"
+)
+
+# Failing statement in SQLAlchemy error messages (``[SQL: ...]``), followed
+# by its parameters or the background link
+REGEX_SQL_STATEMENT = (
+    r"\[SQL: (?P<statement>.*?)\]\s*(?:\[parameters:|\(Background on|$)"
+)
+
+# Alembic ends each online migration step with a version table write that
+# carries the revision as a literal (``VALUES ('abc')``, ``SET ...='abc'``)
+REGEX_VERSION_WRITE = r"^\s*(?:INSERT|UPDATE|DELETE)\b"
+REGEX_VERSION_LITERAL = r"'([^']*)'"
+
+# Statement fingerprints: literals, IN lists and whitespace are normalized
+REGEX_FINGERPRINT_LITERAL = r"'(?:[^']++|'')*+'|(?<![\w$.])-?\d+(?:\.\d+)?(?![\w$])"
+REGEX_FINGERPRINT_IN_LIST = r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*+\s*\)"
+REGEX_FINGERPRINT_WHITESPACE = r"\s+"
+
+# Tables targeted by flagged statements (matched case-insensitively against
+# statements with comments removed); identifiers may be quoted and qualified
+REGEX_IDENTIFIER = r'(?:"(?:[^"]|"")+"|`[^`]+`|\[[^\]]+\]|[\w$]+)'
+REGEX_QUALIFIED_IDENTIFIER = rf"{REGEX_IDENTIFIER}(?:\s*\.\s*{REGEX_IDENTIFIER})*"
+REGEX_ALTER_TABLE_TARGET = (
+    rf"\bALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?"
+    rf"({REGEX_QUALIFIED_IDENTIFIER})"
+)
+REGEX_DROP_TABLE_TARGET = (
+    rf"\bDROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?"
+    rf"({REGEX_QUALIFIED_IDENTIFIER}(?:\s*,\s*{REGEX_QUALIFIED_IDENTIFIER})*)"
+)
+REGEX_TRUNCATE_TARGET = (
+    rf"\bTRUNCATE\s+(?:TABLE\s+)?(?:ONLY\s+)?"
+    rf"({REGEX_QUALIFIED_IDENTIFIER}(?:\s*,\s*{REGEX_QUALIFIED_IDENTIFIER})*)"
+)
+
+# Marker Alembic writes before each revision in offline (--sql) output
+REGEX_RUNNING_UPGRADE = r"^-- Running upgrade .*? -> (\S+)$"
+
+# SQL lexical noise: comments, string literals (including E'' escape strings),
+# quoted identifiers and dollar-quoted bodies. Every repetition is possessive
+# or lazy up to a fixed terminator and unterminated constructs run to end of
+# input, so matching never backtracks.
+REGEX_LINE_COMMENT = r"--[^\n]*+"
+REGEX_BLOCK_COMMENT = r"/\*(?:[^*]++|\*(?!/))*+(?:\*/|\Z)"
+REGEX_STRING = (
+    r"'(?:(?<=[Ee]')(?<![\w$][Ee]')(?:[^'\\]++|''|\\.?)*+|(?:[^']++|'')*+)(?:'|\Z)"
+)
+REGEX_QUOTED_IDENTIFIER = r'"(?:[^"]++|"")*+(?:"|\Z)'
+REGEX_BACKTICK_IDENTIFIER = r"`[^`]*+(?:`|\Z)"
+REGEX_DOLLAR_QUOTED = (
+    r"\$(?<![\w$]\$)(?P<tag>(?:[A-Za-z_]\w*+)?)\$(?:.*?\$(?P=tag)\$|.*+)"
+)
+# MySQL/MariaDB: backslash escapes in every '...' and "..." literal
+REGEX_BACKSLASH_STRING = r"'(?:[^'\\]++|''|\\.?)*+(?:'|\Z)"
+REGEX_BACKSLASH_QUOTED = r'"(?:[^"\\]++|""|\\.?)*+(?:"|\Z)'
+
+# Dangerous operations, matched against upper-cased SQL with noise removed.
+# Keywords must be whole words; the boundary check trails the literal so the
+# regex engine can still jump straight to candidate positions.
+REGEX_DROP_TABLE = r"DROP(?<![\w$]DROP)\s++TABLE(?![\w$])"
+REGEX_DROP_COLUMN = r"DROP(?<![\w$]DROP)\s++COLUMN(?![\w$])"
+REGEX_DROP_INDEX = r"DROP(?<![\w$]DROP)\s++INDEX(?![\w$])"
+REGEX_TRUNCATE = r"TRUNCATE(?<![\w$]TRUNCATE)(?![\w$])"
+# Applied to a single statement; atomic groups commit to the first ALTER and
+# COLUMN so a failed match is never retried from a later position.
+REGEX_ALTER_COLUMN_TYPE = (
+    r"(?>.*?ALTER(?<![\w$]ALTER)(?![\w$]))"
+    r"(?>.*?COLUMN(?<![\w$]COLUMN)(?![\w$]))"
+    r".*?TYPE(?<![\w$]TYPE)(?![\w$])"
+)
+
+# PostgreSQL lock classification. Statement patterns run against upper-cased
+# SQL with noise removed and whitespace collapsed to single spaces; ALTER
+# TABLE subcommand patterns against each comma-separated subcommand.
+REGEX_PG_CREATE_INDEX = r"^CREATE (?:UNIQUE )?INDEX\b"
+REGEX_PG_DROP_INDEX = r"^DROP INDEX\b"
+REGEX_PG_REINDEX = r"^REINDEX\b"
+REGEX_PG_DROP_TABLE = r"^DROP TABLE\b"
+REGEX_PG_TRUNCATE = r"^TRUNCATE\b"
+REGEX_PG_LOCK_TABLE = r"^LOCK\b(?:.*? IN (?P<mode>[A-Z ]+?) MODE\b)?"
+REGEX_PG_CLUSTER = r"^CLUSTER\b"
+REGEX_PG_VACUUM = r"^VACUUM\b"
+REGEX_PG_REFRESH_MATVIEW = r"^REFRESH MATERIALIZED VIEW\b"
+REGEX_PG_CREATE_TRIGGER = r"^CREATE (?:OR REPLACE )?(?:CONSTRAINT )?TRIGGER\b"
+REGEX_PG_ALTER_TABLE = r"^ALTER TABLE (?:IF EXISTS )?(?:ONLY )?\S*"
+REGEX_PG_ADD_CONSTRAINT = (
+    r"^ADD (?:CONSTRAINT \S+ |CONSTRAINT )?"
+    r"(?P<kind>PRIMARY KEY|UNIQUE|CHECK|FOREIGN KEY|EXCLUDE)\b"
+)
+REGEX_PG_ADD_COLUMN = r"^ADD\b"
+REGEX_PG_DROP_CONSTRAINT = r"^DROP CONSTRAINT\b"
+REGEX_PG_DROP_COLUMN = r"^DROP\b"
+REGEX_PG_ALTER_COLUMN = (
+    r"^ALTER (?:COLUMN )?\S* ?(?P<action>SET DATA TYPE|TYPE|SET NOT NULL|"
+    r"DROP NOT NULL|SET DEFAULT|DROP DEFAULT|SET STATISTICS|SET STORAGE)\b"
+)
+REGEX_PG_VALIDATE_CONSTRAINT = r"^VALIDATE CONSTRAINT\b"
+REGEX_PG_RENAME = r"^RENAME\b"
+REGEX_PG_SET_REWRITE = r"^SET (?:TABLESPACE|LOGGED|UNLOGGED|ACCESS METHOD)\b"
+REGEX_PG_STORAGE_PARAMS = r"^(?:SET|RESET) ?\("
+REGEX_PG_TRIGGER_TOGGLE = r"^(?:ENABLE|DISABLE) (?:ALWAYS |REPLICA )?TRIGGER\b"
+REGEX_PG_CLUSTER_ON = r"^(?:CLUSTER ON|SET WITHOUT CLUSTER)\b"
+REGEX_PG_ATTACH_PARTITION = r"^ATTACH PARTITION\b"
+REGEX_PG_DETACH_PARTITION = r"^DETACH PARTITION\b"
+# Column definitions that force a table rewrite when added
+REGEX_PG_VOLATILE_DEFAULT = (
+    r"\bDEFAULT\b.*\b(?:RANDOM|CLOCK_TIMESTAMP|TIMEOFDAY|GEN_RANDOM_UUID|"
+    r"UUID_GENERATE_V[14]|NEXTVAL|TXID_CURRENT) ?\("
+)
+REGEX_PG_REWRITING_COLUMN = (
+    r"\b(?:SMALLSERIAL|SERIAL[248]?|BIGSERIAL)\b|"
+    r"\bGENERATED (?:ALWAYS|BY DEFAULT) AS (?:IDENTITY\b|\(.*\) STORED\b)"
+)
+REGEX_PG_INLINE_INDEX = r"\b(?:PRIMARY KEY|UNIQUE)\b"
+REGEX_PG_NOT_VALID = r"\bNOT VALID\b"
+REGEX_PG_USING_INDEX = r"\bUSING INDEX\b"
+REGEX_PG_CONCURRENTLY = r"\bCONCURRENTLY\b"
+REGEX_PG_FULL = r"\bFULL\b"
+# Tables locked by statements other than ALTER / DROP TABLE / TRUNCATE
+# (matched case-insensitively against statements with comments removed)
+REGEX_ON_TABLE_TARGET = rf"\bON\s+(?:ONLY\s+)?({REGEX_QUALIFIED_IDENTIFIER})"
+REGEX_LOCK_TABLE_TARGET = (
+    rf"^\s*LOCK\s+(?:TABLE\s+)?(?:ONLY\s+)?({REGEX_QUALIFIED_IDENTIFIER})"
+)
+REGEX_CLUSTER_TARGET = rf"^\s*CLUSTER\s+(?:VERBOSE\s+)?({REGEX_QUALIFIED_IDENTIFIER})"
+REGEX_VACUUM_TARGET = (
+    r"^\s*VACUUM\s+(?:\([^)]*\)\s*)?(?:(?:FULL|FREEZE|VERBOSE|ANALYZE)\s+)*"
+    rf"({REGEX_QUALIFIED_IDENTIFIER})"
+)
+REGEX_REFRESH_TARGET = (
+    r"^\s*REFRESH\s+MATERIALIZED\s+VIEW\s+(?:CONCURRENTLY\s+)?"
+    rf"({REGEX_QUALIFIED_IDENTIFIER})"
+)
+REGEX_REINDEX_TARGET = (
+    r"^\s*REINDEX\s+(?:\([^)]*\)\s*)?TABLE\s+(?:CONCURRENTLY\s+)?"
+    rf"({REGEX_QUALIFIED_IDENTIFIER})"
+)
@@ -0,0 +1,326 @@
+"""Live lock-contention monitoring of running migrations."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+# Third Party
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool, Pool
+
+# Project/Local
+from src.constants import DEFAULT_CONTENTION_POLL_INTERVAL, INTERNAL_CONNECTION_KEY
+from src.logger import setup_logger
+from src.urls import dialect_name
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+DIALECT_POSTGRESQL = "postgresql"
+DIALECT_MYSQL = "mysql"
+DIALECT_MARIADB = "mariadb"
+
+# Longest query text kept per blocked session
+MAX_QUERY_LENGTH = 200
+
+BACKEND_ID_SQL = {
+    DIALECT_POSTGRESQL: "SELECT pg_backend_pid()",
+    DIALECT_MYSQL: "SELECT CONNECTION_ID()",
+    DIALECT_MARIADB: "SELECT CONNECTION_ID()",
+}
+# Sessions waiting on a lock, with the sessions they wait for (including
+# those queued ahead of them for the same lock). Advisory lock waits are
+# other deploys queued on the deploy lock, not blocked traffic.
+POSTGRESQL_WAITS_SQL = text(
+    "SELECT pid, pg_blocking_pids(pid), "
+    "EXTRACT(EPOCH FROM clock_timestamp() - query_start) * 1000, query "
+    "FROM pg_stat_activity "
+    "WHERE wait_event_type = 'Lock' AND wait_event <> 'advisory' "
+    "AND pid <> pg_backend_pid()"
+)
+# Metadata lock (DDL) waits and InnoDB row lock waits, from the sys schema
+MYSQL_WAITS_SQL = text(
+    "SELECT waiting_pid, blocking_pid, waiting_query_secs * 1000, waiting_query "
+    "FROM sys.schema_table_lock_waits "
+    "UNION ALL "
+    "SELECT waiting_pid, blocking_pid, wait_age_secs * 1000, waiting_query "
+    "FROM sys.innodb_lock_waits"
+)
+POSTGRESQL_CANCEL_SQL = text("SELECT pg_cancel_backend(:pid)")
+
+
+@dataclass(frozen=True)
+class BlockedSession:
+    """A session waiting on a lock held or requested by the migration.
+
+    Attributes:
+        pid: Backend / connection ID of the waiting session.
+        blocked_by: Migration backends it waits for.
+        wait_ms: Milliseconds it has been waiting.
+        query: Start of the statement it is running.
+    """
+
+    pid: int
+    blocked_by: tuple[int, ...]
+    wait_ms: float
+    query: str
+
+
+@dataclass(frozen=True)
+class ContentionReport:
+    """Why the monitor cancelled the migration.
+
+    Attributes:
+        reason: Threshold that was crossed.
+        blocked: Sessions blocked by the migration when it was cancelled.
+        cancelled: Migration backends whose statements were cancelled.
+    """
+
+    reason: str
+    blocked: list[BlockedSession]
+    cancelled: list[int] = field(default_factory=list)
+
+    @property
+    def max_wait_ms(self) -> float:
+        """Longest wait among the blocked sessions."""
+        return max((s.wait_ms for s in self.blocked), default=0.0)
+
+    def describe(self) -> str:
+        """Multi-line summary for the log."""
+        lines = [
+            f"Lock contention: {self.reason}; cancelled backend(s) "
+            f"{', '.join(map(str, self.cancelled)) or 'none'}"
+        ]
+        for session in sorted(self.blocked, key=lambda s: -s.wait_ms):
+            lines.append(
+                f"  - session {session.pid} waiting {session.wait_ms / 1000:.1f}s: "
+                f"{session.query}"
+            )
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to JSON-compatible data."""
+        return {
+            "reason": self.reason,
+            "blocked_sessions": len(self.blocked),
+            "max_wait_ms": round(self.max_wait_ms, 1),
+            "cancelled": self.cancelled,
+            "blocked": [asdict(session) for session in self.blocked],
+        }
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class ContentionMonitor:
+    """Watches a running migration for the traffic it blocks.
+
+    The backend ID of every database connection opened in this process
+    after :meth:`install` is recorded; those are the migration's
+    connections. While :meth:`watching`, a background thread polls
+    ``pg_stat_activity`` (PostgreSQL) or the ``sys`` lock-wait views (MySQL)
+    over its own connection for sessions waiting on them. When more than
+    ``max_blocked`` sessions are blocked, or one has waited longer than
+    ``max_wait_ms``, the migration's running statement is cancelled and a
+    :class:`ContentionReport` is kept in :attr:`report`.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        max_blocked: int = 0,
+        max_wait_ms: int = 0,
+        interval_ms: int = DEFAULT_CONTENTION_POLL_INTERVAL,
+    ):
+        """Initialize monitor.
+
+        Args:
+            database_url: URL of the database being migrated.
+            max_blocked: Blocked sessions tolerated (0 for no limit).
+            max_wait_ms: Milliseconds a session may stay blocked (0 for no
+                limit).
+            interval_ms: Milliseconds between polls.
+        """
+        self.database_url = database_url
+        self.dialect = dialect_name(database_url)
+        self.max_blocked = max_blocked
+        self.max_wait_ms = max_wait_ms
+        self.interval = max(10, interval_ms) / 1000
+        self.report: ContentionReport | None = None
+        self.backends: set[int] = set()
+        self._connections: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._engine: Engine | None = None
+
+    @property
+    def supported(self) -> bool:
+        """Whether the backend exposes lock waits the monitor can read."""
+        return self.dialect in BACKEND_ID_SQL
+
+    def install(self) -> None:
+        """Start recording the backends of connections opened from now on."""
+        if not self.supported:
+            logger.warning(f"Contention monitoring is not supported on {self.dialect}")
+            return
+        event.listen(Pool, "connect", self._on_connect)
+        event.listen(Pool, "close", self._on_close)
+
+    def uninstall(self) -> None:
+        """Stop recording connection backends."""
+        for name, fn in (("connect", self._on_connect), ("close", self._on_close)):
+            if event.contains(Pool, name, fn):
+                event.remove(Pool, name, fn)
+
+    @contextmanager
+    def watching(self) -> Iterator[None]:
+        """Poll for blocked sessions while the block runs."""
+        if not self.supported:
+            yield
+            return
+        connection = self._open()
+        self._stop.clear()
+        thread = threading.Thread(
+            target=self._poll, args=(connection,), name="contention-monitor"
+        )
+        thread.daemon = True
+        thread.start()
+        try:
+            yield
+        finally:
+            self._stop.set()
+            thread.join()
+            self._close(connection)
+
+    def check(self, blocked: list[BlockedSession]) -> str | None:
+        """Threshold crossed by the blocked sessions, if any."""
+        if self.max_blocked and len(blocked) > self.max_blocked:
+            return f"{len(blocked)} sessions blocked (limit {self.max_blocked})"
+        longest = max((s.wait_ms for s in blocked), default=0.0)
+        if self.max_wait_ms and longest > self.max_wait_ms:
+            return (
+                f"a session blocked for {longest / 1000:.1f}s "
+                f"(limit {self.max_wait_ms / 1000:.1f}s)"
+            )
+        return None
+
+    def sample(self, connection: Connection) -> list[BlockedSession]:
+        """Sessions currently blocked by the migration's backends."""
+        with self._lock:
+            backends = set(self.backends)
+        if not backends:
+            return []
+        if self.dialect == DIALECT_POSTGRESQL:
+            rows = connection.execute(POSTGRESQL_WAITS_SQL).all()
+            waits = [
+                (pid, tuple(blockers or ()), ms, q) for pid, blockers, ms, q in rows
+            ]
+        else:
+            rows = connection.execute(MYSQL_WAITS_SQL).all()
+            waits = [(pid, (blocker,), ms, q) for pid, blocker, ms, q in rows]
+        connection.rollback()
+
+        blocked: dict[int, BlockedSession] = {}
+        for pid, blockers, wait_ms, query in waits:
+            by = tuple(int(b) for b in blockers if int(b) in backends)
+            if not by or int(pid) in backends:
+                continue
+            session = BlockedSession(
+                pid=int(pid),
+                blocked_by=by,
+                wait_ms=float(wait_ms or 0),
+                query=" ".join((query or "").split())[:MAX_QUERY_LENGTH],
+            )
+            previous = blocked.get(session.pid)
+            if previous is None or session.wait_ms > previous.wait_ms:
+                blocked[session.pid] = session
+        return list(blocked.values())
+
+    def cancel(self, connection: Connection, backends: set[int]) -> list[int]:
+        """Cancel the running statement of each migration backend."""
+        cancelled = []
+        for pid in sorted(backends):
+            if self.dialect == DIALECT_POSTGRESQL:
+                connection.execute(POSTGRESQL_CANCEL_SQL, {"pid": pid})
+            else:
+                connection.exec_driver_sql(f"KILL QUERY {int(pid)}")
+            cancelled.append(pid)
+        connection.rollback()
+        return cancelled
+
+    def _poll(self, connection: Connection) -> None:
+        """Monitor thread: sample until stopped or a threshold is crossed."""
+        failing = False
+        while not self._stop.wait(self.interval):
+            try:
+                blocked = self.sample(connection)
+                reason = self.check(blocked)
+                if reason is None:
+                    continue
+                backends = {pid for s in blocked for pid in s.blocked_by}
+                cancelled = self.cancel(connection, backends)
+            except SQLAlchemyError as e:
+                if not failing:
+                    logger.warning(f"Contention monitor cannot read lock waits: {e}")
+                failing = True
+                continue
+            self.report = ContentionReport(reason, blocked, cancelled)
+            logger.error(self.report.describe())
+            return
+
+    def _open(self) -> Connection:
+        """Open the monitor's own connection, which is not watched."""
+        self._engine = create_engine(self.database_url, poolclass=NullPool)
+        connection = self._engine.connect()
+        connection.info[INTERNAL_CONNECTION_KEY] = True
+        backend = connection.exec_driver_sql(BACKEND_ID_SQL[self.dialect]).scalar()
+        connection.rollback()
+        if backend is None:
+            self._close(connection)
+            raise RuntimeError(
+                f"Cannot read the backend ID of the monitor connection ({self.dialect})"
+            )
+        with self._lock:
+            self.backends.discard(int(backend))
+        return connection
+
+    def _close(self, connection: Connection) -> None:
+        """Close the monitor's connection."""
+        connection.close()
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
+
+    def _on_connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+        """Record the backend ID of a new DBAPI connection."""
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(BACKEND_ID_SQL[self.dialect])
+            backend = int(cursor.fetchone()[0])
+        finally:
+            cursor.close()
+        dbapi_connection.commit()
+        with self._lock:
+            self.backends.add(backend)
+            self._connections[id(dbapi_connection)] = backend
+
+    def _on_close(self, dbapi_connection: Any, connection_record: Any) -> None:
+        """Forget the backend of a closed connection (IDs get reused)."""
+        with self._lock:
+            backend = self._connections.pop(id(dbapi_connection), None)
+            self.backends.discard(backend)
@@ -0,0 +1,247 @@
+"""Database lock serializing concurrent deploys to the same database."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import hashlib
+import os
+import socket
+import time
+from datetime import UTC, datetime
+
+# Third Party
+from sqlalchemy import (
+    Column,
+    DateTime,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    delete,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.pool import NullPool
+
+# Project/Local
+from src.constants import (
+    DEFAULT_DEPLOY_LOCK_NAME,
+    DEFAULT_DEPLOY_LOCK_POLL_INTERVAL,
+    DEFAULT_DEPLOY_LOCK_TABLE,
+    DEFAULT_DEPLOY_LOCK_TIMEOUT,
+    INTERNAL_CONNECTION_KEY,
+)
+from src.lock_timeout import is_lock_timeout
+from src.logger import setup_logger
+from src.urls import dialect_name
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+DIALECT_POSTGRESQL = "postgresql"
+DIALECT_MYSQL = "mysql"
+DIALECT_MARIADB = "mariadb"
+
+# Longest lock name GET_LOCK accepts
+MYSQL_MAX_LOCK_NAME = 64
+
+POSTGRESQL_LOCK_SQL = text("SELECT pg_advisory_lock(:key)")
+POSTGRESQL_UNLOCK_SQL = text("SELECT pg_advisory_unlock(:key)")
+POSTGRESQL_LOCK_TIMEOUT_SQL = text("SELECT set_config('lock_timeout', :ms, false)")
+MYSQL_LOCK_SQL = text("SELECT GET_LOCK(:name, :timeout)")
+MYSQL_UNLOCK_SQL = text("SELECT RELEASE_LOCK(:name)")
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class DeployLock:
+    """Lock held by one deploy at a time for the whole run.
+
+    The lock lives on its own connection, so it survives the commits and
+    rollbacks of the migration and is held whichever runner is used:
+    a session-level ``pg_advisory_lock`` on PostgreSQL, ``GET_LOCK`` on
+    MySQL / MariaDB, and a row in a lock table on other backends. Advisory
+    locks are released by the database when the connection drops; a lock
+    row left by a killed run must be deleted by hand.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        name: str = DEFAULT_DEPLOY_LOCK_NAME,
+        timeout: float = DEFAULT_DEPLOY_LOCK_TIMEOUT,
+        table_name: str = DEFAULT_DEPLOY_LOCK_TABLE,
+        poll_interval: float = DEFAULT_DEPLOY_LOCK_POLL_INTERVAL,
+    ):
+        """Initialize lock.
+
+        Args:
+            database_url: URL of the database being migrated.
+            name: Lock name; deploys sharing it wait for each other.
+            timeout: Seconds to wait for the lock (0 for no limit).
+            table_name: Lock table of backends without advisory locks.
+            poll_interval: Seconds between attempts on the lock table.
+        """
+        self.database_url = database_url
+        self.dialect = dialect_name(database_url)
+        self.name = name
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.waited = 0.0
+        self.held = False
+        self.table = Table(
+            table_name,
+            MetaData(),
+            Column("name", String(255), primary_key=True),
+            Column("owner", String(255), nullable=False),
+            Column("acquired_at", DateTime, nullable=False),
+        )
+        self._engine: Engine | None = None
+        self._connection: Connection | None = None
+
+    @property
+    def key(self) -> int:
+        """Signed 64-bit advisory lock key derived from the name."""
+        digest = hashlib.sha256(self.name.encode()).digest()
+        return int.from_bytes(digest[:8], "big", signed=True)
+
+    def acquire(self) -> None:
+        """Wait for the lock and hold it until :meth:`release`.
+
+        Raises:
+            TimeoutError: If the lock is not acquired within the timeout.
+        """
+        self._engine = create_engine(self.database_url, poolclass=NullPool)
+        start = time.perf_counter()
+        try:
+            self._connection = self._engine.connect()
+            self._connection.info[INTERNAL_CONNECTION_KEY] = True
+            if self.dialect == DIALECT_POSTGRESQL:
+                self.held = self._acquire_postgresql(self._connection)
+            elif self.dialect in (DIALECT_MYSQL, DIALECT_MARIADB):
+                self.held = self._acquire_mysql(self._connection)
+            else:
+                self.held = self._acquire_table(self._connection)
+        finally:
+            self.waited = time.perf_counter() - start
+            if not self.held:
+                self._close()
+        if not self.held:
+            raise TimeoutError(
+                f"Timed out after {self.waited:.1f}s waiting for deploy lock "
+                f"'{self.name}'"
+            )
+        logger.info(f"Deploy lock '{self.name}' acquired in {self.waited:.1f}s")
+
+    def release(self) -> None:
+        """Release the lock, if held, and close its connection."""
+        connection = self._connection
+        if self.held and connection is not None:
+            try:
+                if self.dialect == DIALECT_POSTGRESQL:
+                    connection.execute(POSTGRESQL_UNLOCK_SQL, {"key": self.key})
+                elif self.dialect in (DIALECT_MYSQL, DIALECT_MARIADB):
+                    connection.execute(MYSQL_UNLOCK_SQL, {"name": self._mysql_name})
+                else:
+                    connection.execute(
+                        delete(self.table).where(
+                            self.table.c.name == self.name,
+                            self.table.c.owner == self.owner,
+                        )
+                    )
+                connection.commit()
+                logger.info(f"Deploy lock '{self.name}' released")
+            except DBAPIError as e:
+                logger.warning(f"Could not release deploy lock '{self.name}': {e}")
+        self.held = False
+        self._close()
+
+    @property
+    def _mysql_name(self) -> str:
+        """Lock name within the length GET_LOCK accepts."""
+        if len(self.name) <= MYSQL_MAX_LOCK_NAME:
+            return self.name
+        return hashlib.sha256(self.name.encode()).hexdigest()[:MYSQL_MAX_LOCK_NAME]
+
+    def _acquire_postgresql(self, connection: Connection) -> bool:
+        """Wait on the advisory lock, bounded by ``lock_timeout``."""
+        connection.execute(
+            POSTGRESQL_LOCK_TIMEOUT_SQL, {"ms": str(int(self.timeout * 1000))}
+        )
+        try:
+            connection.execute(POSTGRESQL_LOCK_SQL, {"key": self.key})
+        except DBAPIError as e:
+            if not is_lock_timeout(e):
+                raise
+            connection.rollback()
+            return False
+        # Session-level: the lock outlives this transaction
+        connection.execute(text("RESET lock_timeout"))
+        connection.commit()
+        return True
+
+    def _acquire_mysql(self, connection: Connection) -> bool:
+        """Wait on the named lock; a negative timeout waits forever."""
+        acquired = connection.execute(
+            MYSQL_LOCK_SQL,
+            {"name": self._mysql_name, "timeout": self.timeout or -1},
+        ).scalar()
+        connection.commit()
+        return acquired == 1
+
+    def _acquire_table(self, connection: Connection) -> bool:
+        """Insert the lock row, polling while another deploy holds it."""
+        self.table.metadata.create_all(connection, checkfirst=True)
+        connection.commit()
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        reported = False
+        while True:
+            try:
+                connection.execute(
+                    self.table.insert().values(
+                        name=self.name,
+                        owner=self.owner,
+                        acquired_at=datetime.now(UTC).replace(tzinfo=None),
+                    )
+                )
+                connection.commit()
+                return True
+            except IntegrityError:
+                connection.rollback()
+            if not reported:
+                holder = connection.execute(
+                    select(self.table.c.owner, self.table.c.acquired_at).where(
+                        self.table.c.name == self.name
+                    )
+                ).first()
+                connection.rollback()
+                if holder is not None:
+                    logger.info(
+                        f"Deploy lock '{self.name}' held by {holder.owner} "
+                        f"since {holder.acquired_at:%Y-%m-%d %H:%M:%S} UTC"
+                    )
+                reported = True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+
+    def _close(self) -> None:
+        """Close the lock's connection and engine."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
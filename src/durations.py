@@ -0,0 +1,375 @@
+"""Ledger of past migration durations and deploy-time estimates."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import fcntl
+import json
+import os
+import statistics
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+# Third Party
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.exc import ArgumentError
+
+# Project/Local
+from src.constants import (
+    DEFAULT_LEDGER_HISTORY,
+    DEFAULT_VERSION_TABLE,
+)
+from src.logger import setup_logger
+from src.statement_timing import version_write_revision
+from src.urls import dialect_name
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+# Bump when the ledger layout changes; older files are started afresh
+LEDGER_FORMAT_VERSION = 1
+
+BASIS_ENVIRONMENT = "environment"
+BASIS_DIALECT = "dialect"
+
+
+@dataclass(frozen=True)
+class LedgerEntry:
+    """Duration of one revision's upgrade step on one environment.
+
+    Attributes:
+        environment: Environment the migration ran on.
+        dialect: Database backend of that environment.
+        revision: Revision that was applied.
+        seconds: Wall time of the migration step.
+        recorded_at: ISO 8601 UTC timestamp of the run.
+    """
+
+    environment: str
+    dialect: str
+    revision: str
+    seconds: float
+    recorded_at: str
+
+
+@dataclass(frozen=True)
+class RevisionEstimate:
+    """Predicted duration of one pending revision.
+
+    Attributes:
+        revision: Pending revision.
+        seconds: Median of past durations, or None without history.
+        samples: Past runs the median is taken over.
+        basis: ``environment`` when the samples come from the target
+            environment, ``dialect`` when they come from other environments
+            on the same backend, empty without history.
+    """
+
+    revision: str
+    seconds: float | None
+    samples: int
+    basis: str
+
+
+@dataclass(frozen=True)
+class DurationEstimate:
+    """Predicted duration of a pending revision range.
+
+    Attributes:
+        revisions: Per-revision estimates in upgrade order.
+    """
+
+    revisions: list[RevisionEstimate]
+
+    @property
+    def total(self) -> float:
+        """Sum of the known per-revision estimates, in seconds."""
+        return sum(r.seconds for r in self.revisions if r.seconds is not None)
+
+    @property
+    def unknown(self) -> list[str]:
+        """Pending revisions without any recorded duration."""
+        return [r.revision for r in self.revisions if r.seconds is None]
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class DurationLedger:
+    """JSON file of how long each revision took on each environment.
+
+    Only the latest ``history`` durations per environment and revision are
+    kept. The file is meant to outlive the job, e.g. through
+    ``actions/cache`` or by committing it.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        environment: str,
+        dialect: str,
+        history: int = DEFAULT_LEDGER_HISTORY,
+    ):
+        """Initialize ledger.
+
+        Args:
+            path: Ledger file (created on first save).
+            environment: Environment new durations are recorded for.
+            dialect: Database backend of that environment.
+            history: Durations kept per environment and revision.
+        """
+        self.path = Path(path)
+        self.environment = environment
+        self.dialect = dialect
+        self.history = max(1, history)
+        self._entries: list[LedgerEntry] | None = None
+
+    @classmethod
+    def for_database(
+        cls, path: str | Path, database_url: str, environment: str = ""
+    ) -> DurationLedger:
+        """Create a ledger for a database, naming its environment if unnamed.
+
+        Args:
+            path: Ledger file.
+            database_url: URL of the target database.
+            environment: Explicit environment name.
+        """
+        return cls(
+            path,
+            environment or environment_name(database_url),
+            dialect_name(database_url),
+        )
+
+    @property
+    def entries(self) -> list[LedgerEntry]:
+        """All recorded durations, oldest first."""
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+
+    def record(self, durations: dict[str, float]) -> None:
+        """Add durations measured on this environment and save the ledger.
+
+        Args:
+            durations: Seconds per applied revision.
+        """
+        if not durations:
+            return
+        now = datetime.now(UTC).isoformat(timespec="seconds")
+        with self._locked():
+            # Keep what concurrent runs (fan-out targets) recorded meanwhile
+            entries = self._load() + [
+                LedgerEntry(self.environment, self.dialect, revision, round(s, 3), now)
+                for revision, s in durations.items()
+            ]
+            self._entries = self._trim(entries)
+            self._save()
+        logger.info(
+            f"Recorded {len(durations)} revision duration(s) for "
+            f"'{self.environment}' in {self.path}"
+        )
+
+    def samples(self, revision: str) -> tuple[list[float], str]:
+        """Past durations of a revision, preferring this environment.
+
+        Returns:
+            Durations and their basis (see :class:`RevisionEstimate`).
+        """
+        own: list[float] = []
+        similar: list[float] = []
+        for entry in self.entries:
+            if entry.revision != revision:
+                continue
+            if entry.environment == self.environment:
+                own.append(entry.seconds)
+            elif entry.dialect == self.dialect:
+                similar.append(entry.seconds)
+        if own:
+            return own, BASIS_ENVIRONMENT
+        if similar:
+            return similar, BASIS_DIALECT
+        return [], ""
+
+    def _trim(self, entries: list[LedgerEntry]) -> list[LedgerEntry]:
+        """Keep the newest ``history`` entries per environment and revision."""
+        seen: dict[tuple[str, str], int] = {}
+        kept: list[LedgerEntry] = []
+        for entry in reversed(entries):
+            key = (entry.environment, entry.revision)
+            seen[key] = seen.get(key, 0) + 1
+            if seen[key] <= self.history:
+                kept.append(entry)
+        kept.reverse()
+        return kept
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold an exclusive lock on the ledger across read-modify-write."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(f"{self.path.name}.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load(self) -> list[LedgerEntry]:
+        """Read the ledger file; missing or unreadable files start empty."""
+        try:
+            data = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable duration ledger {self.path}: {e}")
+            return []
+        if data.get("format") != LEDGER_FORMAT_VERSION:
+            return []
+        try:
+            return [LedgerEntry(**entry) for entry in data.get("entries", [])]
+        except TypeError as e:
+            logger.warning(f"Ignoring malformed duration ledger {self.path}: {e}")
+            return []
+
+    def _save(self) -> None:
+        """Write the ledger atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "format": LEDGER_FORMAT_VERSION,
+                    "entries": [asdict(entry) for entry in self.entries],
+                },
+                indent=2,
+            )
+        )
+        os.replace(tmp, self.path)
+
+
+class DurationEstimator:
+    """Predicts how long pending revisions will take from a ledger.
+
+    Each revision is estimated by the median of its past durations on the
+    target environment or, failing that, on other environments with the
+    same database backend.
+    """
+
+    def __init__(self, ledger: DurationLedger):
+        """Initialize estimator.
+
+        Args:
+            ledger: Ledger of past durations.
+        """
+        self.ledger = ledger
+
+    def estimate(self, revisions: list[str]) -> DurationEstimate:
+        """Estimate the duration of upgrading through ``revisions``.
+
+        Args:
+            revisions: Pending revisions in upgrade order.
+        """
+        estimates = []
+        for revision in revisions:
+            samples, basis = self.ledger.samples(revision)
+            estimates.append(
+                RevisionEstimate(
+                    revision=revision,
+                    seconds=statistics.median(samples) if samples else None,
+                    samples=len(samples),
+                    basis=basis,
+                )
+            )
+        return DurationEstimate(estimates)
+
+
+class StepTimer:
+    """Measures the wall time of each migration step Alembic runs in-process.
+
+    A step ends when Alembic writes its revision to the version table
+    (``INSERT`` or ``UPDATE``), and the next one starts there. The first
+    step starts at the last version table read before it, so connecting
+    and ``env.py`` setup are not charged to it.
+    """
+
+    def __init__(self, version_table: str = DEFAULT_VERSION_TABLE):
+        """Initialize timer.
+
+        Args:
+            version_table: Name of the Alembic version table.
+        """
+        self.version_table = version_table.lower()
+        self.durations: dict[str, float] = {}
+        self._mark: float | None = None
+
+    @contextmanager
+    def recording(self) -> Iterator[None]:
+        """Time migration steps executed inside the block."""
+        self._mark = time.perf_counter()
+        event.listen(Engine, "after_cursor_execute", self._after_execute)
+        try:
+            yield
+        finally:
+            event.remove(Engine, "after_cursor_execute", self._after_execute)
+
+    def _after_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        """Close the current step on a version write."""
+        if self.version_table not in statement.lower():
+            return
+        now = time.perf_counter()
+        revision = version_write_revision(statement, self.version_table)
+        if revision is None:
+            # Version table read or creation before the first step
+            if not self.durations:
+                self._mark = now
+            return
+        verb = statement.lstrip()[:6].upper()
+        if not revision or verb == "DELETE":
+            # Merge points delete the extra heads before updating the last
+            return
+        if self._mark is not None:
+            self.durations[revision] = self.durations.get(revision, 0.0) + (
+                now - self._mark
+            )
+        self._mark = now
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def environment_name(database_url: str) -> str:
+    """Ledger name of the environment behind a database URL.
+
+    Credentials and query parameters are left out, so the name is stable
+    across rotated passwords and safe to store.
+    """
+    try:
+        url = make_url(database_url)
+    except ArgumentError:
+        return database_url.split("@")[-1]
+    host = url.host or ""
+    if url.port:
+        host = f"{host}:{url.port}"
+    return f"{url.get_backend_name()}://{host}/{url.database or ''}"
@@ -0,0 +1,400 @@
+"""Fan-out deploys of the same migrations to many databases."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import contextlib
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+# Third Party
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import ArgumentError
+
+# Project/Local
+from src.constants import (
+    DEFAULT_CHECKPOINT_PATH,
+    DEFAULT_FANOUT_WORKERS,
+    DEFAULT_PROFILE_PATH,
+    DEFAULT_STATE_SNAPSHOT_DIR,
+    DEFAULT_STATEMENT_TIMINGS_PATH,
+    DEFAULT_TRACE_PATH,
+    ENV_DATABASE_URL,
+    ENV_SQLALCHEMY_URL,
+    GITHUB_OUTPUT,
+    GITHUB_STEP_SUMMARY,
+    INPUT_CHECKPOINT_PATH,
+    INPUT_DATABASE_URL,
+    INPUT_PROFILE_PATH,
+    INPUT_STATE_SNAPSHOT_DIR,
+    INPUT_STATEMENT_TIMINGS_PATH,
+    INPUT_TARGETS,
+    INPUT_TARGETS_FILE,
+    INPUT_TRACE_PATH,
+    INPUT_WORKING_DIRECTORY,
+    OUTPUT_MIGRATION_STATUS,
+    POLICY_CONTINUE,
+    POLICY_FAIL_FAST,
+    STATUS_CANCELLED,
+    STATUS_DRY_RUN,
+    STATUS_FAILED,
+    STATUS_SKIPPED,
+    STATUS_SUCCESS,
+    STATUS_TIMEOUT,
+)
+from src.logger import setup_logger
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+# Project root and single-target entrypoint run for every target
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+MAIN_SCRIPT = Path(__file__).resolve().with_name("main.py")
+
+# Statuses a target may finish with without failing the run
+OK_STATUSES = (STATUS_SUCCESS, STATUS_DRY_RUN, STATUS_SKIPPED)
+POLICIES = (POLICY_CONTINUE, POLICY_FAIL_FAST)
+
+# Per-run files (and directories) each target writes its own copy of, so
+# concurrent targets do not overwrite each other's checkpoints or reports.
+# The duration ledger stays shared: it merges entries under a file lock.
+PER_TARGET_PATHS = (
+    (INPUT_CHECKPOINT_PATH, DEFAULT_CHECKPOINT_PATH, False),
+    (INPUT_STATE_SNAPSHOT_DIR, DEFAULT_STATE_SNAPSHOT_DIR, True),
+    (INPUT_PROFILE_PATH, DEFAULT_PROFILE_PATH, False),
+    (INPUT_STATEMENT_TIMINGS_PATH, DEFAULT_STATEMENT_TIMINGS_PATH, False),
+    (INPUT_TRACE_PATH, DEFAULT_TRACE_PATH, False),
+)
+# Characters of a target name kept in its file names
+UNSAFE_PATH_CHARS = re.compile(r"[^\w.-]+")
+
+
+@dataclass(frozen=True)
+class Target:
+    """A database to deploy to.
+
+    Attributes:
+        name: Label used in logs and outputs (never the raw URL).
+        database_url: Connection string of the database.
+    """
+
+    name: str
+    database_url: str
+
+
+@dataclass
+class TargetResult:
+    """Outcome of one target.
+
+    Attributes:
+        name: Target name.
+        status: ``migration-status`` of the target, ``timeout`` or
+            ``cancelled``.
+        duration: Wall-clock seconds spent on the target.
+        error: Last line logged by a failed target.
+        outputs: Single-line outputs the target set.
+    """
+
+    name: str
+    status: str
+    duration: float = 0.0
+    error: str = ""
+    outputs: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        """Whether the target finished without failing."""
+        return self.status in OK_STATUSES
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to JSON-compatible data."""
+        return {
+            "target": self.name,
+            "status": self.status,
+            "duration_seconds": round(self.duration, 3),
+            "error": self.error,
+            "outputs": self.outputs,
+        }
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class FanOut:
+    """Runs the single-database action once per target on a bounded pool.
+
+    Each target runs in its own child process (``src/main.py`` with the
+    target's URL in the environment), so it gets its own ``StateMachine``,
+    ``ActionContext`` and ``GITHUB_OUTPUT`` file, and ``env.py`` sees the
+    right ``SQLALCHEMY_DATABASE_URI``. A process can also be killed when it
+    exceeds the per-target timeout, which a thread could not. Each target
+    runs in its own session, so the kill also reaches the ``alembic``
+    processes it started.
+
+    With the ``fail-fast`` policy, the first failure cancels targets that
+    have not started yet; running targets are left to finish.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_FANOUT_WORKERS,
+        timeout: float = 0,
+        policy: str = POLICY_CONTINUE,
+        command: list[str] | None = None,
+    ):
+        """Initialize fan-out.
+
+        Args:
+            workers: Targets run concurrently.
+            timeout: Seconds before a target is killed (0 for no limit).
+            policy: ``continue`` or ``fail-fast``.
+            command: Command run per target (defaults to this action).
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown target error policy: {policy}")
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.policy = policy
+        self.command = command or [sys.executable, str(MAIN_SCRIPT)]
+        self._abort = threading.Event()
+        self._log_lock = threading.Lock()
+
+    def run(self, targets: list[Target]) -> list[TargetResult]:
+        """Deploy to every target.
+
+        Args:
+            targets: Targets, in the order results are returned.
+
+        Returns:
+            One result per target.
+        """
+        self._abort.clear()
+        logger.info(
+            f"Deploying to {len(targets)} target(s) with {self.workers} worker(s)..."
+        )
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(self._run_target, targets))
+
+    def _run_target(self, target: Target) -> TargetResult:
+        """Run the action for one target in a child process."""
+        if self._abort.is_set():
+            return TargetResult(target.name, STATUS_CANCELLED)
+
+        with (
+            tempfile.TemporaryDirectory(prefix="alembic-deploy-") as tmp,
+            open(Path(tmp) / "log", "w+b") as log,
+        ):
+            output_path = Path(tmp) / "output"
+            started = time.perf_counter()
+            with subprocess.Popen(
+                self.command,
+                env=self._child_env(target, output_path),
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            ) as process:
+                try:
+                    process.communicate(timeout=self.timeout or None)
+                except subprocess.TimeoutExpired:
+                    # Also kills the alembic grandchild of a subprocess runner
+                    _kill_group(process)
+                    result = TargetResult(
+                        target.name,
+                        STATUS_TIMEOUT,
+                        error=f"Timed out after {self.timeout:g}s",
+                    )
+                except BaseException:
+                    _kill_group(process)
+                    raise
+                else:
+                    outputs = _read_outputs(output_path)
+                    status = outputs.get(OUTPUT_MIGRATION_STATUS, STATUS_FAILED)
+                    if process.returncode != 0:
+                        status = STATUS_FAILED
+                    result = TargetResult(target.name, status, outputs=outputs)
+            result.duration = time.perf_counter() - started
+
+            log.seek(0)
+            text = log.read().decode("utf-8", errors="replace")
+
+        if not result.ok:
+            result.error = result.error or _last_line(text)
+            if self.policy == POLICY_FAIL_FAST:
+                self._abort.set()
+        self._print_log(result, text)
+        return result
+
+    def _child_env(self, target: Target, output_path: Path) -> dict[str, str]:
+        """Environment of a target's child process."""
+        env = dict(os.environ)
+        env.pop(GITHUB_STEP_SUMMARY, None)
+        env.update(
+            {
+                INPUT_DATABASE_URL: target.database_url,
+                ENV_DATABASE_URL: target.database_url,
+                ENV_SQLALCHEMY_URL: target.database_url,
+                INPUT_TARGETS: "",
+                INPUT_TARGETS_FILE: "",
+                # The parent already changed into the working directory
+                INPUT_WORKING_DIRECTORY: ".",
+                GITHUB_OUTPUT: str(output_path),
+                "PYTHONPATH": os.pathsep.join(
+                    p for p in (str(PROJECT_ROOT), env.get("PYTHONPATH")) if p
+                ),
+            }
+        )
+        for key, default, is_directory in PER_TARGET_PATHS:
+            path = env.get(key, default)
+            if path:
+                env[key] = _target_path(path, target.name, is_directory)
+        return env
+
+    def _print_log(self, result: TargetResult, text: str) -> None:
+        """Print a target's log as one collapsible group."""
+        with self._log_lock:
+            print(f"::group::{result.name}: {result.status} ({result.duration:.1f}s)")
+            sys.stdout.write(text)
+            if text and not text.endswith("\n"):
+                print()
+            print("::endgroup::", flush=True)
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def parse_targets(text: str) -> list[Target]:
+    """Parse a target list.
+
+    One target per line, either ``<name> <url>`` or just ``<url>``. Blank
+    lines and lines starting with ``#`` are ignored.
+
+    Args:
+        text: Target list.
+
+    Returns:
+        Targets in listed order.
+
+    Raises:
+        ValueError: If a line has more than two fields or names repeat.
+    """
+    targets: list[Target] = []
+    for number, line in enumerate(text.splitlines(), 1):
+        fields = line.split()
+        if not fields or fields[0].startswith("#"):
+            continue
+        if len(fields) > 2:
+            raise ValueError(
+                f"Invalid target on line {number}: expected '<name> <url>'"
+            )
+        url = fields[-1]
+        name = fields[0] if len(fields) == 2 else _default_name(url, number)
+        targets.append(Target(name, url))
+
+    names = [target.name for target in targets]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate target names: {', '.join(duplicates)}")
+    return targets
+
+
+def load_targets(inline: str, path: str = "") -> list[Target]:
+    """Collect targets from the ``targets`` input and ``targets-file``."""
+    text = inline
+    if path:
+        text += "\n" + Path(path).read_text()
+    return parse_targets(text)
+
+
+def format_summary(results: list[TargetResult]) -> str:
+    """Render results as a Markdown status matrix."""
+    lines = ["| Target | Status | Duration | Error |", "|---|---|---|---|"]
+    for result in results:
+        error = result.error.replace("|", "\\|")
+        lines.append(
+            f"| {result.name} | {result.status} | {result.duration:.1f}s | {error} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _default_name(url: str, number: int) -> str:
+    """Name of an unnamed target: its URL without the password."""
+    try:
+        return make_url(url).render_as_string(hide_password=True)
+    except ArgumentError:
+        return f"target-{number}"
+
+
+def _target_path(path: str, name: str, is_directory: bool) -> str:
+    """Make a per-run path unique to a target.
+
+    ``checkpoint.json`` becomes ``checkpoint.<name>.json`` and a directory
+    gets a ``<name>`` subdirectory.
+    """
+    label = UNSAFE_PATH_CHARS.sub("_", name)
+    original = Path(path)
+    if is_directory:
+        return str(original / label)
+    return str(original.with_name(f"{original.stem}.{label}{original.suffix}"))
+
+
+def _read_outputs(path: Path) -> dict[str, str]:
+    """Single-line ``key=value`` outputs written by a target."""
+    try:
+        lines = path.read_text().splitlines()
+    except FileNotFoundError:
+        return {}
+
+    outputs: dict[str, str] = {}
+    delimiter = None
+    for line in lines:
+        if delimiter is not None:
+            # Skip multi-line values such as the SQL preview
+            if line == delimiter:
+                delimiter = None
+            continue
+        key, sep, value = line.partition("=")
+        if sep and "<<" not in key:
+            outputs[key] = value
+        elif "<<" in line:
+            delimiter = line.split("<<", 1)[1]
+    return outputs
+
+
+def _kill_group(process: subprocess.Popen[bytes]) -> None:
+    """Kill a target and every process it started, then reap it."""
+    with contextlib.suppress(ProcessLookupError):
+        os.killpg(process.pid, signal.SIGKILL)
+    process.wait()
+
+
+def _last_line(text: str) -> str:
+    """Last non-blank line of a log."""
+    for line in reversed(text.splitlines()):
+        if line.strip():
+            return line.strip()
+    return ""
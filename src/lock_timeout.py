@@ -0,0 +1,228 @@
+"""Lock timeouts on migration connections, with retry and backoff."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import math
+import random
+import re
+import subprocess
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+# Third Party
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import Pool
+
+# Project/Local
+from src.constants import (
+    DEFAULT_LOCK_RETRIES,
+    DEFAULT_LOCK_RETRY_BUDGET,
+    DEFAULT_LOCK_RETRY_DELAY,
+    DEFAULT_LOCK_RETRY_MAX_DELAY,
+    ENV_PGOPTIONS,
+    REGEX_LOCK_TIMEOUT_ERROR,
+)
+from src.logger import setup_logger
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+T = TypeVar("T")
+
+LOCK_TIMEOUT_PATTERN = re.compile(REGEX_LOCK_TIMEOUT_ERROR, re.IGNORECASE)
+
+# PostgreSQL SQLSTATE of a lock_timeout (lock_not_available)
+PG_LOCK_NOT_AVAILABLE = "55P03"
+# MySQL / MariaDB error of a lock_wait_timeout
+MYSQL_LOCK_WAIT_TIMEOUT = 1205
+
+DIALECT_POSTGRESQL = "postgresql"
+DIALECT_MYSQL = "mysql"
+DIALECT_MARIADB = "mariadb"
+DIALECT_SQLITE = "sqlite"
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class LockTimeoutGuard:
+    """Bounds how long migrations wait for locks, and retries when they give up.
+
+    Every new database connection in this process gets a session-level
+    lock timeout (``lock_timeout`` on PostgreSQL, ``lock_wait_timeout`` on
+    MySQL / MariaDB, ``busy_timeout`` on SQLite), so a DDL statement queued
+    behind a long transaction fails quickly instead of blocking all traffic
+    to its table. :meth:`run` then retries the command with exponential
+    backoff and full jitter until it succeeds, runs out of retries, or the
+    wait budget is spent. Alembic resumes from the first revision not yet
+    committed, so a retry repeats only the revision that failed (or the
+    whole run when it is one transaction).
+    """
+
+    def __init__(
+        self,
+        dialect: str,
+        lock_timeout_ms: int,
+        statement_timeout_ms: int = 0,
+        retries: int = DEFAULT_LOCK_RETRIES,
+        budget: float = DEFAULT_LOCK_RETRY_BUDGET,
+        base_delay: float = DEFAULT_LOCK_RETRY_DELAY,
+        max_delay: float = DEFAULT_LOCK_RETRY_MAX_DELAY,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Initialize guard.
+
+        Args:
+            dialect: Database backend name (e.g. ``postgresql``).
+            lock_timeout_ms: Milliseconds a statement may wait for a lock.
+            statement_timeout_ms: Milliseconds a statement may run (0 for no
+                limit; PostgreSQL only).
+            retries: Retries after a lock timeout.
+            budget: Seconds the failed attempts and backoff may take in total.
+            base_delay: Backoff cap of the first retry, in seconds; doubled
+                for each further retry.
+            max_delay: Largest backoff cap, in seconds.
+            sleep: Waits between attempts (replaceable in tests).
+        """
+        self.dialect = dialect
+        self.lock_timeout_ms = lock_timeout_ms
+        self.statement_timeout_ms = statement_timeout_ms
+        self.max_retries = max(0, retries)
+        self.budget = budget
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self.retries = 0
+        self.waited = 0.0
+
+    @property
+    def settings(self) -> list[str]:
+        """Statements applying the timeouts to a new connection."""
+        if self.dialect == DIALECT_POSTGRESQL:
+            settings = [f"SET lock_timeout = {self.lock_timeout_ms}"]
+            if self.statement_timeout_ms:
+                settings.append(f"SET statement_timeout = {self.statement_timeout_ms}")
+            return settings
+        if self.dialect in (DIALECT_MYSQL, DIALECT_MARIADB):
+            # Whole seconds; metadata locks and InnoDB row locks time out apart
+            seconds = max(1, math.ceil(self.lock_timeout_ms / 1000))
+            return [
+                f"SET SESSION lock_wait_timeout = {seconds}",
+                f"SET SESSION innodb_lock_wait_timeout = {seconds}",
+            ]
+        if self.dialect == DIALECT_SQLITE:
+            return [f"PRAGMA busy_timeout = {self.lock_timeout_ms}"]
+        return []
+
+    def environment(self) -> dict[str, str]:
+        """Environment variables carrying the timeouts to an ``alembic`` CLI.
+
+        Only libpq-based PostgreSQL drivers read connection settings from
+        the environment (``PGOPTIONS``).
+        """
+        if self.dialect != DIALECT_POSTGRESQL:
+            return {}
+        options = [f"-c lock_timeout={self.lock_timeout_ms}"]
+        if self.statement_timeout_ms:
+            options.append(f"-c statement_timeout={self.statement_timeout_ms}")
+        return {ENV_PGOPTIONS: " ".join(options)}
+
+    def install(self) -> None:
+        """Apply the timeouts to every connection opened from now on."""
+        if not self.settings:
+            logger.warning(f"lock-timeout is not supported on {self.dialect}")
+            return
+        event.listen(Pool, "connect", self._on_connect)
+
+    def uninstall(self) -> None:
+        """Stop applying the timeouts to new connections."""
+        if event.contains(Pool, "connect", self._on_connect):
+            event.remove(Pool, "connect", self._on_connect)
+
+    def run(self, operation: Callable[[], T]) -> T:
+        """Run ``operation``, retrying it after lock timeouts.
+
+        Args:
+            operation: Alembic command to run (e.g. an upgrade).
+
+        Returns:
+            What ``operation`` returned.
+
+        Raises:
+            Exception: The last error, when it is not a lock timeout or the
+                retries or budget are exhausted.
+        """
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                return operation()
+            except Exception as e:
+                if not is_lock_timeout(e):
+                    raise
+                self.waited += time.perf_counter() - start
+                delay = self._backoff(attempt)
+                if attempt >= self.max_retries or delay is None:
+                    logger.error(
+                        f"Lock timeout; giving up after {self.retries} "
+                        f"retry(ies) and {self.waited:.1f}s waiting"
+                    )
+                    raise
+            attempt += 1
+            self.retries = attempt
+            logger.warning(
+                f"Lock timeout; retry {attempt}/{self.max_retries} in {delay:.1f}s"
+            )
+            self._sleep(delay)
+            self.waited += delay
+
+    def _backoff(self, attempt: int) -> float | None:
+        """Jittered delay before retry ``attempt + 1``, or None past the budget."""
+        remaining = self.budget - self.waited
+        if remaining <= 0:
+            return None
+        cap = min(self.max_delay, self.base_delay * 2**attempt)
+        return min(remaining, random.uniform(0, cap))
+
+    def _on_connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+        """Set the timeouts on a new DBAPI connection."""
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in self.settings:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+        # Settings made inside a transaction are lost if it rolls back
+        dbapi_connection.commit()
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def is_lock_timeout(error: BaseException) -> bool:
+    """Whether an error from a migration command is a lock timeout.
+
+    Statement timeouts are not: the statement would be slow again.
+    """
+    if isinstance(error, subprocess.CalledProcessError):
+        return bool(LOCK_TIMEOUT_PATTERN.search(error.stderr or ""))
+    if isinstance(error, DBAPIError):
+        orig = error.orig
+        code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+        if code == PG_LOCK_NOT_AVAILABLE:
+            return True
+        args = getattr(orig, "args", ())
+        if args and args[0] == MYSQL_LOCK_WAIT_TIMEOUT:
+            return True
+    return bool(LOCK_TIMEOUT_PATTERN.search(str(error)))
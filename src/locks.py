@@ -0,0 +1,511 @@
+"""Table lock classification of DDL statements."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import re
+from dataclasses import dataclass
+from enum import IntEnum, StrEnum
+from typing import Any, Protocol
+
+# Project/Local
+from src.constants import (
+    REGEX_ALTER_TABLE_TARGET,
+    REGEX_BACKTICK_IDENTIFIER,
+    REGEX_BLOCK_COMMENT,
+    REGEX_CLUSTER_TARGET,
+    REGEX_DOLLAR_QUOTED,
+    REGEX_DROP_TABLE_TARGET,
+    REGEX_LINE_COMMENT,
+    REGEX_LOCK_TABLE_TARGET,
+    REGEX_ON_TABLE_TARGET,
+    REGEX_PG_ADD_COLUMN,
+    REGEX_PG_ADD_CONSTRAINT,
+    REGEX_PG_ALTER_COLUMN,
+    REGEX_PG_ALTER_TABLE,
+    REGEX_PG_ATTACH_PARTITION,
+    REGEX_PG_CLUSTER,
+    REGEX_PG_CLUSTER_ON,
+    REGEX_PG_CONCURRENTLY,
+    REGEX_PG_CREATE_INDEX,
+    REGEX_PG_CREATE_TRIGGER,
+    REGEX_PG_DETACH_PARTITION,
+    REGEX_PG_DROP_COLUMN,
+    REGEX_PG_DROP_CONSTRAINT,
+    REGEX_PG_DROP_INDEX,
+    REGEX_PG_DROP_TABLE,
+    REGEX_PG_FULL,
+    REGEX_PG_INLINE_INDEX,
+    REGEX_PG_LOCK_TABLE,
+    REGEX_PG_NOT_VALID,
+    REGEX_PG_REFRESH_MATVIEW,
+    REGEX_PG_REINDEX,
+    REGEX_PG_RENAME,
+    REGEX_PG_REWRITING_COLUMN,
+    REGEX_PG_SET_REWRITE,
+    REGEX_PG_STORAGE_PARAMS,
+    REGEX_PG_TRIGGER_TOGGLE,
+    REGEX_PG_TRUNCATE,
+    REGEX_PG_USING_INDEX,
+    REGEX_PG_VACUUM,
+    REGEX_PG_VALIDATE_CONSTRAINT,
+    REGEX_PG_VOLATILE_DEFAULT,
+    REGEX_QUALIFIED_IDENTIFIER,
+    REGEX_QUOTED_IDENTIFIER,
+    REGEX_REFRESH_TARGET,
+    REGEX_REINDEX_TARGET,
+    REGEX_STRING,
+    REGEX_TRUNCATE_TARGET,
+    REGEX_VACUUM_TARGET,
+)
+
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+class LockMode(StrEnum):
+    """PostgreSQL table-level lock modes, weakest first."""
+
+    ACCESS_SHARE = "ACCESS SHARE"
+    ROW_SHARE = "ROW SHARE"
+    ROW_EXCLUSIVE = "ROW EXCLUSIVE"
+    SHARE_UPDATE_EXCLUSIVE = "SHARE UPDATE EXCLUSIVE"
+    SHARE = "SHARE"
+    SHARE_ROW_EXCLUSIVE = "SHARE ROW EXCLUSIVE"
+    EXCLUSIVE = "EXCLUSIVE"
+    ACCESS_EXCLUSIVE = "ACCESS EXCLUSIVE"
+
+
+LOCK_ORDER = tuple(LockMode)
+
+
+class BlockingImpact(IntEnum):
+    """How much concurrent traffic a statement blocks, and for how long.
+
+    ``BRIEF`` locks conflict with traffic but are held only for a catalog
+    update; from ``BLOCKS_WRITES`` on, the lock is held while the whole
+    table is scanned or rewritten.
+    """
+
+    NONE = 0
+    MINIMAL = 1
+    BRIEF = 2
+    BLOCKS_WRITES = 3
+    BLOCKS_ALL = 4
+    REWRITE = 5
+
+
+@dataclass(frozen=True)
+class LockFinding:
+    """Lock taken by one statement.
+
+    Attributes:
+        operation: Statement kind, with ALTER TABLE subcommands
+            (e.g. ``ALTER TABLE ADD COLUMN, SET NOT NULL``).
+        table: Table locked, as written in the SQL (empty if unresolved).
+        lock: Strongest table lock the statement takes.
+        rewrite: Whether the table (and its indexes) is rewritten.
+        scan: Whether the whole table is read while the lock is held.
+        revision: Revision the statement belongs to (merged reports only).
+    """
+
+    operation: str
+    table: str
+    lock: LockMode
+    rewrite: bool = False
+    scan: bool = False
+    revision: str = ""
+
+    @property
+    def impact(self) -> BlockingImpact:
+        """Blocking impact of the lock, used to rank findings."""
+        return _impact(self.lock, self.rewrite, self.scan)
+
+    def describe(self) -> str:
+        """One-line summary, e.g. ``CREATE INDEX on users: SHARE, scans``."""
+        effects = [
+            effect
+            for effect, applies in (("rewrites", self.rewrite), ("scans", self.scan))
+            if applies
+        ]
+        target = f" on {self.table}" if self.table else ""
+        suffix = f", {' and '.join(effects)} table" if effects else ""
+        return f"{self.operation}{target}: {self.lock}{suffix}"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to JSON-compatible data."""
+        return {
+            "operation": self.operation,
+            "table": self.table,
+            "lock": str(self.lock),
+            "rewrite": self.rewrite,
+            "scan": self.scan,
+            "impact": self.impact.name,
+            "rank": int(self.impact),
+            "revision": self.revision,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> LockFinding:
+        """Deserialize from :meth:`to_dict` output."""
+        return cls(
+            operation=data["operation"],
+            table=data["table"],
+            lock=LockMode(data["lock"]),
+            rewrite=data["rewrite"],
+            scan=data["scan"],
+            revision=data.get("revision", ""),
+        )
+
+
+class LockClassifier(Protocol):
+    """Maps a statement to the lock it takes."""
+
+    def classify(self, statement: str) -> LockFinding | None:
+        """Classify one statement, given without its terminating ``;``."""
+        ...
+
+
+@dataclass(frozen=True)
+class _Lock:
+    """Lock and table effects of a statement or subcommand."""
+
+    operation: str
+    lock: LockMode
+    rewrite: bool = False
+    scan: bool = False
+
+
+CREATE_INDEX_PATTERN = re.compile(REGEX_PG_CREATE_INDEX)
+DROP_INDEX_PATTERN = re.compile(REGEX_PG_DROP_INDEX)
+REINDEX_PATTERN = re.compile(REGEX_PG_REINDEX)
+DROP_TABLE_PATTERN = re.compile(REGEX_PG_DROP_TABLE)
+TRUNCATE_PATTERN = re.compile(REGEX_PG_TRUNCATE)
+LOCK_TABLE_PATTERN = re.compile(REGEX_PG_LOCK_TABLE)
+CLUSTER_PATTERN = re.compile(REGEX_PG_CLUSTER)
+VACUUM_PATTERN = re.compile(REGEX_PG_VACUUM)
+REFRESH_MATVIEW_PATTERN = re.compile(REGEX_PG_REFRESH_MATVIEW)
+CREATE_TRIGGER_PATTERN = re.compile(REGEX_PG_CREATE_TRIGGER)
+ALTER_TABLE_PATTERN = re.compile(REGEX_PG_ALTER_TABLE)
+ADD_CONSTRAINT_PATTERN = re.compile(REGEX_PG_ADD_CONSTRAINT)
+ADD_COLUMN_PATTERN = re.compile(REGEX_PG_ADD_COLUMN)
+DROP_CONSTRAINT_PATTERN = re.compile(REGEX_PG_DROP_CONSTRAINT)
+DROP_COLUMN_PATTERN = re.compile(REGEX_PG_DROP_COLUMN)
+ALTER_COLUMN_PATTERN = re.compile(REGEX_PG_ALTER_COLUMN)
+VALIDATE_CONSTRAINT_PATTERN = re.compile(REGEX_PG_VALIDATE_CONSTRAINT)
+RENAME_PATTERN = re.compile(REGEX_PG_RENAME)
+SET_REWRITE_PATTERN = re.compile(REGEX_PG_SET_REWRITE)
+STORAGE_PARAMS_PATTERN = re.compile(REGEX_PG_STORAGE_PARAMS)
+TRIGGER_TOGGLE_PATTERN = re.compile(REGEX_PG_TRIGGER_TOGGLE)
+CLUSTER_ON_PATTERN = re.compile(REGEX_PG_CLUSTER_ON)
+ATTACH_PARTITION_PATTERN = re.compile(REGEX_PG_ATTACH_PARTITION)
+DETACH_PARTITION_PATTERN = re.compile(REGEX_PG_DETACH_PARTITION)
+VOLATILE_DEFAULT_PATTERN = re.compile(REGEX_PG_VOLATILE_DEFAULT)
+REWRITING_COLUMN_PATTERN = re.compile(REGEX_PG_REWRITING_COLUMN)
+INLINE_INDEX_PATTERN = re.compile(REGEX_PG_INLINE_INDEX)
+NOT_VALID_PATTERN = re.compile(REGEX_PG_NOT_VALID)
+USING_INDEX_PATTERN = re.compile(REGEX_PG_USING_INDEX)
+CONCURRENTLY_PATTERN = re.compile(REGEX_PG_CONCURRENTLY)
+FULL_PATTERN = re.compile(REGEX_PG_FULL)
+
+COMMENT_PATTERN = re.compile(f"{REGEX_LINE_COMMENT}|{REGEX_BLOCK_COMMENT}", re.DOTALL)
+# Literals are blanked out; quoted identifiers become a placeholder word so
+# the keywords around them keep their positions
+LITERAL_PATTERN = re.compile(
+    f"(?P<literal>{REGEX_STRING}|{REGEX_DOLLAR_QUOTED})|"
+    f"{REGEX_QUOTED_IDENTIFIER}|{REGEX_BACKTICK_IDENTIFIER}",
+    re.DOTALL,
+)
+QUALIFIED_IDENTIFIER_PATTERN = re.compile(REGEX_QUALIFIED_IDENTIFIER)
+# Statement kinds and the pattern finding the table they lock
+TABLE_PATTERNS = {
+    kind: re.compile(regex, re.IGNORECASE)
+    for kind, regex in (
+        ("ALTER TABLE", REGEX_ALTER_TABLE_TARGET),
+        ("DROP TABLE", REGEX_DROP_TABLE_TARGET),
+        ("TRUNCATE", REGEX_TRUNCATE_TARGET),
+        ("CREATE INDEX", REGEX_ON_TABLE_TARGET),
+        ("CREATE TRIGGER", REGEX_ON_TABLE_TARGET),
+        ("LOCK", REGEX_LOCK_TABLE_TARGET),
+        ("CLUSTER", REGEX_CLUSTER_TARGET),
+        ("VACUUM", REGEX_VACUUM_TARGET),
+        ("REFRESH MATERIALIZED VIEW", REGEX_REFRESH_TARGET),
+        ("REINDEX", REGEX_REINDEX_TARGET),
+    )
+}
+
+DIALECT_POSTGRESQL = "postgresql"
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class PostgresLockClassifier:
+    """Classifies PostgreSQL statements by the table lock they take.
+
+    Each statement maps to the strongest lock it acquires on its table, and
+    whether it scans or rewrites the table while holding it. ALTER TABLE
+    takes the strongest lock of its subcommands. The rules follow the
+    PostgreSQL 11+ documentation (e.g. non-volatile column defaults are
+    stored in the catalog, not written to every row).
+    """
+
+    def classify(self, statement: str) -> LockFinding | None:
+        """Classify one statement.
+
+        Args:
+            statement: SQL of the statement, without its terminating ``;``.
+
+        Returns:
+            The lock taken, or None for statements that take no lock worth
+            reporting (DML, queries, CREATE TABLE, ...).
+        """
+        text = COMMENT_PATTERN.sub(" ", statement)
+        upper = " ".join(LITERAL_PATTERN.sub(_placeholder, text).split()).upper()
+        match = ALTER_TABLE_PATTERN.match(upper)
+        if match is not None:
+            lock = self._alter_table(upper[match.end() :])
+            kind = "ALTER TABLE"
+        else:
+            lock, kind = self._statement(upper)
+        if lock is None:
+            return None
+        return LockFinding(
+            operation=lock.operation,
+            table=_table(text, kind),
+            lock=lock.lock,
+            rewrite=lock.rewrite,
+            scan=lock.scan,
+        )
+
+    def _statement(self, upper: str) -> tuple[_Lock | None, str]:
+        """Classify a statement other than ALTER TABLE."""
+        concurrently = CONCURRENTLY_PATTERN.search(upper) is not None
+        if CREATE_INDEX_PATTERN.match(upper):
+            if concurrently:
+                return _Lock(
+                    "CREATE INDEX CONCURRENTLY",
+                    LockMode.SHARE_UPDATE_EXCLUSIVE,
+                    scan=True,
+                ), "CREATE INDEX"
+            return _Lock("CREATE INDEX", LockMode.SHARE, scan=True), "CREATE INDEX"
+        if DROP_INDEX_PATTERN.match(upper):
+            if concurrently:
+                return _Lock(
+                    "DROP INDEX CONCURRENTLY", LockMode.SHARE_UPDATE_EXCLUSIVE
+                ), ""
+            return _Lock("DROP INDEX", LockMode.ACCESS_EXCLUSIVE), ""
+        if REINDEX_PATTERN.match(upper):
+            if concurrently:
+                return _Lock(
+                    "REINDEX CONCURRENTLY", LockMode.SHARE_UPDATE_EXCLUSIVE, scan=True
+                ), "REINDEX"
+            return _Lock("REINDEX", LockMode.SHARE, scan=True), "REINDEX"
+        if DROP_TABLE_PATTERN.match(upper):
+            return _Lock("DROP TABLE", LockMode.ACCESS_EXCLUSIVE), "DROP TABLE"
+        if TRUNCATE_PATTERN.match(upper):
+            return _Lock("TRUNCATE", LockMode.ACCESS_EXCLUSIVE), "TRUNCATE"
+        match = LOCK_TABLE_PATTERN.match(upper)
+        if match is not None:
+            mode = match.group("mode")
+            lock = LockMode(mode) if mode in LOCK_ORDER else LockMode.ACCESS_EXCLUSIVE
+            return _Lock("LOCK TABLE", lock), "LOCK"
+        if CLUSTER_PATTERN.match(upper):
+            return _Lock(
+                "CLUSTER", LockMode.ACCESS_EXCLUSIVE, rewrite=True, scan=True
+            ), "CLUSTER"
+        if VACUUM_PATTERN.match(upper):
+            if FULL_PATTERN.search(upper):
+                return _Lock(
+                    "VACUUM FULL", LockMode.ACCESS_EXCLUSIVE, rewrite=True, scan=True
+                ), "VACUUM"
+            return _Lock("VACUUM", LockMode.SHARE_UPDATE_EXCLUSIVE, scan=True), "VACUUM"
+        if REFRESH_MATVIEW_PATTERN.match(upper):
+            if concurrently:
+                return _Lock(
+                    "REFRESH MATERIALIZED VIEW CONCURRENTLY",
+                    LockMode.EXCLUSIVE,
+                    scan=True,
+                ), "REFRESH MATERIALIZED VIEW"
+            return _Lock(
+                "REFRESH MATERIALIZED VIEW",
+                LockMode.ACCESS_EXCLUSIVE,
+                rewrite=True,
+                scan=True,
+            ), "REFRESH MATERIALIZED VIEW"
+        if CREATE_TRIGGER_PATTERN.match(upper):
+            return _Lock(
+                "CREATE TRIGGER", LockMode.SHARE_ROW_EXCLUSIVE
+            ), "CREATE TRIGGER"
+        return None, ""
+
+    def _alter_table(self, actions: str) -> _Lock:
+        """Combine the locks of ALTER TABLE subcommands."""
+        locks = [self._subcommand(a.strip()) for a in _split_actions(actions)]
+        locks = [lock for lock in locks if lock is not None]
+        if not locks:
+            return _Lock("ALTER TABLE", LockMode.ACCESS_EXCLUSIVE)
+        names = list(dict.fromkeys(lock.operation for lock in locks))
+        return _Lock(
+            operation=f"ALTER TABLE {', '.join(names)}",
+            lock=max((lock.lock for lock in locks), key=LOCK_ORDER.index),
+            rewrite=any(lock.rewrite for lock in locks),
+            scan=any(lock.scan for lock in locks),
+        )
+
+    def _subcommand(self, action: str) -> _Lock | None:
+        """Classify one ALTER TABLE subcommand."""
+        if not action:
+            return None
+        match = ADD_CONSTRAINT_PATTERN.match(action)
+        if match is not None:
+            return _add_constraint(match.group("kind"), action)
+        if ADD_COLUMN_PATTERN.match(action):
+            return _add_column(action)
+        match = ALTER_COLUMN_PATTERN.match(action)
+        if match is not None:
+            return _alter_column(match.group("action"))
+        if VALIDATE_CONSTRAINT_PATTERN.match(action):
+            return _Lock(
+                "VALIDATE CONSTRAINT", LockMode.SHARE_UPDATE_EXCLUSIVE, scan=True
+            )
+        if DROP_CONSTRAINT_PATTERN.match(action):
+            return _Lock("DROP CONSTRAINT", LockMode.ACCESS_EXCLUSIVE)
+        if DROP_COLUMN_PATTERN.match(action):
+            return _Lock("DROP COLUMN", LockMode.ACCESS_EXCLUSIVE)
+        if RENAME_PATTERN.match(action):
+            return _Lock("RENAME", LockMode.ACCESS_EXCLUSIVE)
+        match = SET_REWRITE_PATTERN.match(action)
+        if match is not None:
+            return _Lock(
+                match.group(0), LockMode.ACCESS_EXCLUSIVE, rewrite=True, scan=True
+            )
+        if STORAGE_PARAMS_PATTERN.match(action):
+            return _Lock("SET STORAGE PARAMETERS", LockMode.SHARE_UPDATE_EXCLUSIVE)
+        if TRIGGER_TOGGLE_PATTERN.match(action):
+            return _Lock(f"{action.split()[0]} TRIGGER", LockMode.SHARE_ROW_EXCLUSIVE)
+        if CLUSTER_ON_PATTERN.match(action):
+            return _Lock("CLUSTER ON", LockMode.SHARE_UPDATE_EXCLUSIVE)
+        if ATTACH_PARTITION_PATTERN.match(action):
+            # Without a matching CHECK constraint the partition is scanned
+            return _Lock("ATTACH PARTITION", LockMode.SHARE_UPDATE_EXCLUSIVE, scan=True)
+        if DETACH_PARTITION_PATTERN.match(action):
+            if CONCURRENTLY_PATTERN.search(action):
+                return _Lock(
+                    "DETACH PARTITION CONCURRENTLY", LockMode.SHARE_UPDATE_EXCLUSIVE
+                )
+            return _Lock("DETACH PARTITION", LockMode.ACCESS_EXCLUSIVE)
+        return _Lock(" ".join(action.split()[:2]), LockMode.ACCESS_EXCLUSIVE)
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def classifier_for(dialect: str) -> LockClassifier | None:
+    """Lock classifier for a database backend, if one is supported.
+
+    Args:
+        dialect: Backend name (e.g. ``postgresql``).
+    """
+    if dialect == DIALECT_POSTGRESQL:
+        return PostgresLockClassifier()
+    return None
+
+
+def rank_findings(findings: list[LockFinding]) -> list[LockFinding]:
+    """Findings ordered by blocking impact, most disruptive first.
+
+    Findings of equal impact keep their upgrade order.
+    """
+    return sorted(findings, key=lambda finding: -finding.impact)
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _impact(lock: LockMode, rewrite: bool, scan: bool) -> BlockingImpact:
+    """Blocking impact of holding ``lock`` for a catalog update, scan or rewrite."""
+    level = LOCK_ORDER.index(lock)
+    if level <= LOCK_ORDER.index(LockMode.ROW_EXCLUSIVE):
+        return BlockingImpact.NONE
+    if lock == LockMode.SHARE_UPDATE_EXCLUSIVE:
+        # Blocks only other schema changes and VACUUM
+        return BlockingImpact.MINIMAL
+    if lock != LockMode.ACCESS_EXCLUSIVE:
+        return BlockingImpact.BLOCKS_WRITES if rewrite or scan else BlockingImpact.BRIEF
+    if rewrite:
+        return BlockingImpact.REWRITE
+    return BlockingImpact.BLOCKS_ALL if scan else BlockingImpact.BRIEF
+
+
+def _placeholder(match: re.Match[str]) -> str:
+    """Replacement of a literal (blank) or quoted identifier (a word)."""
+    return " " if match.group("literal") is not None else "_"
+
+
+def _add_column(action: str) -> _Lock:
+    """ADD COLUMN: catalog-only unless the new values must be written out."""
+    rewrite = bool(
+        VOLATILE_DEFAULT_PATTERN.search(action)
+        or REWRITING_COLUMN_PATTERN.search(action)
+    )
+    scan = rewrite or INLINE_INDEX_PATTERN.search(action) is not None
+    return _Lock("ADD COLUMN", LockMode.ACCESS_EXCLUSIVE, rewrite=rewrite, scan=scan)
+
+
+def _add_constraint(kind: str, action: str) -> _Lock:
+    """ADD CONSTRAINT: validated against every row unless NOT VALID."""
+    not_valid = NOT_VALID_PATTERN.search(action) is not None
+    if kind == "FOREIGN KEY":
+        return _Lock(
+            "ADD FOREIGN KEY", LockMode.SHARE_ROW_EXCLUSIVE, scan=not not_valid
+        )
+    if kind == "CHECK":
+        return _Lock("ADD CHECK", LockMode.ACCESS_EXCLUSIVE, scan=not not_valid)
+    # PRIMARY KEY / UNIQUE / EXCLUDE build an index unless one is given
+    using_index = USING_INDEX_PATTERN.search(action) is not None
+    return _Lock(f"ADD {kind}", LockMode.ACCESS_EXCLUSIVE, scan=not using_index)
+
+
+def _alter_column(action: str) -> _Lock:
+    """ALTER COLUMN subcommands."""
+    if action in ("TYPE", "SET DATA TYPE"):
+        # Binary-coercible changes skip the rewrite; that needs the old type
+        return _Lock("ALTER COLUMN TYPE", LockMode.ACCESS_EXCLUSIVE, True, True)
+    if action == "SET NOT NULL":
+        return _Lock("SET NOT NULL", LockMode.ACCESS_EXCLUSIVE, scan=True)
+    if action == "SET STATISTICS":
+        return _Lock("SET STATISTICS", LockMode.SHARE_UPDATE_EXCLUSIVE)
+    return _Lock(action, LockMode.ACCESS_EXCLUSIVE)
+
+
+def _split_actions(actions: str) -> list[str]:
+    """Split ALTER TABLE subcommands on commas outside parentheses."""
+    parts = []
+    depth = 0
+    start = 0
+    for pos, char in enumerate(actions):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(0, depth - 1)
+        elif char == "," and depth == 0:
+            parts.append(actions[start:pos])
+            start = pos + 1
+    parts.append(actions[start:])
+    return parts
+
+
+def _table(text: str, kind: str) -> str:
+    """Table a statement of ``kind`` locks (first one for lists)."""
+    pattern = TABLE_PATTERNS.get(kind)
+    if pattern is None:
+        return ""
+    match = pattern.search(text)
+    if match is None:
+        return ""
+    first = QUALIFIED_IDENTIFIER_PATTERN.match(match.group(1))
+    return "".join(first.group(0).split()) if first else ""
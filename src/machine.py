@@ -6,14 +6,20 @@ from __future__ import annotations
 # IMPORTS
 # =============================================================================
 # Standard Library
+import asyncio
+import contextvars
+import inspect
+import threading
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Generic, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Generic, Protocol, TypeVar, Union
 
 # Project/Local
 from src.logger import setup_logger
 
 if TYPE_CHECKING:
-    from src.observers import StateObserver
+    from src.observers import AsyncStateObserver, StateObserver
 
 # =============================================================================
 # TYPES & CONSTANTS
@@ -21,6 +27,16 @@ if TYPE_CHECKING:
 logger = setup_logger(__name__)
 
 T = TypeVar("T")
+T_contra = TypeVar("T_contra", contravariant=True)
+S_co = TypeVar("S_co", covariant=True)
+
+
+class Snapshotter(Protocol[T_contra]):
+    """Persists the context after each state so a later run can resume."""
+
+    def save(self, state_name: str, next_state: str | None, context: T_contra) -> None:
+        """Called after a state exits, with the state that runs next."""
+        ...
 
 
 # =============================================================================
@@ -30,31 +46,80 @@ class State(ABC, Generic[T]):
     """Abstract base state."""
 
     @abstractmethod
-    def handle(self, context: T) -> State[T] | None:
+    def handle(self, context: T) -> Transition[T]:
         """Handle execution for this state.
 
         Args:
             context: The shared context object.
 
         Returns:
-            The next State to transition to, or None if terminal.
+            The next State to transition to, a Fork of states to run
+            concurrently, or None if terminal.
         """
         pass
 
 
+class AsyncState(ABC, Generic[T]):
+    """Abstract base state of an :class:`AsyncStateMachine`."""
+
+    @abstractmethod
+    async def handle(self, context: T) -> AsyncTransition[T]:
+        """Handle execution for this state.
+
+        Args:
+            context: The shared context object.
+
+        Returns:
+            The next AsyncState to transition to, a Fork of states to run
+            concurrently, or None if terminal.
+        """
+        pass
+
+
+@dataclass(frozen=True)
+class Fork(Generic[S_co]):
+    """Successor that runs several branches concurrently, then joins.
+
+    Each branch runs on its own thread (a task in ``AsyncStateMachine``)
+    until its chain of states ends; once all have ended, the machine
+    continues at ``join``. Branches share the context, so they must write
+    disjoint parts of it.
+
+    Attributes:
+        branches: First state of each branch.
+        join: State run after every branch finished (None to stop).
+    """
+
+    branches: tuple[S_co, ...]
+    join: S_co | None = None
+
+
+Transition = Union[State[T], Fork[State[T]], None]  # noqa: UP007
+AsyncTransition = Union[AsyncState[T], Fork[AsyncState[T]], None]  # noqa: UP007
+
+
 class StateMachine(Generic[T]):
     """Generic State Machine with observer support."""
 
-    def __init__(self, initial_state: State[T], context: T):
+    def __init__(
+        self,
+        initial_state: State[T],
+        context: T,
+        snapshotter: Snapshotter[T] | None = None,
+    ):
         """Initialize state machine.
 
         Args:
             initial_state: Starting state.
             context: Shared context.
+            snapshotter: Optional store saving the context after each state.
         """
         self.current_state: State[T] | None = initial_state
         self.context = context
+        self.snapshotter = snapshotter
         self._observers: list[StateObserver[T]] = []
+        # Branches notify from several threads; observers see one at a time
+        self._notify_lock = threading.Lock()
 
     def add_observer(self, observer: StateObserver[T]) -> None:
         """Add an observer to receive state change notifications.
@@ -75,34 +140,224 @@ class StateMachine(Generic[T]):
     def run(self) -> None:
         """Run the state machine until completion."""
         while self.current_state:
-            state_name = self.current_state.__class__.__name__
+            completed = [self.current_state.__class__.__name__]
+            next_state = self._handle(self.current_state)
+            while isinstance(next_state, Fork):
+                completed += self._run_branches(next_state.branches)
+                next_state = next_state.join
+
+            self.current_state = next_state
+            for state_name in completed:
+                self._snapshot(state_name)
+
+    def _handle(self, state: State[T]) -> Transition[T]:
+        """Run one state, notifying observers of its entry and exit or error."""
+        state_name = state.__class__.__name__
 
-            # Notify observers of state entry
-            self._notify_enter(state_name)
+        # Notify observers of state entry
+        self._notify_enter(state_name)
 
-            try:
-                next_state = self.current_state.handle(self.context)
+        try:
+            next_state = state.handle(self.context)
+        except Exception as e:
+            # Notify observers of error
+            self._notify_error(state_name, e)
+            raise
+
+        # Notify observers of state exit
+        self._notify_exit(state_name)
+        return next_state
+
+    def _run_branches(self, branches: tuple[State[T], ...]) -> list[str]:
+        """Run branches concurrently and wait for all of them.
+
+        Returns:
+            Names of the states completed by the branches, branch by branch.
 
-                # Notify observers of state exit
-                self._notify_exit(state_name)
+        Raises:
+            Exception: The error of the first failed branch, once every
+                branch has ended.
+        """
+        with ThreadPoolExecutor(
+            max_workers=len(branches), thread_name_prefix="state-branch"
+        ) as pool:
+            # Each branch starts from the caller's context variables
+            futures = [
+                pool.submit(contextvars.copy_context().run, self._run_branch, state)
+                for state in branches
+            ]
+        completed: list[str] = []
+        for future in futures:
+            error = future.exception()
+            if error is not None:
+                raise error
+            completed += future.result()
+        return completed
 
-                self.current_state = next_state
-            except Exception as e:
-                # Notify observers of error
-                self._notify_error(state_name, e)
-                raise
+    def _run_branch(self, state: State[T] | None) -> list[str]:
+        """Run one branch's chain of states to its end."""
+        completed: list[str] = []
+        while state is not None:
+            completed.append(state.__class__.__name__)
+            next_state = self._handle(state)
+            while isinstance(next_state, Fork):
+                completed += self._run_branches(next_state.branches)
+                next_state = next_state.join
+            state = next_state
+        return completed
 
     def _notify_enter(self, state_name: str) -> None:
         """Notify observers of state entry."""
-        for observer in self._observers:
-            observer.on_state_enter(state_name, self.context)
+        with self._notify_lock:
+            for observer in self._observers:
+                observer.on_state_enter(state_name, self.context)
 
     def _notify_exit(self, state_name: str) -> None:
         """Notify observers of state exit."""
-        for observer in self._observers:
-            observer.on_state_exit(state_name, self.context)
+        with self._notify_lock:
+            for observer in self._observers:
+                observer.on_state_exit(state_name, self.context)
+
+    def _snapshot(self, state_name: str) -> None:
+        """Save the context with the state that runs next."""
+        if self.snapshotter is None:
+            return
+        next_state = self.current_state
+        self.snapshotter.save(
+            state_name,
+            next_state.__class__.__name__ if next_state is not None else None,
+            self.context,
+        )
 
     def _notify_error(self, state_name: str, error: Exception) -> None:
         """Notify observers of error."""
+        with self._notify_lock:
+            for observer in self._observers:
+                observer.on_error(state_name, error, self.context)
+
+
+class AsyncStateMachine(Generic[T]):
+    """State machine whose states and observers run on an event loop.
+
+    Mirrors :class:`StateMachine`, but the branches of a :class:`Fork` run
+    as tasks rather than threads. Observers may implement either
+    ``AsyncStateObserver`` or ``StateObserver``. This is library API; the
+    action itself runs the threaded machine.
+    """
+
+    def __init__(
+        self,
+        initial_state: AsyncState[T],
+        context: T,
+        snapshotter: Snapshotter[T] | None = None,
+    ):
+        """Initialize state machine.
+
+        Args:
+            initial_state: Starting state.
+            context: Shared context.
+            snapshotter: Optional store saving the context after each state.
+        """
+        self.current_state: AsyncState[T] | None = initial_state
+        self.context = context
+        self.snapshotter = snapshotter
+        self._observers: list[AsyncStateObserver[T] | StateObserver[T]] = []
+
+    def add_observer(self, observer: AsyncStateObserver[T] | StateObserver[T]) -> None:
+        """Add an observer to receive state change notifications.
+
+        Args:
+            observer: Observer to add.
+        """
+        self._observers.append(observer)
+
+    def remove_observer(
+        self, observer: AsyncStateObserver[T] | StateObserver[T]
+    ) -> None:
+        """Remove an observer.
+
+        Args:
+            observer: Observer to remove.
+        """
+        self._observers.remove(observer)
+
+    async def run(self) -> None:
+        """Run the state machine until completion."""
+        while self.current_state:
+            completed = [self.current_state.__class__.__name__]
+            next_state = await self._handle(self.current_state)
+            while isinstance(next_state, Fork):
+                completed += await self._run_branches(next_state.branches)
+                next_state = next_state.join
+
+            self.current_state = next_state
+            for state_name in completed:
+                self._snapshot(state_name)
+
+    async def _handle(self, state: AsyncState[T]) -> AsyncTransition[T]:
+        """Run one state, notifying observers of its entry and exit or error."""
+        state_name = state.__class__.__name__
+
+        # Notify observers of state entry
+        await self._notify("on_state_enter", state_name)
+
+        try:
+            next_state = await state.handle(self.context)
+        except Exception as e:
+            # Notify observers of error
+            await self._notify("on_error", state_name, e)
+            raise
+
+        # Notify observers of state exit
+        await self._notify("on_state_exit", state_name)
+        return next_state
+
+    async def _run_branches(self, branches: tuple[AsyncState[T], ...]) -> list[str]:
+        """Run branches as concurrent tasks and wait for all of them.
+
+        Returns:
+            Names of the states completed by the branches, branch by branch.
+
+        Raises:
+            Exception: The error of the first failed branch, once every
+                branch has ended.
+        """
+        results = await asyncio.gather(
+            *(self._run_branch(state) for state in branches), return_exceptions=True
+        )
+        completed: list[str] = []
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+            completed += result
+        return completed
+
+    async def _run_branch(self, state: AsyncState[T] | None) -> list[str]:
+        """Run one branch's chain of states to its end."""
+        completed: list[str] = []
+        while state is not None:
+            completed.append(state.__class__.__name__)
+            next_state = await self._handle(state)
+            while isinstance(next_state, Fork):
+                completed += await self._run_branches(next_state.branches)
+                next_state = next_state.join
+            state = next_state
+        return completed
+
+    async def _notify(self, event: str, state_name: str, *args: Any) -> None:
+        """Call an event on every observer, awaiting async observers."""
         for observer in self._observers:
-            observer.on_error(state_name, error, self.context)
+            result = getattr(observer, event)(state_name, *args, self.context)
+            if inspect.isawaitable(result):
+                await result
+
+    def _snapshot(self, state_name: str) -> None:
+        """Save the context with the state that runs next."""
+        if self.snapshotter is None:
+            return
+        next_state = self.current_state
+        self.snapshotter.save(
+            state_name,
+            next_state.__class__.__name__ if next_state is not None else None,
+            self.context,
+        )
@@ -6,18 +6,69 @@ from __future__ import annotations
 # IMPORTS
 # =============================================================================
 # Standard Library
+import json
 import os
 import sys
+from contextlib import ExitStack
 
 # Project/Local
-from src.alembic_ops import AlembicRunner
+from src.alembic_ops import create_runner
+from src.checkpoint import RevisionCheckpointer
 from src.config import ActionConfig
-from src.constants import OUTPUT_MIGRATION_STATUS, STATUS_FAILED
+from src.constants import (
+    CMD_DOWNGRADE,
+    CMD_STATS_SNAPSHOT,
+    CMD_UPGRADE,
+    GITHUB_STEP_SUMMARY,
+    OUTPUT_FAILED_SCHEMAS,
+    OUTPUT_FAILED_TARGETS,
+    OUTPUT_MIGRATION_STATUS,
+    OUTPUT_SCHEMA_RESULTS,
+    OUTPUT_SNAPSHOT_TABLES,
+    OUTPUT_TARGET_RESULTS,
+    OUTPUT_TRACE_ID,
+    RUNNER_IN_PROCESS,
+    STATUS_DRY_RUN,
+    STATUS_FAILED,
+    STATUS_SUCCESS,
+)
+from src.contention import ContentionMonitor
+from src.deploy_lock import DeployLock
+from src.durations import DurationLedger, StepTimer
+from src.fanout import FanOut, format_summary, load_targets
+from src.lock_timeout import LockTimeoutGuard
 from src.logger import setup_logger
-from src.machine import StateMachine
-from src.observers import LoggingObserver, OutputObserver
+from src.machine import State, StateMachine
+from src.observers import (
+    LoggingObserver,
+    OutputObserver,
+    ProfilingObserver,
+    TracingObserver,
+)
+from src.probe import RevisionProbe
+from src.render import ParallelRenderer
+from src.render_cache import RenderCache
+from src.revision_index import RevisionIndex
 from src.safety import SafetyAnalyzer
-from src.states import ActionContext, InitState
+from src.schemas import SchemaMigrator, parse_schemas
+from src.session import DatabaseSession
+from src.snapshot import SnapshotStore
+from src.statement_timing import StatementRecorder
+from src.states import (
+    RESUMABLE_STATES,
+    ActionContext,
+    InitState,
+    ResumeState,
+    write_output,
+)
+from src.table_stats import (
+    CatalogStats,
+    SizeRiskScorer,
+    SnapshotStats,
+    export_snapshot,
+)
+from src.tracing import Tracer, set_tracer
+from src.urls import dialect_name
 
 # =============================================================================
 # TYPES & CONSTANTS
@@ -40,22 +91,28 @@ def main() -> None:
             logger.info(f"Changing working directory to: {workspace}")
             os.chdir(workspace)
 
+        if config.fan_out:
+            if not fan_out(config):
+                sys.exit(1)
+            return
+
         # Setup Environment for Alembic
         os.environ["SQLALCHEMY_DATABASE_URI"] = config.database_url
         os.environ["DATABASE_URL"] = config.database_url
 
-        # Initialize Context
-        context = ActionContext(
-            config=config,
-            runner=AlembicRunner(config.alembic_config_path),
-            analyzer=SafetyAnalyzer(),
-        )
+        if config.command == CMD_STATS_SNAPSHOT:
+            snapshot_stats(config)
+            return
 
-        # Initialize State Machine with Observers
-        machine = StateMachine(initial_state=InitState(), context=context)
-        machine.add_observer(LoggingObserver())
-        machine.add_observer(OutputObserver())
-        machine.run()
+        schemas = parse_schemas(config.schemas)
+        if schemas:
+            if not migrate_schemas(config, schemas):
+                sys.exit(1)
+            return
+
+        with ExitStack() as cleanup:
+            context = build_context(config, cleanup)
+            build_machine(config, context, cleanup).run()
 
     except Exception as e:
         logger.error(f"Action failed: {e}")
@@ -68,5 +125,346 @@ def main() -> None:
         sys.exit(1)
 
 
+def build_context(config: ActionConfig, cleanup: ExitStack) -> ActionContext:
+    """Build the context of a single-database run and its optional components.
+
+    Args:
+        config: Action configuration.
+        cleanup: Stack releasing what the components install or hold.
+
+    Returns:
+        Context for the state machine.
+    """
+    session, revision_index, probe = _build_revision_reading(config)
+    renderer, render_cache = _build_renderers(config, revision_index)
+    statement_recorder, duration_ledger, step_timer = _build_recorders(config)
+    deploy_lock, lock_guard, contention_monitor, checkpointer = _build_execution_guards(
+        config, cleanup
+    )
+
+    context = ActionContext(
+        config=config,
+        runner=create_runner(
+            config.runner,
+            config.alembic_config_path,
+            session=session if config.shared_connection else None,
+        ),
+        analyzer=SafetyAnalyzer(dialect_name(config.database_url)),
+        session=session,
+        probe=probe,
+        revision_index=revision_index,
+        renderer=renderer,
+        render_cache=render_cache,
+        statement_recorder=statement_recorder,
+        duration_ledger=duration_ledger,
+        step_timer=step_timer,
+        risk_scorer=_build_risk_scorer(config, session),
+        lock_guard=lock_guard,
+        contention_monitor=contention_monitor,
+        deploy_lock=deploy_lock,
+        checkpointer=checkpointer,
+    )
+    # Also closes a session DeployLockCommand opened for its probe
+    cleanup.callback(_close_session, context)
+    return context
+
+
+def build_machine(
+    config: ActionConfig, context: ActionContext, cleanup: ExitStack
+) -> StateMachine[ActionContext]:
+    """Build the state machine, resuming a snapshot and adding observers.
+
+    Args:
+        config: Action configuration.
+        context: Context of the run.
+        cleanup: Stack publishing the profile and trace once the run ends.
+
+    Returns:
+        Machine ready to run.
+    """
+    # Resume at the last incomplete state of an interrupted run
+    snapshots = None
+    initial_state: State[ActionContext] = InitState()
+    if config.state_snapshots or config.resume:
+        snapshots = SnapshotStore(config, config.state_snapshot_dir)
+    if config.resume and snapshots is not None:
+        snapshot = snapshots.load()
+        if snapshot is not None and snapshot.state in RESUMABLE_STATES:
+            snapshots.restore(snapshot, context)
+            initial_state = ResumeState(RESUMABLE_STATES[snapshot.state]())
+
+    machine = StateMachine(
+        initial_state=initial_state, context=context, snapshotter=snapshots
+    )
+    machine.add_observer(LoggingObserver())
+    machine.add_observer(OutputObserver())
+    if config.profile:
+        profiler = ProfilingObserver()
+        machine.add_observer(profiler)
+        cleanup.callback(profiler.finish, context, config.profile_path)
+    if config.trace_path:
+        tracer = Tracer.from_env(config.version_table)
+        tracer.instrument()
+        set_tracer(tracer)
+        cleanup.callback(_export_trace, tracer, context)
+        machine.add_observer(TracingObserver(tracer))
+    return machine
+
+
+def fan_out(config: ActionConfig) -> bool:
+    """Deploy to every configured target and aggregate the results.
+
+    Args:
+        config: Action configuration with a target list.
+
+    Returns:
+        True if every target succeeded.
+    """
+    targets = load_targets(config.targets, config.targets_file)
+    if not targets:
+        raise ValueError("Target list is empty")
+
+    results = FanOut(
+        workers=config.fanout_workers,
+        timeout=config.target_timeout,
+        policy=config.on_target_error,
+    ).run(targets)
+
+    failed = [result.name for result in results if not result.ok]
+    for result in results:
+        logger.info(f"{result.name}: {result.status} in {result.duration:.1f}s")
+    logger.info(f"{len(results) - len(failed)}/{len(results)} target(s) succeeded")
+
+    summary_path = os.getenv(GITHUB_STEP_SUMMARY)
+    if summary_path:
+        with open(summary_path, "a") as f:
+            f.write(format_summary(results))
+
+    ok_status = STATUS_DRY_RUN if config.dry_run else STATUS_SUCCESS
+    write_output(OUTPUT_TARGET_RESULTS, json.dumps([r.to_dict() for r in results]))
+    write_output(OUTPUT_FAILED_TARGETS, ",".join(failed))
+    write_output(OUTPUT_MIGRATION_STATUS, STATUS_FAILED if failed else ok_status)
+    return not failed
+
+
+def migrate_schemas(config: ActionConfig, schemas: list[str]) -> bool:
+    """Upgrade every tenant schema of the database and report each one.
+
+    Args:
+        config: Action configuration.
+        schemas: Schemas to upgrade.
+
+    Returns:
+        True if every schema succeeded.
+    """
+    if config.command != CMD_UPGRADE or config.dry_run:
+        raise ValueError("Schema mode supports upgrade only (without dry-run)")
+
+    results = SchemaMigrator(
+        config.database_url,
+        config.alembic_config_path,
+        revision=config.revision,
+        workers=config.schema_workers,
+        version_table=config.version_table,
+    ).run(schemas)
+
+    failed = [result.schema for result in results if not result.ok]
+    logger.info(f"{len(results) - len(failed)}/{len(results)} schema(s) succeeded")
+    write_output(OUTPUT_SCHEMA_RESULTS, json.dumps([r.to_dict() for r in results]))
+    write_output(OUTPUT_FAILED_SCHEMAS, ",".join(failed))
+    write_output(OUTPUT_MIGRATION_STATUS, STATUS_FAILED if failed else STATUS_SUCCESS)
+    return not failed
+
+
+def snapshot_stats(config: ActionConfig) -> None:
+    """Export the table statistics of the database for offline risk scoring.
+
+    Args:
+        config: Action configuration naming the snapshot file.
+    """
+    if not config.stats_snapshot:
+        raise ValueError("stats-snapshot is required by the stats-snapshot command")
+
+    tables = export_snapshot(config.database_url, config.stats_snapshot)
+    write_output(OUTPUT_SNAPSHOT_TABLES, str(tables))
+    write_output(OUTPUT_MIGRATION_STATUS, STATUS_SUCCESS)
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _build_revision_reading(
+    config: ActionConfig,
+) -> tuple[DatabaseSession | None, RevisionIndex | None, RevisionProbe | None]:
+    """Shared session, revision index and revision probe, as configured."""
+    session = None
+    # Shared connection is opened lazily by InitState
+    if config.shared_connection or config.fast_revision_probe:
+        session = DatabaseSession(config.database_url)
+
+    revision_index = None
+    if config.revision_index:
+        revision_index = RevisionIndex.from_config(
+            config.alembic_config_path, config.revision_index_cache
+        )
+
+    probe = None
+    if config.fast_revision_probe and session is not None:
+        probe = RevisionProbe(
+            session,
+            config.alembic_config_path,
+            config.version_table,
+            index=revision_index,
+        )
+    return session, revision_index, probe
+
+
+def _build_renderers(
+    config: ActionConfig, revision_index: RevisionIndex | None
+) -> tuple[ParallelRenderer | None, RenderCache | None]:
+    """Parallel renderer and render cache of dry runs, as configured."""
+    renderer = None
+    if config.render_workers > 0:
+        renderer = ParallelRenderer(
+            config.alembic_config_path,
+            config.render_workers,
+            config.render_chunk_size,
+            dialect_name(config.database_url),
+        )
+
+    render_cache = None
+    if config.render_cache and config.dry_run:
+        render_cache = RenderCache(
+            config.render_cache_dir,
+            config.alembic_config_path,
+            config.database_url,
+            index=revision_index,
+        )
+    return renderer, render_cache
+
+
+def _build_recorders(
+    config: ActionConfig,
+) -> tuple[StatementRecorder | None, DurationLedger | None, StepTimer | None]:
+    """Statement recorder, duration ledger and step timer, as configured."""
+    statement_recorder = None
+    if config.statement_timings:
+        if config.runner == RUNNER_IN_PROCESS:
+            statement_recorder = StatementRecorder(
+                config.version_table, config.statement_timings_top
+            )
+        else:
+            logger.warning("statement-timings requires runner: in-process")
+
+    duration_ledger = None
+    step_timer = None
+    if config.duration_ledger:
+        duration_ledger = DurationLedger.for_database(
+            config.duration_ledger, config.database_url, config.environment
+        )
+        if config.runner == RUNNER_IN_PROCESS:
+            step_timer = StepTimer(config.version_table)
+        elif not config.dry_run:
+            logger.warning(
+                "duration-ledger records durations only with runner: in-process"
+            )
+    return statement_recorder, duration_ledger, step_timer
+
+
+def _build_risk_scorer(
+    config: ActionConfig, session: DatabaseSession | None
+) -> SizeRiskScorer | None:
+    """Scorer weighing safety warnings by table size, as configured."""
+    if not config.analyze_safety or not (config.table_stats or config.stats_snapshot):
+        return None
+    return SizeRiskScorer(
+        SnapshotStats(config.stats_snapshot)
+        if config.stats_snapshot
+        else CatalogStats(config.database_url, session=session),
+        small_rows=config.small_table_rows,
+        large_rows=config.large_table_rows,
+        dialect=dialect_name(config.database_url),
+    )
+
+
+def _build_execution_guards(
+    config: ActionConfig, cleanup: ExitStack
+) -> tuple[
+    DeployLock | None,
+    LockTimeoutGuard | None,
+    ContentionMonitor | None,
+    RevisionCheckpointer | None,
+]:
+    """Components guarding a run that changes the database, as configured.
+
+    Whatever they install process-wide, or hold, is released by ``cleanup``.
+    """
+    if config.dry_run:
+        return None, None, None, None
+
+    # Only runs that change the database wait for each other
+    deploy_lock = None
+    if config.deploy_lock and config.command in (CMD_UPGRADE, CMD_DOWNGRADE):
+        deploy_lock = DeployLock(
+            config.database_url,
+            config.deploy_lock_name,
+            config.deploy_lock_timeout,
+        )
+        cleanup.callback(deploy_lock.release)
+
+    lock_guard = None
+    if config.lock_timeout > 0:
+        lock_guard = LockTimeoutGuard(
+            dialect_name(config.database_url),
+            config.lock_timeout,
+            config.statement_timeout,
+            retries=config.lock_retries,
+            budget=config.lock_retry_budget,
+        )
+        if config.runner == RUNNER_IN_PROCESS:
+            lock_guard.install()
+            cleanup.callback(lock_guard.uninstall)
+        elif lock_guard.environment():
+            os.environ.update(lock_guard.environment())
+        else:
+            logger.warning(
+                "lock-timeout is applied to the subprocess runner on "
+                "PostgreSQL only; lock timeouts are still retried"
+            )
+
+    contention_monitor = None
+    if config.contention_limits:
+        if config.runner == RUNNER_IN_PROCESS:
+            contention_monitor = ContentionMonitor(
+                config.database_url,
+                config.max_blocked_sessions,
+                config.max_blocked_wait,
+                config.contention_poll_interval,
+            )
+            contention_monitor.install()
+            cleanup.callback(contention_monitor.uninstall)
+        else:
+            logger.warning("Contention monitoring requires runner: in-process")
+
+    checkpointer = None
+    if config.transaction_per_revision and config.command == CMD_UPGRADE:
+        checkpointer = RevisionCheckpointer(config.database_url, config.checkpoint_path)
+    return deploy_lock, lock_guard, contention_monitor, checkpointer
+
+
+def _close_session(context: ActionContext) -> None:
+    """Close the run's database session, if any."""
+    if context.session is not None:
+        context.session.close()
+
+
+def _export_trace(tracer: Tracer, context: ActionContext) -> None:
+    """Stop tracing and write the trace file."""
+    set_tracer(None)
+    tracer.uninstrument()
+    tracer.export(context.config.trace_path)
+    context.set_output(OUTPUT_TRACE_ID, tracer.trace_id)
+
+
 if __name__ == "__main__":
     main()
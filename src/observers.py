@@ -6,11 +6,26 @@ from __future__ import annotations
 # IMPORTS
 # =============================================================================
 # Standard Library
-from typing import TYPE_CHECKING, Generic, Protocol, TypeVar
+import json
+import os
+import resource
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Generic, Protocol, TypeVar
 
 # Project/Local
-from src.constants import OUTPUT_MIGRATION_STATUS, STATUS_FAILED
+from src.constants import (
+    DEFAULT_PROFILE_PATH,
+    GITHUB_STEP_SUMMARY,
+    OUTPUT_MIGRATION_STATUS,
+    OUTPUT_PROFILE_PATH,
+    OUTPUT_STATE_TIMINGS,
+    STATUS_FAILED,
+)
 from src.logger import setup_logger
+from src.tracing import Span, Tracer
 
 if TYPE_CHECKING:
     from src.states import ActionContext
@@ -22,6 +37,33 @@ logger = setup_logger(__name__)
 
 T_contra = TypeVar("T_contra", contravariant=True)
 
+# ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+MAXRSS_BYTES = 1 if sys.platform == "darwin" else 1024
+
+
+@dataclass(frozen=True)
+class StateProfile:
+    """Resources used by one state.
+
+    Attributes:
+        state: State class name.
+        wall_seconds: Elapsed wall-clock time.
+        cpu_seconds: CPU time (user + system) of this process.
+        child_cpu_seconds: CPU time of child processes that finished during
+            the state (``alembic`` subprocesses, render workers).
+        peak_rss_mb: Peak resident set size of this process so far.
+        child_peak_rss_mb: Peak resident set size of any finished child.
+        failed: Whether the state raised.
+    """
+
+    state: str
+    wall_seconds: float
+    cpu_seconds: float
+    child_cpu_seconds: float
+    peak_rss_mb: float
+    child_peak_rss_mb: float
+    failed: bool = False
+
 
 # =============================================================================
 # PROTOCOLS
@@ -42,6 +84,29 @@ class StateObserver(Protocol[T_contra]):
         ...
 
 
+class AsyncStateObserver(Protocol[T_contra]):
+    """Observer protocol for ``AsyncStateMachine`` events.
+
+    Same events as :class:`StateObserver`, awaited on the machine's event
+    loop. ``AsyncStateMachine`` also accepts plain ``StateObserver``
+    implementations.
+    """
+
+    async def on_state_enter(self, state_name: str, context: T_contra) -> None:
+        """Called when entering a state."""
+        ...
+
+    async def on_state_exit(self, state_name: str, context: T_contra) -> None:
+        """Called when exiting a state."""
+        ...
+
+    async def on_error(
+        self, state_name: str, error: Exception, context: T_contra
+    ) -> None:
+        """Called when an error occurs in a state."""
+        ...
+
+
 # =============================================================================
 # IMPLEMENTATIONS
 # =============================================================================
@@ -80,3 +145,161 @@ class OutputObserver:
     ) -> None:
         """Set failure output on error."""
         context.set_output(OUTPUT_MIGRATION_STATUS, STATUS_FAILED)
+
+
+class ProfilingObserver:
+    """Records wall time, CPU time and peak memory of every state.
+
+    Call :meth:`finish` once the machine stops to publish the profile as a
+    JSON file, the ``state-timings`` output and a job summary table. CPU
+    time is process-wide, so states running in concurrent branches each
+    include the other's.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty profile."""
+        self.profiles: list[StateProfile] = []
+        self._starts: dict[str, tuple[float, float, float]] = {}
+
+    def on_state_enter(self, state_name: str, context: Any) -> None:
+        """Take a resource snapshot."""
+        self._starts[state_name] = _snapshot()
+
+    def on_state_exit(self, state_name: str, context: Any) -> None:
+        """Record the state."""
+        self._record(state_name, failed=False)
+
+    def on_error(self, state_name: str, error: Exception, context: Any) -> None:
+        """Record the failed state."""
+        self._record(state_name, failed=True)
+
+    def finish(
+        self, context: ActionContext, path: str | Path = DEFAULT_PROFILE_PATH
+    ) -> None:
+        """Publish the profile.
+
+        Args:
+            context: Context used to set outputs.
+            path: JSON file the profile is written to.
+        """
+        data = [asdict(profile) for profile in self.profiles]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, indent=2))
+
+        for profile in self.profiles:
+            logger.info(
+                f"{profile.state}: {profile.wall_seconds:.3f}s wall, "
+                f"{profile.cpu_seconds:.3f}s CPU, "
+                f"{profile.child_cpu_seconds:.3f}s child CPU, "
+                f"{profile.peak_rss_mb:.1f} MB peak RSS"
+            )
+        context.set_output(OUTPUT_STATE_TIMINGS, json.dumps(data))
+        context.set_output(OUTPUT_PROFILE_PATH, str(path))
+
+        summary_path = os.getenv(GITHUB_STEP_SUMMARY)
+        if summary_path:
+            with open(summary_path, "a") as f:
+                f.write(self.format_summary())
+
+    def format_summary(self) -> str:
+        """Render the profile as a Markdown table."""
+        lines = [
+            "| State | Wall (s) | CPU (s) | Child CPU (s) | Peak RSS (MB) "
+            "| Child peak RSS (MB) |",
+            "|---|---:|---:|---:|---:|---:|",
+        ]
+        for p in self.profiles:
+            state = f"{p.state} (failed)" if p.failed else p.state
+            lines.append(
+                f"| {state} | {p.wall_seconds:.3f} | {p.cpu_seconds:.3f} "
+                f"| {p.child_cpu_seconds:.3f} | {p.peak_rss_mb:.1f} "
+                f"| {p.child_peak_rss_mb:.1f} |"
+            )
+        return "\n".join(lines) + "\n"
+
+    def _record(self, state_name: str, failed: bool) -> None:
+        """Turn the snapshot taken on entry into a profile."""
+        start = self._starts.pop(state_name, None)
+        if start is None:
+            return
+        wall, cpu, child_cpu = _snapshot()
+        start_wall, start_cpu, start_child_cpu = start
+        self.profiles.append(
+            StateProfile(
+                state=state_name,
+                wall_seconds=round(wall - start_wall, 6),
+                cpu_seconds=round(cpu - start_cpu, 6),
+                child_cpu_seconds=round(child_cpu - start_child_cpu, 6),
+                peak_rss_mb=_peak_rss_mb(resource.RUSAGE_SELF),
+                child_peak_rss_mb=_peak_rss_mb(resource.RUSAGE_CHILDREN),
+                failed=failed,
+            )
+        )
+
+
+class TracingObserver:
+    """Records a span for the run and one child span per state.
+
+    The run span opens with the first state and is closed when the tracer
+    is exported.
+    """
+
+    def __init__(self, tracer: Tracer):
+        """Initialize observer.
+
+        Args:
+            tracer: Tracer collecting the spans.
+        """
+        self.tracer = tracer
+        self.run_span: Span | None = None
+        # Keyed by state: states of concurrent branches overlap
+        self._state_spans: dict[str, Span] = {}
+
+    def on_state_enter(self, state_name: str, context: Any) -> None:
+        """Open the state's span (and the run span on the first state)."""
+        if self.run_span is None:
+            config = getattr(context, "config", None)
+            attributes = {}
+            if config is not None:
+                attributes = {
+                    "alembic.command": config.command,
+                    "alembic.revision": config.revision,
+                    "alembic_deploy.dry_run": config.dry_run,
+                }
+            self.run_span = self.tracer.start_span("alembic-deploy", attributes)
+        self._state_spans[state_name] = self.tracer.start_span(
+            f"state {state_name}", {"alembic_deploy.state": state_name}
+        )
+
+    def on_state_exit(self, state_name: str, context: Any) -> None:
+        """Close the state's span."""
+        span = self._state_spans.pop(state_name, None)
+        if span is not None:
+            self.tracer.end_span(span)
+
+    def on_error(self, state_name: str, error: Exception, context: Any) -> None:
+        """Close the state's span and mark the run as failed."""
+        span = self._state_spans.pop(state_name, None)
+        if span is not None:
+            self.tracer.end_span(span, error)
+        if self.run_span is not None:
+            self.tracer.end_span(self.run_span, error)
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _snapshot() -> tuple[float, float, float]:
+    """Wall clock, own CPU time and finished children's CPU time."""
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (
+        time.perf_counter(),
+        time.process_time(),
+        children.ru_utime + children.ru_stime,
+    )
+
+
+def _peak_rss_mb(who: int) -> float:
+    """Peak resident set size in MB."""
+    return round(resource.getrusage(who).ru_maxrss * MAXRSS_BYTES / 2**20, 1)
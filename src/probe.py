@@ -0,0 +1,139 @@
+"""Fast current-revision probe reading the Alembic version table directly."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+# Third Party
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import column, inspect, select, table
+from sqlalchemy.exc import DBAPIError
+
+# Project/Local
+from src.constants import DEFAULT_VERSION_TABLE, REVISION_BASE, REVISION_HEAD
+from src.logger import setup_logger
+from src.session import DatabaseSession
+
+if TYPE_CHECKING:
+    from src.revision_index import RevisionIndex
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+REVISION_HEADS = "heads"
+RELATIVE_MARKERS = ("+", "-", "@", ":")
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class RevisionProbe:
+    """Reads current revisions with one query instead of ``alembic current``.
+
+    ``alembic current`` loads ``env.py`` and the whole script directory just
+    to read a single table. The probe issues one ``SELECT`` on the shared,
+    pooled session instead.
+    """
+
+    def __init__(
+        self,
+        session: DatabaseSession,
+        config_path: str,
+        version_table: str = DEFAULT_VERSION_TABLE,
+        version_table_schema: str | None = None,
+        index: RevisionIndex | None = None,
+    ):
+        """Initialize probe.
+
+        Args:
+            session: Database session used for the query.
+            config_path: Path to alembic.ini, used to resolve ``head``.
+            version_table: Name of the Alembic version table.
+            version_table_schema: Schema holding the version table.
+            index: Revision index used to resolve targets without imports.
+        """
+        self.session = session
+        self.config_path = config_path
+        self.version_table = version_table
+        self.version_table_schema = version_table_schema
+        self.index = index
+
+    def current_revisions(self) -> tuple[str, ...]:
+        """Read the revisions stored in the version table.
+
+        Returns:
+            Sorted revision IDs; several when the database has multiple heads,
+            empty when the version table does not exist yet.
+        """
+        connection = self.session.open()
+        version = table(
+            self.version_table,
+            column("version_num"),
+            schema=self.version_table_schema,
+        )
+        try:
+            rows = connection.execute(select(version.c.version_num)).scalars().all()
+        except DBAPIError:
+            self.session.rollback()
+            if inspect(connection).has_table(
+                self.version_table, schema=self.version_table_schema
+            ):
+                raise
+            logger.info(f"Version table '{self.version_table}' does not exist yet")
+            return ()
+        finally:
+            self.session.commit()
+        return tuple(sorted(rows))
+
+    def target_revisions(self, target: str) -> tuple[str, ...] | None:
+        """Resolve a target revision to concrete revision IDs.
+
+        Args:
+            target: Revision argument as passed to ``alembic upgrade``.
+
+        Returns:
+            Sorted revision IDs, or None when the target cannot be resolved
+            without Alembic (relative, branch or ambiguous targets).
+        """
+        if self.index is not None:
+            return self.index.resolve(target)
+        if target == REVISION_BASE:
+            return ()
+        if target in (REVISION_HEAD, REVISION_HEADS):
+            heads = self.heads
+            if target == REVISION_HEAD and len(heads) != 1:
+                return None
+            return heads
+        if any(marker in target for marker in RELATIVE_MARKERS):
+            return None
+        return (target,)
+
+    def is_at_target(self, current: tuple[str, ...], target: str) -> bool:
+        """Check whether the database already sits at the target revision.
+
+        Args:
+            current: Revisions returned by :meth:`current_revisions`.
+            target: Revision argument as passed to ``alembic upgrade``.
+
+        Returns:
+            True only when the target resolves and matches exactly.
+        """
+        resolved = self.target_revisions(target)
+        return resolved is not None and tuple(sorted(resolved)) == current
+
+    @cached_property
+    def heads(self) -> tuple[str, ...]:
+        """Head revisions of the script directory."""
+        script = ScriptDirectory.from_config(Config(self.config_path))
+        return tuple(sorted(script.get_heads()))
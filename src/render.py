@@ -0,0 +1,233 @@
+"""Parallel offline SQL rendering of pending revisions."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+# Third Party
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from alembic.util import CommandError
+
+# Project/Local
+from src.alembic_ops import InProcessAlembicRunner
+from src.constants import (
+    DEFAULT_RENDER_CHUNK_SIZE,
+    REGEX_RUNNING_UPGRADE,
+    REVISION_BASE,
+)
+from src.logger import setup_logger
+from src.safety import SafetyAnalyzer, SafetyReport, combine_reports, merge_reports
+from src.spool import CommandOutput, SpooledOutput, iter_text
+
+if TYPE_CHECKING:
+    from src.render_cache import RenderCache
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+RUNNING_UPGRADE_PATTERN = re.compile(REGEX_RUNNING_UPGRADE, re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class RenderSlice:
+    """Contiguous run of revisions rendered by one worker.
+
+    Attributes:
+        start: Revision the slice upgrades from (``None`` for base).
+        revisions: Revisions applied by the slice, in upgrade order.
+    """
+
+    start: str | None
+    revisions: tuple[str, ...]
+
+    @property
+    def spec(self) -> str:
+        """Revision range understood by ``alembic upgrade --sql``."""
+        end = self.revisions[-1]
+        return end if self.start is None else f"{self.start}:{end}"
+
+
+@dataclass(frozen=True)
+class SliceResult:
+    """Rendered SQL of a slice and its report, attributed per revision."""
+
+    sql: str
+    report: SafetyReport
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class ParallelRenderer:
+    """Renders offline SQL for pending revisions across a process pool.
+
+    The ``current:target`` range is split into slices of ``chunk_size``
+    revisions. Each slice is rendered with ``alembic upgrade start:end --sql``
+    in a worker process, which also runs the safety analysis per revision.
+    Results are merged back in upgrade order.
+
+    Only linear ranges are split; branches and merges are left to the serial
+    path, since a slice starting at one parent of a merge would re-render the
+    other branch.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        workers: int,
+        chunk_size: int = DEFAULT_RENDER_CHUNK_SIZE,
+        dialect: str = "",
+    ):
+        """Initialize renderer.
+
+        Args:
+            config_path: Path to alembic.ini
+            workers: Number of worker processes.
+            chunk_size: Revisions rendered per slice.
+            dialect: Database backend, passed to the safety analysis.
+        """
+        self.config_path = config_path
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self.dialect = dialect
+
+    def plan(self, current: tuple[str, ...], target: str) -> list[RenderSlice] | None:
+        """Split the pending range into slices.
+
+        Args:
+            current: Revisions currently applied (empty for a fresh database).
+            target: Target revision.
+
+        Returns:
+            Slices in upgrade order, or None if the range is not linear.
+        """
+        if len(current) > 1:
+            return None
+
+        start = current[0] if current else None
+        script = ScriptDirectory.from_config(Config(self.config_path))
+        try:
+            scripts = list(script.iterate_revisions(target, start or REVISION_BASE))
+        except CommandError as e:
+            logger.warning(f"Cannot plan parallel render: {e}")
+            return None
+
+        revisions: list[str] = []
+        previous = start
+        for revision in reversed(scripts):
+            if revision.down_revision != previous:
+                return None
+            revisions.append(revision.revision)
+            previous = revision.revision
+
+        slices = []
+        for offset in range(0, len(revisions), self.chunk_size):
+            chunk = tuple(revisions[offset : offset + self.chunk_size])
+            slices.append(RenderSlice(start, chunk))
+            start = chunk[-1]
+        return slices
+
+    def render(
+        self, slices: list[RenderSlice], cache: RenderCache | None = None
+    ) -> tuple[CommandOutput, SafetyReport]:
+        """Render and analyze slices in parallel.
+
+        Args:
+            slices: Slices from :meth:`plan`.
+            cache: Optional cache consulted per slice; misses are stored.
+
+        Returns:
+            The concatenated SQL, in upgrade order, and the merged report.
+        """
+        keys = [cache.slice_key(s) if cache else None for s in slices]
+        cached = [cache.load(key) if cache and key else None for key in keys]
+        missing = [i for i, entry in enumerate(cached) if entry is None]
+
+        output = SpooledOutput()
+        reports: list[SafetyReport] = []
+        futures = {}
+        pool = None
+        if missing:
+            # Spawn rather than fork: the parent may hold an open database session
+            pool = ProcessPoolExecutor(
+                max_workers=min(self.workers, len(missing)),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            futures = {
+                i: pool.submit(_render_slice, self.config_path, slices[i], self.dialect)
+                for i in missing
+            }
+
+        try:
+            for i, entry in enumerate(cached):
+                if entry is not None:
+                    for chunk in iter_text(entry.sql):
+                        output.write(chunk)
+                    entry.sql.close()
+                    reports.append(entry.report)
+                    continue
+
+                result = futures[i].result()
+                output.write(result.sql)
+                reports.append(result.report)
+                key = keys[i]
+                if cache is not None and key is not None:
+                    cache.store(key, result.sql, result.report)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        return output.finish(), combine_reports(reports)
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _render_slice(
+    config_path: str, render_slice: RenderSlice, dialect: str = ""
+) -> SliceResult:
+    """Render one slice and analyze each of its revisions (worker process)."""
+    runner = InProcessAlembicRunner(config_path)
+    output = runner.upgrade(render_slice.spec, sql=True)
+    try:
+        sql = output.text()
+    finally:
+        output.close()
+    report = merge_reports(_analyze_revisions(sql, render_slice.revisions, dialect))
+    return SliceResult(sql, report)
+
+
+def _analyze_revisions(
+    sql: str, revisions: tuple[str, ...], dialect: str = ""
+) -> dict[str, SafetyReport]:
+    """Analyze rendered SQL section by section, one per revision.
+
+    Sections start at Alembic's ``-- Running upgrade`` markers; text before
+    the first marker (e.g. the version table DDL) belongs to the first
+    revision and text after the last one (e.g. ``COMMIT``) to the last.
+    """
+    analyzer = SafetyAnalyzer(dialect)
+    markers = list(RUNNING_UPGRADE_PATTERN.finditer(sql))
+    if not markers:
+        return {revisions[-1]: analyzer.analyze(sql)}
+
+    starts = [0] + [marker.start() for marker in markers[1:]]
+    ends = starts[1:] + [len(sql)]
+    return {
+        marker.group(1): analyzer.analyze(sql[start:end])
+        for marker, start, end in zip(markers, starts, ends, strict=True)
+    }
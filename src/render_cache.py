@@ -0,0 +1,189 @@
+"""Content-addressed cache for rendered dry-run SQL and safety reports."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+# Third Party
+import alembic
+import sqlalchemy
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+
+# Project/Local
+from src.constants import DEFAULT_SPOOL_MEMORY_BYTES
+from src.logger import setup_logger
+from src.revision_index import RevisionIndex
+from src.safety import SafetyReport
+from src.spool import CommandOutput, SQLText, iter_text
+from src.urls import dialect_name
+
+if TYPE_CHECKING:
+    from src.render import RenderSlice
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+# Bump when rendering or safety rules change in a way that invalidates entries
+CACHE_FORMAT_VERSION = 2
+SQL_SUFFIX = ".sql"
+REPORT_SUFFIX = ".json"
+
+
+@dataclass
+class CacheEntry:
+    """Cached dry-run result.
+
+    Attributes:
+        sql: Rendered SQL.
+        report: Safety report of the SQL.
+    """
+
+    sql: CommandOutput
+    report: SafetyReport
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class RenderCache:
+    """Directory of rendered SQL and safety reports keyed by their inputs.
+
+    Keys hash everything that determines the output: the content of the
+    revision files, ``env.py`` and ``alembic.ini``, the revision range, the
+    SQL dialect and the Alembic / SQLAlchemy versions. Entries are plain
+    files, so the directory can be persisted with ``actions/cache``.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        config_path: str,
+        database_url: str,
+        index: RevisionIndex | None = None,
+    ):
+        """Initialize cache.
+
+        Args:
+            directory: Directory holding cache entries.
+            config_path: Path to alembic.ini
+            database_url: Database URL, used for its dialect.
+            index: Revision index providing file hashes (built if omitted).
+        """
+        self.directory = Path(directory)
+        self.config_path = config_path
+        self.dialect = dialect_name(database_url)
+        self._index = index
+        self.hits = 0
+        self.misses = 0
+
+    # -------------------------------------------------------------------------
+    # Keys
+    # -------------------------------------------------------------------------
+    def range_key(self, start: str | None, target: str) -> str:
+        """Key of an ``upgrade start:target --sql`` render (``None`` for base)."""
+        hashes = {entry.revision: entry.content_hash for entry in self.index.entries}
+        return self._key(start=start, target=target, revisions=hashes)
+
+    def slice_key(self, render_slice: RenderSlice) -> str:
+        """Key of a single parallel-render slice."""
+        hashes = {
+            revision: self.index.get(revision).content_hash
+            for revision in render_slice.revisions
+        }
+        return self._key(start=render_slice.start, revisions=hashes)
+
+    def _key(self, **parts: Any) -> str:
+        """Hash key parts together with the environment fingerprint."""
+        payload = {
+            "format": CACHE_FORMAT_VERSION,
+            "alembic": alembic.__version__,
+            "sqlalchemy": sqlalchemy.__version__,
+            "dialect": self.dialect,
+            "environment": self._environment_hash,
+            **parts,
+        }
+        encoded = json.dumps(payload, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    @property
+    def index(self) -> RevisionIndex:
+        """Revision index used for file hashes."""
+        if self._index is None:
+            self._index = RevisionIndex.from_config(self.config_path)
+        return self._index
+
+    @cached_property
+    def _environment_hash(self) -> str:
+        """Hash of alembic.ini and env.py, which shape every render."""
+        script = ScriptDirectory.from_config(Config(self.config_path))
+        digest = hashlib.sha256()
+        for path in (self.config_path, script.env_py_location):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    # -------------------------------------------------------------------------
+    # Entries
+    # -------------------------------------------------------------------------
+    def load(self, key: str) -> CacheEntry | None:
+        """Return the entry stored under ``key``, counting hits and misses."""
+        sql_path = self._path(key, SQL_SUFFIX)
+        report_path = self._path(key, REPORT_SUFFIX)
+        try:
+            report = SafetyReport.from_dict(json.loads(report_path.read_text()))
+            sql = _open_output(sql_path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable render cache entry {key}: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return CacheEntry(sql, report)
+
+    def store(self, key: str, sql: SQLText, report: SafetyReport) -> None:
+        """Write an entry. The report is written last and marks it complete."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        sql_path = self._path(key, SQL_SUFFIX)
+        tmp_path = sql_path.with_name(f"{sql_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for chunk in iter_text(sql):
+                f.write(chunk)
+        tmp_path.replace(sql_path)
+
+        report_path = self._path(key, REPORT_SUFFIX)
+        tmp_path = report_path.with_name(f"{report_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(report.to_dict()))
+        tmp_path.replace(report_path)
+
+    def _path(self, key: str, suffix: str) -> Path:
+        """File of an entry."""
+        return self.directory / f"{key}{suffix}"
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _open_output(path: Path) -> CommandOutput:
+    """Open cached SQL, memory-mapping large files instead of reading them."""
+    if path.stat().st_size <= DEFAULT_SPOOL_MEMORY_BYTES:
+        return CommandOutput(path.read_bytes())
+    return CommandOutput(file=open(path, "rb"))  # noqa: SIM115
@@ -0,0 +1,487 @@
+"""Persistent revision-graph index built without importing migration modules."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import ast
+import configparser
+import hashlib
+import heapq
+import json
+import os
+import re
+from dataclasses import astuple, dataclass
+from pathlib import Path
+from typing import Any
+
+# Project/Local
+from src.constants import REVISION_BASE, REVISION_HEAD
+from src.logger import setup_logger
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+CACHE_FORMAT_VERSION = 1
+REVISION_HEADS = "heads"
+REVISION_FIELDS = ("revision", "down_revision", "branch_labels", "depends_on")
+SOURCE_FILE = re.compile(r"^(?!\.#|__init__).*\.py$")
+PATH_SEPARATORS = {
+    "os": os.pathsep,
+    "space": " ",
+    "newline": "\n",
+    ":": ":",
+    ";": ";",
+}
+
+
+@dataclass(frozen=True)
+class RevisionEntry:
+    """Static metadata of one revision file.
+
+    Attributes:
+        revision: Revision identifier.
+        down_revisions: Parent revisions (several for a merge point).
+        branch_labels: Branch labels declared by the revision.
+        depends_on: Extra dependencies declared by the revision.
+        path: Path of the revision file.
+        content_hash: SHA-256 of the file contents.
+        mtime_ns: Modification time used for revalidation.
+        size: File size used for revalidation.
+        doc: Module docstring.
+    """
+
+    revision: str
+    down_revisions: tuple[str, ...]
+    branch_labels: tuple[str, ...]
+    depends_on: tuple[str, ...]
+    path: str
+    content_hash: str
+    mtime_ns: int
+    size: int
+    doc: str
+
+    @property
+    def short_doc(self) -> str:
+        """First paragraph of the docstring, as Alembic displays it."""
+        return self.doc.split("\n\n")[0]
+
+    def to_row(self) -> list[Any]:
+        """Serialize to a compact JSON row."""
+        return [list(v) if isinstance(v, tuple) else v for v in astuple(self)]
+
+    @classmethod
+    def from_row(cls, row: list[Any]) -> RevisionEntry:
+        """Deserialize from a compact JSON row."""
+        rev, down, labels, deps, path, digest, mtime_ns, size, doc = row
+        return cls(
+            rev,
+            tuple(down),
+            tuple(labels),
+            tuple(deps),
+            path,
+            digest,
+            mtime_ns,
+            size,
+            doc,
+        )
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class RevisionIndex:
+    """Revision graph answering heads, ancestry and path queries.
+
+    Revision files are parsed with :mod:`ast` instead of being imported, and
+    the result is cached on disk. On refresh only files whose mtime or size
+    changed are re-read.
+    """
+
+    def __init__(self, version_locations: list[Path], cache_path: Path | None = None):
+        """Initialize index.
+
+        Args:
+            version_locations: Directories holding revision files.
+            cache_path: Optional on-disk cache file.
+        """
+        self.version_locations = version_locations
+        self.cache_path = cache_path
+        self.recursive = False
+        self._entries: dict[str, RevisionEntry] = {}
+        self._by_revision: dict[str, RevisionEntry] = {}
+        self._children: dict[str, list[str]] = {}
+        self._order: list[str] = []
+
+    @classmethod
+    def from_config(
+        cls, config_path: str, cache_path: str | Path | None = None
+    ) -> RevisionIndex:
+        """Build an index for the version locations declared in alembic.ini.
+
+        Args:
+            config_path: Path to alembic.ini
+            cache_path: Optional on-disk cache file.
+
+        Returns:
+            Refreshed index.
+
+        Raises:
+            ValueError: If the ini file has no ``script_location``.
+        """
+        here = os.path.dirname(os.path.abspath(config_path))
+        parser = configparser.ConfigParser(defaults={"here": here})
+        parser.read(config_path)
+        if not parser.has_option("alembic", "script_location"):
+            raise ValueError(f"No script_location in {config_path}")
+
+        script_location = parser.get("alembic", "script_location")
+        raw_locations = parser.get("alembic", "version_locations", fallback="")
+        separator = parser.get(
+            "alembic",
+            "path_separator",
+            fallback=parser.get("alembic", "version_path_separator", fallback=""),
+        )
+        locations = _split_locations(raw_locations, separator) or [
+            os.path.join(script_location, "versions")
+        ]
+
+        index = cls(
+            [Path(location) for location in locations],
+            Path(cache_path) if cache_path else None,
+        )
+        index.recursive = parser.getboolean(
+            "alembic", "recursive_version_locations", fallback=False
+        )
+        index.refresh()
+        return index
+
+    # -------------------------------------------------------------------------
+    # Loading
+    # -------------------------------------------------------------------------
+    def refresh(self) -> None:
+        """Load the cache and revalidate it against the version directories."""
+        cached = self._load_cache()
+        entries: dict[str, RevisionEntry] = {}
+        reparsed = 0
+
+        for path in self._source_files():
+            stat = path.stat()
+            key = str(path)
+            entry = cached.get(key)
+            if entry is None or (entry.mtime_ns, entry.size) != (
+                stat.st_mtime_ns,
+                stat.st_size,
+            ):
+                entry = _parse_revision_file(path, stat.st_mtime_ns, stat.st_size)
+                reparsed += 1
+            entries[key] = entry
+
+        changed = reparsed > 0 or entries.keys() != cached.keys()
+        self._set_entries(entries)
+        logger.info(f"Revision index: {len(entries)} revisions, {reparsed} re-parsed")
+        if changed:
+            self._save_cache()
+
+    def _source_files(self) -> list[Path]:
+        """List revision source files in every version location."""
+        files: list[Path] = []
+        for location in self.version_locations:
+            if not location.is_dir():
+                continue
+            for root, dirs, names in os.walk(location):
+                dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+                files.extend(
+                    Path(root) / name
+                    for name in sorted(names)
+                    if SOURCE_FILE.match(name)
+                )
+                if not self.recursive:
+                    break
+        return files
+
+    def _set_entries(self, entries: dict[str, RevisionEntry]) -> None:
+        """Rebuild lookup tables from entries."""
+        self._entries = entries
+        self._by_revision = {e.revision: e for e in entries.values()}
+        self._children = {rev: [] for rev in self._by_revision}
+        for entry in self._by_revision.values():
+            for parent in entry.down_revisions:
+                self._children.setdefault(parent, []).append(entry.revision)
+        self._order = self._topological()
+
+    def _load_cache(self) -> dict[str, RevisionEntry]:
+        """Read cached entries, ignoring unreadable or outdated caches."""
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            data = json.loads(self.cache_path.read_text())
+            if data.get("version") != CACHE_FORMAT_VERSION:
+                return {}
+            return {
+                path: RevisionEntry.from_row(row)
+                for path, row in data["entries"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable revision index cache: {e}")
+            return {}
+
+    def _save_cache(self) -> None:
+        """Write entries to the cache file."""
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": CACHE_FORMAT_VERSION,
+            "entries": {path: e.to_row() for path, e in self._entries.items()},
+        }
+        # Per-process temp file: fan-out targets may save concurrently
+        tmp_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(payload, separators=(",", ":")))
+        tmp_path.replace(self.cache_path)
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+    def __len__(self) -> int:
+        """Number of indexed revisions."""
+        return len(self._by_revision)
+
+    @property
+    def entries(self) -> list[RevisionEntry]:
+        """All entries, bases first."""
+        return [self._by_revision[rev] for rev in self._order]
+
+    def get(self, revision: str) -> RevisionEntry:
+        """Look up a revision by full ID or unique prefix.
+
+        Raises:
+            KeyError: If the revision is unknown or the prefix is ambiguous.
+        """
+        if revision in self._by_revision:
+            return self._by_revision[revision]
+        matches = [rev for rev in self._by_revision if rev.startswith(revision)]
+        if len(matches) != 1:
+            raise KeyError(f"Unknown or ambiguous revision: {revision}")
+        return self._by_revision[matches[0]]
+
+    def heads(self) -> tuple[str, ...]:
+        """Revisions no other revision builds upon."""
+        return tuple(sorted(rev for rev, kids in self._children.items() if not kids))
+
+    def bases(self) -> tuple[str, ...]:
+        """Revisions without a parent."""
+        return tuple(
+            sorted(
+                e.revision for e in self._by_revision.values() if not e.down_revisions
+            )
+        )
+
+    def resolve(self, target: str) -> tuple[str, ...] | None:
+        """Resolve a target argument to revision IDs.
+
+        Returns:
+            Revision IDs, or None for relative and branch-qualified targets.
+        """
+        if target == REVISION_BASE:
+            return ()
+        if target == REVISION_HEADS:
+            return self.heads()
+        if target == REVISION_HEAD:
+            heads = self.heads()
+            return heads if len(heads) == 1 else None
+        if any(marker in target for marker in ("+", "-", "@", ":")):
+            return None
+        try:
+            return (self.get(target).revision,)
+        except KeyError:
+            return None
+
+    def ancestors(self, revisions: tuple[str, ...] | list[str]) -> set[str]:
+        """Revisions (including those given) required to reach ``revisions``."""
+        seen: set[str] = set()
+        stack = list(revisions)
+        while stack:
+            rev = stack.pop()
+            if rev in seen or rev not in self._by_revision:
+                continue
+            seen.add(rev)
+            entry = self._by_revision[rev]
+            stack.extend(entry.down_revisions)
+            stack.extend(entry.depends_on)
+        return seen
+
+    def upgrade_path(self, current: tuple[str, ...], target: str) -> list[str] | None:
+        """Revisions an upgrade from ``current`` to ``target`` applies, in order.
+
+        Returns:
+            Ordered revision IDs, or None if the target cannot be resolved.
+        """
+        resolved = self.resolve(target)
+        if resolved is None:
+            return None
+        pending = self.ancestors(resolved) - self.ancestors(current)
+        return [rev for rev in self._order if rev in pending]
+
+    def _topological(self) -> list[str]:
+        """All revisions ordered so that parents precede children."""
+        remaining = {
+            rev: {
+                p for p in (*e.down_revisions, *e.depends_on) if p in self._by_revision
+            }
+            for rev, e in self._by_revision.items()
+        }
+        dependents: dict[str, list[str]] = {rev: [] for rev in remaining}
+        for rev, parents in remaining.items():
+            for parent in parents:
+                dependents[parent].append(rev)
+
+        ready = [rev for rev, parents in remaining.items() if not parents]
+        heapq.heapify(ready)
+        order: list[str] = []
+        while ready:
+            rev = heapq.heappop(ready)
+            order.append(rev)
+            for child in dependents[rev]:
+                remaining[child].discard(rev)
+                if not remaining[child]:
+                    heapq.heappush(ready, child)
+        return order
+
+    # -------------------------------------------------------------------------
+    # Formatting (mirrors ``alembic history`` / ``alembic show``)
+    # -------------------------------------------------------------------------
+    def format_history(self) -> str:
+        """Render history like ``alembic history``, newest first."""
+        return "".join(
+            f"{self._format_line(self._by_revision[rev])}\n"
+            for rev in reversed(self._order)
+        )
+
+    def format_show(self, revision: str) -> str:
+        """Render the revisions a target names like ``alembic show``.
+
+        Symbolic targets (``head``, ``heads``, ``base``) are resolved first.
+
+        Raises:
+            KeyError: If the target is unknown, or relative or branch-qualified
+                (which only Alembic resolves).
+        """
+        resolved = self.resolve(revision)
+        if resolved is None:
+            raise KeyError(f"Cannot resolve revision: {revision}")
+        return "".join(self._format_entry(self._by_revision[rev]) for rev in resolved)
+
+    def _format_entry(self, entry: RevisionEntry) -> str:
+        """Render a single ``alembic show`` entry."""
+        children = self._children.get(entry.revision, [])
+        is_merge = len(entry.down_revisions) > 1
+        text = (
+            f"Rev: {entry.revision}"
+            f"{' (head)' if not children else ''}"
+            f"{' (branchpoint)' if len(children) > 1 else ''}"
+            f"{' (mergepoint)' if is_merge else ''}\n"
+        )
+        text += f"{'Merges' if is_merge else 'Parent'}: {_format_down(entry)}\n"
+        if entry.depends_on:
+            text += f"Also depends on: {', '.join(entry.depends_on)}\n"
+        if len(children) > 1:
+            text += f"Branches into: {', '.join(sorted(children))}\n"
+        if entry.branch_labels:
+            text += f"Branch names: {', '.join(entry.branch_labels)}\n"
+        text += f"Path: {entry.path}\n"
+        body = "\n".join(f"    {line}" for line in entry.doc.splitlines())
+        return f"{text}\n{body}\n\n"
+
+    def _format_line(self, entry: RevisionEntry) -> str:
+        """Render a single history line."""
+        children = self._children.get(entry.revision, [])
+        parents = _format_down(entry)
+        if entry.depends_on:
+            parents += f" ({', '.join(entry.depends_on)})"
+        text = f"{parents} -> {entry.revision}"
+        if entry.branch_labels:
+            text += f" ({', '.join(entry.branch_labels)})"
+        if not children:
+            text += " (head)"
+        if len(children) > 1:
+            text += " (branchpoint)"
+        if len(entry.down_revisions) > 1:
+            text += " (mergepoint)"
+        return f"{text}, {entry.short_doc}"
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _split_locations(value: str, separator: str) -> list[str]:
+    """Split ``version_locations`` the way Alembic does."""
+    if not value.strip():
+        return []
+    if separator in PATH_SEPARATORS:
+        parts = value.split(PATH_SEPARATORS[separator])
+    else:
+        parts = re.split(r"[ ,]+", value)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _as_tuple(value: Any) -> tuple[str, ...]:
+    """Normalize None / str / sequence revision attributes to a tuple."""
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    return tuple(value)
+
+
+def _parse_revision_file(path: Path, mtime_ns: int, size: int) -> RevisionEntry:
+    """Statically read revision identifiers from a migration file.
+
+    Raises:
+        ValueError: If the revision identifiers are not literals.
+    """
+    content = path.read_bytes()
+    tree = ast.parse(content, filename=str(path))
+    values: dict[str, Any] = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        else:
+            continue
+        for target in targets:
+            if isinstance(target, ast.Name) and target.id in REVISION_FIELDS:
+                try:
+                    values[target.id] = ast.literal_eval(value)
+                except ValueError as err:
+                    raise ValueError(
+                        f"{path}: '{target.id}' is not a literal value"
+                    ) from err
+
+    if not isinstance(values.get("revision"), str):
+        raise ValueError(f"{path}: no literal 'revision' identifier found")
+
+    return RevisionEntry(
+        revision=values["revision"],
+        down_revisions=_as_tuple(values.get("down_revision")),
+        branch_labels=_as_tuple(values.get("branch_labels")),
+        depends_on=_as_tuple(values.get("depends_on")),
+        path=os.path.abspath(path),
+        content_hash=hashlib.sha256(content).hexdigest(),
+        mtime_ns=mtime_ns,
+        size=size,
+        doc=(ast.get_docstring(tree, clean=False) or "").strip(),
+    )
+
+
+def _format_down(entry: RevisionEntry) -> str:
+    """Render the parent list like Alembic."""
+    return ", ".join(entry.down_revisions) if entry.down_revisions else "<base>"
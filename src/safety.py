@@ -7,19 +7,34 @@ from __future__ import annotations
 # =============================================================================
 # Standard Library
 import re
-from dataclasses import dataclass
+import string
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field, replace
 from enum import StrEnum
+from typing import Any
 
 # Project/Local
 from src.constants import (
-    REGEX_ALTER_COLUMN,
+    REGEX_ALTER_COLUMN_TYPE,
+    REGEX_ALTER_TABLE_TARGET,
+    REGEX_BACKSLASH_QUOTED,
+    REGEX_BACKSLASH_STRING,
+    REGEX_BACKTICK_IDENTIFIER,
     REGEX_BLOCK_COMMENT,
+    REGEX_DOLLAR_QUOTED,
     REGEX_DROP_COLUMN,
     REGEX_DROP_INDEX,
     REGEX_DROP_TABLE,
+    REGEX_DROP_TABLE_TARGET,
+    REGEX_IDENTIFIER,
     REGEX_LINE_COMMENT,
+    REGEX_QUALIFIED_IDENTIFIER,
+    REGEX_QUOTED_IDENTIFIER,
+    REGEX_STRING,
     REGEX_TRUNCATE,
+    REGEX_TRUNCATE_TARGET,
 )
+from src.locks import LockClassifier, LockFinding, classifier_for
 
 
 # =============================================================================
@@ -41,11 +56,155 @@ class SafetyReport:
         is_safe: Whether the SQL is considered safe to execute.
         danger_level: The highest danger level detected.
         warnings: List of warning messages detailing detected issues.
+        attribution: Revisions that triggered each warning, in upgrade order
+            (only for reports merged from per-revision analysis).
+        locks: Table lock taken by each DDL statement, in upgrade order
+            (only for dialects with a lock classifier).
     """
 
     is_safe: bool
     danger_level: DangerLevel
     warnings: list[str]
+    attribution: dict[str, tuple[str, ...]] = field(default_factory=dict)
+    locks: list[LockFinding] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to JSON-compatible data."""
+        return {
+            "is_safe": self.is_safe,
+            "danger_level": str(self.danger_level),
+            "warnings": self.warnings,
+            "attribution": {w: list(revs) for w, revs in self.attribution.items()},
+            "locks": [finding.to_dict() for finding in self.locks],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> SafetyReport:
+        """Deserialize from :meth:`to_dict` output."""
+        return cls(
+            is_safe=data["is_safe"],
+            danger_level=DangerLevel(data["danger_level"]),
+            warnings=list(data["warnings"]),
+            attribution={w: tuple(revs) for w, revs in data["attribution"].items()},
+            locks=[LockFinding.from_dict(f) for f in data.get("locks", [])],
+        )
+
+
+@dataclass(frozen=True)
+class _Rule:
+    """A dangerous operation and how it is reported."""
+
+    name: str
+    message: str
+    level: DangerLevel
+    pattern: re.Pattern[str]
+
+
+RULE_DROP_TABLE = _Rule(
+    "drop_table",
+    "DROP TABLE detected - data will be permanently lost",
+    DangerLevel.HIGH,
+    re.compile(REGEX_DROP_TABLE),
+)
+RULE_DROP_COLUMN = _Rule(
+    "drop_column",
+    "DROP COLUMN detected - data will be lost",
+    DangerLevel.MEDIUM,
+    re.compile(REGEX_DROP_COLUMN),
+)
+RULE_ALTER_COLUMN_TYPE = _Rule(
+    "alter_column_type",
+    "Column type change detected - may fail or lock table",
+    DangerLevel.MEDIUM,
+    re.compile(REGEX_ALTER_COLUMN_TYPE, re.DOTALL),
+)
+RULE_TRUNCATE = _Rule(
+    "truncate",
+    "TRUNCATE detected - all data will be deleted",
+    DangerLevel.HIGH,
+    re.compile(REGEX_TRUNCATE),
+)
+RULE_DROP_INDEX = _Rule(
+    "drop_index",
+    "DROP INDEX detected - may affect query performance",
+    DangerLevel.LOW,
+    re.compile(REGEX_DROP_INDEX),
+)
+
+# Report order
+RULES = (
+    RULE_DROP_TABLE,
+    RULE_DROP_COLUMN,
+    RULE_ALTER_COLUMN_TYPE,
+    RULE_TRUNCATE,
+    RULE_DROP_INDEX,
+)
+# Rules matched anywhere in the script vs. within a single statement
+SCRIPT_RULES = tuple(rule for rule in RULES if rule is not RULE_ALTER_COLUMN_TYPE)
+LEVEL_ORDER = (DangerLevel.LOW, DangerLevel.MEDIUM, DangerLevel.HIGH)
+
+NOISE_PATTERN = re.compile(
+    "|".join(
+        (
+            REGEX_LINE_COMMENT,
+            REGEX_BLOCK_COMMENT,
+            REGEX_STRING,
+            REGEX_QUOTED_IDENTIFIER,
+            REGEX_BACKTICK_IDENTIFIER,
+            REGEX_DOLLAR_QUOTED,
+        )
+    ),
+    re.DOTALL,
+)
+# Dialects whose strings and double-quoted literals take backslash escapes
+DIALECT_MYSQL = "mysql"
+DIALECT_MARIADB = "mariadb"
+BACKSLASH_NOISE_PATTERN = re.compile(
+    "|".join(
+        (
+            REGEX_LINE_COMMENT,
+            REGEX_BLOCK_COMMENT,
+            REGEX_BACKSLASH_STRING,
+            REGEX_BACKSLASH_QUOTED,
+            REGEX_BACKTICK_IDENTIFIER,
+            REGEX_DOLLAR_QUOTED,
+        )
+    ),
+    re.DOTALL,
+)
+
+COMMENT_PATTERN = re.compile(f"{REGEX_LINE_COMMENT}|{REGEX_BLOCK_COMMENT}", re.DOTALL)
+IDENTIFIER_PATTERN = re.compile(REGEX_IDENTIFIER)
+QUALIFIED_IDENTIFIER_PATTERN = re.compile(REGEX_QUALIFIED_IDENTIFIER)
+# Tables each rule's statements act on (rules without one are not resolved)
+TARGET_PATTERNS = {
+    RULE_DROP_TABLE.name: re.compile(REGEX_DROP_TABLE_TARGET, re.IGNORECASE),
+    RULE_DROP_COLUMN.name: re.compile(REGEX_ALTER_TABLE_TARGET, re.IGNORECASE),
+    RULE_ALTER_COLUMN_TYPE.name: re.compile(REGEX_ALTER_TABLE_TARGET, re.IGNORECASE),
+    RULE_TRUNCATE.name: re.compile(REGEX_TRUNCATE_TARGET, re.IGNORECASE),
+}
+
+# Trailing ``$tag`` that may become a dollar-quote opener with more input
+PARTIAL_DOLLAR_TAG_PATTERN = re.compile(r"\$\w*+\Z")
+# Characters the noise pattern looks behind at (``x E'...'``)
+LOOKBEHIND_CHARS = 2
+# Where a quote opens an escape string (lookbehind of ``REGEX_STRING``)
+ESCAPE_STRING_PATTERN = re.compile(r"(?<=[Ee]')(?<![\w$][Ee]')")
+# Body of a quoted literal up to its closing quote (or a trailing backslash)
+QUOTED_BODY_PATTERNS = {
+    "'": re.compile(r"(?:[^']++|'')*+"),
+    '"': re.compile(r'(?:[^"]++|"")*+'),
+    "`": re.compile(r"[^`]*+"),
+}
+ESCAPE_STRING_BODY_PATTERN = re.compile(r"(?:[^'\\]++|''|\\.)*+", re.DOTALL)
+BACKSLASH_BODY_PATTERNS = {
+    "'": ESCAPE_STRING_BODY_PATTERN,
+    '"': re.compile(r'(?:[^"\\]++|""|\\.)*+', re.DOTALL),
+}
+
+# Length-preserving ASCII upper-casing, so the rule patterns can run
+# case-sensitively (much faster than IGNORECASE).
+ASCII_UPPER = str.maketrans(string.ascii_lowercase, string.ascii_uppercase)
 
 
 # =============================================================================
@@ -54,6 +213,18 @@ class SafetyReport:
 class SafetyAnalyzer:
     """Analyzes SQL for dangerous operations."""
 
+    def __init__(self, dialect: str = ""):
+        """Initialize analyzer.
+
+        Args:
+            dialect: Database backend the SQL targets. Backends with a lock
+                classifier (PostgreSQL) also get the lock of each statement;
+                on MySQL/MariaDB, backslashes escape quotes in literals.
+        """
+        self.dialect = dialect
+        self.classifier = classifier_for(dialect)
+        self.noise_pattern = noise_pattern_for(dialect)
+
     def analyze(self, sql: str) -> SafetyReport:
         """Analyze SQL content for dangerous operations.
 
@@ -63,56 +234,475 @@ class SafetyAnalyzer:
         Returns:
             SafetyReport containing the analysis results.
         """
-        warnings: list[str] = []
-        danger_level = DangerLevel.LOW
-
-        # Remove comments to avoid false positives in comments
-        clean_sql = self._strip_comments(sql)
-
-        # Check for DROP TABLE
-        if re.search(REGEX_DROP_TABLE, clean_sql, re.IGNORECASE):
-            warnings.append("DROP TABLE detected - data will be permanently lost")
-            danger_level = DangerLevel.HIGH
-
-        # Check for DROP COLUMN
-        if re.search(REGEX_DROP_COLUMN, clean_sql, re.IGNORECASE):
-            warnings.append("DROP COLUMN detected - data will be lost")
-            if danger_level == DangerLevel.LOW:
-                danger_level = DangerLevel.MEDIUM
-
-        # Check for ALTER COLUMN TYPE
-        if re.search(REGEX_ALTER_COLUMN, clean_sql, re.IGNORECASE):
-            warnings.append("Column type change detected - may fail or lock table")
-            if danger_level == DangerLevel.LOW:
-                danger_level = DangerLevel.MEDIUM
-
-        # Check for TRUNCATE
-        if re.search(REGEX_TRUNCATE, clean_sql, re.IGNORECASE):
-            warnings.append("TRUNCATE detected - all data will be deleted")
-            danger_level = DangerLevel.HIGH
-
-        # Check for DROP INDEX
-        if re.search(REGEX_DROP_INDEX, clean_sql, re.IGNORECASE):
-            warnings.append("DROP INDEX detected - may affect query performance")
-            # Keeps current danger level (LOW if nothing else found)
-
-        return SafetyReport(
-            is_safe=(danger_level == DangerLevel.LOW and not warnings),
-            danger_level=danger_level,
-            warnings=warnings,
+        return self.analyze_stream((sql,))
+
+    def analyze_stream(self, chunks: Iterable[str]) -> SafetyReport:
+        """Analyze SQL arriving as an iterable of text chunks.
+
+        Chunks may split comments, strings and keywords anywhere; the result
+        is the same as analyzing their concatenation.
+
+        Args:
+            chunks: SQL text chunks, in order.
+
+        Returns:
+            SafetyReport containing the analysis results.
+        """
+        stream = self.stream()
+        for chunk in chunks:
+            stream.feed(chunk)
+        return stream.finish()
+
+    def stream(self) -> SafetyStream:
+        """Start an incremental analysis fed with :meth:`SafetyStream.feed`."""
+        return SafetyStream(self.classifier, self.noise_pattern)
+
+
+class SafetyStream:
+    """Incremental safety analysis over SQL fed chunk by chunk.
+
+    Input that may still change meaning with more text (a trailing partial
+    token) is held back until the next chunk. An open comment, string or
+    dollar-quoted body is not: only its opening delimiter and what may close
+    it are kept, so the next chunk resumes the search for its end instead of
+    scanning the body again. Cleaned text is buffered only up to the end of
+    the current statement, so memory is bounded by the longest statement
+    rather than the whole script, however long its literals are.
+
+    With a lock classifier, the original text of each statement is also
+    split out and classified.
+    """
+
+    def __init__(
+        self,
+        classifier: LockClassifier | None = None,
+        noise_pattern: re.Pattern[str] = NOISE_PATTERN,
+    ) -> None:
+        """Initialize empty stream.
+
+        Args:
+            classifier: Classifies the table lock of each statement.
+            noise_pattern: Lexer of the dialect (see :func:`noise_pattern_for`).
+        """
+        self._found: set[_Rule] = set()
+        self._pending = ""
+        self._context = ""
+        self._statement: list[str] = []
+        self._noise = noise_pattern
+        self._classifier = classifier
+        self._splitter = (
+            StatementSplitter(noise_pattern) if classifier is not None else None
+        )
+        self._locks: list[LockFinding] = []
+
+    @property
+    def report(self) -> SafetyReport:
+        """Report covering the complete statements seen so far."""
+        return _build_report(self._found, self._locks)
+
+    def feed(self, chunk: str) -> None:
+        """Analyze the next chunk of SQL."""
+        if chunk:
+            self._lex(chunk, final=False)
+            if self._splitter is not None:
+                self._classify(self._splitter.feed(chunk))
+
+    def finish(self) -> SafetyReport:
+        """Analyze any held-back input and return the final report."""
+        self._lex("", final=True)
+        self._check("".join(self._statement))
+        self._statement = []
+        if self._splitter is not None:
+            self._classify(self._splitter.finish())
+        return self.report
+
+    def _classify(self, statements: list[str]) -> None:
+        """Record the locks taken by complete statements."""
+        if self._classifier is None:
+            return
+        for statement in statements:
+            finding = self._classifier.classify(statement)
+            if finding is not None:
+                self._locks.append(finding)
+
+    def _lex(self, chunk: str, final: bool) -> None:
+        """Blank out noise in pending input and pass the result on."""
+        text = self._context + self._pending + chunk
+        start = len(self._context)
+        end = len(text)
+        pos = start
+        hold = end
+        held = None
+        pieces: list[str] = []
+        for match in self._noise.finditer(text, start):
+            if not final and match.end() == end:
+                # May be unterminated, or continue in the next chunk
+                hold = match.start()
+                held = match
+                break
+            pieces.append(text[pos : match.start()])
+            pieces.append(" ")
+            pos = match.end()
+        else:
+            if not final:
+                hold = _plain_hold(text, pos)
+
+        pieces.append(text[pos:hold])
+        self._context = text[max(0, hold - LOOKBEHIND_CHARS) : hold]
+        self._pending = _reopen(held) if held is not None else text[hold:]
+        self._add_clean("".join(pieces))
+
+    def _add_clean(self, clean: str) -> None:
+        """Buffer cleaned text and check every statement it completes."""
+        if ";" not in clean:
+            self._statement.append(clean)
+            return
+        # Only statement separators survive cleaning
+        complete, _, rest = clean.rpartition(";")
+        self._statement.append(complete)
+        self._check("".join(self._statement))
+        self._statement = [rest]
+
+    def _check(self, clean: str) -> None:
+        """Record the rules triggered by complete, cleaned statements."""
+        if not clean:
+            return
+        clean = clean.translate(ASCII_UPPER)
+        self._found.update(
+            rule
+            for rule in SCRIPT_RULES
+            if rule not in self._found and rule.pattern.search(clean)
         )
+        if RULE_ALTER_COLUMN_TYPE not in self._found and any(
+            "TYPE" in statement and RULE_ALTER_COLUMN_TYPE.pattern.match(statement)
+            for statement in clean.split(";")
+        ):
+            self._found.add(RULE_ALTER_COLUMN_TYPE)
+
+
+class StatementSplitter:
+    """Splits SQL fed chunk by chunk into statements, keeping their text.
 
-    def _strip_comments(self, sql: str) -> str:
-        """Strip SQL comments to reduce false positives.
+    Statements end at a ``;`` outside comments, strings, quoted identifiers
+    and dollar-quoted bodies. Only the statement in progress is buffered,
+    and text already lexed is not scanned again, including the body of a
+    literal still open at the end of a chunk.
+    """
+
+    def __init__(self, noise_pattern: re.Pattern[str] = NOISE_PATTERN) -> None:
+        """Initialize empty splitter.
 
         Args:
-            sql: Raw SQL string.
+            noise_pattern: Lexer of the dialect (see :func:`noise_pattern_for`).
+        """
+        self._noise = noise_pattern
+        self._buffer = ""
+        self._scanned = 0
+        # Lookbehind and stand-in text of a construct open at the buffer end,
+        # and the chunks it has spanned since (joined once it closes)
+        self._open: tuple[str, str] | None = None
+        self._held: list[str] = []
+
+    def feed(self, chunk: str) -> list[str]:
+        """Add a chunk and return the statements it completes."""
+        return self._split(chunk, final=False)
+
+    def finish(self) -> list[str]:
+        """Return the remaining statements, including an unterminated one."""
+        statements = self._split("", final=True)
+        if self._buffer.strip():
+            statements.append(self._buffer)
+        self._buffer = ""
+        self._scanned = 0
+        return statements
+
+    def _split(self, chunk: str, final: bool) -> list[str]:
+        """Split complete statements off the buffer."""
+        if self._open is not None:
+            closed = self._resume(self._open, chunk, final)
+            if closed is None:
+                self._held.append(chunk)
+                return []
+            buffer = "".join((self._buffer, *self._held, chunk))
+            self._held = []
+            pos = len(buffer) - len(chunk) + closed
+        else:
+            buffer = self._buffer + chunk
+            pos = self._scanned
+        statements = []
+        start = 0
+        end = len(buffer)
+        for match in self._noise.finditer(buffer, pos):
+            for separator in _separators(buffer, pos, match.start()):
+                statements.append(buffer[start:separator])
+                start = separator + 1
+            if not final and match.end() == end:
+                # May be unterminated, or continue in the next chunk
+                opening = match.start()
+                context = buffer[max(0, opening - LOOKBEHIND_CHARS) : opening]
+                self._open = (context, _reopen(match))
+                pos = end
+                break
+            pos = match.end()
+        else:
+            for separator in _separators(buffer, pos, end):
+                statements.append(buffer[start:separator])
+                start = separator + 1
+        self._buffer = buffer[start:]
+        # Plain text after ``pos`` may still start noise with more input
+        self._scanned = max(0, pos - start)
+        return statements
+
+    def _resume(
+        self, open_construct: tuple[str, str], chunk: str, final: bool
+    ) -> int | None:
+        """Scan a chunk for the end of the construct left open before it.
+
+        Args:
+            open_construct: Lookbehind and stand-in text of the construct.
+            chunk: Text following the construct's stand-in.
+            final: Whether no more input follows.
 
         Returns:
-            SQL string with comments removed.
+            Position in the chunk after the construct, or None while it is
+            still open.
         """
-        # Remove block comments /* */
-        sql = re.sub(REGEX_BLOCK_COMMENT, "", sql, flags=re.DOTALL)
-        # Remove line comments --
-        sql = re.sub(REGEX_LINE_COMMENT, "", sql, flags=re.MULTILINE)
-        return sql
+        context, opened = open_construct
+        text = context + opened + chunk
+        match = self._noise.match(text, len(context))
+        if match is None:
+            # Stand-ins always open a construct; lex the chunk afresh if not
+            self._open = None
+            return 0
+        if not final and match.end() == len(text):
+            self._open = (context, _reopen(match))
+            return None
+        self._open = None
+        return match.end() - len(context) - len(opened)
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def merge_reports(reports: Mapping[str, SafetyReport]) -> SafetyReport:
+    """Combine per-revision reports into one, keeping attribution.
+
+    Args:
+        reports: Report of each revision, in upgrade order.
+
+    Returns:
+        Report whose warnings and level cover every revision, with
+        ``attribution`` mapping each warning to the revisions raising it.
+    """
+    return combine_reports(
+        SafetyReport(
+            is_safe=report.is_safe,
+            danger_level=report.danger_level,
+            warnings=report.warnings,
+            attribution=dict.fromkeys(report.warnings, (revision,)),
+            locks=[replace(finding, revision=revision) for finding in report.locks],
+        )
+        for revision, report in reports.items()
+    )
+
+
+def combine_reports(reports: Iterable[SafetyReport]) -> SafetyReport:
+    """Combine reports of consecutive SQL sections, merging attribution.
+
+    Args:
+        reports: Reports in upgrade order.
+
+    Returns:
+        Report covering every section.
+    """
+    reports = list(reports)
+    attribution: dict[str, tuple[str, ...]] = {}
+    for report in reports:
+        for warning in report.warnings:
+            revisions = attribution.get(warning, ())
+            added = report.attribution.get(warning, ())
+            attribution[warning] = (
+                *revisions,
+                *(rev for rev in added if rev not in revisions),
+            )
+
+    order = [rule.message for rule in RULES]
+    warnings = sorted(
+        attribution,
+        key=lambda w: order.index(w) if w in order else len(order),
+    )
+    danger_level = max(
+        (report.danger_level for report in reports),
+        key=LEVEL_ORDER.index,
+        default=DangerLevel.LOW,
+    )
+    return SafetyReport(
+        is_safe=all(report.is_safe for report in reports),
+        danger_level=danger_level,
+        warnings=warnings,
+        attribution={w: attribution[w] for w in warnings if attribution[w]},
+        locks=[finding for report in reports for finding in report.locks],
+    )
+
+
+def flagged_tables(
+    chunks: Iterable[str], warnings: Iterable[str], dialect: str = ""
+) -> dict[str, list[str]]:
+    """Tables acted on by the statements behind each warning.
+
+    Args:
+        chunks: SQL text chunks that produced the warnings, in order.
+        warnings: Warnings of the report for that SQL.
+        dialect: Database backend the SQL targets.
+
+    Returns:
+        Table names as written in the SQL (quoted and qualified names kept),
+        per warning whose rule targets tables.
+    """
+    flagged = set(warnings)
+    rules = [
+        rule
+        for rule in RULES
+        if rule.message in flagged and rule.name in TARGET_PATTERNS
+    ]
+    tables: dict[str, list[str]] = {}
+    if not rules:
+        return tables
+
+    noise_pattern = noise_pattern_for(dialect)
+    for statement in iter_statements(chunks, dialect):
+        clean = noise_pattern.sub(" ", statement).translate(ASCII_UPPER)
+        for rule in rules:
+            if rule is RULE_ALTER_COLUMN_TYPE:
+                matched = "TYPE" in clean and rule.pattern.match(clean)
+            else:
+                matched = rule.pattern.search(clean)
+            if not matched:
+                continue
+            target = TARGET_PATTERNS[rule.name].search(
+                COMMENT_PATTERN.sub(" ", statement)
+            )
+            if target is None:
+                continue
+            names = tables.setdefault(rule.message, [])
+            for name in _split_names(target.group(1)):
+                if name not in names:
+                    names.append(name)
+    return tables
+
+
+def noise_pattern_for(dialect: str) -> re.Pattern[str]:
+    """Lexer matching the comments, literals and quoted names of a dialect.
+
+    MySQL and MariaDB escape quotes with backslashes in every string and
+    double-quoted literal; other backends follow standard SQL quoting (plus
+    PostgreSQL ``E''`` strings and dollar quoting).
+    """
+    if dialect in (DIALECT_MYSQL, DIALECT_MARIADB):
+        return BACKSLASH_NOISE_PATTERN
+    return NOISE_PATTERN
+
+
+def split_identifier(name: str) -> list[str]:
+    """Unquoted parts of a possibly qualified identifier (``a."B"`` -> a, B)."""
+    parts = []
+    for part in IDENTIFIER_PATTERN.findall(name):
+        if part[0] in '"`[':
+            part = part[1:-1].replace('""', '"')
+        parts.append(part)
+    return parts
+
+
+def iter_statements(chunks: Iterable[str], dialect: str = "") -> Iterator[str]:
+    """Split SQL arriving in chunks into statements, keeping their text.
+
+    See :class:`StatementSplitter`.
+
+    Args:
+        chunks: SQL text chunks, in order.
+        dialect: Database backend the SQL targets.
+
+    Yields:
+        Statements without their terminating ``;``.
+    """
+    splitter = StatementSplitter(noise_pattern_for(dialect))
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.finish()
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _split_names(names: str) -> list[str]:
+    """Split a comma-separated list of (qualified) identifiers."""
+    return [match.group(0) for match in QUALIFIED_IDENTIFIER_PATTERN.finditer(names)]
+
+
+def _separators(text: str, start: int, end: int) -> Iterator[int]:
+    """Positions of ``;`` in plain (noise-free) text."""
+    pos = text.find(";", start, end)
+    while pos != -1:
+        yield pos
+        pos = text.find(";", pos + 1, end)
+
+
+def _plain_hold(text: str, pos: int) -> int:
+    """Return where to stop in trailing plain text that may still grow.
+
+    The last character may start ``--`` or ``/*``, and a trailing ``$tag``
+    may become a dollar-quote opener.
+    """
+    hold = max(pos, len(text) - 1)
+    partial = PARTIAL_DOLLAR_TAG_PATTERN.search(text, pos)
+    if partial is not None:
+        hold = min(hold, partial.start())
+    return hold
+
+
+def _reopen(match: re.Match[str]) -> str:
+    """Return short text lexing like a noise match that reached the input end.
+
+    Lexed together with the following text, it yields the same tokens as the
+    whole match would: the opening delimiter plus whatever tail may still
+    close (or continue) the construct. The body in between is dropped.
+    """
+    token = match.group()
+    opener = token[0]
+    if opener == "-":
+        return "--"
+    if opener == "/":
+        if len(token) >= 4 and token.endswith("*/"):
+            return "/**/"
+        return "/**" if len(token) > 2 and token.endswith("*") else "/*"
+    if opener == "$":
+        delimiter = f"${match.group('tag')}$"
+        if len(token) >= 2 * len(delimiter) and token.endswith(delimiter):
+            return delimiter * 2
+        # The closing delimiter may start in the last few characters
+        body = token[len(delimiter) :]
+        return delimiter + body[-(len(delimiter) - 1) :]
+    body_pattern = QUOTED_BODY_PATTERNS[opener]
+    if match.re is BACKSLASH_NOISE_PATTERN:
+        body_pattern = BACKSLASH_BODY_PATTERNS.get(opener, body_pattern)
+    elif opener == "'" and ESCAPE_STRING_PATTERN.match(match.string, match.start() + 1):
+        body_pattern = ESCAPE_STRING_BODY_PATTERN
+    # What follows the body: a closing quote, a pending backslash, or nothing
+    body = body_pattern.match(token, 1)
+    return opener + token[body.end() if body is not None else 1 :]
+
+
+def _build_report(found: set[_Rule], locks: list[LockFinding]) -> SafetyReport:
+    """Turn triggered rules and lock findings into a report."""
+    warnings = [rule.message for rule in RULES if rule in found]
+    danger_level = max(
+        (rule.level for rule in found),
+        key=LEVEL_ORDER.index,
+        default=DangerLevel.LOW,
+    )
+    return SafetyReport(
+        is_safe=(danger_level == DangerLevel.LOW and not warnings),
+        danger_level=danger_level,
+        warnings=warnings,
+        locks=list(locks),
+    )
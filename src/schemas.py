@@ -0,0 +1,280 @@
+"""Schema-per-tenant migrations over one engine via ``search_path``."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+# Third Party
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+# Project/Local
+from src.alembic_ops import InProcessAlembicRunner
+from src.constants import (
+    ATTR_TENANT_SCHEMA,
+    DEFAULT_REVISION,
+    DEFAULT_SCHEMA_WORKERS,
+    DEFAULT_VERSION_TABLE,
+    REVISION_NONE,
+    STATUS_FAILED,
+    STATUS_SKIPPED,
+    STATUS_SUCCESS,
+)
+from src.logger import setup_logger
+from src.probe import RevisionProbe
+from src.session import DatabaseSession
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+DIALECT_POSTGRESQL = "postgresql"
+
+# Worker state of the process pool (one session per worker process)
+_worker: SchemaWorker | None = None
+
+
+@dataclass
+class SchemaResult:
+    """Outcome of one schema.
+
+    Attributes:
+        schema: Schema name.
+        status: ``success``, ``skipped`` (already at target) or ``failed``.
+        from_revision: Revision before the upgrade.
+        revision: Revision after the upgrade.
+        duration: Wall-clock seconds spent on the schema.
+        error: Error message of a failed schema.
+    """
+
+    schema: str
+    status: str
+    from_revision: str = REVISION_NONE
+    revision: str = REVISION_NONE
+    duration: float = 0.0
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the schema finished without failing."""
+        return self.status != STATUS_FAILED
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to JSON-compatible data."""
+        return {
+            "schema": self.schema,
+            "status": self.status,
+            "from_revision": self.from_revision,
+            "revision": self.revision,
+            "duration_seconds": round(self.duration, 3),
+            "error": self.error,
+        }
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class SchemaWorker:
+    """Migrates schemas one after another on a single connection.
+
+    Before each schema, ``search_path`` is pointed at it and committed, so
+    unqualified names in migrations resolve to the tenant's tables. ``env.py``
+    receives the connection as ``config.attributes["connection"]`` and the
+    schema as ``config.attributes["tenant_schema"]``, which it should pass to
+    ``context.configure(version_table_schema=...)``.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        config_path: str,
+        revision: str = DEFAULT_REVISION,
+        version_table: str = DEFAULT_VERSION_TABLE,
+    ):
+        """Initialize worker.
+
+        Args:
+            database_url: SQLAlchemy connection string.
+            config_path: Path to alembic.ini
+            revision: Target revision.
+            version_table: Name of the Alembic version table.
+        """
+        self.session = DatabaseSession(database_url)
+        self.config_path = config_path
+        self.revision = revision
+        self.version_table = version_table
+
+    def migrate(self, schema: str) -> SchemaResult:
+        """Upgrade one schema to the target revision.
+
+        Args:
+            schema: Schema to migrate.
+
+        Returns:
+            Result of the schema; errors are reported, not raised.
+        """
+        started = time.perf_counter()
+        result = SchemaResult(schema, STATUS_FAILED)
+        try:
+            set_search_path(self.session.open(), schema)
+            self.session.commit()
+
+            probe = RevisionProbe(
+                self.session,
+                self.config_path,
+                self.version_table,
+                version_table_schema=schema,
+            )
+            current = probe.current_revisions()
+            result.from_revision = ",".join(current) or REVISION_NONE
+            if probe.is_at_target(current, self.revision):
+                logger.info(f"[{schema}] Already at target revision")
+                result.status = STATUS_SKIPPED
+                result.revision = result.from_revision
+            else:
+                runner = InProcessAlembicRunner(
+                    self.config_path,
+                    attributes={ATTR_TENANT_SCHEMA: schema},
+                    session=self.session,
+                )
+                runner.upgrade(self.revision).close()
+                result.revision = ",".join(probe.current_revisions()) or REVISION_NONE
+                result.status = STATUS_SUCCESS
+        except Exception as e:
+            logger.error(f"[{schema}] Migration failed: {e}")
+            self.session.rollback()
+            result.error = str(e)
+        result.duration = time.perf_counter() - started
+        logger.info(
+            f"[{schema}] {result.status}: {result.from_revision} -> "
+            f"{result.revision} in {result.duration:.2f}s"
+        )
+        return result
+
+    def close(self) -> None:
+        """Close the worker's connection."""
+        self.session.close()
+
+
+class SchemaMigrator:
+    """Upgrades many schemas of one database.
+
+    With one worker, every schema is migrated on a single connection. With
+    more, schemas are spread over a small pool of worker processes, each
+    holding one connection for all schemas it migrates. Processes rather than
+    threads are used because Alembic's ``context`` and ``op`` proxies are
+    module-level globals.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        config_path: str,
+        revision: str = DEFAULT_REVISION,
+        workers: int = DEFAULT_SCHEMA_WORKERS,
+        version_table: str = DEFAULT_VERSION_TABLE,
+    ):
+        """Initialize migrator.
+
+        Args:
+            database_url: SQLAlchemy connection string.
+            config_path: Path to alembic.ini
+            revision: Target revision.
+            workers: Schemas migrated concurrently.
+            version_table: Name of the Alembic version table.
+        """
+        self.database_url = database_url
+        self.config_path = config_path
+        self.revision = revision
+        self.workers = max(1, workers)
+        self.version_table = version_table
+
+    def run(self, schemas: list[str]) -> list[SchemaResult]:
+        """Migrate every schema.
+
+        Args:
+            schemas: Schemas, in the order results are returned.
+
+        Returns:
+            One result per schema.
+        """
+        worker_args = (
+            self.database_url,
+            self.config_path,
+            self.revision,
+            self.version_table,
+        )
+        workers = min(self.workers, len(schemas))
+        logger.info(f"Migrating {len(schemas)} schema(s) on {workers} connection(s)...")
+
+        if workers <= 1:
+            worker = SchemaWorker(*worker_args)
+            try:
+                return [worker.migrate(schema) for schema in schemas]
+            finally:
+                worker.close()
+
+        # Spawn rather than fork: the parent may hold an open database session
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=worker_args,
+        ) as pool:
+            return list(pool.map(_migrate_schema, schemas))
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def set_search_path(connection: Connection, schema: str) -> None:
+    """Point unqualified names on ``connection`` at ``schema``.
+
+    Args:
+        connection: Open connection.
+        schema: Existing schema.
+
+    Raises:
+        ValueError: If the dialect has no search path or the schema is missing.
+    """
+    dialect = connection.dialect
+    if dialect.name != DIALECT_POSTGRESQL:
+        raise ValueError(f"Schema mode requires PostgreSQL (got {dialect.name})")
+    # A missing schema would silently fall through to the next one on the path
+    if not inspect(connection).has_schema(schema):
+        raise ValueError(f"Schema '{schema}' does not exist")
+    quoted = dialect.identifier_preparer.quote_identifier(schema)
+    connection.exec_driver_sql(f"SET search_path TO {quoted}")
+
+
+def parse_schemas(text: str) -> list[str]:
+    """Parse a newline- or comma-separated schema list."""
+    schemas = [name.strip() for name in text.replace(",", "\n").splitlines()]
+    return list(dict.fromkeys(name for name in schemas if name))
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _init_worker(*args: Any) -> None:
+    """Create the worker process's session (pool initializer)."""
+    global _worker
+    _worker = SchemaWorker(*args)
+
+
+def _migrate_schema(schema: str) -> SchemaResult:
+    """Migrate one schema in a worker process."""
+    assert _worker is not None
+    return _worker.migrate(schema)
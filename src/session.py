@@ -0,0 +1,84 @@
+"""Database session shared by every state of one action run."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import time
+
+# Third Party
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection, Engine
+
+# Project/Local
+from src.logger import setup_logger
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class DatabaseSession:
+    """Owns one engine and one connection for the lifetime of a run.
+
+    Alembic's ``env.py`` receives the connection through
+    ``config.attributes["connection"]`` so that no migration step pays for
+    its own TLS handshake and authentication.
+    """
+
+    def __init__(self, database_url: str):
+        """Initialize session.
+
+        Args:
+            database_url: SQLAlchemy connection string.
+        """
+        self.database_url = database_url
+        self.engine: Engine | None = None
+        self.connection: Connection | None = None
+        self.connect_latency_ms: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the shared connection has been established."""
+        return self.connection is not None
+
+    def open(self) -> Connection:
+        """Create the engine and open the shared connection.
+
+        Returns:
+            The open connection. Calling again returns the same connection.
+        """
+        if self.connection is not None:
+            return self.connection
+
+        self.engine = create_engine(self.database_url)
+        start = time.perf_counter()
+        self.connection = self.engine.connect()
+        self.connect_latency_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Database connection opened in {self.connect_latency_ms:.1f} ms")
+        return self.connection
+
+    def commit(self) -> None:
+        """Commit the transaction in progress on the shared connection, if any."""
+        if self.connection is not None and self.connection.in_transaction():
+            self.connection.commit()
+
+    def rollback(self) -> None:
+        """Roll back the transaction in progress on the shared connection, if any."""
+        if self.connection is not None and self.connection.in_transaction():
+            self.connection.rollback()
+
+    def close(self) -> None:
+        """Close the connection and dispose of the engine."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        if self.engine is not None:
+            self.engine.dispose()
+            self.engine = None
@@ -0,0 +1,228 @@
+"""On-disk snapshots of the action context for resuming interrupted runs."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import hashlib
+import json
+import os
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+# Project/Local
+from src.constants import DEFAULT_STATE_SNAPSHOT_DIR
+from src.durations import environment_name
+from src.logger import setup_logger
+from src.revision_index import RevisionIndex
+from src.safety import SafetyReport
+from src.spool import CommandOutput, SQLText, iter_text
+
+if TYPE_CHECKING:
+    from src.config import ActionConfig
+    from src.states import ActionContext
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_FILE = "snapshot.json"
+SQL_PREVIEW_FILE = "sql-preview.sql"
+
+
+@dataclass
+class Snapshot:
+    """Context of a run as it stood after its last completed state.
+
+    Attributes:
+        key: Fingerprint of the run's command, target, database and
+            migration scripts; only a run with the same key may resume.
+        state: State that runs next (None once the run finished).
+        completed: States completed so far, in order.
+        outputs: Action outputs set so far (text values).
+        sql_outputs: Outputs whose value is the SQL preview.
+        sql_preview: SQL preview file in the snapshot directory, if any.
+        safety_report: Serialized safety report, if any.
+        updated_at: When the snapshot was written (UTC, ISO 8601).
+    """
+
+    key: str
+    state: str | None
+    completed: list[str] = field(default_factory=list)
+    outputs: dict[str, str] = field(default_factory=dict)
+    sql_outputs: list[str] = field(default_factory=list)
+    sql_preview: str | None = None
+    safety_report: dict[str, Any] | None = None
+    updated_at: str = ""
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to JSON-compatible data."""
+        return {"format": SNAPSHOT_FORMAT_VERSION, **asdict(self)}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Snapshot:
+        """Deserialize data written by :meth:`to_dict`."""
+        return cls(**{key: value for key, value in data.items() if key != "format"})
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class SnapshotStore:
+    """Saves the action context after every state and restores it on resume.
+
+    The snapshot keeps what is expensive to recompute or must be published
+    again: the outputs, the rendered SQL preview (as a file next to the
+    snapshot) and the safety report. Database state such as the current
+    revision is not kept; a resumed run reads it again.
+    """
+
+    def __init__(
+        self, config: ActionConfig, directory: str | Path = DEFAULT_STATE_SNAPSHOT_DIR
+    ):
+        """Initialize store.
+
+        Args:
+            config: Configuration of the run.
+            directory: Directory holding the snapshot and SQL preview.
+        """
+        self.config = config
+        self.directory = Path(directory)
+        self.completed: list[str] = []
+        # Preview last written to disk; holding it keeps identity checks sound
+        self._sql_written: SQLText | None = None
+
+    @property
+    def path(self) -> Path:
+        """Snapshot file."""
+        return self.directory / SNAPSHOT_FILE
+
+    @cached_property
+    def key(self) -> str:
+        """Fingerprint of everything a snapshot's contents depend on."""
+        config = self.config
+        index = RevisionIndex.from_config(config.alembic_config_path)
+        with open(config.alembic_config_path, "rb") as f:
+            ini_hash = hashlib.sha256(f.read()).hexdigest()
+        payload = {
+            "format": SNAPSHOT_FORMAT_VERSION,
+            "database": environment_name(config.database_url),
+            "command": config.command,
+            "revision": config.revision,
+            "dry_run": config.dry_run,
+            "analyze_safety": config.analyze_safety,
+            "ini": ini_hash,
+            "revisions": {e.revision: e.content_hash for e in index.entries},
+        }
+        encoded = json.dumps(payload, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def save(
+        self, state_name: str, next_state: str | None, context: ActionContext
+    ) -> None:
+        """Write the context after ``state_name`` exits.
+
+        Args:
+            state_name: State that just completed.
+            next_state: State that runs next (None when the run is over).
+            context: Context to save.
+        """
+        self.completed.append(state_name)
+        sql = context.sql_preview
+        snapshot = Snapshot(
+            key=self.key,
+            state=next_state,
+            completed=list(self.completed),
+            outputs={k: v for k, v in context.outputs.items() if isinstance(v, str)},
+            sql_outputs=[
+                k
+                for k, v in context.outputs.items()
+                if not isinstance(v, str) and v is sql
+            ],
+            sql_preview=SQL_PREVIEW_FILE if sql else None,
+            safety_report=(
+                context.safety_report.to_dict()
+                if context.safety_report is not None
+                else None
+            ),
+            updated_at=datetime.now(UTC).isoformat(timespec="seconds"),
+        )
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if sql and sql is not self._sql_written:
+            self._write(self.directory / SQL_PREVIEW_FILE, iter_text(sql))
+            self._sql_written = sql
+        self._write(self.path, [json.dumps(snapshot.to_dict(), indent=2)])
+
+    def load(self) -> Snapshot | None:
+        """Read the snapshot of an unfinished run with the same key.
+
+        Returns:
+            The snapshot, or None when there is none to resume.
+        """
+        try:
+            data = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable state snapshot {self.path}: {e}")
+            return None
+        if data.get("format") != SNAPSHOT_FORMAT_VERSION:
+            return None
+        try:
+            snapshot = Snapshot.from_dict(data)
+        except TypeError as e:
+            logger.warning(f"Ignoring malformed state snapshot {self.path}: {e}")
+            return None
+        if snapshot.key != self.key:
+            logger.warning(
+                "State snapshot is for another target, database or set of "
+                "migrations; starting over"
+            )
+            return None
+        if snapshot.state is None:
+            return None
+        return snapshot
+
+    def restore(self, snapshot: Snapshot, context: ActionContext) -> None:
+        """Load a snapshot into the context and publish its outputs again.
+
+        Args:
+            snapshot: Snapshot returned by :meth:`load`.
+            context: Context of the resumed run.
+        """
+        self.completed = list(snapshot.completed)
+        if snapshot.safety_report is not None:
+            context.safety_report = SafetyReport.from_dict(snapshot.safety_report)
+        if snapshot.sql_preview:
+            path = self.directory / snapshot.sql_preview
+            context.sql_preview = CommandOutput(file=open(path, "rb"))  # noqa: SIM115
+            self._sql_written = context.sql_preview
+        for key, value in snapshot.outputs.items():
+            context.set_output(key, value)
+        for key in snapshot.sql_outputs:
+            context.set_output(key, context.sql_preview)
+        logger.info(
+            f"Restored state snapshot after {', '.join(snapshot.completed)}; "
+            f"resuming at {snapshot.state}"
+        )
+
+    @staticmethod
+    def _write(path: Path, chunks: Iterable[str]) -> None:
+        """Write text chunks to a file atomically."""
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp, path)
@@ -0,0 +1,219 @@
+"""Bounded, spill-to-disk buffers for large command output."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import codecs
+import mmap
+import tempfile
+from collections.abc import Callable, Iterator
+from typing import IO
+
+# Project/Local
+from src.constants import DEFAULT_CHUNK_SIZE, DEFAULT_SPOOL_MEMORY_BYTES
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+ENCODING = "utf-8"
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class CommandOutput:
+    """Read-only handle over captured command output.
+
+    Small outputs stay in memory. Spilled outputs live in an anonymous
+    temporary file that is memory-mapped on first read, so consumers iterate
+    over chunks without ever holding the whole text as one ``str``.
+    """
+
+    def __init__(self, data: bytes = b"", file: IO[bytes] | None = None):
+        """Initialize handle.
+
+        Args:
+            data: In-memory content (when not spilled).
+            file: Temporary file holding the content (when spilled).
+        """
+        self._data = data
+        self._file = file
+        self._map: mmap.mmap | None = None
+        self.size = len(data)
+        if file is not None:
+            file.seek(0, 2)
+            self.size = file.tell()
+
+    @classmethod
+    def from_text(cls, text: str) -> CommandOutput:
+        """Wrap an existing string."""
+        return cls(text.encode(ENCODING))
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the content was written to disk."""
+        return self._file is not None
+
+    def __len__(self) -> int:
+        """Size of the content in bytes."""
+        return self.size
+
+    def __bool__(self) -> bool:
+        """True when any output was captured."""
+        return self.size > 0
+
+    def __str__(self) -> str:
+        """Decode the whole content. Prefer :meth:`iter_chunks` for large output."""
+        return self.text()
+
+    def text(self) -> str:
+        """Decode the whole content into a single string."""
+        return bytes(self._buffer()).decode(ENCODING, errors="replace")
+
+    def iter_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        """Yield the content as decoded text chunks.
+
+        Args:
+            chunk_size: Approximate chunk size in bytes.
+        """
+        buffer = self._buffer()
+        decoder = codecs.getincrementaldecoder(ENCODING)(errors="replace")
+        for start in range(0, self.size, chunk_size):
+            chunk = decoder.decode(buffer[start : start + chunk_size])
+            if chunk:
+                yield chunk
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield the content line by line, keeping line endings."""
+        pending = ""
+        for chunk in self.iter_chunks():
+            lines = (pending + chunk).splitlines(keepends=True)
+            pending = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+            yield from lines
+        if pending:
+            yield pending
+
+    def close(self) -> None:
+        """Release the memory map and delete the temporary file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._data = b""
+            self.size = 0
+
+    def _buffer(self) -> bytes | mmap.mmap:
+        """Return the raw content, mapping the spill file lazily."""
+        if self._file is None:
+            return self._data
+        if self._map is None:
+            self._file.flush()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+
+class SpooledOutput:
+    """Text sink keeping up to ``max_memory`` bytes in memory, then spilling.
+
+    Implements the subset of ``TextIO`` Alembic writes to, so it can be used
+    as ``Config.stdout`` / ``Config.output_buffer`` as well as for subprocess
+    output.
+
+    An optional ``on_chunk`` callback receives the text as it is written,
+    batched into chunks of about ``chunk_size`` characters, so consumers can
+    process output while the command is still producing it.
+    """
+
+    encoding = ENCODING
+
+    def __init__(
+        self,
+        max_memory: int = DEFAULT_SPOOL_MEMORY_BYTES,
+        on_chunk: Callable[[str], None] | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """Initialize sink.
+
+        Args:
+            max_memory: Bytes kept in memory before spilling to a temp file.
+            on_chunk: Callback receiving written text in batches.
+            chunk_size: Approximate batch size, in characters.
+        """
+        self.max_memory = max_memory
+        self.on_chunk = on_chunk
+        self.chunk_size = chunk_size
+        self._memory = bytearray()
+        self._file: IO[bytes] | None = None
+        self._batch: list[str] = []
+        self._batch_size = 0
+
+    def write(self, text: str) -> int:
+        """Append text."""
+        if self.on_chunk is not None:
+            self._batch.append(text)
+            self._batch_size += len(text)
+            if self._batch_size >= self.chunk_size:
+                self._emit()
+
+        data = text.encode(ENCODING)
+        if self._file is None and len(self._memory) + len(data) > self.max_memory:
+            # Lifetime is owned by the CommandOutput returned from finish()
+            self._file = tempfile.TemporaryFile(prefix="alembic-deploy-")  # noqa: SIM115
+            self._file.write(self._memory)
+            self._memory = bytearray()
+        if self._file is not None:
+            self._file.write(data)
+        else:
+            self._memory += data
+        return len(text)
+
+    def flush(self) -> None:
+        """Flush the spill file, if any."""
+        if self._file is not None:
+            self._file.flush()
+
+    def finish(self) -> CommandOutput:
+        """Close the sink for writing and return a read handle."""
+        self._emit()
+        self.flush()
+        if self._file is not None:
+            return CommandOutput(file=self._file)
+        return CommandOutput(bytes(self._memory))
+
+    def discard(self) -> None:
+        """Drop the output of a failed command, closing any spill file."""
+        self._batch = []
+        self._memory = bytearray()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _emit(self) -> None:
+        """Hand the batched text to ``on_chunk``."""
+        if self.on_chunk is not None and self._batch:
+            chunk = "".join(self._batch)
+            self._batch = []
+            self._batch_size = 0
+            self.on_chunk(chunk)
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+SQLText = str | CommandOutput
+
+
+def iter_text(value: SQLText, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Yield text chunks from either a string or a :class:`CommandOutput`."""
+    if isinstance(value, CommandOutput):
+        yield from value.iter_chunks(chunk_size)
+    elif value:
+        yield value
@@ -0,0 +1,278 @@
+"""Per-statement timing of online migrations."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import hashlib
+import json
+import os
+import re
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+# Third Party
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+# Project/Local
+from src.constants import (
+    DEFAULT_STATEMENT_TIMINGS_PATH,
+    DEFAULT_STATEMENT_TIMINGS_TOP,
+    DEFAULT_VERSION_TABLE,
+    GITHUB_STEP_SUMMARY,
+    INTERNAL_CONNECTION_KEY,
+    OUTPUT_SLOWEST_STATEMENTS,
+    OUTPUT_STATEMENT_TIMINGS_PATH,
+    REGEX_FINGERPRINT_IN_LIST,
+    REGEX_FINGERPRINT_LITERAL,
+    REGEX_FINGERPRINT_WHITESPACE,
+    REGEX_VERSION_LITERAL,
+    REGEX_VERSION_WRITE,
+)
+from src.logger import setup_logger
+
+if TYPE_CHECKING:
+    from src.states import ActionContext
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+FINGERPRINT_LITERAL_PATTERN = re.compile(REGEX_FINGERPRINT_LITERAL)
+FINGERPRINT_IN_LIST_PATTERN = re.compile(REGEX_FINGERPRINT_IN_LIST, re.IGNORECASE)
+FINGERPRINT_WHITESPACE_PATTERN = re.compile(REGEX_FINGERPRINT_WHITESPACE)
+VERSION_WRITE_PATTERN = re.compile(REGEX_VERSION_WRITE, re.IGNORECASE)
+VERSION_LITERAL_PATTERN = re.compile(REGEX_VERSION_LITERAL)
+
+# Characters of normalized SQL kept in reports
+MAX_SQL_LENGTH = 500
+
+START_KEY = "statement_timing_start"
+
+
+@dataclass(frozen=True)
+class StatementTiming:
+    """One executed statement.
+
+    Attributes:
+        revision: Revision whose migration step ran the statement (empty if
+            the step did not complete).
+        fingerprint: Hash of the normalized statement.
+        sql: Normalized statement (literals replaced by ``?``), truncated.
+        duration_ms: Execution time in milliseconds.
+        rowcount: Rows affected, when the driver reports it.
+    """
+
+    revision: str
+    fingerprint: str
+    sql: str
+    duration_ms: float
+    rowcount: int | None
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class StatementRecorder:
+    """Times every statement Alembic executes in this process.
+
+    Listens to SQLAlchemy ``before_cursor_execute`` / ``after_cursor_execute``
+    on all engines, including the one ``env.py`` creates, so it only sees
+    statements of the in-process runner. Statements are attributed to a
+    revision when Alembic writes that revision to the version table, which
+    it does at the end of each migration step.
+    """
+
+    def __init__(
+        self,
+        version_table: str = DEFAULT_VERSION_TABLE,
+        top: int = DEFAULT_STATEMENT_TIMINGS_TOP,
+    ):
+        """Initialize recorder.
+
+        Args:
+            version_table: Name of the Alembic version table.
+            top: Statements listed in the slowest-statements report.
+        """
+        self.version_table = version_table
+        self.top = top
+        self.timings: list[StatementTiming] = []
+        self._step: list[tuple[str, float, int | None]] = []
+
+    @contextmanager
+    def recording(self) -> Iterator[None]:
+        """Record statements executed inside the block."""
+        event.listen(Engine, "before_cursor_execute", self._before_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_execute)
+        try:
+            yield
+        finally:
+            event.remove(Engine, "before_cursor_execute", self._before_execute)
+            event.remove(Engine, "after_cursor_execute", self._after_execute)
+            # Statements of a step that failed before its version write
+            self._close_step("")
+
+    def slowest(self) -> list[StatementTiming]:
+        """The ``top`` slowest statements, slowest first."""
+        ranked = sorted(self.timings, key=lambda t: t.duration_ms, reverse=True)
+        return ranked[: self.top]
+
+    def revision_totals(self) -> dict[str, float]:
+        """Total statement time per revision, in milliseconds."""
+        totals: dict[str, float] = {}
+        for timing in self.timings:
+            totals[timing.revision] = totals.get(timing.revision, 0.0) + (
+                timing.duration_ms
+            )
+        return {rev: round(ms, 3) for rev, ms in totals.items()}
+
+    def publish(
+        self, context: ActionContext, path: str | Path = DEFAULT_STATEMENT_TIMINGS_PATH
+    ) -> None:
+        """Write the full JSON report and publish the slowest statements.
+
+        Args:
+            context: Context used to set outputs.
+            path: JSON file receiving every timing.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(
+                {
+                    "revisions": self.revision_totals(),
+                    "statements": [asdict(t) for t in self.timings],
+                },
+                indent=2,
+            )
+        )
+
+        slowest = self.slowest()
+        logger.info(f"Timed {len(self.timings)} statement(s); slowest:")
+        for timing in slowest:
+            logger.info(
+                f"  {timing.duration_ms:10.1f} ms  [{timing.revision or '?'}] "
+                f"{timing.sql[:120]}"
+            )
+        context.set_output(OUTPUT_STATEMENT_TIMINGS_PATH, str(path))
+        context.set_output(
+            OUTPUT_SLOWEST_STATEMENTS, json.dumps([asdict(t) for t in slowest])
+        )
+
+        summary_path = os.getenv(GITHUB_STEP_SUMMARY)
+        if summary_path:
+            with open(summary_path, "a") as f:
+                f.write(self.format_summary())
+
+    def format_summary(self) -> str:
+        """Render the slowest statements as a Markdown table."""
+        lines = [
+            "| Duration (ms) | Revision | Rows | Statement |",
+            "|---:|---|---:|---|",
+        ]
+        for t in self.slowest():
+            sql = t.sql[:120].replace("|", "\\|")
+            rows = "" if t.rowcount is None else str(t.rowcount)
+            lines.append(
+                f"| {t.duration_ms:.1f} | {t.revision or '?'} | {rows} | `{sql}` |"
+            )
+        return "\n".join(lines) + "\n"
+
+    def _before_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        """Note the start time."""
+        if conn.info.get(INTERNAL_CONNECTION_KEY):
+            return
+        conn.info.setdefault(START_KEY, []).append(time.perf_counter())
+
+    def _after_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        """Record the statement and attribute finished steps to a revision."""
+        if conn.info.get(INTERNAL_CONNECTION_KEY):
+            return
+        starts = conn.info.get(START_KEY)
+        if not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+        rowcount = cursor.rowcount if (cursor.rowcount or 0) >= 0 else None
+        self._step.append((statement, duration_ms, rowcount))
+
+        revision = version_write_revision(statement, self.version_table)
+        if revision is not None:
+            self._close_step(revision)
+
+    def _close_step(self, revision: str) -> None:
+        """Attribute the statements of the current step to ``revision``."""
+        for statement, duration_ms, rowcount in self._step:
+            normalized = fingerprint_sql(statement)
+            self.timings.append(
+                StatementTiming(
+                    revision=revision,
+                    fingerprint=hashlib.sha1(normalized.encode()).hexdigest()[:16],
+                    sql=normalized[:MAX_SQL_LENGTH],
+                    duration_ms=round(duration_ms, 3),
+                    rowcount=rowcount,
+                )
+            )
+        self._step = []
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def fingerprint_sql(statement: str) -> str:
+    """Normalize a statement so runs differing only in literals compare equal.
+
+    String and numeric literals become ``?``, ``IN`` lists collapse to
+    ``IN (?+)`` and whitespace is collapsed.
+    """
+    normalized = FINGERPRINT_LITERAL_PATTERN.sub("?", statement)
+    normalized = FINGERPRINT_IN_LIST_PATTERN.sub("IN (?+)", normalized)
+    return FINGERPRINT_WHITESPACE_PATTERN.sub(" ", normalized).strip()
+
+
+def version_write_revision(statement: str, version_table: str) -> str | None:
+    """Revision written by an Alembic version table statement.
+
+    Alembic ends each migration step with an ``INSERT``, ``UPDATE`` or
+    ``DELETE`` on the version table carrying the revision as a literal.
+
+    Args:
+        statement: Executed SQL.
+        version_table: Name of the Alembic version table.
+
+    Returns:
+        The revision (empty if it cannot be read), or None when the
+        statement is not a version table write.
+    """
+    if version_table.lower() not in statement.lower():
+        return None
+    if not VERSION_WRITE_PATTERN.match(statement):
+        return None
+    literal = VERSION_LITERAL_PATTERN.search(statement)
+    return literal.group(1) if literal is not None else ""
@@ -7,26 +7,48 @@ from __future__ import annotations
 # =============================================================================
 # Standard Library
 import os
+import threading
 from dataclasses import dataclass, field
 
 # Project/Local
-from src.alembic_ops import AlembicRunner
+from src.alembic_ops import InProcessAlembicRunner, RunnerType
+from src.checkpoint import RevisionCheckpointer
 from src.commands import (
+    ConnectCommand,
+    DeployLockCommand,
     DryRunCommand,
+    EstimateCommand,
     ExecutionCommand,
     InitCommand,
     SafetyCheckCommand,
+    SkipCommand,
 )
 from src.config import ActionConfig
+from src.constants import GITHUB_OUTPUT, OUTPUT_RESUMED_STATE
+from src.contention import ContentionMonitor
+from src.deploy_lock import DeployLock
+from src.durations import DurationLedger, StepTimer
+from src.lock_timeout import LockTimeoutGuard
 from src.logger import setup_logger
-from src.machine import State
-from src.safety import SafetyAnalyzer
+from src.machine import Fork, State, Transition
+from src.probe import RevisionProbe
+from src.render import ParallelRenderer
+from src.render_cache import RenderCache
+from src.revision_index import RevisionIndex
+from src.safety import SafetyAnalyzer, SafetyReport
+from src.session import DatabaseSession
+from src.spool import SQLText, iter_text
+from src.statement_timing import StatementRecorder
+from src.table_stats import SizeRiskScorer
 
 # =============================================================================
 # TYPES & CONSTANTS
 # =============================================================================
 logger = setup_logger(__name__)
 
+# Concurrent branches append to the same GITHUB_OUTPUT file
+_output_lock = threading.Lock()
+
 
 # =============================================================================
 # CONTEXT
@@ -36,23 +58,32 @@ class ActionContext:
     """Context shared between states."""
 
     config: ActionConfig
-    runner: AlembicRunner
+    runner: RunnerType
     analyzer: SafetyAnalyzer
-    outputs: dict[str, str] = field(default_factory=dict)
-    sql_preview: str = ""
+    outputs: dict[str, SQLText] = field(default_factory=dict)
+    sql_preview: SQLText = ""
+    session: DatabaseSession | None = None
+    probe: RevisionProbe | None = None
+    current_revisions: tuple[str, ...] = ()
+    up_to_date: bool = False
+    revision_index: RevisionIndex | None = None
+    pending_revisions: list[str] | None = None
+    safety_report: SafetyReport | None = None
+    renderer: ParallelRenderer | None = None
+    render_cache: RenderCache | None = None
+    statement_recorder: StatementRecorder | None = None
+    duration_ledger: DurationLedger | None = None
+    step_timer: StepTimer | None = None
+    risk_scorer: SizeRiskScorer | None = None
+    lock_guard: LockTimeoutGuard | None = None
+    contention_monitor: ContentionMonitor | None = None
+    deploy_lock: DeployLock | None = None
+    checkpointer: RevisionCheckpointer | None = None
 
-    def set_output(self, key: str, value: str) -> None:
+    def set_output(self, key: str, value: SQLText) -> None:
         """Set a GitHub Action output."""
         self.outputs[key] = value
-        github_output = os.getenv("GITHUB_OUTPUT")
-        if github_output:
-            with open(github_output, "a") as f:
-                if "\n" in value:
-                    f.write(f"{key}<<EOF\n{value}\nEOF\n")
-                else:
-                    f.write(f"{key}={value}\n")
-        else:
-            logger.info(f"[OUTPUT] {key}={value}")
+        write_output(key, value)
 
 
 # =============================================================================
@@ -61,21 +92,92 @@ class ActionContext:
 class InitState(State[ActionContext]):
     """Initialization state. Checks connection and setup."""
 
-    def handle(self, context: ActionContext) -> State[ActionContext] | None:
-        """Initialize and validate environment."""
+    def handle(self, context: ActionContext) -> Transition[ActionContext]:
+        """Initialize and validate environment.
+
+        A dry run that can render while the revision is read forks into
+        both and joins at the estimate.
+        """
+        if _renders_concurrently(context):
+            return Fork((RevisionState(), RenderState()), join=EstimateState())
+
+        ConnectCommand().execute(context)
+        # Before reading the revision: a run that waited sees its predecessor's
+        # migrations
+        DeployLockCommand().execute(context)
         InitCommand().execute(context)
 
         if context.config.dry_run:
             return DryRunState()
+        if context.up_to_date:
+            return SkipState()
         return ExecutionState()
 
 
+class ResumeState(State[ActionContext]):
+    """Entry state of a run resumed from a snapshot."""
+
+    def __init__(self, state: State[ActionContext]):
+        """Initialize state.
+
+        Args:
+            state: Last incomplete state of the interrupted run.
+        """
+        self.state = state
+
+    def handle(self, context: ActionContext) -> State[ActionContext] | None:
+        """Reconnect and re-read the revision, then continue at the snapshot."""
+        ConnectCommand().execute(context)
+        DeployLockCommand().execute(context)
+        # The interrupted run may have migrated before it could save
+        InitCommand().execute(context)
+        context.set_output(OUTPUT_RESUMED_STATE, self.state.__class__.__name__)
+
+        if isinstance(self.state, ExecutionState) and context.up_to_date:
+            return SkipState()
+        return self.state
+
+
 class DryRunState(State[ActionContext]):
     """Handle Dry-Run execution."""
 
     def handle(self, context: ActionContext) -> State[ActionContext] | None:
-        """Generate SQL and perform safety analysis."""
+        """Generate SQL, estimate its duration and perform safety analysis."""
+        DryRunCommand().execute(context)
+        EstimateCommand().execute(context)
+
+        if context.config.analyze_safety:
+            return SafetyCheckState()
+
+        return None
+
+
+class RevisionState(State[ActionContext]):
+    """Dry-run branch reading the current and pending revisions."""
+
+    def handle(self, context: ActionContext) -> State[ActionContext] | None:
+        """Connect and read the current revision."""
+        ConnectCommand().execute(context)
+        DeployLockCommand().execute(context)
+        InitCommand().execute(context)
+        return None
+
+
+class RenderState(State[ActionContext]):
+    """Dry-run branch rendering the SQL preview."""
+
+    def handle(self, context: ActionContext) -> State[ActionContext] | None:
+        """Generate SQL (and the safety report while it streams)."""
         DryRunCommand().execute(context)
+        return None
+
+
+class EstimateState(State[ActionContext]):
+    """Join of the dry-run branches."""
+
+    def handle(self, context: ActionContext) -> State[ActionContext] | None:
+        """Estimate the pending range's duration."""
+        EstimateCommand().execute(context)
 
         if context.config.analyze_safety:
             return SafetyCheckState()
@@ -92,6 +194,15 @@ class SafetyCheckState(State[ActionContext]):
         return None
 
 
+class SkipState(State[ActionContext]):
+    """Terminal state when the database is already at the target revision."""
+
+    def handle(self, context: ActionContext) -> State[ActionContext] | None:
+        """Report skipped status."""
+        SkipCommand().execute(context)
+        return None
+
+
 class ExecutionState(State[ActionContext]):
     """Execute the actual Alembic command."""
 
@@ -99,3 +210,66 @@ class ExecutionState(State[ActionContext]):
         """Run the configured command."""
         ExecutionCommand().execute(context)
         return None
+
+
+# States a snapshot can resume at, by name
+RESUMABLE_STATES: dict[str, type[State[ActionContext]]] = {
+    state.__name__: state
+    for state in (
+        DryRunState,
+        EstimateState,
+        SafetyCheckState,
+        SkipState,
+        ExecutionState,
+    )
+}
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def write_output(key: str, value: SQLText) -> None:
+    """Write a GitHub Action output.
+
+    Large values (``CommandOutput``) are copied to the output file chunk
+    by chunk instead of being materialized as one string.
+    """
+    with _output_lock:
+        _write_output(key, value)
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _renders_concurrently(context: ActionContext) -> bool:
+    """Whether a dry run can render SQL while the revision is read.
+
+    The full render starts from base, so it does not need the current
+    revision; slices of a parallel render do, and stay serial. An
+    in-process runner keeps Alembic's global state and the shared
+    connection to itself, so the revision must then come from the probe.
+    """
+    if not context.config.dry_run or context.renderer is not None:
+        return False
+    if isinstance(context.runner, InProcessAlembicRunner):
+        return context.probe is not None and context.runner.session is None
+    return True
+
+
+def _write_output(key: str, value: SQLText) -> None:
+    """Write an output to ``GITHUB_OUTPUT`` or the log."""
+    github_output = os.getenv(GITHUB_OUTPUT)
+    if isinstance(value, str) and "\n" not in value:
+        if github_output:
+            with open(github_output, "a") as f:
+                f.write(f"{key}={value}\n")
+        else:
+            logger.info(f"[OUTPUT] {key}={value}")
+    elif github_output:
+        with open(github_output, "a") as f:
+            f.write(f"{key}<<EOF\n")
+            for chunk in iter_text(value):
+                f.write(chunk)
+            f.write("\nEOF\n")
+    else:
+        logger.info(f"[OUTPUT] {key}={value}")
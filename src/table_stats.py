@@ -0,0 +1,498 @@
+"""Table size statistics and size-aware risk scoring of safety reports."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import json
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol
+
+# Third Party
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+
+# Project/Local
+from src.constants import (
+    DEFAULT_LARGE_TABLE_BYTES,
+    DEFAULT_LARGE_TABLE_ROWS,
+    DEFAULT_SMALL_TABLE_ROWS,
+)
+from src.durations import environment_name
+from src.logger import setup_logger
+from src.safety import (
+    LEVEL_ORDER,
+    RULE_ALTER_COLUMN_TYPE,
+    RULE_DROP_COLUMN,
+    RULES,
+    DangerLevel,
+    SafetyReport,
+    flagged_tables,
+    split_identifier,
+)
+
+if TYPE_CHECKING:
+    from src.session import DatabaseSession
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+DIALECT_POSTGRESQL = "postgresql"
+DIALECT_MYSQL = "mysql"
+DIALECT_MARIADB = "mariadb"
+DIALECT_SQLITE = "sqlite"
+
+# Bump when the snapshot layout changes
+SNAPSHOT_FORMAT_VERSION = 1
+SYSTEM_SCHEMAS = frozenset(
+    {"information_schema", "mysql", "performance_schema", "sys", "pg_catalog"}
+)
+
+# Rules whose cost grows with the table (rewrites and long locks); the
+# others are already rated by what they destroy
+SCALED_RULES = (RULE_DROP_COLUMN.name, RULE_ALTER_COLUMN_TYPE.name)
+RULES_BY_MESSAGE = {rule.message: rule for rule in RULES}
+
+POSTGRESQL_STATS_SQL = text(
+    "SELECT reltuples::bigint, pg_total_relation_size(oid) "
+    "FROM pg_class WHERE oid = to_regclass(:name)"
+)
+MYSQL_STATS_SQL = text(
+    "SELECT table_rows, data_length + index_length "
+    "FROM information_schema.tables "
+    "WHERE table_schema = COALESCE(:schema, DATABASE()) AND table_name = :name"
+)
+SQLITE_EXISTS_SQL = text(
+    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+)
+SQLITE_SIZE_SQL = text("SELECT SUM(pgsize) FROM dbstat WHERE name = :name")
+
+
+@dataclass(frozen=True)
+class TableStats:
+    """Size estimate of one table.
+
+    Attributes:
+        name: Table name as written in the migration.
+        rows: Estimated row count, if known.
+        bytes: Total size including indexes and TOAST, if known.
+        indexes: Index names, when known (snapshots only).
+    """
+
+    name: str
+    rows: int | None
+    bytes: int | None
+    indexes: tuple[str, ...] = ()
+
+    def describe(self) -> str:
+        """Short human-readable size, e.g. ``events: ~2.0B rows, 310.4 GB``."""
+        parts = []
+        if self.rows is not None:
+            parts.append(f"~{_format_count(self.rows)} rows")
+        if self.bytes is not None:
+            parts.append(_format_bytes(self.bytes))
+        if self.indexes:
+            parts.append(f"{len(self.indexes)} index(es)")
+        return f"{self.name}: {', '.join(parts) or 'size unknown'}"
+
+
+class StatsSource(Protocol):
+    """Provides size estimates for tables."""
+
+    def lookup(self, tables: list[str]) -> dict[str, TableStats]: ...
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class CatalogStats:
+    """Reads size estimates from the live database catalog.
+
+    PostgreSQL uses ``pg_class.reltuples`` and ``pg_total_relation_size``,
+    MySQL / MariaDB ``information_schema.tables`` and SQLite an exact count
+    plus the ``dbstat`` virtual table. Only catalog reads are issued (and a
+    ``COUNT(*)`` on SQLite, whose databases are local).
+    """
+
+    def __init__(self, database_url: str, session: DatabaseSession | None = None):
+        """Initialize catalog statistics.
+
+        Args:
+            database_url: URL of the database the migration targets.
+            session: Shared session to query on instead of a new connection.
+        """
+        self.database_url = database_url
+        self.session = session
+
+    def lookup(self, tables: list[str]) -> dict[str, TableStats]:
+        """Estimate the size of existing tables.
+
+        Args:
+            tables: Table names as written in the SQL.
+
+        Returns:
+            Statistics of the tables found; missing tables are left out.
+        """
+        if not tables:
+            return {}
+        try:
+            if self.session is not None:
+                try:
+                    return self._lookup(self.session.open(), tables)
+                finally:
+                    self.session.rollback()
+            engine = create_engine(self.database_url)
+            try:
+                with engine.connect() as connection:
+                    return self._lookup(connection, tables)
+            finally:
+                engine.dispose()
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not read table statistics: {e}")
+            return {}
+
+    def _lookup(
+        self, connection: Connection, tables: list[str]
+    ) -> dict[str, TableStats]:
+        """Query each table on an open connection."""
+        dialect = connection.dialect.name
+        query = {
+            DIALECT_POSTGRESQL: _postgresql_stats,
+            DIALECT_MYSQL: _mysql_stats,
+            DIALECT_MARIADB: _mysql_stats,
+            DIALECT_SQLITE: _sqlite_stats,
+        }.get(dialect)
+        if query is None:
+            logger.warning(f"Table statistics are not supported on {dialect}")
+            return {}
+
+        found = {}
+        for name in tables:
+            stats = query(connection, name)
+            if stats is not None:
+                found[name] = stats
+        return found
+
+
+class SnapshotStats:
+    """Reads size estimates from a snapshot written by :func:`export_snapshot`.
+
+    Lets dry runs against a throwaway database score warnings with the
+    sizes of production tables, without connecting to production.
+    """
+
+    def __init__(self, path: str | Path):
+        """Initialize snapshot statistics.
+
+        Args:
+            path: Snapshot JSON file.
+
+        Raises:
+            ValueError: If the file is not a snapshot of a supported format.
+        """
+        self.path = Path(path)
+        data = json.loads(self.path.read_text())
+        if data.get("format") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported statistics snapshot format: {self.path}")
+        self.dialect: str = data.get("dialect", "")
+        self.default_schema: str | None = data.get("default_schema")
+        self._tables: dict[str, list[dict[str, Any]]] = {}
+        for table in data.get("tables", []):
+            self._tables.setdefault(table["name"].lower(), []).append(table)
+        logger.info(
+            f"Loaded statistics of {len(data.get('tables', []))} table(s) "
+            f"from {self.path} (taken {data.get('created_at', '?')})"
+        )
+
+    def lookup(self, tables: list[str]) -> dict[str, TableStats]:
+        """Estimate the size of tables present in the snapshot.
+
+        Args:
+            tables: Table names as written in the SQL.
+
+        Returns:
+            Statistics of the tables found; missing tables are left out.
+        """
+        found = {}
+        for name in tables:
+            entry = self._find(split_identifier(name))
+            if entry is not None:
+                found[name] = TableStats(
+                    name,
+                    entry.get("rows"),
+                    entry.get("bytes"),
+                    tuple(entry.get("indexes", ())),
+                )
+        return found
+
+    def _find(self, parts: list[str]) -> dict[str, Any] | None:
+        """Snapshot entry of a (possibly schema-qualified) table name."""
+        if not parts:
+            return None
+        candidates = self._tables.get(parts[-1].lower(), [])
+        schema = parts[-2] if len(parts) > 1 else self.default_schema
+        # Exact spelling first, then case-insensitive (unquoted names fold)
+        for exact in (True, False):
+            for entry in candidates:
+                if _same(entry["name"], parts[-1], exact) and (
+                    schema is None or _same(entry.get("schema"), schema, exact)
+                ):
+                    return entry
+        if len(parts) == 1 and len(candidates) == 1:
+            return candidates[0]
+        return None
+
+
+class SizeRiskScorer:
+    """Rescales safety warnings by the size of the tables they touch.
+
+    A column drop or type change on a large table (by rows or bytes) is
+    raised to HIGH, since it rewrites or locks the table for long; on tables
+    known to be small it is lowered to LOW. Every warning whose tables were
+    found is annotated with their size.
+    """
+
+    def __init__(
+        self,
+        stats: StatsSource,
+        small_rows: int = DEFAULT_SMALL_TABLE_ROWS,
+        large_rows: int = DEFAULT_LARGE_TABLE_ROWS,
+        large_bytes: int = DEFAULT_LARGE_TABLE_BYTES,
+        dialect: str = "",
+    ):
+        """Initialize scorer.
+
+        Args:
+            stats: Source of table size estimates.
+            small_rows: Row count up to which a table is small.
+            large_rows: Row count from which a table is large.
+            large_bytes: Total size from which a table is large.
+            dialect: Database backend the SQL targets.
+        """
+        self.stats = stats
+        self.small_rows = small_rows
+        self.large_rows = large_rows
+        self.large_bytes = large_bytes
+        self.dialect = dialect
+
+    def score(self, report: SafetyReport, chunks: Iterable[str]) -> SafetyReport:
+        """Rescale a report using the sizes of the tables in its SQL.
+
+        Args:
+            report: Report of the SQL.
+            chunks: SQL text chunks the report was produced from.
+
+        Returns:
+            Report with adjusted level and size-annotated warnings.
+        """
+        if not report.warnings:
+            return report
+        targets = flagged_tables(chunks, report.warnings, self.dialect)
+        names = list(dict.fromkeys(n for tables in targets.values() for n in tables))
+        stats = self.stats.lookup(names)
+
+        warnings: list[str] = []
+        attribution: dict[str, tuple[str, ...]] = {}
+        levels: list[DangerLevel] = []
+        for warning in report.warnings:
+            rule = RULES_BY_MESSAGE.get(warning)
+            found = [stats[n] for n in targets.get(warning, []) if n in stats]
+            level = rule.level if rule is not None else report.danger_level
+            if rule is not None and rule.name in SCALED_RULES and found:
+                level = self._scale(level, found, len(targets[warning]))
+            message = warning
+            if found:
+                message += " " + " ".join(f"[{s.describe()}]" for s in found)
+            warnings.append(message)
+            levels.append(level)
+            if warning in report.attribution:
+                attribution[message] = report.attribution[warning]
+
+        danger_level = max(levels, key=LEVEL_ORDER.index)
+        return SafetyReport(
+            is_safe=report.is_safe,
+            danger_level=danger_level,
+            warnings=warnings,
+            attribution=attribution,
+            locks=report.locks,
+        )
+
+    def _scale(
+        self, level: DangerLevel, found: list[TableStats], targeted: int
+    ) -> DangerLevel:
+        """Level of a rule given the sizes of the tables it touches."""
+        if any(self._is_large(s) for s in found):
+            return DangerLevel.HIGH
+        if len(found) == targeted and all(
+            s.rows is not None and s.rows <= self.small_rows for s in found
+        ):
+            return DangerLevel.LOW
+        return level
+
+    def _is_large(self, stats: TableStats) -> bool:
+        """Whether a table is large by rows or by bytes."""
+        return (stats.rows is not None and stats.rows >= self.large_rows) or (
+            stats.bytes is not None and stats.bytes >= self.large_bytes
+        )
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def export_snapshot(database_url: str, path: str | Path) -> int:
+    """Write the statistics of every table of a database to a JSON snapshot.
+
+    Covers all non-system schemas on PostgreSQL and the default schema
+    elsewhere. Only catalog reads are issued on PostgreSQL and MySQL.
+
+    Args:
+        database_url: URL of the database to snapshot (e.g. production).
+        path: Snapshot file to write.
+
+    Returns:
+        Number of tables in the snapshot.
+    """
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as connection:
+            tables = _snapshot_tables(connection)
+            dialect = connection.dialect.name
+            default_schema = inspect(connection).default_schema_name
+    finally:
+        engine.dispose()
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(
+        json.dumps(
+            {
+                "format": SNAPSHOT_FORMAT_VERSION,
+                "dialect": dialect,
+                "database": environment_name(database_url),
+                "default_schema": default_schema,
+                "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+                "tables": tables,
+            },
+            separators=(",", ":"),
+        )
+    )
+    os.replace(tmp, path)
+    logger.info(f"Wrote statistics of {len(tables)} table(s) to {path}")
+    return len(tables)
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _snapshot_tables(connection: Connection) -> list[dict[str, Any]]:
+    """Statistics and index names of every user table."""
+    dialect = connection.dialect.name
+    query = {
+        DIALECT_POSTGRESQL: _postgresql_stats,
+        DIALECT_MYSQL: _mysql_stats,
+        DIALECT_MARIADB: _mysql_stats,
+        DIALECT_SQLITE: _sqlite_stats,
+    }.get(dialect)
+    inspector = inspect(connection)
+    schemas = [inspector.default_schema_name]
+    if dialect == DIALECT_POSTGRESQL:
+        schemas = [s for s in inspector.get_schema_names() if s not in SYSTEM_SCHEMAS]
+
+    preparer = connection.dialect.identifier_preparer
+    tables = []
+    for schema in schemas:
+        for name in inspector.get_table_names(schema=schema):
+            qualified = preparer.quote(name)
+            if schema is not None:
+                qualified = f"{preparer.quote_schema(schema)}.{qualified}"
+            stats = query(connection, qualified) if query is not None else None
+            tables.append(
+                {
+                    "schema": schema,
+                    "name": name,
+                    "rows": stats.rows if stats is not None else None,
+                    "bytes": stats.bytes if stats is not None else None,
+                    "indexes": [
+                        index["name"]
+                        for index in inspector.get_indexes(name, schema=schema)
+                        if index.get("name")
+                    ],
+                }
+            )
+    return tables
+
+
+def _same(a: str | None, b: str, exact: bool) -> bool:
+    """Compare identifiers exactly or case-insensitively."""
+    if a is None:
+        return False
+    return a == b if exact else a.lower() == b.lower()
+
+
+def _postgresql_stats(connection: Connection, name: str) -> TableStats | None:
+    """Planner estimate and on-disk size of a PostgreSQL table."""
+    # to_regclass applies PostgreSQL's own quoting and search_path rules
+    row = connection.execute(POSTGRESQL_STATS_SQL, {"name": name}).first()
+    if row is None:
+        return None
+    rows, size = row
+    # reltuples is -1 for tables never vacuumed or analyzed
+    return TableStats(name, rows if rows >= 0 else None, size)
+
+
+def _mysql_stats(connection: Connection, name: str) -> TableStats | None:
+    """``information_schema`` estimate of a MySQL / MariaDB table."""
+    parts = split_identifier(name)
+    schema = parts[-2] if len(parts) > 1 else None
+    row = connection.execute(
+        MYSQL_STATS_SQL, {"schema": schema, "name": parts[-1]}
+    ).first()
+    if row is None:
+        return None
+    return TableStats(name, row[0], row[1])
+
+
+def _sqlite_stats(connection: Connection, name: str) -> TableStats | None:
+    """Exact row count and ``dbstat`` size of a SQLite table."""
+    table = split_identifier(name)[-1]
+    if connection.execute(SQLITE_EXISTS_SQL, {"name": table}).first() is None:
+        return None
+    quoted = connection.dialect.identifier_preparer.quote(table)
+    rows = connection.execute(text(f"SELECT COUNT(*) FROM {quoted}")).scalar()
+    try:
+        size = connection.execute(SQLITE_SIZE_SQL, {"name": table}).scalar()
+    except DBAPIError:
+        # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+        size = None
+    return TableStats(name, rows, size)
+
+
+def _format_count(count: int) -> str:
+    """Abbreviate a count: 950, 12.3K, 4.5M, 2.0B."""
+    for limit, suffix in ((10**9, "B"), (10**6, "M"), (10**3, "K")):
+        if count >= limit:
+            return f"{count / limit:.1f}{suffix}"
+    return str(count)
+
+
+def _format_bytes(size: int) -> str:
+    """Human-readable byte size in binary units."""
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
@@ -0,0 +1,397 @@
+"""Offline tracing: spans collected in memory and exported as OTLP-JSON."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Standard Library
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+# Third Party
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+# Project/Local
+from src.constants import (
+    DEFAULT_VERSION_TABLE,
+    ENV_TRACEPARENT,
+    REGEX_TRACEPARENT,
+    SERVICE_NAME,
+)
+from src.logger import setup_logger
+from src.statement_timing import version_write_revision
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+logger = setup_logger(__name__)
+
+# =============================================================================
+# TYPES & CONSTANTS
+# =============================================================================
+TRACEPARENT_PATTERN = re.compile(REGEX_TRACEPARENT)
+
+# OTLP enum values
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+# Longest statement text kept on a span
+MAX_STATEMENT_LENGTH = 2048
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_in_invocation: ContextVar[bool] = ContextVar("in_invocation", default=False)
+_active_tracer: Tracer | None = None
+
+
+@dataclass(eq=False)
+class Span:
+    """A timed operation.
+
+    Attributes:
+        name: Operation name.
+        trace_id: 32 hex digit trace ID.
+        span_id: 16 hex digit span ID.
+        parent_id: Span ID of the parent (empty for a root span).
+        start_ns: Start time, Unix nanoseconds.
+        end_ns: End time, Unix nanoseconds (0 while open).
+        attributes: Span attributes.
+        kind: OTLP span kind.
+        error: Error message when the operation failed.
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str = ""
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    kind: int = SPAN_KIND_INTERNAL
+    error: str | None = None
+    _parent: Span | None = field(default=None, repr=False)
+
+    def to_otlp(self) -> dict[str, Any]:
+        """Serialize to an OTLP-JSON span."""
+        span: dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items()],
+            "status": (
+                {"code": STATUS_CODE_ERROR, "message": self.error}
+                if self.error is not None
+                else {"code": STATUS_CODE_OK}
+            ),
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+# =============================================================================
+# CORE CLASSES
+# =============================================================================
+class Tracer:
+    """Collects spans of one run and writes them as OTLP-JSON.
+
+    Nothing is sent over the network: :meth:`export` appends one
+    ``ExportTraceServiceRequest`` per line to a file, which an OpenTelemetry
+    Collector ``otlpjsonfile`` receiver can pick up later. When a W3C
+    ``TRACEPARENT`` is given, every root span becomes its child, so the
+    deploy nests under the CI pipeline's trace.
+
+    :meth:`instrument` adds a span per SQL statement executed by any engine
+    in this process (including the one ``env.py`` creates in-process), and
+    groups the statements of each migration step under a revision span.
+    """
+
+    def __init__(
+        self,
+        traceparent: str | None = None,
+        version_table: str = DEFAULT_VERSION_TABLE,
+    ):
+        """Initialize tracer.
+
+        Args:
+            traceparent: W3C ``traceparent`` header of the parent span.
+            version_table: Name of the Alembic version table.
+        """
+        self.trace_id = secrets.token_hex(16)
+        self.parent_id = ""
+        match = TRACEPARENT_PATTERN.match(traceparent or "")
+        if match is not None:
+            self.trace_id, self.parent_id = match.group(1), match.group(2)
+        elif traceparent:
+            logger.warning(f"Ignoring malformed {ENV_TRACEPARENT}: {traceparent}")
+        self.version_table = version_table.lower()
+        self.spans: list[Span] = []
+        self._open: list[Span] = []
+        # States of concurrent branches open and close spans from threads
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls, version_table: str = DEFAULT_VERSION_TABLE) -> Tracer:
+        """Create a tracer continuing the trace in ``TRACEPARENT``, if set."""
+        return cls(os.getenv(ENV_TRACEPARENT), version_table)
+
+    # -------------------------------------------------------------------------
+    # Spans
+    # -------------------------------------------------------------------------
+    def start_span(
+        self,
+        name: str,
+        attributes: dict[str, Any] | None = None,
+        kind: int = SPAN_KIND_INTERNAL,
+    ) -> Span:
+        """Open a span as a child of the current one and make it current."""
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=self.trace_id,
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent is not None else self.parent_id,
+            attributes=dict(attributes or {}),
+            kind=kind,
+            _parent=parent,
+        )
+        with self._lock:
+            self._open.append(span)
+        _current_span.set(span)
+        return span
+
+    def end_span(self, span: Span, error: BaseException | None = None) -> None:
+        """Close a span, and any span still open beneath it.
+
+        Args:
+            span: Span to close.
+            error: Exception that ended the operation, if any.
+        """
+        with self._lock:
+            if span not in self._open:
+                return
+            for child in list(reversed(self._open)):
+                if child is not span and _descends_from(child, span):
+                    self.end_span(child, error)
+            span.end_ns = time.time_ns()
+            if error is not None:
+                span.error = f"{type(error).__name__}: {error}"
+            self._open.remove(span)
+            self.spans.append(span)
+        if _current_span.get() is span:
+            _current_span.set(span._parent)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Context manager around :meth:`start_span` / :meth:`end_span`."""
+        span = self.start_span(name, attributes)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, e)
+            raise
+        self.end_span(span)
+
+    # -------------------------------------------------------------------------
+    # SQL instrumentation
+    # -------------------------------------------------------------------------
+    def instrument(self) -> None:
+        """Trace every SQL statement executed in this process."""
+        event.listen(Engine, "before_cursor_execute", self._before_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_execute)
+        event.listen(Engine, "handle_error", self._handle_error)
+
+    def uninstrument(self) -> None:
+        """Stop tracing SQL statements."""
+        for name, fn in (
+            ("before_cursor_execute", self._before_execute),
+            ("after_cursor_execute", self._after_execute),
+            ("handle_error", self._handle_error),
+        ):
+            if event.contains(Engine, name, fn):
+                event.remove(Engine, name, fn)
+
+    def _before_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        """Open a statement span (and a revision span at a step's start)."""
+        if _in_invocation.get():
+            touches_version = self.version_table in statement.lower()
+            if not touches_version and conn.info.get("trace_revision") is None:
+                conn.info["trace_revision"] = self.start_span("alembic.revision")
+
+        span = self.start_span(
+            _statement_name(statement),
+            {
+                "db.system": conn.dialect.name,
+                "db.statement": statement[:MAX_STATEMENT_LENGTH],
+            },
+            kind=SPAN_KIND_CLIENT,
+        )
+        conn.info.setdefault("trace_statements", []).append(span)
+
+    def _after_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        """Close the statement span (and the revision span at a step's end)."""
+        statements = conn.info.get("trace_statements")
+        if statements:
+            span = statements.pop()
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.attributes["db.rowcount"] = cursor.rowcount
+            self.end_span(span)
+
+        written = version_write_revision(statement, self.version_table)
+        if _in_invocation.get() and written is not None:
+            revision = conn.info.pop("trace_revision", None)
+            if revision is None:
+                # Step without statements of its own (e.g. a merge point)
+                revision = self.start_span("alembic.revision")
+            if written:
+                revision.name = f"alembic.revision {written}"
+                revision.attributes["alembic.revision"] = written
+            self.end_span(revision)
+
+    def _handle_error(self, exception_context: Any) -> None:
+        """Close the failed statement span with its error."""
+        conn = exception_context.connection
+        if conn is None:
+            return
+        statements = conn.info.get("trace_statements")
+        if statements:
+            self.end_span(statements.pop(), exception_context.original_exception)
+        revision = conn.info.pop("trace_revision", None)
+        if revision is not None:
+            self.end_span(revision, exception_context.original_exception)
+
+    # -------------------------------------------------------------------------
+    # Export
+    # -------------------------------------------------------------------------
+    def to_otlp(self) -> dict[str, Any]:
+        """Closed spans as an OTLP-JSON ``ExportTraceServiceRequest``."""
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [_attribute("service.name", SERVICE_NAME)]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": SERVICE_NAME},
+                            "spans": [span.to_otlp() for span in self.spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def export(self, path: str | Path) -> None:
+        """Close open spans and append the trace to an OTLP-JSON lines file.
+
+        Appending lets several runs (e.g. fan-out targets) share one file.
+        """
+        for span in reversed(self._open):
+            self.end_span(span)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps(self.to_otlp(), separators=(",", ":")) + "\n")
+        logger.info(
+            f"Wrote {len(self.spans)} span(s) of trace {self.trace_id} to {path}"
+        )
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def set_tracer(tracer: Tracer | None) -> None:
+    """Install the tracer used by :func:`span` (``None`` disables tracing)."""
+    global _active_tracer
+    _active_tracer = tracer
+
+
+def get_tracer() -> Tracer | None:
+    """Return the installed tracer, if any."""
+    return _active_tracer
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """Trace a block with the installed tracer; a no-op without one."""
+    tracer = _active_tracer
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(name, **attributes) as current:
+        yield current
+
+
+@contextmanager
+def invocation(description: str) -> Iterator[Span | None]:
+    """Trace an Alembic command; statements inside are grouped by revision."""
+    token = _in_invocation.set(True)
+    try:
+        with span(f"alembic {description}", **{"alembic.command": description}) as s:
+            yield s
+    finally:
+        _in_invocation.reset(token)
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+def _descends_from(span: Span, ancestor: Span) -> bool:
+    """Whether ``ancestor`` is a (transitive) parent of ``span``."""
+    parent = span._parent
+    while parent is not None:
+        if parent is ancestor:
+            return True
+        parent = parent._parent
+    return False
+
+
+def _statement_name(statement: str) -> str:
+    """Span name of a statement: its leading keyword."""
+    words = statement.split(None, 1)
+    return words[0].upper() if words else "SQL"
+
+
+def _attribute(key: str, value: Any) -> dict[str, Any]:
+    """OTLP key/value attribute."""
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
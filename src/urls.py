@@ -0,0 +1,29 @@
+"""Database URL helpers."""
+
+from __future__ import annotations
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+# Third Party
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import ArgumentError
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def dialect_name(database_url: str) -> str:
+    """Backend name of a database URL, without loading its driver.
+
+    Args:
+        database_url: SQLAlchemy URL (e.g. ``postgresql+psycopg2://...``).
+
+    Returns:
+        Backend name (e.g. ``postgresql``), or the URL's scheme when it
+        cannot be parsed.
+    """
+    try:
+        return make_url(database_url).get_backend_name()
+    except ArgumentError:
+        return database_url.split(":", 1)[0]
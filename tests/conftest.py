@@ -4,14 +4,34 @@
 # IMPORTS
 # =============================================================================
 # Standard Library
+import shutil
+from pathlib import Path
+
 import pytest
 
 # Project/Local
 from src.safety import DangerLevel, SafetyAnalyzer
 
+TEST_APP = Path(__file__).resolve().parent / "test_app"
+
+
 # =============================================================================
 # FIXTURES
 # =============================================================================
+@pytest.fixture
+def app_dir(tmp_path, monkeypatch) -> Path:
+    """Copy of the test app with an isolated SQLite database.
+
+    The test runs inside the copy, with GitHub output files unset so
+    outputs are only logged.
+    """
+    app = tmp_path / "app"
+    shutil.copytree(TEST_APP, app)
+    monkeypatch.chdir(app)
+    monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", f"sqlite:///{app / 'test.db'}")
+    monkeypatch.delenv("GITHUB_OUTPUT", raising=False)
+    monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+    return app
 
 
 @pytest.fixture
@@ -0,0 +1,136 @@
+"""Unit tests for Alembic runners."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import subprocess
+import sys
+
+import pytest
+
+from src.alembic_ops import (
+    AlembicRunner,
+    AsyncAlembicRunner,
+    InProcessAlembicRunner,
+    create_runner,
+)
+from src.spool import SpooledOutput
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_create_runner_modes():
+    """Test runner factory selects the right implementation."""
+    assert isinstance(create_runner("subprocess", "alembic.ini"), AlembicRunner)
+    assert isinstance(
+        create_runner("in-process", "alembic.ini"), InProcessAlembicRunner
+    )
+    with pytest.raises(ValueError, match="Unknown runner"):
+        create_runner("bogus", "alembic.ini")
+
+
+def test_in_process_upgrade_and_current(app_dir):
+    """Test in-process runner upgrades and reports the new revision."""
+    runner = InProcessAlembicRunner("alembic.ini")
+
+    assert runner.current() == ""
+    runner.upgrade("head")
+
+    assert runner.current().strip() == "003 (head)"
+
+
+def test_in_process_offline_sql(app_dir):
+    """Test in-process runner returns offline SQL."""
+    runner = InProcessAlembicRunner("alembic.ini")
+
+    sql = runner.upgrade("head", sql=True).text()
+
+    assert "CREATE TABLE users" in sql
+    assert "DROP COLUMN email" in sql
+
+
+def test_in_process_offline_sql_streams_chunks(app_dir):
+    """Test on_chunk receives the offline SQL while it is generated."""
+    chunks: list[str] = []
+    runner = InProcessAlembicRunner("alembic.ini")
+
+    output = runner.upgrade("head", sql=True, on_chunk=chunks.append)
+
+    assert "".join(chunks) == output.text()
+
+
+def test_in_process_history(app_dir):
+    """Test in-process runner returns history output."""
+    history = InProcessAlembicRunner("alembic.ini").history()
+
+    assert "002 -> 003 (head)" in history
+
+
+def test_in_process_keeps_loggers_enabled(app_dir):
+    """Test env.py fileConfig does not disable our loggers."""
+    InProcessAlembicRunner("alembic.ini").current()
+
+    assert not logging.getLogger("src.alembic_ops").disabled
+
+
+def test_async_runner_upgrades_targets_concurrently(app_dir):
+    """Test one event loop drives upgrades of several databases."""
+    runners = [
+        AsyncAlembicRunner(
+            "alembic.ini",
+            env={"SQLALCHEMY_DATABASE_URI": f"sqlite:///{app_dir / f'{name}.db'}"},
+        )
+        for name in ("first", "second")
+    ]
+
+    async def deploy(runner: AsyncAlembicRunner) -> str:
+        await runner.upgrade("head")
+        return await runner.current()
+
+    async def deploy_all() -> list[str]:
+        return await asyncio.gather(*(deploy(runner) for runner in runners))
+
+    assert [current.strip() for current in asyncio.run(deploy_all())] == [
+        "003 (head)",
+        "003 (head)",
+    ]
+    assert not (app_dir / "test.db").exists()
+
+
+def test_async_runner_kills_command_past_timeout():
+    """Test a call exceeding its timeout kills the child and raises."""
+    runner = AsyncAlembicRunner("alembic.ini", timeout=30)
+    cmd = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(runner._run_command(cmd, timeout=0.2))
+
+
+def test_async_runner_discards_output_when_reading_fails(monkeypatch):
+    """Test a failed read kills the child and drops its spooled output."""
+
+    class RecordingSpool(SpooledOutput):
+        discarded = False
+
+        def __init__(self, **kwargs):
+            super().__init__(chunk_size=1, **kwargs)
+            spools.append(self)
+
+        def discard(self) -> None:
+            super().discard()
+            self.discarded = True
+
+    spools: list[RecordingSpool] = []
+
+    def fail(chunk: str) -> None:
+        raise RuntimeError("consumer failed")
+
+    monkeypatch.setattr("src.alembic_ops.SpooledOutput", RecordingSpool)
+    cmd = [sys.executable, "-c", "print('x', flush=True); import time; time.sleep(30)"]
+
+    with pytest.raises(RuntimeError, match="consumer failed"):
+        asyncio.run(AsyncAlembicRunner("alembic.ini")._run_command(cmd, fail))
+
+    assert [spool.discarded for spool in spools] == [True]
@@ -0,0 +1,106 @@
+"""Unit tests for checkpointed revision-by-revision upgrades."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from src.alembic_ops import InProcessAlembicRunner
+from src.checkpoint import CompletedRevision, RevisionCheckpointer, failure_details
+from src.commands import ExecutionCommand
+from src.config import ActionConfig
+from src.safety import SafetyAnalyzer
+from src.states import ActionContext
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+def _context(app_dir: Path, current: tuple[str, ...] = ()) -> ActionContext:
+    """Upgrade context with a checkpointer on the test app database."""
+    url = f"sqlite:///{app_dir / 'test.db'}"
+    return ActionContext(
+        config=ActionConfig(
+            database_url=url,
+            command="upgrade",
+            revision="head",
+            dry_run=False,
+            alembic_config_path="alembic.ini",
+            working_directory=".",
+            analyze_safety=False,
+            fail_on_danger=False,
+            runner="in-process",
+            transaction_per_revision=True,
+        ),
+        runner=InProcessAlembicRunner("alembic.ini"),
+        analyzer=SafetyAnalyzer(),
+        current_revisions=current,
+        checkpointer=RevisionCheckpointer(url, app_dir / "checkpoint.json"),
+    )
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_failed_revision_is_checkpointed_and_resumed(app_dir):
+    """Test a rerun resumes after the revisions committed before a failure."""
+    db = sqlite3.connect(app_dir / "test.db")
+    db.execute("CREATE TABLE posts (id INTEGER)")
+    db.close()
+
+    with pytest.raises(Exception, match="already exists"):
+        ExecutionCommand().execute(_context(app_dir))
+
+    saved = json.loads((app_dir / "checkpoint.json").read_text())
+    assert [entry["revision"] for entry in saved["completed"]] == ["001"]
+    assert saved["failed_revision"] == "002"
+    assert saved["failed_statement"].startswith("CREATE TABLE posts")
+    assert not saved["finished"]
+
+    db = sqlite3.connect(app_dir / "test.db")
+    db.execute("DROP TABLE posts")
+    db.close()
+    context = _context(app_dir, current=("001",))
+    ExecutionCommand().execute(context)
+
+    saved = json.loads((app_dir / "checkpoint.json").read_text())
+    assert [entry["revision"] for entry in saved["completed"]] == ["001", "002", "003"]
+    assert saved["finished"] and saved["failed_revision"] is None
+    assert context.outputs["resumed-revisions"] == "1"
+
+
+def test_checkpoint_not_matching_database_starts_over(app_dir):
+    """Test a checkpoint ahead of the database version is not resumed."""
+    url = f"sqlite:///{app_dir / 'test.db'}"
+    checkpointer = RevisionCheckpointer(url, app_dir / "checkpoint.json")
+    checkpointer.resume((), "head").completed.append(CompletedRevision("002", 1.0))
+    checkpointer._save()
+
+    fresh = RevisionCheckpointer(url, app_dir / "checkpoint.json")
+
+    assert fresh.resume(("001",), "head").completed == []
+    assert fresh.resumed == 0
+    assert fresh.resume(("002",), "head").last_revision == "002"
+    assert fresh.resume(("002",), "003").completed == []
+
+
+def test_failure_details_from_cli_stderr():
+    """Test the failing statement is recovered from ``alembic`` output."""
+    error = subprocess.CalledProcessError(
+        1,
+        ["alembic", "upgrade", "002"],
+        stderr=(
+            "sqlalchemy.exc.OperationalError: (sqlite3.OperationalError) "
+            "table posts already exists\n[SQL: \nCREATE TABLE posts (id INTEGER)\n]\n"
+            "(Background on this error at: https://sqlalche.me/e/20/e3q8)\n"
+        ),
+    )
+
+    statement, message = failure_details(error)
+
+    assert statement == "CREATE TABLE posts (id INTEGER)"
+    assert message.endswith("table posts already exists")
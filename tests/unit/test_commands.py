@@ -2,16 +2,20 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable
+
 import pytest
 
 from src.commands import (
     AnalyzerProtocol,
     ConfigProtocol,
+    ConnectCommand,
     DryRunCommand,
     ExecutionCommand,
     InitCommand,
     RunnerProtocol,
     SafetyCheckCommand,
+    SkipCommand,
 )
 from src.safety import DangerLevel, SafetyReport
 
@@ -47,7 +51,14 @@ class MockRunner:
     def current(self) -> str:
         return self._current_result
 
-    def upgrade(self, revision: str, sql: bool = False) -> str:
+    def upgrade(
+        self,
+        revision: str,
+        sql: bool = False,
+        on_chunk: Callable[[str], None] | None = None,
+    ) -> str:
+        if on_chunk is not None:
+            on_chunk(self._upgrade_result)
         return self._upgrade_result
 
     def downgrade(self, revision: str) -> str:
@@ -71,6 +82,27 @@ class MockAnalyzer:
     def analyze(self, sql: str) -> SafetyReport:
         return self._report
 
+    def analyze_stream(self, chunks: Iterable[str]) -> SafetyReport:
+        return self._report
+
+    def stream(self) -> MockStream:
+        self.last_stream = MockStream(self._report)
+        return self.last_stream
+
+
+class MockStream:
+    """Mock stream recording the chunks it is fed."""
+
+    def __init__(self, report: SafetyReport):
+        self._report = report
+        self.chunks: list[str] = []
+
+    def feed(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+
+    def finish(self) -> SafetyReport:
+        return self._report
+
 
 class MockContext:
     """Mock context satisfying ActionContextProtocol."""
@@ -91,6 +123,39 @@ class MockContext:
         self.outputs[key] = value
 
 
+# =============================================================================
+# CONNECT COMMAND TESTS
+# =============================================================================
+def test_connect_command_opens_session():
+    """Test ConnectCommand opens the shared session and reports latency."""
+
+    class FakeSession:
+        connect_latency_ms = 12.34
+
+        def __init__(self) -> None:
+            self.opened = False
+
+        def open(self) -> None:
+            self.opened = True
+
+    context = MockContext()
+    context.session = FakeSession()  # type: ignore[attr-defined]
+
+    ConnectCommand().execute(context)  # type: ignore[arg-type]
+
+    assert context.session.opened  # type: ignore[attr-defined]
+    assert context.outputs["connect-latency-ms"] == "12.3"
+
+
+def test_connect_command_without_session_is_noop():
+    """Test ConnectCommand does nothing when no session is configured."""
+    context = MockContext()
+
+    ConnectCommand().execute(context)  # type: ignore[arg-type]
+
+    assert "connect-latency-ms" not in context.outputs
+
+
 # =============================================================================
 # INIT COMMAND TESTS
 # =============================================================================
@@ -117,6 +182,34 @@ def test_init_command_handles_empty_revision():
     assert context.outputs["current-revision"] == "none"
 
 
+def test_init_command_uses_probe_and_detects_target():
+    """Test InitCommand reads revisions from the probe and flags up-to-date."""
+
+    class FakeProbe:
+        def current_revisions(self) -> tuple[str, ...]:
+            return ("abc123", "def456")
+
+        def is_at_target(self, current: tuple[str, ...], target: str) -> bool:
+            return True
+
+    context = MockContext()
+    context.probe = FakeProbe()  # type: ignore[attr-defined]
+
+    InitCommand().execute(context)  # type: ignore[arg-type]
+
+    assert context.outputs["current-revision"] == "abc123,def456"
+    assert context.up_to_date  # type: ignore[attr-defined]
+
+
+def test_skip_command_sets_skipped_status():
+    """Test SkipCommand reports skipped status."""
+    context = MockContext()
+
+    SkipCommand().execute(context)  # type: ignore[arg-type]
+
+    assert context.outputs["migration-status"] == "skipped"
+
+
 # =============================================================================
 # DRY RUN COMMAND TESTS
 # =============================================================================
@@ -131,6 +224,31 @@ def test_dry_run_command_generates_sql():
     assert context.sql_preview == "CREATE TABLE users;"
 
 
+def test_dry_run_command_analyzes_sql_while_generating():
+    """Test DryRunCommand feeds generated SQL to the safety stream."""
+    report = SafetyReport(
+        is_safe=False, danger_level=DangerLevel.HIGH, warnings=["DROP TABLE"]
+    )
+    analyzer = MockAnalyzer(report)
+    context = MockContext(analyzer=analyzer)
+
+    DryRunCommand().execute(context)  # type: ignore[arg-type]
+    SafetyCheckCommand().execute(context)  # type: ignore[arg-type]
+
+    assert analyzer.last_stream.chunks == ["CREATE TABLE users;"]
+    assert context.safety_report is report  # type: ignore[attr-defined]
+    assert context.outputs["is-safe"] == "false"
+
+
+def test_dry_run_command_without_safety_skips_stream():
+    """Test DryRunCommand does not analyze when safety checks are off."""
+    context = MockContext(config=MockConfig(analyze_safety=False))
+
+    DryRunCommand().execute(context)  # type: ignore[arg-type]
+
+    assert not hasattr(context, "safety_report")
+
+
 # =============================================================================
 # SAFETY CHECK COMMAND TESTS
 # =============================================================================
@@ -165,6 +283,22 @@ def test_safety_check_command_dangerous_sql():
     assert "DROP TABLE detected" in context.outputs["warnings"]
 
 
+def test_safety_check_command_reports_unsafe_revisions():
+    """Test attributed warnings produce the unsafe-revisions output."""
+    context = MockContext()
+    context.sql_preview = "DROP TABLE users;"
+    context.safety_report = SafetyReport(  # type: ignore[attr-defined]
+        is_safe=False,
+        danger_level=DangerLevel.HIGH,
+        warnings=["DROP TABLE detected"],
+        attribution={"DROP TABLE detected": ("002", "005")},
+    )
+
+    SafetyCheckCommand().execute(context)  # type: ignore[arg-type]
+
+    assert context.outputs["unsafe-revisions"] == "002,005"
+
+
 def test_safety_check_command_fails_on_danger():
     """Test SafetyCheckCommand fails when fail_on_danger is set."""
     config = MockConfig(fail_on_danger=True)
@@ -0,0 +1,144 @@
+"""Unit tests for the lock-contention monitor."""
+
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+from src.commands import ExecutionCommand
+from src.config import ActionConfig
+from src.contention import BlockedSession, ContentionMonitor
+from src.safety import SafetyAnalyzer
+from src.states import ActionContext
+
+DATABASE_URL = "postgresql://deploy@db/app"
+
+
+class FakeResult:
+    """Result of a fake query."""
+
+    def __init__(self, rows: list[tuple]):
+        self.rows = rows
+
+    def all(self) -> list[tuple]:
+        return self.rows
+
+
+class FakeConnection:
+    """Connection answering the lock-wait query with canned rows."""
+
+    def __init__(self, rows: list[tuple]):
+        self.rows = rows
+
+    def execute(self, statement, parameters=None) -> FakeResult:
+        return FakeResult(self.rows)
+
+    def rollback(self) -> None:
+        pass
+
+
+class FakeMonitor(ContentionMonitor):
+    """Monitor sampling canned sessions instead of a live database."""
+
+    def __init__(self, blocked: list[BlockedSession], **limits):
+        super().__init__(DATABASE_URL, interval_ms=10, **limits)
+        self.blocked = blocked
+        self.cancelled = threading.Event()
+
+    @property
+    def supported(self) -> bool:
+        return True
+
+    def sample(self, connection) -> list[BlockedSession]:
+        return self.blocked
+
+    def cancel(self, connection, backends: set[int]) -> list[int]:
+        self.cancelled.set()
+        return sorted(backends)
+
+    def _open(self):
+        return None
+
+    def _close(self, connection) -> None:
+        pass
+
+
+class CancelledRunner:
+    """Runner whose upgrade runs until the monitor cancels it."""
+
+    def __init__(self, monitor: FakeMonitor):
+        self.monitor = monitor
+
+    def upgrade(self, revision: str) -> None:
+        if not self.monitor.cancelled.wait(5):
+            raise AssertionError("monitor never cancelled the migration")
+        raise RuntimeError("canceling statement due to user request")
+
+
+def _session(pid: int, wait_ms: float) -> BlockedSession:
+    """Session blocked by migration backend 100."""
+    return BlockedSession(pid, (100,), wait_ms, "SELECT * FROM users")
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_check_thresholds():
+    """Test the session count and the longest wait are checked."""
+    monitor = ContentionMonitor(DATABASE_URL, max_blocked=2, max_wait_ms=1000)
+
+    assert monitor.check([_session(1, 10), _session(2, 10)]) is None
+    too_many = monitor.check([_session(1, 10), _session(2, 10), _session(3, 10)])
+    assert too_many is not None and "3 sessions blocked" in too_many
+    too_long = monitor.check([_session(1, 1500)])
+    assert too_long is not None and "blocked for 1.5s" in too_long
+
+
+def test_sample_keeps_sessions_blocked_by_migration():
+    """Test only waits on migration backends count, once per session."""
+    monitor = ContentionMonitor(DATABASE_URL, max_blocked=1)
+    monitor.backends = {100}
+    connection = FakeConnection(
+        [
+            (1, [100], 250.0, "SELECT  *\n FROM users"),
+            (2, [55], 900.0, "UPDATE other"),
+            (3, [1, 100], 40.0, "INSERT INTO users"),
+            (100, [55], 10.0, "ALTER TABLE users"),
+        ]
+    )
+
+    blocked = monitor.sample(connection)  # type: ignore[arg-type]
+
+    assert [(s.pid, s.blocked_by) for s in blocked] == [(1, (100,)), (3, (100,))]
+    assert blocked[0].query == "SELECT * FROM users"
+
+
+def test_monitor_cancels_blocking_migration(monkeypatch):
+    """Test crossing a limit cancels the migration and fails the run."""
+    monkeypatch.delenv("GITHUB_OUTPUT", raising=False)
+    monitor = FakeMonitor([_session(1, 5000)], max_wait_ms=1000)
+    context = ActionContext(
+        config=ActionConfig(
+            database_url=DATABASE_URL,
+            command="upgrade",
+            revision="head",
+            dry_run=False,
+            alembic_config_path="alembic.ini",
+            working_directory=".",
+            analyze_safety=False,
+            fail_on_danger=False,
+            max_blocked_wait=1000,
+        ),
+        runner=CancelledRunner(monitor),  # type: ignore[arg-type]
+        analyzer=SafetyAnalyzer(),
+        contention_monitor=monitor,
+    )
+
+    with pytest.raises(RuntimeError, match="blocking traffic"):
+        ExecutionCommand().execute(context)
+
+    report = json.loads(str(context.outputs["contention-report"]))
+    assert report["cancelled"] == [100]
+    assert report["max_wait_ms"] == 5000
@@ -0,0 +1,114 @@
+"""Unit tests for the deploy lock."""
+
+from __future__ import annotations
+
+import pytest
+
+from src.alembic_ops import InProcessAlembicRunner
+from src.config import ActionConfig
+from src.deploy_lock import DeployLock
+from src.probe import RevisionProbe
+from src.safety import SafetyAnalyzer
+from src.session import DatabaseSession
+from src.states import ActionContext, InitState, SkipState
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_second_deploy_waits_then_times_out(app_dir):
+    """Test a held lock makes other deploys wait until it is released."""
+    url = f"sqlite:///{app_dir / 'test.db'}"
+    first = DeployLock(url)
+    second = DeployLock(url, timeout=0.2, poll_interval=0.05)
+    second.owner = "other-runner"
+
+    first.acquire()
+    try:
+        with pytest.raises(TimeoutError, match="deploy lock 'alembic-deploy'"):
+            second.acquire()
+        assert second.waited >= 0.2
+        assert not second.held
+    finally:
+        first.release()
+
+    second.acquire()
+    assert second.held
+    second.release()
+
+
+def test_advisory_key_is_stable_per_name():
+    """Test runs sharing a lock name share the advisory lock key."""
+    url = "postgresql://deploy@db/app"
+
+    assert DeployLock(url, "billing").key == DeployLock(url, "billing").key
+    assert DeployLock(url, "billing").key != DeployLock(url, "search").key
+    assert -(2**63) <= DeployLock(url).key < 2**63
+
+
+def test_waiter_at_target_skips(app_dir):
+    """Test a run finding the target reached after the lock skips migrating."""
+    url = f"sqlite:///{app_dir / 'test.db'}"
+    InProcessAlembicRunner("alembic.ini").upgrade("head")
+    session = DatabaseSession(url)
+    lock = DeployLock(url)
+    context = ActionContext(
+        config=ActionConfig(
+            database_url=url,
+            command="upgrade",
+            revision="head",
+            dry_run=False,
+            alembic_config_path="alembic.ini",
+            working_directory=".",
+            analyze_safety=False,
+            fail_on_danger=False,
+            deploy_lock=True,
+        ),
+        runner=InProcessAlembicRunner("alembic.ini"),
+        analyzer=SafetyAnalyzer(),
+        session=session,
+        probe=RevisionProbe(session, "alembic.ini"),
+        deploy_lock=lock,
+    )
+
+    try:
+        next_state = InitState().handle(context)
+    finally:
+        lock.release()
+        session.close()
+
+    assert isinstance(next_state, SkipState)
+    assert float(str(context.outputs["deploy-lock-wait-seconds"])) >= 0
+
+
+def test_waiter_without_probe_sets_one_up(app_dir):
+    """Test the lock command probes the revision when the run has no probe."""
+    url = f"sqlite:///{app_dir / 'test.db'}"
+    InProcessAlembicRunner("alembic.ini").upgrade("head")
+    lock = DeployLock(url)
+    context = ActionContext(
+        config=ActionConfig(
+            database_url=url,
+            command="upgrade",
+            revision="head",
+            dry_run=False,
+            alembic_config_path="alembic.ini",
+            working_directory=".",
+            analyze_safety=False,
+            fail_on_danger=False,
+            deploy_lock=True,
+        ),
+        runner=InProcessAlembicRunner("alembic.ini"),
+        analyzer=SafetyAnalyzer(),
+        deploy_lock=lock,
+    )
+
+    try:
+        next_state = InitState().handle(context)
+    finally:
+        lock.release()
+        if context.session is not None:
+            context.session.close()
+
+    assert isinstance(next_state, SkipState)
+    assert context.probe is not None
@@ -0,0 +1,167 @@
+"""Unit tests for the duration ledger and estimator."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.alembic_ops import InProcessAlembicRunner
+from src.commands import EstimateCommand, ExecutionCommand
+from src.config import ActionConfig
+from src.durations import (
+    DurationEstimator,
+    DurationLedger,
+    StepTimer,
+    environment_name,
+)
+from src.safety import SafetyAnalyzer
+from src.states import ActionContext
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+def _context(
+    app_dir: Path, ledger: DurationLedger, dry_run: bool = False, **config
+) -> ActionContext:
+    """In-process context recording into ``ledger``."""
+    return ActionContext(
+        config=ActionConfig(
+            database_url=f"sqlite:///{app_dir / 'test.db'}",
+            command="upgrade",
+            revision="head",
+            dry_run=dry_run,
+            alembic_config_path="alembic.ini",
+            working_directory=".",
+            analyze_safety=False,
+            fail_on_danger=False,
+            runner="in-process",
+            duration_ledger=str(ledger.path),
+            **config,
+        ),
+        runner=InProcessAlembicRunner("alembic.ini"),
+        analyzer=SafetyAnalyzer(),
+        duration_ledger=ledger,
+        step_timer=StepTimer(),
+    )
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_environment_name_drops_credentials():
+    """Test the derived name keeps backend, host and database only."""
+    assert (
+        environment_name("postgresql+psycopg2://u:secret@db:5432/app?sslmode=require")
+        == "postgresql://db:5432/app"
+    )
+
+
+def test_estimate_without_revision_index_uses_transient_index(app_dir):
+    """Test the pending range is resolved by a RevisionIndex built on demand."""
+    ledger = DurationLedger(app_dir / "ledger.json", "test", "sqlite")
+    ledger.record({"001": 50.0, "002": 20.0, "003": 5.0})
+    context = _context(app_dir, ledger, dry_run=True)
+    context.current_revisions = ("001",)
+
+    EstimateCommand().execute(context)
+
+    assert context.outputs["estimated-duration"] == "25.0"
+
+
+def test_step_timer_times_each_revision(app_dir):
+    """Test each in-process migration step gets its own duration."""
+    timer = StepTimer()
+
+    with timer.recording():
+        InProcessAlembicRunner("alembic.ini").upgrade("head").close()
+
+    assert list(timer.durations) == ["001", "002", "003"]
+    assert all(seconds > 0 for seconds in timer.durations.values())
+
+
+def test_ledger_keeps_latest_history(tmp_path):
+    """Test entries are persisted and trimmed per environment and revision."""
+    path = tmp_path / "ledger.json"
+    ledger = DurationLedger(path, "prod", "postgresql", history=2)
+    for seconds in (1.0, 2.0, 3.0):
+        ledger.record({"001": seconds})
+
+    reloaded = DurationLedger(path, "prod", "postgresql")
+    assert [e.seconds for e in reloaded.entries] == [2.0, 3.0]
+    assert json.loads(path.read_text())["format"] == 1
+
+
+def test_ledger_keeps_entries_of_concurrent_runs(tmp_path):
+    """Test a ledger loaded before another run recorded does not drop it."""
+    path = tmp_path / "ledger.json"
+    first = DurationLedger(path, "acme", "postgresql")
+    second = DurationLedger(path, "globex", "postgresql")
+    assert first.entries == second.entries == []
+
+    first.record({"001": 1.0})
+    second.record({"001": 2.0})
+
+    reloaded = DurationLedger(path, "acme", "postgresql")
+    assert [(e.environment, e.seconds) for e in reloaded.entries] == [
+        ("acme", 1.0),
+        ("globex", 2.0),
+    ]
+
+
+def test_estimator_prefers_own_environment(tmp_path):
+    """Test medians come from the environment, then from the same backend."""
+    path = tmp_path / "ledger.json"
+    DurationLedger(path, "staging", "postgresql").record({"001": 10.0, "002": 4.0})
+    DurationLedger(path, "staging", "postgresql").record({"001": 30.0})
+    DurationLedger(path, "prod", "postgresql").record({"001": 100.0})
+    DurationLedger(path, "local", "sqlite").record({"003": 1.0})
+
+    estimate = DurationEstimator(
+        DurationLedger(path, "staging", "postgresql")
+    ).estimate(["001", "002", "003"])
+
+    assert [(r.seconds, r.basis) for r in estimate.revisions] == [
+        (20.0, "environment"),
+        (4.0, "environment"),
+        (None, ""),
+    ]
+    assert estimate.total == 24.0
+    assert estimate.unknown == ["003"]
+
+    fresh = DurationEstimator(DurationLedger(path, "qa", "postgresql")).estimate(
+        ["001"]
+    )
+    assert fresh.revisions[0].basis == "dialect"
+    assert fresh.total == 30.0
+
+
+def test_upgrade_records_ledger_and_dry_run_estimates(app_dir):
+    """Test an upgrade feeds the ledger that a later estimate reads."""
+    ledger = DurationLedger(app_dir / "ledger.json", "test", "sqlite")
+    ExecutionCommand().execute(_context(app_dir, ledger))
+
+    assert {e.revision for e in ledger.entries} == {"001", "002", "003"}
+
+    fresh = DurationLedger(app_dir / "ledger.json", "test", "sqlite")
+    context = _context(app_dir, fresh, dry_run=True)
+    EstimateCommand().execute(context)
+
+    assert float(str(context.outputs["estimated-duration"])) >= 0
+    assert context.outputs["unestimated-revisions"] == ""
+
+
+def test_estimate_over_limit_fails_dry_run(app_dir):
+    """Test max-estimated-duration fails the dry run."""
+    ledger = DurationLedger(app_dir / "ledger.json", "test", "sqlite")
+    ledger.record({"001": 50.0, "002": 20.0})
+    context = _context(app_dir, ledger, dry_run=True, max_estimated_duration=60)
+    context.pending_revisions = ["001", "002", "003"]
+
+    with pytest.raises(RuntimeError, match="maintenance window"):
+        EstimateCommand().execute(context)
+
+    assert context.outputs["estimated-duration"] == "70.0"
+    assert context.outputs["unestimated-revisions"] == "003"
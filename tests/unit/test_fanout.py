@@ -0,0 +1,181 @@
+"""Unit tests for multi-database fan-out."""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.constants import (
+    POLICY_FAIL_FAST,
+    STATUS_CANCELLED,
+    STATUS_FAILED,
+    STATUS_SUCCESS,
+    STATUS_TIMEOUT,
+)
+from src.fanout import FanOut, Target, _read_outputs, format_summary, parse_targets
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+@pytest.fixture(autouse=True)
+def in_process_runner(monkeypatch) -> None:
+    """Run every target with the in-process runner."""
+    monkeypatch.setenv("INPUT_RUNNER", "in-process")
+
+
+def _version(db: Path) -> str:
+    """Revision stored in a SQLite database."""
+    with sqlite3.connect(db) as conn:
+        return conn.execute("SELECT version_num FROM alembic_version").fetchone()[0]
+
+
+def _wait_until_gone(pid: int, timeout: float = 5.0) -> bool:
+    """Whether a process exits (or is left a zombie) within ``timeout``."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            stat = Path(f"/proc/{pid}/stat").read_text()
+        except FileNotFoundError:
+            return True
+        if stat.rsplit(")", 1)[1].split()[0] == "Z":
+            return True
+        time.sleep(0.05)
+    return False
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_parse_targets():
+    """Test named, unnamed, blank and comment lines."""
+    targets = parse_targets(
+        """
+        # tenants
+        acme postgresql://deploy:secret@db/acme
+
+        postgresql://deploy:secret@db/globex
+        """
+    )
+
+    assert targets[0] == Target("acme", "postgresql://deploy:secret@db/acme")
+    assert targets[1].database_url == "postgresql://deploy:secret@db/globex"
+    assert "secret" not in targets[1].name
+
+
+def test_parse_targets_rejects_invalid_lines():
+    """Test duplicate names and extra fields are errors."""
+    with pytest.raises(ValueError, match="Duplicate"):
+        parse_targets("a sqlite:///a.db\na sqlite:///b.db")
+    with pytest.raises(ValueError, match="line 1"):
+        parse_targets("a b sqlite:///a.db")
+
+
+def test_read_outputs_skips_multiline_values(tmp_path):
+    """Test only single-line outputs are collected."""
+    path = tmp_path / "output"
+    path.write_text("sql-preview<<EOF\nx=1\nEOF\nmigration-status=success\n")
+
+    assert _read_outputs(path) == {"migration-status": "success"}
+
+
+def test_targets_get_their_own_run_files(monkeypatch):
+    """Test per-run files are split per target and the ledger is shared."""
+    monkeypatch.setenv("INPUT_CHECKPOINT_PATH", "state/checkpoint.json")
+    monkeypatch.setenv("INPUT_STATE_SNAPSHOT_DIR", "state/snapshots")
+    monkeypatch.setenv("INPUT_DURATION_LEDGER", "state/ledger.json")
+    monkeypatch.setenv("INPUT_TRACE_PATH", "")
+    fan_out = FanOut()
+
+    env = fan_out._child_env(Target("acme", "sqlite://"), Path("output"))
+    other = fan_out._child_env(Target("db/2", "sqlite://"), Path("output"))
+
+    assert env["INPUT_CHECKPOINT_PATH"] == str(Path("state/checkpoint.acme.json"))
+    assert other["INPUT_CHECKPOINT_PATH"] == str(Path("state/checkpoint.db_2.json"))
+    assert env["INPUT_STATE_SNAPSHOT_DIR"] == str(Path("state/snapshots/acme"))
+    assert env["INPUT_PROFILE_PATH"] != other["INPUT_PROFILE_PATH"]
+    assert env["INPUT_DURATION_LEDGER"] == other["INPUT_DURATION_LEDGER"]
+    assert env["INPUT_TRACE_PATH"] == ""
+
+
+def test_fan_out_migrates_every_target(app_dir):
+    """Test each target gets its own run and database."""
+    targets = [
+        Target("one", f"sqlite:///{app_dir / 'one.db'}"),
+        Target("two", f"sqlite:///{app_dir / 'two.db'}"),
+    ]
+
+    results = FanOut(workers=2).run(targets)
+
+    assert [r.status for r in results] == [STATUS_SUCCESS, STATUS_SUCCESS]
+    assert all(r.duration > 0 for r in results)
+    assert _version(app_dir / "one.db") == _version(app_dir / "two.db")
+    assert results[0].outputs["current-revision"] == "none"
+    assert "| one | success |" in format_summary(results)
+
+
+def test_continue_policy_runs_remaining_targets(app_dir):
+    """Test a failing target does not stop the others by default."""
+    targets = [
+        Target("bad", "sqlite:////nonexistent/dir/bad.db"),
+        Target("good", f"sqlite:///{app_dir / 'good.db'}"),
+    ]
+
+    results = FanOut(workers=1).run(targets)
+
+    assert [r.status for r in results] == [STATUS_FAILED, STATUS_SUCCESS]
+    assert results[0].error
+
+
+def test_fail_fast_cancels_pending_targets(app_dir):
+    """Test fail-fast skips targets that had not started."""
+    targets = [
+        Target("bad", "sqlite:////nonexistent/dir/bad.db"),
+        Target("next", f"sqlite:///{app_dir / 'next.db'}"),
+    ]
+
+    results = FanOut(workers=1, policy=POLICY_FAIL_FAST).run(targets)
+
+    assert [r.status for r in results] == [STATUS_FAILED, STATUS_CANCELLED]
+    assert not (app_dir / "next.db").exists()
+
+
+def test_timeout_kills_target(app_dir):
+    """Test a target exceeding the timeout is killed and reported."""
+    fan_out = FanOut(
+        timeout=1, command=[sys.executable, "-c", "import time; time.sleep(30)"]
+    )
+
+    [result] = fan_out.run([Target("slow", "sqlite:///slow.db")])
+
+    assert result.status == STATUS_TIMEOUT
+    assert result.duration < 10
+
+
+@pytest.mark.skipif(not Path("/proc").is_dir(), reason="needs /proc")
+def test_timeout_kills_target_grandchildren(app_dir):
+    """Test a timed-out target's own children (e.g. alembic) are killed too."""
+    pid_file = app_dir / "grandchild.pid"
+    script = (
+        "import subprocess, sys, time\n"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; "
+        "time.sleep(60)'])\n"
+        f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+        "time.sleep(60)\n"
+    )
+    fan_out = FanOut(timeout=2, command=[sys.executable, "-c", script])
+
+    [result] = fan_out.run([Target("slow", "sqlite:///slow.db")])
+
+    assert result.status == STATUS_TIMEOUT
+    assert _wait_until_gone(int(pid_file.read_text()))
+
+
+def test_unknown_policy():
+    """Test invalid policies are rejected."""
+    with pytest.raises(ValueError, match="Unknown target error policy"):
+        FanOut(policy="retry")
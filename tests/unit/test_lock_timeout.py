@@ -0,0 +1,129 @@
+"""Unit tests for lock-timeout guarded execution."""
+
+from __future__ import annotations
+
+import sqlite3
+import subprocess
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from src.alembic_ops import InProcessAlembicRunner
+from src.commands import ExecutionCommand
+from src.config import ActionConfig
+from src.lock_timeout import LockTimeoutGuard, is_lock_timeout
+from src.safety import SafetyAnalyzer
+from src.states import ActionContext
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+def _lock_error() -> subprocess.CalledProcessError:
+    """CLI failure of a statement that hit lock_timeout."""
+    return subprocess.CalledProcessError(
+        1,
+        ["alembic", "upgrade", "head"],
+        stderr="ERROR:  canceling statement due to lock timeout",
+    )
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_is_lock_timeout():
+    """Test lock timeouts are told apart from other failures."""
+    assert is_lock_timeout(_lock_error())
+    assert is_lock_timeout(
+        OperationalError("ALTER TABLE t ...", {}, Exception(1205, "Lock wait"))
+    )
+    assert not is_lock_timeout(
+        subprocess.CalledProcessError(
+            1, ["alembic"], stderr="canceling statement due to statement timeout"
+        )
+    )
+    assert not is_lock_timeout(ValueError("syntax error"))
+
+
+def test_settings_per_dialect():
+    """Test each backend gets its own session timeouts."""
+    assert LockTimeoutGuard("postgresql", 2000, 60000).settings == [
+        "SET lock_timeout = 2000",
+        "SET statement_timeout = 60000",
+    ]
+    assert LockTimeoutGuard("mysql", 2500).settings[0] == (
+        "SET SESSION lock_wait_timeout = 3"
+    )
+    assert LockTimeoutGuard("postgresql", 2000).environment() == {
+        "PGOPTIONS": "-c lock_timeout=2000"
+    }
+    assert LockTimeoutGuard("sqlite", 2000).environment() == {}
+
+
+def test_run_retries_with_capped_backoff():
+    """Test lock timeouts are retried with jittered, growing delays."""
+    delays: list[float] = []
+    failures = [_lock_error(), _lock_error()]
+
+    def operation() -> str:
+        if failures:
+            raise failures.pop()
+        return "done"
+
+    guard = LockTimeoutGuard("postgresql", 100, base_delay=1.0, sleep=delays.append)
+
+    assert guard.run(operation) == "done"
+    assert guard.retries == 2
+    assert 0 <= delays[0] <= 1.0 and 0 <= delays[1] <= 2.0
+    assert guard.waited >= sum(delays)
+
+
+def test_run_stops_at_budget_and_reraises():
+    """Test the last lock timeout is raised once the budget is spent."""
+    guard = LockTimeoutGuard("postgresql", 100, budget=0, sleep=lambda _: None)
+
+    def operation() -> None:
+        raise _lock_error()
+
+    with pytest.raises(subprocess.CalledProcessError):
+        guard.run(operation)
+    assert guard.retries == 0
+
+
+def test_locked_upgrade_is_retried(app_dir):
+    """Test an upgrade blocked by another transaction succeeds on retry."""
+    blocker = sqlite3.connect(app_dir / "test.db", isolation_level=None)
+    blocker.execute("BEGIN EXCLUSIVE")
+
+    def release(delay: float) -> None:
+        blocker.execute("COMMIT")
+
+    guard = LockTimeoutGuard("sqlite", 50, sleep=release)
+    context = ActionContext(
+        config=ActionConfig(
+            database_url=f"sqlite:///{app_dir / 'test.db'}",
+            command="upgrade",
+            revision="head",
+            dry_run=False,
+            alembic_config_path="alembic.ini",
+            working_directory=".",
+            analyze_safety=False,
+            fail_on_danger=False,
+            runner="in-process",
+            lock_timeout=50,
+        ),
+        runner=InProcessAlembicRunner("alembic.ini"),
+        analyzer=SafetyAnalyzer(),
+        lock_guard=guard,
+    )
+
+    guard.install()
+    try:
+        ExecutionCommand().execute(context)
+    finally:
+        guard.uninstall()
+        blocker.close()
+
+    assert context.outputs["lock-timeout-retries"] == "1"
+    assert float(str(context.outputs["lock-wait-seconds"])) > 0
+    assert context.outputs["migration-status"] == "success"
@@ -0,0 +1,152 @@
+"""Unit tests for PostgreSQL lock classification."""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import pytest
+
+from src.locks import (
+    BlockingImpact,
+    LockFinding,
+    LockMode,
+    PostgresLockClassifier,
+    classifier_for,
+    rank_findings,
+)
+from src.safety import SafetyAnalyzer, SafetyReport, merge_reports
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+@pytest.mark.parametrize(
+    ("sql", "lock", "rewrite", "scan", "impact"),
+    [
+        (
+            "ALTER TABLE users ADD COLUMN flag boolean DEFAULT false",
+            LockMode.ACCESS_EXCLUSIVE,
+            False,
+            False,
+            BlockingImpact.BRIEF,
+        ),
+        (
+            "ALTER TABLE users ADD COLUMN token uuid DEFAULT gen_random_uuid()",
+            LockMode.ACCESS_EXCLUSIVE,
+            True,
+            True,
+            BlockingImpact.REWRITE,
+        ),
+        (
+            "ALTER TABLE users ALTER COLUMN email SET NOT NULL",
+            LockMode.ACCESS_EXCLUSIVE,
+            False,
+            True,
+            BlockingImpact.BLOCKS_ALL,
+        ),
+        (
+            "ALTER TABLE orders ADD CONSTRAINT fk_user FOREIGN KEY (user_id) "
+            "REFERENCES users (id)",
+            LockMode.SHARE_ROW_EXCLUSIVE,
+            False,
+            True,
+            BlockingImpact.BLOCKS_WRITES,
+        ),
+        (
+            "ALTER TABLE orders ADD CONSTRAINT ck CHECK (total > 0) NOT VALID",
+            LockMode.ACCESS_EXCLUSIVE,
+            False,
+            False,
+            BlockingImpact.BRIEF,
+        ),
+        (
+            "ALTER TABLE orders VALIDATE CONSTRAINT ck",
+            LockMode.SHARE_UPDATE_EXCLUSIVE,
+            False,
+            True,
+            BlockingImpact.MINIMAL,
+        ),
+        (
+            "CREATE INDEX ix_users_email ON users (email)",
+            LockMode.SHARE,
+            False,
+            True,
+            BlockingImpact.BLOCKS_WRITES,
+        ),
+        (
+            "CREATE INDEX CONCURRENTLY ix_users_email ON users (email)",
+            LockMode.SHARE_UPDATE_EXCLUSIVE,
+            False,
+            True,
+            BlockingImpact.MINIMAL,
+        ),
+        (
+            "ALTER TABLE users ALTER COLUMN id TYPE bigint",
+            LockMode.ACCESS_EXCLUSIVE,
+            True,
+            True,
+            BlockingImpact.REWRITE,
+        ),
+    ],
+)
+def test_classify_statement(sql, lock, rewrite, scan, impact):
+    """Test statements map to their lock, table effects and impact."""
+    finding = PostgresLockClassifier().classify(sql)
+
+    assert finding is not None
+    assert (finding.lock, finding.rewrite, finding.scan) == (lock, rewrite, scan)
+    assert finding.impact == impact
+
+
+def test_classify_resolves_table_and_combines_subcommands():
+    """Test ALTER TABLE takes its strongest subcommand lock on its table."""
+    finding = PostgresLockClassifier().classify(
+        "-- widen\nALTER TABLE public.\"Users\" ADD COLUMN note text DEFAULT 'a, b',"
+        ' ALTER COLUMN "name" SET NOT NULL'
+    )
+
+    assert finding is not None
+    assert finding.table == 'public."Users"'
+    assert finding.operation == "ALTER TABLE ADD COLUMN, SET NOT NULL"
+    assert finding.scan and not finding.rewrite
+
+
+def test_classify_ignores_statements_without_table_locks():
+    """Test DML and new tables produce no finding."""
+    classifier = PostgresLockClassifier()
+
+    assert classifier.classify("CREATE TABLE t (id int)") is None
+    assert classifier.classify("INSERT INTO alembic_version VALUES ('001')") is None
+    assert classifier_for("sqlite") is None
+
+
+def test_analyzer_reports_ranked_locks_per_revision():
+    """Test PostgreSQL reports carry lock findings through merging."""
+    analyzer = SafetyAnalyzer("postgresql")
+    merged = merge_reports(
+        {
+            "001": analyzer.analyze("CREATE INDEX ix ON users (email);"),
+            "002": analyzer.analyze_stream(
+                ["ALTER TABLE users ALTER COL", "UMN id TYPE bigint;"]
+            ),
+        }
+    )
+
+    assert [(f.revision, f.table) for f in merged.locks] == [
+        ("001", "users"),
+        ("002", "users"),
+    ]
+    assert [f.revision for f in rank_findings(merged.locks)] == ["002", "001"]
+    assert SafetyReport.from_dict(merged.to_dict()) == merged
+    assert SafetyAnalyzer().analyze("CREATE INDEX ix ON users (email);").locks == []
+
+
+def test_finding_round_trips_with_rank():
+    """Test serialized findings carry their rank."""
+    finding = LockFinding("CREATE INDEX", "users", LockMode.SHARE, scan=True)
+
+    data = finding.to_dict()
+
+    assert data["rank"] == BlockingImpact.BLOCKS_WRITES
+    assert LockFinding.from_dict(data) == finding
+    assert finding.describe() == "CREATE INDEX on users: SHARE, scans table"
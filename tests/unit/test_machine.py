@@ -2,9 +2,22 @@
 
 from __future__ import annotations
 
+import asyncio
+import threading
+from collections.abc import Callable
+
 import pytest
 
-from src.machine import State, StateMachine
+from src.config import ActionConfig
+from src.machine import AsyncState, AsyncStateMachine, Fork, State, StateMachine
+from src.safety import SafetyAnalyzer
+from src.states import (
+    ActionContext,
+    EstimateState,
+    InitState,
+    RenderState,
+    RevisionState,
+)
 
 
 # =============================================================================
@@ -30,6 +43,109 @@ class ErrorState(State[dict]):
         raise ValueError("Test error")
 
 
+class BarrierState(State[dict]):
+    """Test state that only finishes once every branch has started."""
+
+    def __init__(self, name: str, barrier: threading.Barrier):
+        self.name = name
+        self.barrier = barrier
+
+    def handle(self, context: dict) -> State | None:
+        self.barrier.wait(timeout=5)
+        context["visited"].append(self.name)
+        return None
+
+
+class ForkState(State[dict]):
+    """Test state that forks into branches."""
+
+    def __init__(self, fork: Fork):
+        self.fork = fork
+
+    def handle(self, context: dict) -> Fork:
+        return self.fork
+
+
+class AsyncCounterState(AsyncState[dict]):
+    """Async test state that yields to the loop, then transitions."""
+
+    def __init__(self, name: str, next_state=None):
+        self.name = name
+        self.next_state = next_state
+
+    async def handle(self, context: dict):
+        await asyncio.sleep(0)
+        context["visited"].append(self.name)
+        return self.next_state
+
+
+class AsyncBarrierState(AsyncState[dict]):
+    """Async test state that only finishes once every branch has started."""
+
+    def __init__(self, name: str, started: list[str], count: int):
+        self.name = name
+        self.started = started
+        self.count = count
+
+    async def handle(self, context: dict) -> None:
+        self.started.append(self.name)
+        while len(self.started) < self.count:
+            await asyncio.sleep(0)
+        context["visited"].append(self.name)
+
+
+class AsyncRecordingObserver:
+    """Async test observer recording every event in order."""
+
+    def __init__(self):
+        self.events = []
+
+    async def on_state_enter(self, state_name: str, context: dict) -> None:
+        self.events.append(("enter", state_name))
+
+    async def on_state_exit(self, state_name: str, context: dict) -> None:
+        self.events.append(("exit", state_name))
+
+    async def on_error(self, state_name: str, error: Exception, context: dict) -> None:
+        self.events.append(("error", state_name))
+
+
+class RecordingObserver:
+    """Test observer recording every event in order."""
+
+    def __init__(self):
+        self.events = []
+
+    def on_state_enter(self, state_name: str, context: dict) -> None:
+        self.events.append(("enter", state_name))
+
+    def on_state_exit(self, state_name: str, context: dict) -> None:
+        self.events.append(("exit", state_name))
+
+    def on_error(self, state_name: str, error: Exception, context: dict) -> None:
+        self.events.append(("error", state_name))
+
+
+class BarrierRunner:
+    """Subprocess-style runner whose revision read waits for the render."""
+
+    def __init__(self, barrier: threading.Barrier):
+        self.barrier = barrier
+
+    def current(self) -> str:
+        self.barrier.wait(timeout=5)
+        return "001 (head)"
+
+    def upgrade(
+        self,
+        revision: str,
+        sql: bool = False,
+        on_chunk: Callable[[str], None] | None = None,
+    ) -> str:
+        self.barrier.wait(timeout=5)
+        return "CREATE TABLE users (id INTEGER);"
+
+
 # =============================================================================
 # TESTS
 # =============================================================================
@@ -130,3 +246,159 @@ def test_state_machine_observer_error_notification():
         machine.run()
 
     assert observer.error_calls == ["ErrorState"]
+
+
+def test_state_machine_snapshots_after_each_exit():
+    """Test the snapshotter sees each completed state and its successor."""
+
+    class TestSnapshotter:
+        def __init__(self):
+            self.calls = []
+
+        def save(self, state_name: str, next_state: str | None, context: dict):
+            self.calls.append((state_name, next_state, context["count"]))
+
+    context = {"count": 0, "visited": []}
+    snapshotter = TestSnapshotter()
+    machine = StateMachine(
+        initial_state=CounterState("A", next_state=ErrorState()),
+        context=context,
+        snapshotter=snapshotter,
+    )
+
+    with pytest.raises(ValueError):
+        machine.run()
+
+    assert snapshotter.calls == [("CounterState", "ErrorState", 1)]
+
+
+def test_fork_runs_branches_concurrently_then_joins():
+    """Test branches run at the same time and the join runs after both."""
+    barrier = threading.Barrier(2)
+    context = {"count": 0, "visited": []}
+    fork = Fork(
+        (BarrierState("left", barrier), BarrierState("right", barrier)),
+        join=CounterState("join"),
+    )
+    observer = RecordingObserver()
+    machine = StateMachine(initial_state=ForkState(fork), context=context)
+    machine.add_observer(observer)
+
+    machine.run()
+
+    assert sorted(context["visited"][:2]) == ["left", "right"]
+    assert context["visited"][2] == "join"
+    assert observer.events.count(("enter", "BarrierState")) == 2
+    assert observer.events.count(("exit", "BarrierState")) == 2
+    assert observer.events[-2:] == [("enter", "CounterState"), ("exit", "CounterState")]
+
+
+def test_fork_branch_error_propagates_after_other_branches():
+    """Test a failed branch stops the machine once the others finished."""
+    context = {"count": 0, "visited": []}
+    fork = Fork(
+        (ErrorState(), CounterState("B", next_state=CounterState("C"))),
+        join=CounterState("join"),
+    )
+    observer = RecordingObserver()
+    machine = StateMachine(initial_state=ForkState(fork), context=context)
+    machine.add_observer(observer)
+
+    with pytest.raises(ValueError, match="Test error"):
+        machine.run()
+
+    assert context["visited"] == ["B", "C"]
+    assert ("error", "ErrorState") in observer.events
+    assert observer.events.count(("exit", "CounterState")) == 2
+
+
+def test_dry_run_reads_revision_while_rendering(monkeypatch):
+    """Test a dry run forks the revision read and the render, then estimates."""
+    monkeypatch.delenv("GITHUB_OUTPUT", raising=False)
+    context = ActionContext(
+        config=ActionConfig(
+            database_url="sqlite:///test.db",
+            command="upgrade",
+            revision="head",
+            dry_run=True,
+            alembic_config_path="alembic.ini",
+            working_directory=".",
+            analyze_safety=False,
+            fail_on_danger=False,
+        ),
+        runner=BarrierRunner(threading.Barrier(2)),  # type: ignore[arg-type]
+        analyzer=SafetyAnalyzer(),
+    )
+    observer = RecordingObserver()
+    machine = StateMachine(initial_state=InitState(), context=context)
+    machine.add_observer(observer)  # type: ignore[arg-type]
+
+    machine.run()
+
+    exits = [name for kind, name in observer.events if kind == "exit"]
+    assert exits[0] == "InitState"
+    assert sorted(exits[1:3]) == sorted([RevisionState.__name__, RenderState.__name__])
+    assert exits[3] == EstimateState.__name__
+    assert context.current_revisions == ("001",)
+    assert context.outputs["sql-preview"] == "CREATE TABLE users (id INTEGER);"
+
+
+def test_async_state_machine_runs_many_machines_on_one_loop():
+    """Test machines interleave on one loop and notify both observer kinds."""
+    contexts = [{"visited": []} for _ in range(3)]
+    observers = []
+    machines = []
+    for index, context in enumerate(contexts):
+        machine = AsyncStateMachine(
+            initial_state=AsyncCounterState(
+                f"{index}a", next_state=AsyncCounterState(f"{index}b")
+            ),
+            context=context,
+        )
+        observers.append((AsyncRecordingObserver(), RecordingObserver()))
+        for observer in observers[-1]:
+            machine.add_observer(observer)
+        machines.append(machine)
+
+    async def run_all() -> None:
+        await asyncio.gather(*(machine.run() for machine in machines))
+
+    asyncio.run(run_all())
+
+    assert [context["visited"] for context in contexts] == [
+        ["0a", "0b"],
+        ["1a", "1b"],
+        ["2a", "2b"],
+    ]
+    for async_observer, observer in observers:
+        assert async_observer.events == observer.events
+        assert (
+            observer.events
+            == [
+                ("enter", "AsyncCounterState"),
+                ("exit", "AsyncCounterState"),
+            ]
+            * 2
+        )
+
+
+def test_async_fork_runs_branches_as_tasks_then_joins():
+    """Test async branches run concurrently and the join runs after both."""
+    started: list[str] = []
+    context = {"visited": []}
+    fork = Fork(
+        (
+            AsyncBarrierState("left", started, 2),
+            AsyncBarrierState("right", started, 2),
+        ),
+        join=AsyncCounterState("join"),
+    )
+
+    class AsyncForkState(AsyncState[dict]):
+        async def handle(self, context: dict) -> Fork:
+            return fork
+
+    asyncio.run(AsyncStateMachine(AsyncForkState(), context).run())
+
+    assert sorted(context["visited"][:2]) == ["left", "right"]
+    assert context["visited"][2] == "join"
@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import json
 import logging
+import subprocess
+import sys
 
-from src.observers import LoggingObserver
+from src.observers import LoggingObserver, ProfilingObserver
 
 
 def test_logging_observer_on_state_enter(caplog):
@@ -39,3 +42,50 @@ def test_logging_observer_on_error(caplog):
     observer.on_error("TestState", error, context)
 
     assert "Error in state TestState" in caplog.text
+
+
+class _Context:
+    """Minimal context recording outputs."""
+
+    def __init__(self) -> None:
+        self.outputs: dict[str, str] = {}
+
+    def set_output(self, key: str, value: str) -> None:
+        self.outputs[key] = value
+
+
+def test_profiling_observer_records_states():
+    """Test each state gets wall, CPU and child-process figures."""
+    observer = ProfilingObserver()
+
+    observer.on_state_enter("InitState", None)
+    subprocess.run([sys.executable, "-c", "sum(range(3_000_000))"], check=True)
+    observer.on_state_exit("InitState", None)
+    observer.on_state_enter("ExecutionState", None)
+    observer.on_error("ExecutionState", ValueError("boom"), None)
+
+    init, execution = observer.profiles
+    assert init.state == "InitState"
+    assert init.wall_seconds > 0
+    assert init.child_cpu_seconds > 0
+    assert init.peak_rss_mb > 0
+    assert not init.failed
+    assert execution.failed
+
+
+def test_profiling_observer_finish_publishes_profile(tmp_path, monkeypatch):
+    """Test the profile is written as JSON, outputs and a summary table."""
+    summary = tmp_path / "summary.md"
+    monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(summary))
+    observer = ProfilingObserver()
+    observer.on_state_enter("DryRunState", None)
+    observer.on_state_exit("DryRunState", None)
+    context = _Context()
+
+    observer.finish(context, tmp_path / "out" / "profile.json")  # type: ignore[arg-type]
+
+    data = json.loads((tmp_path / "out" / "profile.json").read_text())
+    assert [row["state"] for row in data] == ["DryRunState"]
+    assert json.loads(context.outputs["state-timings"]) == data
+    assert context.outputs["profile-path"] == str(tmp_path / "out" / "profile.json")
+    assert "| DryRunState |" in summary.read_text()
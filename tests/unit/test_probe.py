@@ -0,0 +1,71 @@
+"""Unit tests for the fast revision probe."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from src.alembic_ops import InProcessAlembicRunner
+from src.probe import RevisionProbe
+from src.session import DatabaseSession
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+@pytest.fixture
+def session(app_dir: Path):
+    """Session against a fresh copy of the test app database."""
+    db = DatabaseSession(f"sqlite:///{app_dir / 'test.db'}")
+    yield db
+    db.close()
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_probe_missing_version_table(session):
+    """Test probe returns no revisions before the first migration."""
+    probe = RevisionProbe(session, "alembic.ini")
+
+    assert probe.current_revisions() == ()
+    assert not probe.is_at_target((), "head")
+    assert probe.is_at_target((), "base")
+
+
+def test_probe_reads_current_revision(session):
+    """Test probe reads the revision written by an upgrade."""
+    InProcessAlembicRunner("alembic.ini").upgrade("head")
+    probe = RevisionProbe(session, "alembic.ini")
+
+    current = probe.current_revisions()
+
+    assert current == ("003",)
+    assert probe.is_at_target(current, "head")
+    assert probe.is_at_target(current, "003")
+    assert not probe.is_at_target(current, "002")
+
+
+def test_probe_multiple_heads(session):
+    """Test probe returns every row of a multi-head database."""
+    InProcessAlembicRunner("alembic.ini").upgrade("head")
+    connection = session.open()
+    connection.execute(text("INSERT INTO alembic_version VALUES ('zzz')"))
+    connection.execute(text("INSERT INTO alembic_version VALUES ('aaa')"))
+    session.commit()
+
+    assert RevisionProbe(session, "alembic.ini").current_revisions() == (
+        "003",
+        "aaa",
+        "zzz",
+    )
+
+
+def test_probe_relative_target_is_unresolved(session):
+    """Test relative targets never short-circuit."""
+    probe = RevisionProbe(session, "alembic.ini")
+
+    assert probe.target_revisions("+1") is None
+    assert not probe.is_at_target(("003",), "+1")
@@ -0,0 +1,111 @@
+"""Unit tests for parallel SQL rendering."""
+
+from __future__ import annotations
+
+from src.alembic_ops import InProcessAlembicRunner
+from src.commands import DryRunCommand
+from src.config import ActionConfig
+from src.render import ParallelRenderer, RenderSlice, _analyze_revisions
+from src.render_cache import RenderCache
+from src.safety import SafetyAnalyzer
+from src.states import ActionContext
+
+DROP_COLUMN_WARNING = "DROP COLUMN detected - data will be lost"
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_plan_slices_linear_range(app_dir):
+    """Test the pending range is split into chained slices."""
+    renderer = ParallelRenderer("alembic.ini", workers=2, chunk_size=2)
+
+    assert renderer.plan((), "head") == [
+        RenderSlice(None, ("001", "002")),
+        RenderSlice("002", ("003",)),
+    ]
+    assert renderer.plan(("001",), "head") == [RenderSlice("001", ("002", "003"))]
+    assert renderer.plan(("003",), "head") == []
+
+
+def test_plan_rejects_multiple_current_heads(app_dir):
+    """Test several current revisions fall back to serial rendering."""
+    renderer = ParallelRenderer("alembic.ini", workers=2)
+
+    assert renderer.plan(("002", "003"), "head") is None
+
+
+def test_render_slice_spec():
+    """Test slice ranges match alembic's offline syntax."""
+    assert RenderSlice(None, ("001", "002")).spec == "002"
+    assert RenderSlice("002", ("003",)).spec == "002:003"
+
+
+def test_render_matches_serial_output(app_dir):
+    """Test merged parallel output equals one serial render."""
+    renderer = ParallelRenderer("alembic.ini", workers=2)
+
+    output, report = renderer.render(renderer.plan((), "head") or [])
+
+    serial = InProcessAlembicRunner("alembic.ini").upgrade("head", sql=True)
+    assert output.text() == serial.text()
+    assert report.warnings == [DROP_COLUMN_WARNING]
+    assert report.attribution == {DROP_COLUMN_WARNING: ("003",)}
+
+
+def test_analyze_revisions_splits_on_markers():
+    """Test each revision section is analyzed separately."""
+    sql = (
+        "CREATE TABLE alembic_version (version_num VARCHAR(32));\n"
+        "-- Running upgrade  -> 001\n\nTRUNCATE logs;\n"
+        "-- Running upgrade 001 -> 002\n\nCREATE TABLE t (id INT);\n"
+    )
+
+    reports = _analyze_revisions(sql, ("001", "002"))
+
+    assert not reports["001"].is_safe
+    assert reports["002"].is_safe
+
+
+def test_render_reuses_cached_slices(app_dir):
+    """Test cached slices are not re-rendered."""
+    renderer = ParallelRenderer("alembic.ini", workers=2)
+    slices = renderer.plan((), "head") or []
+    cache = RenderCache(app_dir / "cache", "alembic.ini", "sqlite:///test.db")
+    first, _ = renderer.render(slices, cache)
+
+    second, report = renderer.render(slices, cache)
+
+    assert (cache.hits, cache.misses) == (3, 3)
+    assert second.text() == first.text()
+    assert report.attribution == {DROP_COLUMN_WARNING: ("003",)}
+
+
+def test_dry_run_previews_same_range_with_and_without_workers(app_dir):
+    """Test parallel and serial dry runs preview the same SQL and report."""
+    config = ActionConfig(
+        database_url="sqlite:///test.db",
+        command="upgrade",
+        revision="head",
+        dry_run=True,
+        alembic_config_path="alembic.ini",
+        working_directory=".",
+        analyze_safety=True,
+        fail_on_danger=False,
+    )
+    contexts = []
+    for renderer in (None, ParallelRenderer("alembic.ini", workers=2)):
+        context = ActionContext(
+            config=config,
+            runner=InProcessAlembicRunner("alembic.ini"),
+            analyzer=SafetyAnalyzer(),
+            current_revisions=("002",),
+            renderer=renderer,
+        )
+        DryRunCommand().execute(context)
+        contexts.append(context)
+
+    serial, parallel = contexts
+    assert str(parallel.sql_preview) == str(serial.sql_preview)
+    assert parallel.safety_report is not None and serial.safety_report is not None
+    assert parallel.safety_report.warnings == serial.safety_report.warnings
@@ -0,0 +1,89 @@
+"""Unit tests for the render cache."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.alembic_ops import InProcessAlembicRunner
+from src.commands import DryRunCommand
+from src.config import ActionConfig
+from src.render import RenderSlice
+from src.render_cache import RenderCache
+from src.safety import DangerLevel, SafetyAnalyzer, SafetyReport
+from src.states import ActionContext
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+def _cache(app_dir: Path, url: str = "sqlite:///test.db") -> RenderCache:
+    """Cache for the test app."""
+    return RenderCache(app_dir / "cache", "alembic.ini", url)
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_store_and_load_round_trip(app_dir):
+    """Test entries are read back and hits/misses are counted."""
+    cache = _cache(app_dir)
+    key = cache.range_key(None, "head")
+    report = SafetyReport(
+        is_safe=False,
+        danger_level=DangerLevel.MEDIUM,
+        warnings=["DROP COLUMN detected - data will be lost"],
+        attribution={"DROP COLUMN detected - data will be lost": ("003",)},
+    )
+
+    assert cache.load(key) is None
+    cache.store(key, "ALTER TABLE users DROP COLUMN email;\n", report)
+    entry = cache.load(key)
+
+    assert entry is not None
+    assert entry.sql.text() == "ALTER TABLE users DROP COLUMN email;\n"
+    assert entry.report == report
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_depends_on_revision_content_and_dialect(app_dir):
+    """Test keys change with revision files and dialect, not with nothing."""
+    key = _cache(app_dir).range_key(None, "head")
+    slice_key = _cache(app_dir).slice_key(RenderSlice("002", ("003",)))
+
+    assert _cache(app_dir).range_key(None, "head") == key
+    assert _cache(app_dir, "postgresql://db/app").range_key(None, "head") != key
+
+    revision = next((app_dir / "alembic" / "versions").glob("003_*.py"))
+    revision.write_text(revision.read_text() + "\n# edited\n")
+    assert _cache(app_dir).range_key(None, "head") != key
+    assert _cache(app_dir).slice_key(RenderSlice("002", ("003",))) != slice_key
+
+
+def test_dry_run_loads_second_run_from_cache(app_dir):
+    """Test a repeated dry run reuses the rendered SQL and report."""
+    config = ActionConfig(
+        database_url="sqlite:///test.db",
+        command="upgrade",
+        revision="head",
+        dry_run=True,
+        alembic_config_path="alembic.ini",
+        working_directory=".",
+        analyze_safety=True,
+        fail_on_danger=False,
+    )
+    outputs = []
+    for _ in range(2):
+        context = ActionContext(
+            config=config,
+            runner=InProcessAlembicRunner("alembic.ini"),
+            analyzer=SafetyAnalyzer(),
+            render_cache=_cache(app_dir),
+        )
+        DryRunCommand().execute(context)
+        outputs.append(context.outputs)
+
+    assert outputs[0]["render-cache-misses"] == "1"
+    assert outputs[1]["render-cache-hits"] == "1"
+    assert str(outputs[1]["sql-preview"]) == str(outputs[0]["sql-preview"])
+    assert context.safety_report is not None
+    assert context.safety_report.danger_level == DangerLevel.MEDIUM
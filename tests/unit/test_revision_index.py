@@ -0,0 +1,124 @@
+"""Unit tests for the revision index."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from src import revision_index
+from src.alembic_ops import InProcessAlembicRunner
+from src.commands import ExecutionCommand
+from src.config import ActionConfig
+from src.revision_index import RevisionIndex
+from src.safety import SafetyAnalyzer
+from src.states import ActionContext
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+def _write_revision(directory: Path, rev: str, down: str | tuple | None) -> None:
+    """Write a minimal revision file."""
+    (directory / f"{rev}.py").write_text(
+        f'"""Revision {rev}"""\n'
+        f"revision = {rev!r}\n"
+        f"down_revision = {down!r}\n"
+        "branch_labels = None\n"
+        "depends_on = None\n"
+    )
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_index_graph_queries(app_dir):
+    """Test heads, bases and pending path on the linear test app."""
+    index = RevisionIndex.from_config("alembic.ini")
+
+    assert len(index) == 3
+    assert index.heads() == ("003",)
+    assert index.bases() == ("001",)
+    assert index.upgrade_path((), "head") == ["001", "002", "003"]
+    assert index.upgrade_path(("001",), "head") == ["002", "003"]
+    assert index.upgrade_path(("003",), "head") == []
+    assert index.upgrade_path((), "+1") is None
+
+
+def test_index_matches_alembic_output(app_dir):
+    """Test history and show render like the Alembic CLI."""
+    index = RevisionIndex.from_config("alembic.ini")
+    runner = InProcessAlembicRunner("alembic.ini")
+
+    assert index.format_history() == runner.history()
+    assert index.format_show("002") == runner.show("002")
+    for target in ("head", "heads", "base"):
+        assert index.format_show(target) == runner.show(target)
+
+
+def test_show_falls_back_to_alembic_for_relative_targets(app_dir, capsys):
+    """Test ``show`` of a target the index cannot resolve runs Alembic."""
+    index = RevisionIndex.from_config("alembic.ini")
+    runner = InProcessAlembicRunner("alembic.ini")
+    context = ActionContext(
+        config=ActionConfig(
+            database_url="sqlite:///test.db",
+            command="show",
+            revision="003@head",
+            dry_run=False,
+            alembic_config_path="alembic.ini",
+            working_directory=".",
+            analyze_safety=False,
+            fail_on_danger=False,
+        ),
+        runner=runner,
+        analyzer=SafetyAnalyzer(),
+        revision_index=index,
+    )
+
+    ExecutionCommand().execute(context)
+
+    assert runner.show("003") in capsys.readouterr().out
+
+
+def test_index_branches_and_merges(tmp_path):
+    """Test a branched and merged graph."""
+    versions = tmp_path / "versions"
+    versions.mkdir()
+    _write_revision(versions, "a", None)
+    _write_revision(versions, "b1", "a")
+    _write_revision(versions, "b2", "a")
+    index = RevisionIndex([versions])
+    index.refresh()
+    assert index.heads() == ("b1", "b2")
+    assert index.resolve("head") is None
+
+    _write_revision(versions, "m", ("b1", "b2"))
+    index.refresh()
+
+    assert index.heads() == ("m",)
+    assert index.upgrade_path(("b1",), "head") == ["b2", "m"]
+    assert "b1, b2 -> m (head) (mergepoint), Revision m" in index.format_history()
+
+
+def test_index_cache_revalidates_changed_files(app_dir, tmp_path, monkeypatch):
+    """Test cached entries are reused and only changed files re-parsed."""
+    cache = tmp_path / "cache" / "index.json"
+    RevisionIndex.from_config("alembic.ini", cache)
+    assert cache.exists()
+
+    parsed: list[str] = []
+    original = revision_index._parse_revision_file
+
+    def tracking_parse(path, mtime_ns, size):
+        parsed.append(path.name)
+        return original(path, mtime_ns, size)
+
+    monkeypatch.setattr(revision_index, "_parse_revision_file", tracking_parse)
+    RevisionIndex.from_config("alembic.ini", cache)
+    assert parsed == []
+
+    target = app_dir / "alembic" / "versions" / "003_dangerous_migration.py"
+    target.write_text(target.read_text() + "\n# touched\n")
+    index = RevisionIndex.from_config("alembic.ini", cache)
+
+    assert parsed == ["003_dangerous_migration.py"]
+    assert index.get("003").content_hash != ""
@@ -3,6 +3,9 @@
 # =============================================================================
 # IMPORTS
 # =============================================================================
+import time
+
+from src.safety import SafetyAnalyzer, flagged_tables, iter_statements, merge_reports
 
 # =============================================================================
 # TESTS
@@ -53,3 +56,167 @@ def test_analyze_truncate_is_high_danger(analyzer, danger_high):
     sql = "TRUNCATE TABLE logs;"
     report = analyzer.analyze(sql)
     assert report.danger_level == danger_high
+
+
+def test_analyze_alter_column_type_is_medium_danger(analyzer, danger_medium):
+    """Test that a column type change spanning lines is detected."""
+    sql = "ALTER TABLE users\n    ALTER COLUMN age\n    TYPE BIGINT;"
+    report = analyzer.analyze(sql)
+    assert report.danger_level == danger_medium
+    assert "Column type change detected" in report.warnings[0]
+
+
+def test_analyze_matches_case_insensitively_across_comments(analyzer, danger_high):
+    """Test that lower-case keywords split by a comment are still detected."""
+    report = analyzer.analyze("drop /* legacy */\n  table users;")
+    assert report.danger_level == danger_high
+
+
+def test_analyze_drop_index_warns_without_raising_level(analyzer, danger_low):
+    """Test that DROP INDEX warns but keeps the LOW level."""
+    report = analyzer.analyze("DROP INDEX ix_users_email;")
+    assert not report.is_safe
+    assert report.danger_level == danger_low
+
+
+def test_analyze_strings_and_dollar_bodies_are_ignored(analyzer):
+    """Test that keywords inside literals and function bodies are ignored."""
+    sql = """
+    INSERT INTO audit (note) VALUES ('DROP TABLE users; it''s fine');
+    INSERT INTO audit (note) VALUES (E'escaped \\' TRUNCATE');
+    CREATE FUNCTION f() RETURNS void AS $body$ TRUNCATE logs; $body$ LANGUAGE sql;
+    SELECT "drop table" FROM t;
+    """
+    report = analyzer.analyze(sql)
+    assert report.is_safe
+
+
+def test_analyze_mysql_backslash_escapes_do_not_hide_statements(danger_high):
+    """Test a backslash-escaped quote does not swallow the rest of the script."""
+    sql = "INSERT INTO t VALUES ('it\\'s', \"a\\\"b\");\nDROP TABLE users;"
+    for dialect in ("mysql", "mariadb"):
+        analyzer = SafetyAnalyzer(dialect)
+        assert analyzer.analyze(sql).danger_level == danger_high
+        for cut in range(1, len(sql)):
+            chunks = (sql[:cut], sql[cut:])
+            assert analyzer.analyze_stream(chunks).danger_level == danger_high
+    assert list(iter_statements((sql,), "mysql"))[1] == "\nDROP TABLE users"
+
+
+def test_analyze_keywords_must_be_whole_words(analyzer):
+    """Test that identifiers containing keywords are not flagged."""
+    sql = "ALTER TABLE logs ADD COLUMN truncated_at TIMESTAMP;"
+    report = analyzer.analyze(sql)
+    assert report.is_safe
+
+
+def test_analyze_alter_type_is_scoped_to_statement(analyzer):
+    """Test that ALTER ... COLUMN and TYPE in separate statements do not match."""
+    sql = "ALTER TABLE t ADD COLUMN c INT;\nCREATE TYPE mood AS ENUM ('ok');"
+    report = analyzer.analyze(sql)
+    assert report.is_safe
+
+
+def test_analyze_is_linear_on_pathological_input(analyzer):
+    """Test input that made the old ALTER/COLUMN/TYPE regex blow up stays fast."""
+    sql = "ALTER TABLE t " + "ALTER COLUMN c SET DEFAULT 1, " * 100_000
+    start = time.perf_counter()
+    report = analyzer.analyze(sql)
+    assert time.perf_counter() - start < 5
+    assert report.is_safe
+
+
+def test_analyze_stream_matches_analyze_for_any_split(analyzer, danger_high):
+    """Test that chunk boundaries inside tokens do not change the result."""
+    sql = (
+        "-- DROP TABLE ignored\nINSERT INTO t VALUES (E'it\\'s', 'a''b');\n"
+        "CREATE FUNCTION f() AS $fn$ TRUNCATE x; $fn$;\n"
+        "/* block */ ALTER TABLE t ALTER COLUMN c TYPE TEXT;\nDROP TABLE old;"
+    )
+    expected = analyzer.analyze(sql)
+    assert expected.danger_level == danger_high
+    for size in (1, 2, 3, 7, 64):
+        chunks = [sql[i : i + size] for i in range(0, len(sql), size)]
+        assert analyzer.analyze_stream(chunks) == expected
+
+
+def test_stream_matches_analyze_when_chunks_split_literal_ends(analyzer):
+    """Test literals left open at a chunk end close and continue correctly."""
+    sql = (
+        "SELECT 'a''' AS x; /* b * */ SELECT E'c\\\\'; SELECT E'd\\'';\n"
+        'SELECT "e""" FROM `f`; SELECT $t$ $t $t$; DROP TABLE g;'
+    )
+    expected = analyzer.analyze(sql)
+    assert expected.warnings
+    for cut in range(1, len(sql)):
+        chunks = (sql[:cut], sql[cut:])
+        assert analyzer.analyze_stream(chunks) == expected
+        assert list(iter_statements(chunks)) == list(iter_statements((sql,)))
+
+
+def test_stream_is_linear_on_long_literals(danger_high):
+    """Test multi-MB literals fed in small chunks are not scanned again."""
+    for body in ("$body$" + "x" * 4_000_000 + "$body$", "'" + "y''" * 1_000_000 + "'"):
+        sql = f"CREATE FUNCTION f() AS {body} LANGUAGE sql; DROP TABLE t;"
+        chunks = [sql[i : i + 1024] for i in range(0, len(sql), 1024)]
+        for dialect in ("", "postgresql"):
+            start = time.perf_counter()
+            report = SafetyAnalyzer(dialect).analyze_stream(chunks)
+            assert time.perf_counter() - start < 5
+            assert report.danger_level == danger_high
+
+
+def test_stream_reports_complete_statements_incrementally(analyzer, danger_high):
+    """Test that the running report covers statements as they complete."""
+    stream = analyzer.stream()
+    stream.feed("CREATE TABLE t (id INT);\nDROP TA")
+    assert stream.report.is_safe
+    stream.feed("BLE t;\n")
+    assert not stream.report.is_safe
+    assert stream.finish().danger_level == danger_high
+
+
+def test_merge_reports_attributes_warnings_to_revisions(analyzer, danger_high):
+    """Test merged reports keep rule order and per-revision attribution."""
+    merged = merge_reports(
+        {
+            "001": analyzer.analyze("DROP INDEX ix_a;"),
+            "002": analyzer.analyze("CREATE TABLE t (id INT);"),
+            "003": analyzer.analyze("TRUNCATE logs; DROP INDEX ix_b;"),
+        }
+    )
+    assert merged.danger_level == danger_high
+    assert not merged.is_safe
+    assert merged.warnings == [
+        "TRUNCATE detected - all data will be deleted",
+        "DROP INDEX detected - may affect query performance",
+    ]
+    assert merged.attribution[merged.warnings[1]] == ("001", "003")
+
+
+def test_iter_statements_ignores_separators_in_noise():
+    """Test statements split the same way for any chunking."""
+    sql = "ALTER TABLE a ADD x; -- c;d\nINSERT INTO t VALUES ('a;b'); SELECT $$;$$"
+    expected = [
+        "ALTER TABLE a ADD x",
+        " -- c;d\nINSERT INTO t VALUES ('a;b')",
+        " SELECT $$;$$",
+    ]
+    for size in (1, 2, 5, len(sql)):
+        chunks = [sql[i : i + size] for i in range(0, len(sql), size)]
+        assert list(iter_statements(chunks)) == expected
+
+
+def test_flagged_tables_per_warning(analyzer):
+    """Test flagged statements are resolved to the tables they act on."""
+    sql = (
+        'ALTER TABLE "Events" ALTER COLUMN id TYPE BIGINT;\n'
+        "DROP TABLE IF EXISTS archive.logs, tmp;\n"
+        "ALTER TABLE users ADD COLUMN age INT;"
+    )
+    report = analyzer.analyze(sql)
+
+    assert flagged_tables([sql], report.warnings) == {
+        "DROP TABLE detected - data will be permanently lost": ["archive.logs", "tmp"],
+        "Column type change detected - may fail or lock table": ['"Events"'],
+    }
@@ -0,0 +1,95 @@
+"""Unit tests for schema-per-tenant migrations."""
+
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from src import schemas
+from src.constants import STATUS_FAILED, STATUS_SKIPPED, STATUS_SUCCESS
+from src.schemas import SchemaMigrator, SchemaWorker, parse_schemas
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+@pytest.fixture
+def attach_schemas(app_dir, monkeypatch) -> list[str]:
+    """Emulate schemas on SQLite: each one is an attached database file."""
+    attached: list[str] = []
+
+    def attach(connection, schema):
+        connection.exec_driver_sql(
+            f"ATTACH DATABASE '{app_dir / schema}.db' AS {schema}"
+        )
+        attached.append(schema)
+
+    monkeypatch.setattr(schemas, "set_search_path", attach)
+    return attached
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_parse_schemas():
+    """Test newline and comma separators, blanks and duplicates."""
+    assert parse_schemas("acme, globex\n\nacme\n initech ") == [
+        "acme",
+        "globex",
+        "initech",
+    ]
+
+
+def test_worker_upgrades_schema_and_reports_revisions(app_dir, attach_schemas):
+    """Test the version table lands in the tenant schema, then is skipped."""
+    url = f"sqlite:///{app_dir / 'test.db'}"
+    worker = SchemaWorker(url, "alembic.ini")
+    try:
+        result = worker.migrate("acme")
+    finally:
+        worker.close()
+
+    assert result.status == STATUS_SUCCESS
+    assert (result.from_revision, result.revision) == ("none", "003")
+    assert result.duration > 0
+    with sqlite3.connect(app_dir / "acme.db") as conn:
+        assert conn.execute("SELECT version_num FROM alembic_version").fetchall() == [
+            ("003",)
+        ]
+
+    worker = SchemaWorker(url, "alembic.ini")
+    try:
+        again = worker.migrate("acme")
+    finally:
+        worker.close()
+    assert again.status == STATUS_SKIPPED
+    assert again.revision == "003"
+
+
+def test_sequential_mode_uses_one_connection(app_dir, attach_schemas, monkeypatch):
+    """Test every schema is migrated on the same connection."""
+    connections = []
+
+    def migrate(self, schema):
+        connections.append(self.session.open())
+        return schemas.SchemaResult(schema, STATUS_SUCCESS)
+
+    monkeypatch.setattr(SchemaWorker, "migrate", migrate)
+    results = SchemaMigrator(f"sqlite:///{app_dir / 'test.db'}", "alembic.ini").run(
+        ["acme", "globex", "initech"]
+    )
+
+    assert [r.schema for r in results] == ["acme", "globex", "initech"]
+    assert len({id(conn) for conn in connections}) == 1
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_failures_are_reported_per_schema(app_dir, workers):
+    """Test unsupported dialects fail each schema without stopping the run."""
+    results = SchemaMigrator(
+        f"sqlite:///{app_dir / 'test.db'}", "alembic.ini", workers=workers
+    ).run(["acme", "globex"])
+
+    assert [r.status for r in results] == [STATUS_FAILED, STATUS_FAILED]
+    assert all("requires PostgreSQL" in r.error for r in results)
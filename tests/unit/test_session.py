@@ -0,0 +1,58 @@
+"""Unit tests for the shared database session."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.alembic_ops import InProcessAlembicRunner, create_runner
+from src.session import DatabaseSession
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+@pytest.fixture
+def app_url(app_dir: Path) -> str:
+    """SQLite URL of the test app copy."""
+    return f"sqlite:///{app_dir / 'test.db'}"
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_session_open_records_latency(app_url):
+    """Test opening the session records connect latency once."""
+    session = DatabaseSession(app_url)
+
+    connection = session.open()
+
+    assert session.is_open
+    assert session.connect_latency_ms is not None
+    assert session.open() is connection
+    session.close()
+    assert not session.is_open
+
+
+def test_runner_shares_session_connection(app_url):
+    """Test in-process runner migrates through the shared connection."""
+    session = DatabaseSession(app_url)
+    session.open()
+    runner = InProcessAlembicRunner("alembic.ini", session=session)
+
+    runner.upgrade("head")
+    session.close()
+
+    engine = create_engine(app_url)
+    with engine.connect() as conn:
+        version = conn.execute(text("SELECT version_num FROM alembic_version"))
+        assert version.scalar() == "003"
+    engine.dispose()
+
+
+def test_subprocess_runner_rejects_session(app_url):
+    """Test a shared session cannot be combined with the subprocess runner."""
+    with pytest.raises(ValueError, match="in-process"):
+        create_runner("subprocess", "alembic.ini", session=DatabaseSession(app_url))
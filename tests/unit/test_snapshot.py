@@ -0,0 +1,133 @@
+"""Unit tests for state snapshots and resumed runs."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.alembic_ops import InProcessAlembicRunner
+from src.config import ActionConfig
+from src.machine import StateMachine
+from src.safety import SafetyAnalyzer
+from src.snapshot import SnapshotStore
+from src.states import (
+    RESUMABLE_STATES,
+    ActionContext,
+    InitState,
+    ResumeState,
+)
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+class NoRenderRunner(InProcessAlembicRunner):
+    """Runner failing the test if the SQL is rendered again."""
+
+    def upgrade(self, revision="head", sql=False, on_chunk=None):
+        raise AssertionError("resumed run rendered the SQL again")
+
+
+class CrashingScorer:
+    """Risk scorer standing in for a runner lost during the safety check."""
+
+    def score(self, report, sql_chunks):
+        raise RuntimeError("runner lost")
+
+
+def _config(app_dir: Path, **overrides) -> ActionConfig:
+    """Dry-run config with safety analysis on the test app."""
+    values = {
+        "database_url": f"sqlite:///{app_dir / 'test.db'}",
+        "command": "upgrade",
+        "revision": "head",
+        "dry_run": True,
+        "alembic_config_path": "alembic.ini",
+        "working_directory": ".",
+        "analyze_safety": True,
+        "fail_on_danger": False,
+        "runner": "in-process",
+        "state_snapshots": True,
+        **overrides,
+    }
+    return ActionConfig(**values)
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_resume_skips_completed_states(app_dir):
+    """Test a failed safety check resumes without rendering the SQL again."""
+    config = _config(app_dir)
+    context = ActionContext(
+        config=config,
+        runner=InProcessAlembicRunner("alembic.ini"),
+        analyzer=SafetyAnalyzer(),
+    )
+    store = SnapshotStore(config, app_dir / "state")
+    machine = StateMachine(InitState(), context, snapshotter=store)
+    context.risk_scorer = CrashingScorer()  # type: ignore[assignment]
+
+    with pytest.raises(RuntimeError, match="runner lost"):
+        machine.run()
+
+    saved = json.loads((app_dir / "state" / "snapshot.json").read_text())
+    assert saved["state"] == "SafetyCheckState"
+    assert saved["completed"] == ["InitState", "DryRunState"]
+    assert "DROP COLUMN" in (app_dir / "state" / "sql-preview.sql").read_text()
+
+    config = _config(app_dir, resume=True)
+    context = ActionContext(
+        config=config, runner=NoRenderRunner("alembic.ini"), analyzer=SafetyAnalyzer()
+    )
+    store = SnapshotStore(config, app_dir / "state")
+    snapshot = store.load()
+    assert snapshot is not None and snapshot.state is not None
+    store.restore(snapshot, context)
+    StateMachine(
+        ResumeState(RESUMABLE_STATES[snapshot.state]()), context, snapshotter=store
+    ).run()
+
+    assert context.outputs["is-safe"] == "false"
+    assert context.outputs["migration-status"] == "dry-run"
+    assert context.outputs["resumed-state"] == "SafetyCheckState"
+    assert "DROP COLUMN" in str(context.outputs["sql-preview"])
+    assert store.load() is None  # finished
+
+
+def test_snapshot_of_changed_migrations_is_not_resumed(app_dir):
+    """Test editing a revision invalidates the snapshot."""
+    config = _config(app_dir)
+    context = ActionContext(
+        config=config,
+        runner=InProcessAlembicRunner("alembic.ini"),
+        analyzer=SafetyAnalyzer(),
+    )
+    SnapshotStore(config, app_dir / "state").save("InitState", "DryRunState", context)
+
+    assert SnapshotStore(config, app_dir / "state").load() is not None
+    revision = app_dir / "alembic" / "versions" / "003_dangerous_migration.py"
+    revision.write_text(revision.read_text() + "\n# edited\n")
+    assert SnapshotStore(config, app_dir / "state").load() is None
+
+
+def test_replaced_sql_preview_is_written_again(app_dir):
+    """Test a new preview of the same size replaces the file written earlier."""
+    config = _config(app_dir)
+    context = ActionContext(
+        config=config,
+        runner=InProcessAlembicRunner("alembic.ini"),
+        analyzer=SafetyAnalyzer(),
+    )
+    store = SnapshotStore(config, app_dir / "state")
+    context.sql_preview = "".join(["SELECT ", "1;"])
+    store.save("DryRunState", "SafetyCheckState", context)
+
+    # Free the first preview first, so the new one can reuse its id()
+    context.sql_preview = ""
+    context.sql_preview = "".join(["SELECT ", "2;"])
+    store.save("SafetyCheckState", None, context)
+
+    assert (app_dir / "state" / "sql-preview.sql").read_text() == "SELECT 2;"
@@ -0,0 +1,87 @@
+"""Unit tests for spooled command output."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+from src.alembic_ops import AlembicRunner
+from src.spool import CommandOutput, SpooledOutput, iter_text
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_spooled_output_stays_in_memory_when_small():
+    """Test small output is not spilled."""
+    spool = SpooledOutput(max_memory=1024)
+    spool.write("SELECT 1;\n")
+
+    output = spool.finish()
+
+    assert not output.spilled
+    assert output.text() == "SELECT 1;\n"
+
+
+def test_spooled_output_spills_and_streams():
+    """Test large output spills to disk and reads back in chunks."""
+    spool = SpooledOutput(max_memory=64)
+    lines = [f"INSERT INTO t VALUES ({i}, 'é');\n" for i in range(200)]
+    for line in lines:
+        spool.write(line)
+
+    output = spool.finish()
+
+    assert output.spilled
+    assert len(output) == len("".join(lines).encode())
+    # Odd chunk size splits the two-byte character across chunk boundaries
+    assert "".join(output.iter_chunks(chunk_size=7)) == "".join(lines)
+    assert list(output.iter_lines()) == lines
+    output.close()
+    assert not output
+
+
+def test_iter_text_accepts_str_and_handles():
+    """Test iter_text normalizes both SQL text types."""
+    assert "".join(iter_text("abc")) == "abc"
+    assert "".join(iter_text(CommandOutput.from_text("abc"))) == "abc"
+    assert list(iter_text("")) == []
+
+
+def test_runner_streams_without_stderr_deadlock():
+    """Test the subprocess runner drains a flooded stderr while streaming."""
+    script = (
+        "import sys\n"
+        "for i in range(20000):\n"
+        "    sys.stderr.write('log line %d\\n' % i)\n"
+        "    sys.stdout.write('row %d\\n' % i)\n"
+    )
+
+    output = AlembicRunner("alembic.ini")._run_command([sys.executable, "-c", script])
+
+    assert output.text().count("\n") == 20000
+
+
+def test_runner_raises_with_stderr_tail():
+    """Test failures raise CalledProcessError carrying stderr."""
+    script = "import sys; sys.stderr.write('boom'); sys.exit(3)"
+
+    with pytest.raises(subprocess.CalledProcessError) as err:
+        AlembicRunner("alembic.ini")._run_command([sys.executable, "-c", script])
+
+    assert err.value.returncode == 3
+    assert err.value.stderr == "boom"
+
+
+def test_spooled_output_batches_on_chunk_callback():
+    """Test written text reaches on_chunk in batches, flushed on finish."""
+    chunks: list[str] = []
+    spool = SpooledOutput(on_chunk=chunks.append, chunk_size=10)
+    for _ in range(5):
+        spool.write("abcd")
+    assert chunks == ["abcdabcdabcd"]
+    spool.finish()
+    assert "".join(chunks) == "abcd" * 5
+    assert len(chunks) == 2
@@ -0,0 +1,131 @@
+"""Unit tests for statement timing."""
+
+from __future__ import annotations
+
+import json
+
+from sqlalchemy import create_engine, text
+
+from src.alembic_ops import InProcessAlembicRunner
+from src.commands import ExecutionCommand
+from src.config import ActionConfig
+from src.constants import INTERNAL_CONNECTION_KEY
+from src.safety import SafetyAnalyzer
+from src.statement_timing import (
+    StatementRecorder,
+    fingerprint_sql,
+    version_write_revision,
+)
+from src.states import ActionContext
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_fingerprint_normalizes_literals():
+    """Test statements differing only in literals share a fingerprint."""
+    assert (
+        fingerprint_sql(
+            "UPDATE t1  SET name = 'it''s'\n WHERE id IN (1, 2, 3) AND x > -4.5"
+        )
+        == "UPDATE t1 SET name = ? WHERE id IN (?+) AND x > ?"
+    )
+
+
+def test_version_write_revision():
+    """Test only version table writes yield a revision."""
+    assert (
+        version_write_revision(
+            "INSERT INTO alembic_version (version_num) VALUES ('001')",
+            "alembic_version",
+        )
+        == "001"
+    )
+    assert (
+        version_write_revision(
+            "UPDATE alembic_version SET version_num='002' "
+            "WHERE alembic_version.version_num = '001'",
+            "alembic_version",
+        )
+        == "002"
+    )
+    assert (
+        version_write_revision(
+            "SELECT version_num FROM alembic_version", "alembic_version"
+        )
+        is None
+    )
+    assert (
+        version_write_revision("INSERT INTO users VALUES ('x')", "alembic_version")
+        is None
+    )
+
+
+def test_recorder_attributes_statements_to_revisions(app_dir):
+    """Test statements of each step carry the revision of that step."""
+    recorder = StatementRecorder(top=3)
+
+    with recorder.recording():
+        InProcessAlembicRunner("alembic.ini").upgrade("head").close()
+
+    assert {"001", "002", "003"} <= set(recorder.revision_totals())
+    users = [t for t in recorder.timings if t.sql.startswith("CREATE TABLE users")]
+    assert [t.revision for t in users] == ["001"]
+    slowest = recorder.slowest()
+    assert len(slowest) == 3
+    assert slowest[0].duration_ms >= slowest[-1].duration_ms
+
+
+def test_recorder_ignores_statements_outside_recording(app_dir):
+    """Test listeners are removed when the block ends."""
+    recorder = StatementRecorder()
+    with recorder.recording():
+        pass
+
+    InProcessAlembicRunner("alembic.ini").upgrade("head").close()
+
+    assert recorder.timings == []
+
+
+def test_execution_command_publishes_timings(app_dir):
+    """Test an upgrade writes the full report and the slowest statements."""
+    config = ActionConfig(
+        database_url=f"sqlite:///{app_dir / 'test.db'}",
+        command="upgrade",
+        revision="head",
+        dry_run=False,
+        alembic_config_path="alembic.ini",
+        working_directory=".",
+        analyze_safety=False,
+        fail_on_danger=False,
+        runner="in-process",
+        statement_timings=True,
+        statement_timings_path=str(app_dir / "timings.json"),
+        statement_timings_top=2,
+    )
+    context = ActionContext(
+        config=config,
+        runner=InProcessAlembicRunner("alembic.ini"),
+        analyzer=SafetyAnalyzer(),
+        statement_recorder=StatementRecorder(top=2),
+    )
+
+    ExecutionCommand().execute(context)
+
+    report = json.loads((app_dir / "timings.json").read_text())
+    assert set(report["revisions"]) >= {"001", "002", "003"}
+    assert len(report["statements"]) > 2
+    assert len(json.loads(str(context.outputs["slowest-statements"]))) == 2
+
+
+def test_recorder_skips_internal_connections(app_dir):
+    """Test the action's own connections are not recorded as migration SQL."""
+    recorder = StatementRecorder()
+    engine = create_engine("sqlite:///test.db")
+
+    with recorder.recording(), engine.connect() as connection:
+        connection.info[INTERNAL_CONNECTION_KEY] = True
+        connection.execute(text("SELECT 1"))
+
+    engine.dispose()
+    assert recorder.timings == []
@@ -0,0 +1,168 @@
+"""Unit tests for table-size-aware risk scoring."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.safety import DangerLevel, SafetyAnalyzer
+from src.table_stats import (
+    CatalogStats,
+    SizeRiskScorer,
+    SnapshotStats,
+    TableStats,
+    export_snapshot,
+)
+
+ALTER_TYPE = "Column type change detected - may fail or lock table"
+DROP_TABLE = "DROP TABLE detected - data will be permanently lost"
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+class _FakeStats:
+    """Stats source answering from a fixed table."""
+
+    def __init__(self, **tables: tuple[int | None, int | None]):
+        self.tables = tables
+
+    def lookup(self, tables: list[str]) -> dict[str, TableStats]:
+        return {
+            name: TableStats(name, *self.tables[name])
+            for name in tables
+            if name in self.tables
+        }
+
+
+@pytest.fixture
+def sqlite_url(tmp_path) -> str:
+    """SQLite database with a populated ``events`` table."""
+    url = f"sqlite:///{Path(tmp_path) / 'stats.db'}"
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE events (id INTEGER PRIMARY KEY, body TEXT)"))
+        conn.execute(
+            text("INSERT INTO events (body) VALUES (:body)"),
+            [{"body": "x" * 100} for _ in range(250)],
+        )
+        conn.execute(text("CREATE INDEX ix_events_body ON events (body)"))
+    engine.dispose()
+    return url
+
+
+def _score(sql: str, **tables: tuple[int | None, int | None]):
+    """Analyze and score SQL against fake table sizes."""
+    report = SafetyAnalyzer().analyze(sql)
+    return SizeRiskScorer(_FakeStats(**tables), large_rows=1_000_000).score(
+        report, [sql]
+    )
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_catalog_stats_reads_sqlite_tables(sqlite_url):
+    """Test row counts and dbstat sizes; missing tables are left out."""
+    stats = CatalogStats(sqlite_url).lookup(['"events"', "missing"])
+
+    assert list(stats) == ['"events"']
+    size = stats['"events"'].bytes
+    assert stats['"events"'].rows == 250
+    assert size is not None and size > 250 * 100
+
+
+def test_type_change_on_large_table_is_high():
+    """Test a rewrite of a large table is raised to HIGH and annotated."""
+    report = _score(
+        "ALTER TABLE events ALTER COLUMN id TYPE BIGINT;",
+        events=(2_000_000_000, 310 * 1024**3),
+    )
+
+    assert report.danger_level == DangerLevel.HIGH
+    assert report.warnings == [f"{ALTER_TYPE} [events: ~2.0B rows, 310.0 GB]"]
+
+
+def test_type_change_on_small_table_is_low():
+    """Test a rewrite of a small lookup table is lowered to LOW."""
+    report = _score(
+        "ALTER TABLE countries ALTER COLUMN code TYPE TEXT;",
+        countries=(250, 16384),
+    )
+
+    assert report.danger_level == DangerLevel.LOW
+    assert report.warnings == [f"{ALTER_TYPE} [countries: ~250 rows, 16.0 KB]"]
+    assert not report.is_safe
+
+
+def test_unknown_tables_keep_rule_level():
+    """Test tables without statistics leave the warning unchanged."""
+    sql = "ALTER TABLE new_table ALTER COLUMN id TYPE BIGINT;"
+
+    assert _score(sql) == SafetyAnalyzer().analyze(sql)
+
+
+def test_data_loss_is_not_downgraded():
+    """Test DROP TABLE stays HIGH on small tables but gets annotated."""
+    report = _score("DROP TABLE tmp;", tmp=(0, 8192))
+
+    assert report.danger_level == DangerLevel.HIGH
+    assert report.warnings == [f"{DROP_TABLE} [tmp: ~0 rows, 8.0 KB]"]
+
+
+def test_attribution_follows_annotated_warning():
+    """Test per-revision attribution is kept under the new message."""
+    sql = "ALTER TABLE events ALTER COLUMN id TYPE BIGINT;"
+    report = SafetyAnalyzer().analyze(sql)
+    report = type(report)(
+        report.is_safe,
+        report.danger_level,
+        report.warnings,
+        {ALTER_TYPE: ("002",)},
+    )
+
+    scored = SizeRiskScorer(_FakeStats(events=(5_000_000, None))).score(report, [sql])
+
+    assert scored.attribution == {scored.warnings[0]: ("002",)}
+    assert scored.danger_level == DangerLevel.HIGH
+
+
+def test_snapshot_round_trip(sqlite_url, tmp_path):
+    """Test exported statistics are found by quoted and qualified names."""
+    path = tmp_path / "snapshot.json"
+    assert export_snapshot(sqlite_url, path) == 1
+
+    stats = SnapshotStats(path).lookup(['"events"', "main.EVENTS", "missing"])
+
+    assert set(stats) == {'"events"', "main.EVENTS"}
+    assert stats['"events"'].rows == 250
+    assert stats['"events"'].indexes == ("ix_events_body",)
+
+
+def test_snapshot_scores_without_database(tmp_path):
+    """Test a production snapshot raises a rewrite found in a dry run."""
+    path = tmp_path / "snapshot.json"
+    path.write_text(
+        '{"format": 1, "dialect": "postgresql", "default_schema": "public", '
+        '"tables": [{"schema": "public", "name": "events", "rows": 2000000000, '
+        '"bytes": null, "indexes": ["events_pkey"]}]}'
+    )
+    sql = "ALTER TABLE events ALTER COLUMN id TYPE BIGINT;"
+
+    report = SizeRiskScorer(SnapshotStats(path)).score(
+        SafetyAnalyzer().analyze(sql), [sql]
+    )
+
+    assert report.danger_level == DangerLevel.HIGH
+    assert report.warnings == [f"{ALTER_TYPE} [events: ~2.0B rows, 1 index(es)]"]
+
+
+def test_snapshot_rejects_unknown_format(tmp_path):
+    """Test files that are not snapshots are refused."""
+    path = tmp_path / "snapshot.json"
+    path.write_text('{"format": 99}')
+
+    with pytest.raises(ValueError, match="format"):
+        SnapshotStats(path)
@@ -0,0 +1,113 @@
+"""Unit tests for offline tracing."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src.alembic_ops import InProcessAlembicRunner
+from src.machine import State, StateMachine
+from src.observers import TracingObserver
+from src.tracing import STATUS_CODE_ERROR, Tracer, set_tracer
+
+TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+@pytest.fixture
+def tracer():
+    """Installed, instrumented tracer, removed after the test."""
+    tracer = Tracer(TRACEPARENT)
+    tracer.instrument()
+    set_tracer(tracer)
+    yield tracer
+    set_tracer(None)
+    tracer.uninstrument()
+
+
+class _Step(State[dict]):
+    """State that runs a callable."""
+
+    def __init__(self, action, next_state=None):
+        self.action = action
+        self.next_state = next_state
+
+    def handle(self, context: dict) -> State[dict] | None:
+        self.action()
+        return self.next_state
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_traceparent_continues_ci_trace():
+    """Test root spans join the trace and span given by TRACEPARENT."""
+    tracer = Tracer(TRACEPARENT)
+    with tracer.span("root"):
+        pass
+
+    [root] = tracer.spans
+    assert root.trace_id == "0af7651916cd43dd8448eb211c80319c"
+    assert root.parent_id == "b7ad6b7169203331"
+
+
+def test_malformed_traceparent_starts_new_trace():
+    """Test an invalid TRACEPARENT is ignored."""
+    tracer = Tracer("not-a-traceparent")
+
+    assert len(tracer.trace_id) == 32
+    assert tracer.parent_id == ""
+
+
+def test_in_process_upgrade_spans_revisions_and_statements(app_dir, tracer):
+    """Test statements are grouped under one span per migration step."""
+    InProcessAlembicRunner("alembic.ini").upgrade("head").close()
+
+    by_id = {span.span_id: span for span in tracer.spans}
+    [command] = [s for s in tracer.spans if s.name == "alembic upgrade head"]
+    revisions = [s for s in tracer.spans if s.name.startswith("alembic.revision ")]
+    assert [s.attributes["alembic.revision"] for s in revisions] == [
+        "001",
+        "002",
+        "003",
+    ]
+    assert all(s.parent_id == command.span_id for s in revisions)
+
+    creates = [s for s in tracer.spans if s.name == "CREATE"]
+    assert any("users" in s.attributes["db.statement"] for s in creates)
+    assert all(by_id[s.parent_id].name.startswith("alembic") for s in creates)
+
+
+def test_observer_spans_states_and_exports_otlp(tmp_path):
+    """Test state spans nest under the run span and are exported."""
+    tracer = Tracer(TRACEPARENT)
+    machine = StateMachine(_Step(lambda: None, _Step(lambda: 1 / 0)), {})
+    machine.add_observer(TracingObserver(tracer))
+
+    with pytest.raises(ZeroDivisionError):
+        machine.run()
+    tracer.export(tmp_path / "trace.json")
+
+    [line] = (tmp_path / "trace.json").read_text().splitlines()
+    spans = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root = next(s for s in spans if s["name"] == "alembic-deploy")
+    states = [s for s in spans if s["name"] == "state _Step"]
+    assert root["parentSpanId"] == "b7ad6b7169203331"
+    assert all(s["parentSpanId"] == root["spanId"] for s in states)
+    assert states[1]["status"]["code"] == STATUS_CODE_ERROR
+    assert root["status"]["code"] == STATUS_CODE_ERROR
+
+
+def test_end_span_closes_open_children():
+    """Test closing a parent closes spans still open beneath it."""
+    tracer = Tracer()
+    parent = tracer.start_span("parent")
+    child = tracer.start_span("child")
+
+    tracer.end_span(parent, RuntimeError("boom"))
+
+    assert child.end_ns > 0
+    assert child.error == "RuntimeError: boom"